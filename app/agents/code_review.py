@@ -21,7 +21,7 @@ from ..services.ai_providers import ai_request, TaskType
 # Import agent framework
 from .base import BaseAgent, AgentType, AgentStatus, DomainAgent
 from .tools import ToolSystem, ToolDefinition, ToolParameter
-from .memory import MemorySystem
+from .memory import MemoryRecord, MemoryType, get_memory_system
 
 logger = logging.getLogger(__name__)
 
@@ -525,8 +525,7 @@ class CodeReviewAgent(DomainAgent):
     ) -> None:
         """Store code review in memory system for learning."""
         try:
-            memory = MemorySystem()
-            await memory.initialize()
+            memory = await get_memory_system()
 
             memory_content = f"Code review for {language} file: {file_path or 'unknown'}"
             memory_metadata = {
@@ -539,15 +538,15 @@ class CodeReviewAgent(DomainAgent):
                 "timestamp": datetime.now().isoformat()
             }
 
-            await memory.store_memory(
+            # Written by the next bulk flush; reviews don't wait on it
+            memory.enqueue_memory(MemoryRecord(
                 agent_id=self.agent_id,
-                memory_type="semantic",
                 content=memory_content,
-                metadata=memory_metadata,
-                embedding_text=memory_content
-            )
+                memory_type=MemoryType.SEMANTIC,
+                metadata=memory_metadata
+            ))
 
-            logger.debug(f"Stored code review in memory: {memory_content[:50]}...")
+            logger.debug(f"Queued code review for memory: {memory_content[:50]}...")
         except Exception as e:
             logger.warning(f"Failed to store review in memory: {e}")
             # Non-critical failure
@@ -5,9 +5,11 @@ Main orchestrator for intelligent email processing.
 Migrated to Multi-Agent Framework with backward compatibility.
 """
 
+import asyncio
 import logging
 import json
 import re
+import uuid
 import httpx
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -16,12 +18,13 @@ from ..database import db
 from ..config import settings
 from ..services.ai_providers import ai_request, TaskType
 from ..services.email_client import (
-    fetch_all_accounts, EmailMessage,
+    load_full_bodies, EmailMessage,
     archive_email, delete_email, mark_as_read
 )
+from ..services.email_sync import email_sync
 from ..services.email_learner import (
-    should_auto_action, record_feedback,
-    get_vip_senders, PREF_IMPORTANT, PREF_ARCHIVE, PREF_DELETE
+    record_feedback, load_preference_snapshot, PreferenceSnapshot,
+    PREF_IMPORTANT, PREF_ARCHIVE, PREF_DELETE
 )
 from ..services.insight_engine import (
     generate_insights, get_recent_insights,
@@ -32,7 +35,7 @@ from ..exceptions.manual_tasks import ConfigurationInterventionRequired
 # Import agent framework
 from .base import BaseAgent, AgentType, AgentStatus
 from .tools import ToolSystem, ToolDefinition, ToolParameter
-from .memory import MemorySystem
+from .memory import MemoryRecord, MemoryType, get_memory_system
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +52,25 @@ Categories:
 
 Respond with ONLY the category name, nothing else."""
 
+CATEGORIES = {"spam", "promo", "social", "financial", "work", "personal", "important"}
+
+# memories.agent_id is a UUID; same uuid5 mapping as conversation memory uses
+EMAIL_SYSTEM_AGENT_ID = str(uuid.uuid5(uuid.NAMESPACE_DNS, "email_system"))
+
+CLASSIFY_BATCH_SYSTEM = """You are an email classifier. You will get several numbered emails.
+Classify each into exactly one category.
+Categories:
+- spam: Obvious junk, scams, phishing
+- promo: Marketing, newsletters, promotions
+- social: Social media notifications
+- financial: Bank statements, bills, receipts, transactions
+- work: Work-related emails
+- personal: From friends/family, personal matters
+- important: Urgent matters, security alerts, time-sensitive
+
+Respond with ONLY a JSON object mapping each email number to its category,
+e.g. {"1": "promo", "2": "work"}. Include every email."""
+
 EXTRACT_SYSTEM = """You are a data extractor. Extract structured information from emails.
 Return JSON with these fields (include only if found):
 {
@@ -476,184 +498,367 @@ async def get_default_email_agent() -> EmailIntelligenceAgent:
     return _default_email_agent
 
 
-async def process_email(email: EmailMessage) -> Dict[str, Any]:
+async def process_email(email: EmailMessage, check_processed: bool = True) -> Dict[str, Any]:
     """
     Process a single email through the intelligence pipeline.
 
+    `check_processed=False` skips the duplicate lookup for callers that
+    already filtered it out.
+
     Returns processing result with classification, summary, extracted data, and action taken.
     """
-    # Original implementation (unchanged except for delegation option)
-    # For backward compatibility, keep original logic
-    result = {
-        "message_id": email.message_id,
-        "account": email.account,
-        "sender": email.sender,
-        "subject": email.subject,
-        "classification": None,
-        "importance_score": 0.5,
-        "summary": None,
-        "extracted_data": {},
-        "action_taken": None,
-        "ai_provider": None
-    }
-
     try:
         # Check if already processed
-        existing = await db.fetch_one(
-            "SELECT id FROM processed_emails WHERE message_id = $1",
-            email.message_id
-        )
-        if existing:
-            logger.debug(f"Email already processed: {email.message_id[:20]}...")
-            return {"skipped": True, "reason": "already_processed"}
+        if check_processed:
+            existing = await db.fetch_one(
+                "SELECT id FROM processed_emails WHERE message_id = $1",
+                email.message_id
+            )
+            if existing:
+                logger.debug(f"Email already processed: {email.message_id[:20]}...")
+                return {"skipped": True, "reason": "already_processed"}
+
+        return (await process_emails([email]))[0]
 
-        # Check VIP senders first
-        vip_senders = await get_vip_senders()
-        is_vip = email.sender.lower() in [s.lower() for s in vip_senders]
+    except Exception as e:
+        logger.error(f"Failed to process email {email.message_id[:20]}: {e}")
+        return {"error": str(e), "message_id": email.message_id}
 
-        # Check for learned auto-action
-        auto_action = await should_auto_action(email.sender, email.subject)
 
-        # 1. Quick classification (Groq - fast)
-        classify_prompt = f"Subject: {email.subject}\nFrom: {email.sender_name} <{email.sender}>\nPreview: {email.body_preview[:300]}"
+async def process_emails(
+    emails: List[EmailMessage],
+    preferences: Optional[PreferenceSnapshot] = None
+) -> List[Dict[str, Any]]:
+    """
+    Process a batch of new emails; returns one result per email, in order.
 
-        classify_result = await ai_request(
-            prompt=classify_prompt,
-            task_type="classification",
-            system=CLASSIFY_SYSTEM
-        )
-        classification = classify_result["content"].strip().lower()
+    Stages: load preferences once, classify in batched prompts, fetch full
+    bodies for the emails that need them, then act on each email (extract,
+    summarize, alert) with at most EMAIL_PIPELINE_CONCURRENCY in flight,
+    and finally write processed_emails/extracted_entities in one transaction.
+    A failing email gets an {"error": ...} result without stopping the rest.
+    """
+    if not emails:
+        return []
+
+    if preferences is None:
+        preferences = await load_preference_snapshot()
+    semaphore = asyncio.Semaphore(max(1, settings.email_pipeline_concurrency))
+
+    results: List[Dict[str, Any]] = [
+        {
+            "message_id": email.message_id,
+            "account": email.account,
+            "sender": email.sender,
+            "subject": email.subject,
+            "classification": None,
+            "importance_score": 0.5,
+            "summary": None,
+            "extracted_data": {},
+            "action_taken": None,
+            "ai_provider": None
+        }
+        for email in emails
+    ]
+
+    # 1. Classification, many emails per prompt
+    classified = await classify_emails(emails, semaphore)
+
+    # 2. Decide what each email needs before touching IMAP again
+    auto_actions: List[Optional[str]] = [None] * len(emails)
+    needs_body = []
+    for i, email in enumerate(emails):
+        if isinstance(classified[i], Exception):
+            results[i] = {"error": str(classified[i]), "message_id": email.message_id}
+            continue
+        classification, provider = classified[i]
+        result = results[i]
         result["classification"] = classification
-        result["ai_provider"] = classify_result["provider"]
+        result["ai_provider"] = provider
+        result["importance_score"] = calculate_importance(
+            classification, preferences.is_vip(email.sender), email
+        )
+        auto_actions[i] = preferences.auto_action(email.sender, email.subject)
+        if _plan_reading(result, auto_actions[i]) != (False, False):
+            needs_body.append(email)
 
-        # 2. Determine importance score
-        importance = calculate_importance(classification, is_vip, email)
-        result["importance_score"] = importance
+    # Scans fetch a partial body; pull the rest (one FETCH per folder) only for emails we read in full
+    if needs_body:
+        await load_full_bodies(needs_body)
 
-        # 3. Handle based on classification and learned preferences
-        if auto_action == PREF_DELETE or classification == "spam":
-            # Auto-delete spam or learned delete
-            await delete_email(email.account, email.message_id)
-            result["action_taken"] = "deleted"
-            logger.info(f"Auto-deleted: {email.subject[:50]}")
+    # 3. Per-email actions and LLM reads, bounded
+    async def act(i: int) -> None:
+        email = emails[i]
+        try:
+            async with semaphore:
+                await _act_on_email(email, results[i], auto_actions[i])
+        except Exception as e:
+            logger.error(f"Failed to process email {email.message_id[:20]}: {e}")
+            results[i] = {"error": str(e), "message_id": email.message_id}
 
-        elif auto_action == PREF_ARCHIVE or classification == "promo":
-            # Auto-archive promos or learned archive
-            await archive_email(email.account, email.message_id)
-            result["action_taken"] = "archived"
-            logger.info(f"Auto-archived: {email.subject[:50]}")
+    await asyncio.gather(*(act(i) for i in range(len(emails)) if "error" not in results[i]))
 
-        else:
-            # Process further for important/financial/personal emails
+    # 4. One transaction for every row this batch produced
+    done = [(email, result) for email, result in zip(emails, results) if "error" not in result]
+    try:
+        await store_processed_emails(done)
+    except Exception as e:
+        logger.error(f"Failed to store {len(done)} processed emails: {e}")
+        for i, result in enumerate(results):
+            if "error" not in result:
+                results[i] = {"error": str(e), "message_id": emails[i].message_id}
+        return results
+
+    # Store insights in memory system
+    await store_email_insights_in_memory(done)
 
-            # 4. Extract entities (Groq - fast)
-            if classification in ["financial", "important", "work", "personal"]:
-                extract_prompt = f"Email:\nSubject: {email.subject}\nFrom: {email.sender}\nBody:\n{email.body[:2000]}"
+    return results
 
-                extract_result = await ai_request(
-                    prompt=extract_prompt,
-                    task_type="extraction",
-                    system=EXTRACT_SYSTEM
+
+async def classify_emails(
+    emails: List[EmailMessage],
+    semaphore: asyncio.Semaphore
+) -> List[Any]:
+    """
+    Classify emails EMAIL_CLASSIFY_BATCH_SIZE at a time.
+
+    Returns a (classification, provider) tuple per email, or the exception
+    that prevented classifying it. Emails a batch answer leaves out (or
+    labels with an unknown category) are classified on their own.
+    """
+    batch_size = max(1, settings.email_classify_batch_size)
+    classified: List[Any] = [None] * len(emails)
+
+    async def classify_one(i: int) -> None:
+        email = emails[i]
+        try:
+            async with semaphore:
+                classify_result = await ai_request(
+                    prompt=_classify_prompt(email),
+                    task_type="classification",
+                    system=CLASSIFY_SYSTEM
                 )
+            classified[i] = (classify_result["content"].strip().lower(), classify_result["provider"])
+        except Exception as e:
+            logger.error(f"Failed to classify email {email.message_id[:20]}: {e}")
+            classified[i] = e
+
+    async def classify_batch(indexes: List[int]) -> None:
+        if len(indexes) == 1:
+            await classify_one(indexes[0])
+            return
 
-                try:
-                    # Parse JSON from response
-                    json_match = re.search(r'\{.*\}', extract_result["content"], re.DOTALL)
-                    if json_match:
-                        extracted = json.loads(json_match.group())
-                        result["extracted_data"] = extracted
-
-                        # Store extracted entities
-                        await store_extracted_entities(email.message_id, extracted)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse extraction for {email.message_id[:20]}: {e}")
-                except Exception as e:
-                    logger.warning(f"Unexpected error parsing extraction for {email.message_id[:20]}: {e}")
-
-            # 5. Summarize important emails (Gemini - better quality)
-            if importance >= 0.7 or classification in ["important", "financial"]:
-                summary_prompt = f"Subject: {email.subject}\nFrom: {email.sender_name}\nBody:\n{email.body[:1500]}"
-
-                summary_result = await ai_request(
-                    prompt=summary_prompt,
-                    task_type="summarization",
-                    system=SUMMARIZE_SYSTEM
+        prompt = "\n\n".join(
+            f"[{n}]\n{_classify_prompt(emails[i])}" for n, i in enumerate(indexes, 1)
+        )
+        labels, provider = {}, None
+        try:
+            async with semaphore:
+                classify_result = await ai_request(
+                    prompt=prompt,
+                    task_type="classification",
+                    system=CLASSIFY_BATCH_SYSTEM
                 )
-                result["summary"] = summary_result["content"].strip()
+            provider = classify_result["provider"]
+            json_match = re.search(r'\{.*\}', classify_result["content"], re.DOTALL)
+            if json_match:
+                labels = json.loads(json_match.group())
+        except Exception as e:
+            logger.warning(f"Batch classification of {len(indexes)} emails failed: {e}")
 
-            # 6. Send alert for high-priority emails
-            if importance >= 0.8 or classification == "important":
-                await send_alert(email, result)
-                result["action_taken"] = "alerted"
+        missing = []
+        for n, i in enumerate(indexes, 1):
+            label = str(labels.get(str(n), "")).strip().lower()
+            if label in CATEGORIES:
+                classified[i] = (label, provider)
+            else:
+                missing.append(i)
+        if missing:
+            logger.debug(f"Classifying {len(missing)} emails individually")
+            await asyncio.gather(*(classify_one(i) for i in missing))
 
-            elif classification == "financial" and result.get("extracted_data", {}).get("transaction"):
-                # Log financial transaction
-                await log_transaction(email, result["extracted_data"]["transaction"])
-                result["action_taken"] = "transaction_logged"
+    await asyncio.gather(*(
+        classify_batch(list(range(start, min(start + batch_size, len(emails)))))
+        for start in range(0, len(emails), batch_size)
+    ))
+    return classified
 
-        # Store processed email
-        await store_processed_email(email, result)
 
-        # Store insights in memory system
-        await store_email_insight_in_memory(email, result)
+def _classify_prompt(email: EmailMessage) -> str:
+    return f"Subject: {email.subject}\nFrom: {email.sender_name} <{email.sender}>\nPreview: {email.body_preview[:300]}"
 
-        return result
 
-    except Exception as e:
-        logger.error(f"Failed to process email {email.message_id[:20]}: {e}")
-        return {"error": str(e), "message_id": email.message_id}
+def _plan_reading(result: Dict[str, Any], auto_action: Optional[str]) -> tuple:
+    """(needs_extraction, needs_summary); both False when the email is deleted or archived."""
+    classification = result["classification"]
+    if auto_action in (PREF_DELETE, PREF_ARCHIVE) or classification in ("spam", "promo"):
+        return False, False
+    needs_extraction = classification in ["financial", "important", "work", "personal"]
+    needs_summary = result["importance_score"] >= 0.7 or classification in ["important", "financial"]
+    return needs_extraction, needs_summary
+
+
+async def _act_on_email(email: EmailMessage, result: Dict[str, Any], auto_action: Optional[str]) -> None:
+    """Delete/archive, or extract, summarize and alert on an email already classified."""
+    classification = result["classification"]
+    importance = result["importance_score"]
+
+    if auto_action == PREF_DELETE or classification == "spam":
+        # Auto-delete spam or learned delete
+        await delete_email(email.account, email.message_id)
+        result["action_taken"] = "deleted"
+        logger.info(f"Auto-deleted: {email.subject[:50]}")
+        return
 
+    if auto_action == PREF_ARCHIVE or classification == "promo":
+        # Auto-archive promos or learned archive
+        await archive_email(email.account, email.message_id)
+        result["action_taken"] = "archived"
+        logger.info(f"Auto-archived: {email.subject[:50]}")
+        return
+
+    needs_extraction, needs_summary = _plan_reading(result, auto_action)
+
+    async def extract() -> None:
+        extract_prompt = f"Email:\nSubject: {email.subject}\nFrom: {email.sender}\nBody:\n{email.body[:2000]}"
+
+        extract_result = await ai_request(
+            prompt=extract_prompt,
+            task_type="extraction",
+            system=EXTRACT_SYSTEM
+        )
 
-async def scan_emails(since_days: int = 1, limit: int = 50) -> Dict[str, Any]:
+        try:
+            # Parse JSON from response
+            json_match = re.search(r'\{.*\}', extract_result["content"], re.DOTALL)
+            if json_match:
+                # Rows built from this share the batch's transaction, so coerce them here
+                result["extracted_data"] = normalize_extraction(json.loads(json_match.group()))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse extraction for {email.message_id[:20]}: {e}")
+        except Exception as e:
+            logger.warning(f"Unexpected error parsing extraction for {email.message_id[:20]}: {e}")
+
+    async def summarize() -> None:
+        summary_prompt = f"Subject: {email.subject}\nFrom: {email.sender_name}\nBody:\n{email.body[:1500]}"
+
+        summary_result = await ai_request(
+            prompt=summary_prompt,
+            task_type="summarization",
+            system=SUMMARIZE_SYSTEM
+        )
+        result["summary"] = summary_result["content"].strip()
+
+    # Extraction (Groq) and summary (Gemini) are independent
+    await asyncio.gather(
+        *([extract()] if needs_extraction else []),
+        *([summarize()] if needs_summary else [])
+    )
+
+    # Send alert for high-priority emails
+    if importance >= 0.8 or classification == "important":
+        await send_alert(email, result)
+        result["action_taken"] = "alerted"
+
+    elif classification == "financial" and result.get("extracted_data", {}).get("transaction"):
+        # Log financial transaction
+        await log_transaction(email, result["extracted_data"]["transaction"])
+        result["action_taken"] = "transaction_logged"
+
+
+# Scans fetch, process and then commit checkpoints; overlapping scans would double-process
+_scan_lock = asyncio.Lock()
+
+
+async def scan_emails(
+    since_days: int = 1,
+    limit: int = 50,
+    accounts: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
-    Scan and process emails from all accounts.
+    Scan and process new emails from all accounts (or just `accounts`).
+
+    Only mail past each folder's sync checkpoint is fetched; `since_days`
+    bounds the first scan of a folder. Checkpoints advance after processing.
 
     Returns summary of processing.
     """
     logger.info(f"Starting email scan (last {since_days} days, limit {limit})")
 
-    # Fetch emails
-    emails = await fetch_all_accounts(since_days=since_days, limit_per_account=limit // 2)
-
-    if not emails:
-        return {"status": "no_emails", "processed": 0}
-
-    results = {
-        "total_fetched": len(emails),
-        "processed": 0,
-        "skipped": 0,
-        "errors": 0,
-        "by_classification": {},
-        "by_action": {},
-        "transactions_found": 0
-    }
+    async with _scan_lock:
+        batches = await email_sync.fetch_all(
+            accounts=accounts,
+            since_days=since_days,
+            limit_per_account=max(1, limit // 2)
+        )
+        emails = [email for batch in batches for email in batch.emails]
+        emails.sort(key=lambda x: x.received_at, reverse=True)
+
+        if not emails:
+            for batch in batches:
+                await email_sync.commit(batch)
+            return {"status": "no_emails", "processed": 0}
+
+        results = {
+            "total_fetched": len(emails),
+            "processed": 0,
+            "skipped": 0,
+            "errors": 0,
+            "by_classification": {},
+            "by_action": {},
+            "transactions_found": 0
+        }
 
-    for email in emails:
+        # One lookup for the whole batch instead of one per email
+        processed_ids = set()
         try:
-            result = await process_email(email)
+            rows = await db.fetch_all(
+                "SELECT message_id FROM processed_emails WHERE message_id = ANY($1)",
+                [email.message_id for email in emails]
+            )
+            processed_ids = {row["message_id"] for row in rows}
+        except Exception as e:
+            logger.error(f"Failed to check processed emails: {e}")
 
-            if result.get("skipped"):
+        # The same message can sit in two folders; process it once
+        new_emails = []
+        for email in emails:
+            if email.message_id in processed_ids:
                 results["skipped"] += 1
-            elif result.get("error"):
+                continue
+            processed_ids.add(email.message_id)
+            new_emails.append(email)
+
+        try:
+            outcomes = await process_emails(new_emails)
+        except Exception as e:
+            logger.error(f"Error processing emails: {e}")
+            outcomes = [{"error": str(e)} for _ in new_emails]
+
+        failed = {}
+        for email, result in zip(new_emails, outcomes):
+            if result.get("error"):
                 results["errors"] += 1
-            else:
-                results["processed"] += 1
+                failed.setdefault((email.account, email.folder), []).append(email.uid)
+                continue
 
-                # Track classifications
-                classification = result.get("classification", "unknown")
-                results["by_classification"][classification] = results["by_classification"].get(classification, 0) + 1
+            results["processed"] += 1
 
-                # Track actions
-                action = result.get("action_taken", "none")
-                results["by_action"][action] = results["by_action"].get(action, 0) + 1
+            # Track classifications
+            classification = result.get("classification", "unknown")
+            results["by_classification"][classification] = results["by_classification"].get(classification, 0) + 1
 
-                # Count transactions
-                if result.get("extracted_data", {}).get("transaction"):
-                    results["transactions_found"] += 1
+            # Track actions
+            action = result.get("action_taken", "none")
+            results["by_action"][action] = results["by_action"].get(action, 0) + 1
 
-        except Exception as e:
-            logger.error(f"Error processing email: {e}")
-            results["errors"] += 1
+            # Count transactions
+            if result.get("extracted_data", {}).get("transaction"):
+                results["transactions_found"] += 1
+
+        # Failed emails stay above the checkpoint and are retried next scan
+        for batch in batches:
+            await email_sync.commit(batch, failed.get((batch.account, batch.folder), ()))
 
     logger.info(f"Email scan complete: {results['processed']} processed, {results['skipped']} skipped")
 
@@ -724,64 +929,121 @@ def calculate_importance(classification: str, is_vip: bool, email: EmailMessage)
     return round(score, 2)
 
 
-async def store_extracted_entities(email_id: str, extracted: Dict[str, Any]) -> None:
-    """Store extracted entities in database."""
+INSERT_ENTITY = """
+    INSERT INTO extracted_entities (source_type, source_id, entity_type, entity_value, context)
+    VALUES ('email', $1, $2, $3, $4)
+"""
+
+INSERT_PROCESSED_EMAIL = """
+    INSERT INTO processed_emails
+    (message_id, account, sender, sender_name, recipient, subject, body_preview,
+     received_at, classification, importance_score, summary, extracted_data,
+     action_taken, ai_provider_used)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+    ON CONFLICT (message_id) DO NOTHING
+"""
+
+
+# Fields of the structured entries EXTRACT_SYSTEM asks for
+EXTRACTED_OBJECTS = {
+    "transaction": ("amount", "merchant", "type"),
+    "subscription": ("name", "amount", "frequency"),
+}
+EXTRACTED_OBJECT_LISTS = {
+    "dates": ("date", "context"),
+    "people": ("name", "email"),
+}
+EXTRACTED_TEXT_LISTS = ("action_items", "companies")
+
+
+def _entity_text(value: Any) -> Optional[str]:
+    """A scalar as text, or None for nested values that don't fit a text column."""
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    return str(value)
+
+
+def normalize_extraction(extracted: Any) -> Dict[str, Any]:
+    """
+    Coerce an LLM extraction to EXTRACT_SYSTEM's shape.
+
+    Known fields keep only well-formed entries, with scalar values turned
+    into text (e.g. a numeric amount); anything else is dropped. Unknown
+    fields are kept as they are for extracted_data.
+    """
+    if not isinstance(extracted, dict):
+        return {}
+    clean = dict(extracted)
+
+    def fields_of(entry: Any, names: tuple) -> Optional[Dict[str, str]]:
+        if not isinstance(entry, dict):
+            return None
+        values = {name: _entity_text(entry.get(name)) for name in names}
+        return {name: value for name, value in values.items() if value is not None}
+
+    for key, names in EXTRACTED_OBJECTS.items():
+        entry = fields_of(extracted.get(key), names) if key in extracted else None
+        if entry is None:
+            clean.pop(key, None)
+        else:
+            clean[key] = entry
+    for key, names in EXTRACTED_OBJECT_LISTS.items():
+        entries = extracted.get(key)
+        if isinstance(entries, list):
+            clean[key] = [entry for entry in (fields_of(e, names) for e in entries) if entry is not None]
+        else:
+            clean.pop(key, None)
+    for key in EXTRACTED_TEXT_LISTS:
+        entries = extracted.get(key)
+        if isinstance(entries, list):
+            clean[key] = [text for text in map(_entity_text, entries) if text is not None]
+        else:
+            clean.pop(key, None)
+    return clean
+
+
+def entity_rows(email_id: str, extracted: Dict[str, Any]) -> List[tuple]:
+    """extracted_entities rows (source_id, type, value, context) for one extraction."""
+    extracted = normalize_extraction(extracted)
+    rows = []
+
     # Transaction
     if "transaction" in extracted:
         tx = extracted["transaction"]
-        await db.execute(
-            """
-            INSERT INTO extracted_entities (source_type, source_id, entity_type, entity_value, context)
-            VALUES ('email', $1, 'transaction', $2, $3)
-            """,
-            email_id, tx.get("amount", ""), f"{tx.get('merchant', '')} - {tx.get('type', '')}"
-        )
+        rows.append((email_id, "transaction", tx.get("amount", ""), f"{tx.get('merchant', '')} - {tx.get('type', '')}"))
 
     # Dates
     for date_info in extracted.get("dates", []):
-        await db.execute(
-            """
-            INSERT INTO extracted_entities (source_type, source_id, entity_type, entity_value, context)
-            VALUES ('email', $1, 'date', $2, $3)
-            """,
-            email_id, date_info.get("date", ""), date_info.get("context", "")
-        )
+        rows.append((email_id, "date", date_info.get("date", ""), date_info.get("context", "")))
 
     # People
     for person in extracted.get("people", []):
-        await db.execute(
-            """
-            INSERT INTO extracted_entities (source_type, source_id, entity_type, entity_value, context)
-            VALUES ('email', $1, 'person', $2, $3)
-            """,
-            email_id, person.get("name", ""), person.get("email", "")
-        )
+        rows.append((email_id, "person", person.get("name", ""), person.get("email", "")))
 
     # Subscription
     if "subscription" in extracted:
         sub = extracted["subscription"]
-        await db.execute(
-            """
-            INSERT INTO extracted_entities (source_type, source_id, entity_type, entity_value, context)
-            VALUES ('email', $1, 'subscription', $2, $3)
-            """,
-            email_id, sub.get("amount", ""), f"{sub.get('name', '')} - {sub.get('frequency', '')}"
-        )
+        rows.append((email_id, "subscription", sub.get("amount", ""), f"{sub.get('name', '')} - {sub.get('frequency', '')}"))
 
+    return rows
 
-async def store_email_insight_in_memory(email: EmailMessage, result: Dict[str, Any]) -> None:
-    """Store email insights in memory system for future retrieval."""
-    try:
-        memory = MemorySystem()
-        await memory.initialize()
 
-        # Create a semantic memory about the email classification
-        classification = result.get("classification")
-        sender = email.sender
-        subject = email.subject[:100]
+async def store_extracted_entities(email_id: str, extracted: Dict[str, Any]) -> None:
+    """Store extracted entities in database."""
+    await db.execute_many([(INSERT_ENTITY, entity_rows(email_id, extracted))])
 
-        memory_content = f"Email from {sender} classified as {classification}: {subject}"
-        memory_metadata = {
+
+def email_insight_record(email: EmailMessage, result: Dict[str, Any]) -> MemoryRecord:
+    """Semantic memory about an email's classification."""
+    classification = result.get("classification")
+    sender = email.sender
+    subject = email.subject[:100]
+
+    return MemoryRecord(
+        agent_id=EMAIL_SYSTEM_AGENT_ID,
+        content=f"Email from {sender} classified as {classification}: {subject}",
+        memory_type=MemoryType.SEMANTIC,
+        metadata={
             "source": "email_processing",
             "email_id": email.message_id,
             "sender": sender,
@@ -790,33 +1052,24 @@ async def store_email_insight_in_memory(email: EmailMessage, result: Dict[str, A
             "action_taken": result.get("action_taken"),
             "timestamp": datetime.now().isoformat()
         }
+    )
 
-        # Store as semantic memory (agent_id can be "email_system" or use email agent ID)
-        await memory.store_memory(
-            agent_id="email_system",
-            memory_type="semantic",
-            content=memory_content,
-            metadata=memory_metadata,
-            embedding_text=memory_content  # Use same content for embedding
-        )
 
-        logger.debug(f"Stored email insight in memory: {memory_content[:50]}...")
+async def store_email_insights_in_memory(done: List[tuple]) -> None:
+    """Store insights for a batch of processed emails in one bulk memory write."""
+    if not done:
+        return
+    try:
+        memory = await get_memory_system()
+        await memory.store_memories_bulk([email_insight_record(email, result) for email, result in done])
+        logger.debug(f"Stored {len(done)} email insights in memory")
     except Exception as e:
-        logger.warning(f"Failed to store email insight in memory: {e}")
+        logger.warning(f"Failed to store email insights in memory: {e}")
         # Non-critical failure
 
 
-async def store_processed_email(email: EmailMessage, result: Dict[str, Any]) -> None:
-    """Store processed email in database."""
-    await db.execute(
-        """
-        INSERT INTO processed_emails
-        (message_id, account, sender, sender_name, recipient, subject, body_preview,
-         received_at, classification, importance_score, summary, extracted_data,
-         action_taken, ai_provider_used)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-        ON CONFLICT (message_id) DO NOTHING
-        """,
+def processed_email_row(email: EmailMessage, result: Dict[str, Any]) -> tuple:
+    return (
         email.message_id,
         email.account,
         email.sender,
@@ -834,6 +1087,26 @@ async def store_processed_email(email: EmailMessage, result: Dict[str, Any]) ->
     )
 
 
+async def store_processed_email(email: EmailMessage, result: Dict[str, Any]) -> None:
+    """Store processed email in database."""
+    await store_processed_emails([(email, result)])
+
+
+async def store_processed_emails(processed: List[tuple]) -> None:
+    """Store (email, result) pairs and their extracted entities in one transaction."""
+    if not processed:
+        return
+    entities = []
+    for email, result in processed:
+        extracted = result.get("extracted_data")
+        if isinstance(extracted, dict):
+            entities.extend(entity_rows(email.message_id, extracted))
+    await db.execute_many([
+        (INSERT_PROCESSED_EMAIL, [processed_email_row(email, result) for email, result in processed]),
+        (INSERT_ENTITY, entities),
+    ])
+
+
 async def log_transaction(email: EmailMessage, transaction: Dict[str, Any]) -> None:
     """Log a financial transaction from email."""
     try:
@@ -6,16 +6,24 @@ and namespace isolation. Integrates with ChromaDB and PostgreSQL memory tables.
 """
 
 import asyncio
+import heapq
 import logging
+import time
 import uuid
 import json
-from typing import Dict, Any, List, Optional, Tuple, Set
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple, Set
 from enum import Enum
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+import numpy as np
 
 from ..database import db
-from ..services.embeddings import get_embedding, cosine_similarity
+from ..services.embeddings import embed, embed_many, cosine_similarity
+from ..services.memory_cache import MemoryCache, estimate_bytes
+from ..services.memory_consolidation import ConsolidationEngine
+from ..services.memory_ingest import MemoryIngestBuffer
 from ..config import settings
 
 import chromadb
@@ -52,12 +60,24 @@ class MemoryQuery:
     min_similarity: float = 0.7
     tags: Optional[List[str]] = None
     recency_weight: float = 0.3  # How much to weight recent memories
+    importance_weight: float = 0.0  # How much to weight importance_score (ties always prefer it)
+
+    # Metadata predicates, applied inside the vector queries
+    session_id: Optional[str] = None  # metadata.session_id
+    source: Optional[str] = None  # metadata.source
+    created_after: Optional[datetime] = None  # Inclusive
+    created_before: Optional[datetime] = None  # Exclusive
 
 
 @dataclass
 class MemoryResult:
     """Result of a memory search."""
 
+    __slots__ = (
+        "memory_id", "content", "memory_type", "similarity", "importance_score",
+        "strength_score", "last_accessed_at", "tags", "metadata",
+    )
+
     memory_id: str
     content: str
     memory_type: MemoryType
@@ -80,6 +100,223 @@ class MemoryBlock:
     version: int = 1
 
 
+@dataclass
+class MemoryRecord:
+    """A memory to write with store_memories_bulk or enqueue_memory."""
+
+    agent_id: str
+    content: str
+    memory_type: MemoryType = MemoryType.SEMANTIC
+    importance_score: float = 0.5
+    strength_score: float = 1.0
+    tags: Optional[List[str]] = None
+    metadata: Optional[Dict[str, Any]] = None
+    source_type: Optional[str] = None
+    source_id: Optional[str] = None
+    memory_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+
+# Postgres bind parameter limit per statement
+MAX_QUERY_PARAMS = 32767
+
+# Row templates for multi-row INSERTs; {n} is the row's n-th parameter
+INSERT_MEMORY = (
+    """
+    INSERT INTO memories
+    (id, agent_id, memory_type, content, content_embedding,
+     importance_score, strength_score, source_type, source_id,
+     tags, metadata, expires_at)
+    VALUES
+    """,
+    "({0}, {1}, {2}, {3}, {4}, {5}, {6}, {7}, {8}, {9}, {10}, "
+    "CASE WHEN {6} < 0.3 THEN NOW() + INTERVAL '7 days' ELSE NULL END)",
+)
+INSERT_SEMANTIC = (
+    "INSERT INTO semantic_memories (memory_id, subject, predicate, object) VALUES",
+    "({0}, 'unknown', 'contains', {1})",
+)
+INSERT_EPISODIC = (
+    "INSERT INTO episodic_memories (memory_id, session_id, event_summary, occurred_at) VALUES",
+    "({0}, {1}, {2}, NOW())",
+)
+INSERT_PROCEDURAL = (
+    "INSERT INTO procedural_memories (memory_id, skill_name, steps) VALUES",
+    "({0}, {1}, {2})",
+)
+
+
+def multi_row_inserts(statement: Tuple[str, str], rows: List[tuple]) -> List[Tuple[str, List[Any]]]:
+    """
+    Expand a (prefix, row template) pair into multi-row INSERTs.
+
+    Returns (sql, params) pairs, each under Postgres' bind parameter limit.
+    """
+    if not rows:
+        return []
+    prefix, template = statement
+    width = len(rows[0])
+    per_statement = max(1, MAX_QUERY_PARAMS // width)
+    statements = []
+    for start in range(0, len(rows), per_statement):
+        chunk = rows[start:start + per_statement]
+        values = ",\n".join(
+            template.format(*(f"${i * width + j + 1}" for j in range(width)))
+            for i in range(len(chunk))
+        )
+        statements.append((f"{prefix}\n{values}", [value for row in chunk for value in row]))
+    return statements
+
+
+def type_rows(records: List[MemoryRecord]) -> Dict[MemoryType, List[tuple]]:
+    """Rows for the type-specific tables (semantic, episodic, procedural)."""
+    rows: Dict[MemoryType, List[tuple]] = {
+        MemoryType.SEMANTIC: [], MemoryType.EPISODIC: [], MemoryType.PROCEDURAL: []
+    }
+    for record in records:
+        metadata = record.metadata or {}
+        if record.memory_type == MemoryType.SEMANTIC:
+            rows[MemoryType.SEMANTIC].append((record.memory_id, record.content[:500]))
+        elif record.memory_type == MemoryType.EPISODIC:
+            rows[MemoryType.EPISODIC].append((record.memory_id, metadata.get("session_id"), record.content[:1000]))
+        elif record.memory_type == MemoryType.PROCEDURAL:
+            rows[MemoryType.PROCEDURAL].append(
+                (record.memory_id, metadata.get("skill_name", "unknown"), json.dumps(metadata.get("steps", [])))
+            )
+    return rows
+
+
+def chroma_metadata(record: MemoryRecord, now: datetime) -> Dict[str, Any]:
+    """ChromaDB metadata for a memory; only scalar (or scalar list) values survive."""
+    metadata = {
+        "memory_id": record.memory_id,
+        "agent_id": record.agent_id,
+        "memory_type": record.memory_type.value,
+        "timestamp": now.isoformat(),
+        "created_ts": now.timestamp()  # Numeric, so date ranges can filter
+    }
+    for key, value in (record.metadata or {}).items():
+        if isinstance(value, (str, int, float, bool)):
+            metadata[key] = str(value)
+        elif isinstance(value, list) and all(isinstance(item, (str, int, float, bool)) for item in value):
+            metadata[key] = json.dumps(value)
+    return metadata
+
+
+RECENCY_HORIZON_SECONDS = 168 * 3600  # Recency decays to zero over one week
+
+
+def chromadb_where(query: MemoryQuery) -> Optional[Dict[str, Any]]:
+    """
+    ChromaDB `where` clause for the query's agent and metadata predicates.
+
+    Dates compare against the numeric `created_ts` stored with each vector;
+    vectors written before it existed never match a date range.
+    """
+    clauses: List[Dict[str, Any]] = []
+    if query.agent_id:
+        clauses.append({"agent_id": query.agent_id})
+    if query.session_id is not None:
+        clauses.append({"session_id": str(query.session_id)})
+    if query.source is not None:
+        clauses.append({"source": str(query.source)})
+    if query.created_after is not None:
+        clauses.append({"created_ts": {"$gte": query.created_after.timestamp()}})
+    if query.created_before is not None:
+        clauses.append({"created_ts": {"$lt": query.created_before.timestamp()}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def metadata_predicates(query: MemoryQuery, params: List[Any]) -> str:
+    """SQL for the query's metadata predicates; appends their values to `params`."""
+    sql = ""
+    if query.session_id is not None:
+        params.append(str(query.session_id))
+        sql += f" AND metadata->>'session_id' = ${len(params)}"
+    if query.source is not None:
+        params.append(str(query.source))
+        sql += f" AND metadata->>'source' = ${len(params)}"
+    if query.created_after is not None:
+        params.append(query.created_after)
+        sql += f" AND created_at >= ${len(params)}"
+    if query.created_before is not None:
+        params.append(query.created_before)
+        sql += f" AND created_at < ${len(params)}"
+    return sql
+
+
+def matches_metadata(query: MemoryQuery, metadata: Optional[Dict[str, Any]], created_at: Optional[datetime]) -> bool:
+    """Python twin of metadata_predicates, for rows served from the cache."""
+    metadata = metadata or {}
+    if query.session_id is not None and str(metadata.get("session_id")) != str(query.session_id):
+        return False
+    if query.source is not None and str(metadata.get("source")) != str(query.source):
+        return False
+    if query.created_after is not None or query.created_before is not None:
+        if created_at is None:
+            return False
+        # created_at is TIMESTAMPTZ; treat naive bounds as UTC like Postgres would
+        created_at = _as_utc(created_at)
+        if query.created_after is not None and created_at < _as_utc(query.created_after):
+            return False
+        if query.created_before is not None and created_at >= _as_utc(query.created_before):
+            return False
+    return True
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def rank_candidates(
+    similarities: List[float],
+    last_accessed: List[Optional[datetime]],
+    importance: List[Any],
+    tags: List[Optional[List[str]]],
+    query: MemoryQuery
+) -> List[Tuple[int, float]]:
+    """
+    Score candidates in one vectorized pass and return the top `query.limit`.
+
+    score = similarity * (1 - recency_weight) + recency * recency_weight
+    (plain similarity for never-accessed memories), then blended with
+    importance by `importance_weight`. Candidates under `min_similarity` or
+    sharing no tag with `query.tags` are dropped. Returns (index, score)
+    pairs, best first; ties go to the more important memory.
+    """
+    if not similarities:
+        return []
+
+    similarity = np.asarray(similarities, dtype=np.float64)
+    importance_arr = np.asarray([float(v) if v is not None else 0.5 for v in importance], dtype=np.float64)
+    score = similarity
+
+    if query.recency_weight > 0:
+        accessed = np.asarray(
+            [ts.timestamp() if ts is not None else np.nan for ts in last_accessed], dtype=np.float64
+        )
+        recency = np.clip(1.0 - (time.time() - accessed) / RECENCY_HORIZON_SECONDS, 0.0, 1.0)
+        blended = similarity * (1 - query.recency_weight) + recency * query.recency_weight
+        score = np.where(np.isnan(accessed), similarity, blended)
+
+    if query.importance_weight > 0:
+        score = score * (1 - query.importance_weight) + importance_arr * query.importance_weight
+
+    keep = similarity >= query.min_similarity
+    if query.tags:
+        wanted = set(query.tags)
+        keep &= np.fromiter(
+            (not wanted.isdisjoint(memory_tags or ()) for memory_tags in tags), dtype=bool, count=len(tags)
+        )
+
+    best = heapq.nlargest(
+        query.limit, np.flatnonzero(keep).tolist(), key=lambda i: (score[i], importance_arr[i])
+    )
+    return [(i, float(score[i])) for i in best]
+
+
 class MemorySystem:
     """
     Central memory system for the NEXUS multi-agent framework.
@@ -94,12 +331,36 @@ class MemorySystem:
     def __init__(self):
         """Initialize the memory system."""
         self.agent_memory_blocks: Dict[str, Dict[str, MemoryBlock]] = {}  # agent_id -> {block_label: block}
-        self.memory_cache: Dict[str, MemoryResult] = {}
+        self.memory_cache = MemoryCache(
+            max_entries=settings.memory_cache_max_entries,
+            max_bytes=settings.memory_cache_max_bytes
+        )
+        self.consolidation = ConsolidationEngine(
+            chunk_size=settings.memory_consolidation_chunk_size,
+            similarity_threshold=settings.memory_consolidation_similarity,
+            min_cluster_size=settings.memory_consolidation_min_cluster_size,
+            max_cluster_size=settings.memory_consolidation_max_cluster_size,
+            max_memories_per_run=settings.memory_consolidation_max_memories_per_run,
+            concurrency=settings.memory_consolidation_concurrency,
+            lookback_hours=settings.memory_consolidation_lookback_hours
+        )
         self._initialized = False
+        self._init_lock = asyncio.Lock()
         self.chroma_client: Optional[chromadb.ClientAPI] = None
         self.chroma_collections: Dict[str, chromadb.Collection] = {}
         self.use_chromadb: bool = True  # Flag to enable/disable ChromaDB
         self.use_pgvector: bool = True  # Flag to enable/disable pgvector similarity search
+        self._search_stats: Dict[str, Any] = {
+            "searches": 0, "candidates": 0, "results": 0, "stage_seconds": {}, "last_ms": {}
+        }
+        self.ingest = MemoryIngestBuffer(
+            self.store_memories_bulk,
+            key=lambda record: record.memory_id,
+            batch_size=settings.memory_ingest_batch_size,
+            flush_interval_seconds=settings.memory_ingest_flush_interval_seconds,
+            max_pending=settings.memory_ingest_max_pending
+        )
+        self._ingest_stats: Dict[str, Any] = {"batches": 0, "memories": 0, "stage_seconds": {}, "last_ms": {}}
 
     async def _init_chromadb_client(self) -> None:
         """Initialize ChromaDB client and create collections."""
@@ -174,54 +435,55 @@ class MemorySystem:
             logger.warning(f"Failed to check pgvector availability: {e}. Disabling pgvector similarity search.")
             self.use_pgvector = False
 
-    async def _store_memory_in_chromadb(
+    async def _store_memories_in_chromadb(
         self,
-        memory_id: str,
-        agent_id: str,
-        content: str,
-        memory_type: MemoryType,
-        embedding: List[float],
-        metadata: Optional[Dict[str, Any]] = None
-    ) -> bool:
-        """Store memory vector in ChromaDB."""
+        records: List[MemoryRecord],
+        embeddings: List[List[float]]
+    ) -> int:
+        """Store memory vectors in ChromaDB, one add per collection. Returns the number stored."""
         if not self.use_chromadb or not self.chroma_client:
-            return False
+            return 0
 
-        try:
+        now = datetime.now()
+        by_type: Dict[MemoryType, List[int]] = {}
+        for i, record in enumerate(records):
+            by_type.setdefault(record.memory_type, []).append(i)
+
+        stored = 0
+        for memory_type, indexes in by_type.items():
             collection = self.chroma_collections.get(memory_type.value)
             if not collection:
                 logger.warning(f"No ChromaDB collection for memory type {memory_type.value}")
-                return False
-
-            # Prepare metadata for ChromaDB
-            chroma_metadata = {
-                "memory_id": memory_id,
-                "agent_id": agent_id,
-                "memory_type": memory_type.value,
-                "timestamp": datetime.now().isoformat()
-            }
-            if metadata:
-                # Filter metadata to avoid complex types
-                for key, value in metadata.items():
-                    if isinstance(value, (str, int, float, bool)):
-                        chroma_metadata[key] = str(value)
-                    elif isinstance(value, list) and all(isinstance(item, (str, int, float, bool)) for item in value):
-                        chroma_metadata[key] = json.dumps(value)
-
-            # Add to ChromaDB collection
-            collection.add(
-                ids=[memory_id],
-                embeddings=[embedding],
-                metadatas=[chroma_metadata],
-                documents=[content[:1000]]  # Store truncated content
-            )
+                continue
+            try:
+                await asyncio.to_thread(
+                    collection.add,
+                    ids=[records[i].memory_id for i in indexes],
+                    embeddings=[embeddings[i] for i in indexes],
+                    metadatas=[chroma_metadata(records[i], now) for i in indexes],
+                    documents=[records[i].content[:1000] for i in indexes]  # Store truncated content
+                )
+                stored += len(indexes)
+            except Exception as e:
+                logger.warning(f"Failed to store {len(indexes)} memories in ChromaDB collection {memory_type.value}: {e}")
+        return stored
 
-            logger.debug(f"Stored memory {memory_id} in ChromaDB collection {memory_type.value}")
-            return True
+    async def _delete_memories_from_chromadb(self, rows: List[Dict[str, Any]]) -> None:
+        """Remove archived memories' vectors, one delete per collection."""
+        if not self.use_chromadb or not self.chroma_client:
+            return
 
-        except Exception as e:
-            logger.warning(f"Failed to store memory {memory_id} in ChromaDB: {e}")
-            return False
+        ids_by_type: Dict[str, List[str]] = {}
+        for row in rows:
+            ids_by_type.setdefault(row["memory_type"], []).append(str(row["id"]))
+        for memory_type, ids in ids_by_type.items():
+            collection = self.chroma_collections.get(memory_type)
+            if not collection:
+                continue
+            try:
+                await asyncio.to_thread(collection.delete, ids=ids)
+            except Exception as e:
+                logger.warning(f"Failed to delete {len(ids)} memories from ChromaDB collection {memory_type}: {e}")
 
     async def _search_memories_in_chromadb(
         self,
@@ -229,51 +491,55 @@ class MemorySystem:
         memory_types: Optional[List[MemoryType]] = None,
         agent_id: Optional[str] = None,
         limit: int = 10,
-        min_similarity: float = 0.7
+        min_similarity: float = 0.7,
+        where: Optional[Dict[str, Any]] = None
     ) -> List[Tuple[str, float]]:
-        """Search memories in ChromaDB using vector similarity."""
+        """
+        Search memories in ChromaDB using vector similarity.
+
+        The client is synchronous, so each collection is queried on a worker
+        thread and all collections run concurrently. `where` (see
+        chromadb_where) replaces the plain agent_id filter.
+        """
         if not self.use_chromadb or not self.chroma_client:
             return []
 
-        results = []
         try:
             # Determine which collections to search
-            collections_to_search = []
             if memory_types:
-                for mt in memory_types:
-                    collection = self.chroma_collections.get(mt.value)
-                    if collection:
-                        collections_to_search.append(collection)
+                collections_to_search = [
+                    self.chroma_collections[mt.value]
+                    for mt in memory_types if mt.value in self.chroma_collections
+                ]
             else:
                 # Search all collections
                 collections_to_search = list(self.chroma_collections.values())
 
-            for collection in collections_to_search:
-                # Build ChromaDB query filters
-                where = {}
-                if agent_id:
-                    where["agent_id"] = agent_id
+            # Build ChromaDB query filters
+            if where is None and agent_id:
+                where = {"agent_id": agent_id}
 
-                # Query collection
-                query_results = collection.query(
+            responses = await asyncio.gather(*(
+                asyncio.to_thread(
+                    collection.query,
                     query_embeddings=[query_embedding],
                     n_results=limit,
-                    where=where if where else None,
-                    include=["metadatas", "distances", "documents"]
+                    where=where,
+                    include=["distances"]
                 )
+                for collection in collections_to_search
+            ))
 
-                # Process results
+            # Each response is already sorted; merge them and keep the best `limit`
+            per_collection = []
+            for query_results in responses:
                 if query_results and query_results.get("ids"):
-                    for i, memory_id in enumerate(query_results["ids"][0]):
-                        distance = query_results["distances"][0][i]
-                        similarity = 1.0 - distance  # Convert distance to similarity
-
-                        if similarity >= min_similarity:
-                            results.append((memory_id, similarity))
-
-            # Sort by similarity and limit
-            results.sort(key=lambda x: x[1], reverse=True)
-            results = results[:limit]
+                    per_collection.append([
+                        (memory_id, 1.0 - distance)  # Convert distance to similarity
+                        for memory_id, distance in zip(query_results["ids"][0], query_results["distances"][0])
+                        if 1.0 - distance >= min_similarity
+                    ])
+            results = list(islice(heapq.merge(*per_collection, key=lambda x: -x[1]), limit))
 
             logger.debug(f"ChromaDB search found {len(results)} results")
             return results
@@ -282,6 +548,45 @@ class MemorySystem:
             logger.warning(f"ChromaDB search failed: {e}")
             return []
 
+    async def _search_memories_in_pgvector(
+        self,
+        query: MemoryQuery,
+        query_embedding: List[float],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Nearest memories by pgvector cosine distance, as full rows with a `similarity` column."""
+        sql = """
+            SELECT id, agent_id, memory_type, content, importance_score,
+                   strength_score, last_accessed_at, tags, metadata,
+                   expires_at, created_at,
+                   1 - (content_embedding <=> $1) AS similarity
+            FROM memories
+            WHERE (expires_at IS NULL OR expires_at > NOW())
+              AND (content_embedding <=> $1) <= 1 - $2
+        """
+        params = [query_embedding, query.min_similarity]
+
+        # Apply filters
+        if query.agent_id:
+            params.append(query.agent_id)
+            sql += f" AND agent_id = ${len(params)}"
+
+        if query.memory_types:
+            params.append([mt.value for mt in query.memory_types])
+            sql += f" AND memory_type = ANY(${len(params)})"
+
+        if query.tags:
+            params.append(query.tags)
+            sql += f" AND tags && ${len(params)}"
+
+        sql += metadata_predicates(query, params)
+
+        # Order by similarity and importance
+        params.append(limit)
+        sql += f" ORDER BY content_embedding <=> $1, importance_score DESC LIMIT ${len(params)}"
+
+        return await db.fetch_all(sql, *params)
+
     async def initialize(self) -> None:
         """
         Initialize the memory system.
@@ -291,26 +596,31 @@ class MemorySystem:
         if self._initialized:
             return
 
-        logger.info("Initializing memory system...")
+        # Concurrent first callers wait for one initialization
+        async with self._init_lock:
+            if self._initialized:
+                return
 
-        try:
-            # Load memory blocks for active agents
-            await self._load_memory_blocks()
+            logger.info("Initializing memory system...")
 
-            # Initialize ChromaDB client
-            await self._init_chromadb_client()
-            # Check pgvector availability
-            await self._check_pgvector()
+            try:
+                # Load memory blocks for active agents
+                await self._load_memory_blocks()
 
-            # Start background consolidation job
-            asyncio.create_task(self._run_consolidation_jobs())
+                # Initialize ChromaDB client
+                await self._init_chromadb_client()
+                # Check pgvector availability
+                await self._check_pgvector()
 
-            self._initialized = True
-            logger.info("Memory system initialized")
+                # Start background consolidation job
+                asyncio.create_task(self._run_consolidation_jobs())
 
-        except Exception as e:
-            logger.error(f"Failed to initialize memory system: {e}")
-            raise
+                self._initialized = True
+                logger.info("Memory system initialized")
+
+            except Exception as e:
+                logger.error(f"Failed to initialize memory system: {e}")
+                raise
 
     async def store_memory(
         self,
@@ -341,83 +651,147 @@ class MemorySystem:
         Returns:
             Memory ID
         """
-        memory_id = str(uuid.uuid4())
+        record = MemoryRecord(
+            agent_id=agent_id,
+            content=content,
+            memory_type=memory_type,
+            importance_score=importance_score,
+            strength_score=strength_score,
+            tags=tags,
+            metadata=metadata,
+            source_type=source_type,
+            source_id=source_id
+        )
+        try:
+            (memory_id,) = await self.store_memories_bulk([record])
+        except Exception as e:
+            logger.error(f"Failed to store memory for agent {agent_id}: {e}")
+            raise
 
-        # Generate embedding for semantic search if needed
-        embedding_list = None
-        if self.use_pgvector or self.use_chromadb:
-            embedding = get_embedding(content)
-            embedding_list = embedding.tolist() if hasattr(embedding, 'tolist') else embedding
+        logger.info(f"Stored memory {memory_id} for agent {agent_id}")
+        return memory_id
 
-        logger.debug(f"Storing {memory_type.value} memory for agent {agent_id}: {content[:100]}...")
+    async def store_memories_bulk(
+        self,
+        records: List[MemoryRecord],
+        in_transaction: Optional[Callable[[Any], Awaitable[Any]]] = None
+    ) -> List[str]:
+        """
+        Store several memories with one write per backend.
 
-        try:
-            # Store in ChromaDB (if enabled)
-            if self.use_chromadb:
-                try:
-                    await self._store_memory_in_chromadb(
-                        memory_id=memory_id,
-                        agent_id=agent_id,
-                        content=content,
-                        memory_type=memory_type,
-                        embedding=embedding_list,
-                        metadata=metadata
-                    )
-                except Exception as e:
-                    logger.warning(f"ChromaDB storage failed for memory {memory_id}: {e}")
-                    # Continue with PostgreSQL storage
+        Encodes every record in one embedding batch, writes the memories and
+        their type-specific rows with multi-row INSERTs in a single
+        transaction, then adds the vectors with one ChromaDB add per collection.
 
-            # Store in PostgreSQL with pgvector
-            await db.execute(
-                """
-                INSERT INTO memories
-                (id, agent_id, memory_type, content, content_embedding,
-                 importance_score, strength_score, source_type, source_id,
-                 tags, metadata, expires_at)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11,
-                        CASE WHEN $7 < 0.3 THEN NOW() + INTERVAL '7 days'
-                             ELSE NULL END)
-                """,
-                memory_id,
-                agent_id,
-                memory_type.value,
-                content,
-                embedding_list,
-                importance_score,
-                strength_score,
-                source_type,
-                source_id,
-                tags or [],
-                metadata or {}
-            )
+        Args:
+            records: Memories to store
+            in_transaction: Called with the connection after the INSERTs, inside
+                the same transaction, for writes that must commit with them
 
-            # Create specific memory type record
-            if memory_type == MemoryType.SEMANTIC:
-                await self._store_semantic_memory(memory_id, content)
-            elif memory_type == MemoryType.EPISODIC:
-                await self._store_episodic_memory(memory_id, content, metadata)
-            elif memory_type == MemoryType.PROCEDURAL:
-                await self._store_procedural_memory(memory_id, content, metadata)
+        Returns:
+            Memory IDs, in the order of `records`
+        """
+        if not records:
+            return []
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
 
-            # Update cache
-            self.memory_cache[memory_id] = MemoryResult(
-                memory_id=memory_id,
-                content=content,
-                memory_type=memory_type,
-                similarity=1.0,
-                importance_score=importance_score,
-                strength_score=strength_score,
-                last_accessed_at=datetime.now(),
-                tags=tags or [],
-                metadata=metadata or {}
+        # Generate embeddings for semantic search if needed
+        embeddings: List[Optional[List[float]]] = [None] * len(records)
+        if self.use_pgvector or self.use_chromadb:
+            stage = time.perf_counter()
+            embeddings = [vector.tolist() for vector in await embed_many([r.content for r in records])]
+            timings["embed"] = time.perf_counter() - stage
+
+        logger.debug(f"Storing {len(records)} memories")
+
+        # Store in PostgreSQL with pgvector, plus the specific memory type records
+        stage = time.perf_counter()
+        statements = multi_row_inserts(INSERT_MEMORY, [
+            (
+                record.memory_id,
+                record.agent_id,
+                record.memory_type.value,
+                record.content,
+                embedding,
+                record.importance_score,
+                record.strength_score,
+                record.source_type,
+                record.source_id,
+                record.tags or [],
+                record.metadata or {}
             )
+            for record, embedding in zip(records, embeddings)
+        ])
+        rows = type_rows(records)
+        statements += multi_row_inserts(INSERT_SEMANTIC, rows[MemoryType.SEMANTIC])
+        statements += multi_row_inserts(INSERT_EPISODIC, rows[MemoryType.EPISODIC])
+        statements += multi_row_inserts(INSERT_PROCEDURAL, rows[MemoryType.PROCEDURAL])
+        async with db.connection() as conn:
+            async with conn.transaction():
+                for sql, params in statements:
+                    await conn.execute(sql, *params)
+                if in_transaction is not None:
+                    await in_transaction(conn)
+        timings["postgres"] = time.perf_counter() - stage
+
+        # Vectors go to ChromaDB (if enabled) only once the rows are committed,
+        # so a failed or retried batch never leaves vectors without rows
+        stage = time.perf_counter()
+        await self._store_memories_in_chromadb(records, embeddings)
+        timings["chromadb"] = time.perf_counter() - stage
 
-            logger.info(f"Stored memory {memory_id} for agent {agent_id}")
-            return memory_id
+        # Update cache
+        now = datetime.now(timezone.utc)
+        for record in records:
+            self._cache_row({
+                "id": record.memory_id,
+                "memory_type": record.memory_type.value,
+                "content": record.content,
+                "importance_score": record.importance_score,
+                "strength_score": record.strength_score,
+                "last_accessed_at": now,
+                "tags": record.tags or [],
+                "metadata": record.metadata or {},
+                # Mirrors the INSERT's soft expiry for weak memories
+                "expires_at": now + timedelta(days=7) if record.strength_score < 0.3 else None,
+                "created_at": now,
+            })
+
+        timings["total"] = time.perf_counter() - started
+        self._record_ingest(timings, len(records))
+        return [record.memory_id for record in records]
+
+    def enqueue_memory(self, record: MemoryRecord) -> Optional[str]:
+        """
+        Queue a memory for the next bulk write and return its ID immediately.
 
-        except Exception as e:
-            logger.error(f"Failed to store memory for agent {agent_id}: {e}")
-            raise
+        The memory becomes searchable once its batch is flushed (within
+        MEMORY_INGEST_FLUSH_INTERVAL_SECONDS). Returns None if the queue is
+        full and the memory was dropped.
+        """
+        return record.memory_id if self.ingest.enqueue(record) else None
+
+    def _record_ingest(self, timings: Dict[str, float], count: int) -> None:
+        stats = self._ingest_stats
+        stats["batches"] += 1
+        stats["memories"] += count
+        for name, seconds in timings.items():
+            stats["stage_seconds"][name] = stats["stage_seconds"].get(name, 0.0) + seconds
+        stats["last_ms"] = {name: round(seconds * 1000, 2) for name, seconds in timings.items()}
+
+    def get_ingest_stats(self) -> Dict[str, Any]:
+        """Bulk write counters and per-stage timings, plus the ingest queue."""
+        stats = self._ingest_stats
+        total = stats["stage_seconds"].get("total", 0.0)
+        return {
+            "batches": stats["batches"],
+            "memories": stats["memories"],
+            "avg_batch_size": round(stats["memories"] / stats["batches"], 2) if stats["batches"] else 0.0,
+            "memories_per_second": round(stats["memories"] / total, 2) if total else 0.0,
+            "last_ms": stats["last_ms"],
+            "queue": self.ingest.get_stats(),
+        }
 
     async def get_memories(self, agent_id: str, memory_type: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -522,6 +896,11 @@ class MemorySystem:
         """
         Search memories using semantic similarity.
 
+        ChromaDB and pgvector are queried concurrently; their candidates are
+        merged by memory ID (best similarity wins), details for ChromaDB-only
+        hits come from one Postgres query, and every candidate is scored in
+        a single numpy pass before the top `limit` are taken from a heap.
+
         Args:
             query: Memory query parameters
 
@@ -529,185 +908,175 @@ class MemorySystem:
             List of memory results sorted by relevance
         """
         logger.debug(f"Searching memories: {query.query_text[:100]}...")
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
 
         # Generate embedding for query if needed
         query_embedding_list = None
         if self.use_pgvector or self.use_chromadb:
-            query_embedding = get_embedding(query.query_text)
-            query_embedding_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else query_embedding
-
-        memory_ids_from_chromadb = []
-        chromadb_similarities = {}
-
-        # Try ChromaDB search first if enabled
-        if self.use_chromadb and self.chroma_client:
-            try:
-                chromadb_results = await self._search_memories_in_chromadb(
-                    query_embedding=query_embedding_list,
-                    memory_types=query.memory_types,
-                    agent_id=query.agent_id,
-                    limit=query.limit * 2,  # Get extra for filtering
-                    min_similarity=query.min_similarity
-                )
-
-                for memory_id, similarity in chromadb_results:
-                    memory_ids_from_chromadb.append(memory_id)
-                    chromadb_similarities[memory_id] = similarity
-
-                logger.debug(f"ChromaDB found {len(memory_ids_from_chromadb)} candidate memories")
+            query_embedding = await embed(query.query_text)
+            query_embedding_list = query_embedding.tolist()
+        timings["embed"] = time.perf_counter() - started
+
+        # 1. Candidates from every vector backend at once (extra for re-ranking)
+        stage = time.perf_counter()
+        candidate_limit = query.limit * 2
+        use_chromadb = self.use_chromadb and self.chroma_client is not None and query_embedding_list is not None
+        use_pgvector = self.use_pgvector and query_embedding_list is not None
+
+        async def chromadb_candidates() -> List[Tuple[str, float]]:
+            if not use_chromadb:
+                return []
+            return await self._search_memories_in_chromadb(
+                query_embedding=query_embedding_list,
+                memory_types=query.memory_types,
+                agent_id=query.agent_id,
+                limit=candidate_limit,
+                min_similarity=query.min_similarity,
+                where=chromadb_where(query)
+            )
 
-            except Exception as e:
-                logger.warning(f"ChromaDB search failed: {e}. Falling back to PostgreSQL.")
+        async def pgvector_candidates() -> List[Dict[str, Any]]:
+            if not use_pgvector:
+                return []
+            return await self._search_memories_in_pgvector(query, query_embedding_list, candidate_limit)
 
-        # Fetch memory details from PostgreSQL
-        results = []
-        if memory_ids_from_chromadb:
-            # Fetch details for memories found in ChromaDB
+        chroma_hits, pg_rows = await asyncio.gather(
+            chromadb_candidates(), pgvector_candidates(), return_exceptions=True
+        )
+        if isinstance(chroma_hits, BaseException):
+            logger.warning(f"ChromaDB search failed: {chroma_hits}")
+            chroma_hits = []
+        if isinstance(pg_rows, BaseException):
+            logger.warning(f"pgvector search failed: {pg_rows}")
+            pg_rows = []
+        timings["vector_search"] = time.perf_counter() - stage
+
+        # 2. Merge by ID; only ChromaDB-only hits still need their rows
+        stage = time.perf_counter()
+        found: Dict[str, MemoryResult] = {}
+        similarities: Dict[str, float] = {}
+        for row in pg_rows:
+            memory_id = str(row["id"])
+            found[memory_id] = self._cache_row(row)
+            similarities[memory_id] = float(row["similarity"])
+        for memory_id, similarity in chroma_hits:
+            if similarity > similarities.get(memory_id, -1.0):
+                similarities[memory_id] = similarity
+
+        # Hot memories come from the cache; the rest from one Postgres query
+        missing = []
+        for memory_id in similarities:
+            if memory_id in found:
+                continue
+            entry = self.memory_cache.get_entry(memory_id)
+            if entry is None:
+                missing.append(memory_id)
+            elif matches_metadata(query, entry.value.metadata, entry.created_at):
+                found[memory_id] = entry.value
+        if missing:
+            # Re-check the predicates against Postgres, the source of truth for metadata
+            params: List[Any] = [missing]
+            predicates = metadata_predicates(query, params)
             rows = await db.fetch_all(
                 """
                 SELECT id, agent_id, memory_type, content, importance_score,
-                       strength_score, last_accessed_at, tags, metadata
+                       strength_score, last_accessed_at, tags, metadata,
+                       expires_at, created_at
                 FROM memories
                 WHERE id = ANY($1)
                   AND (expires_at IS NULL OR expires_at > NOW())
-                """,
-                memory_ids_from_chromadb
+                """ + predicates,
+                *params
             )
-
-            # Convert to MemoryResult objects with ChromaDB similarity scores
-            for row in rows:
-                memory_id = row["id"]
-                similarity = chromadb_similarities.get(memory_id, 0.5)
-
-                # Apply recency weighting
-                final_score = similarity
-                if query.recency_weight > 0 and row["last_accessed_at"]:
-                    hours_ago = (datetime.now() - row["last_accessed_at"]).total_seconds() / 3600
-                    recency_factor = max(0, 1 - (hours_ago / 168))  # Decay over 1 week
-                    final_score = (similarity * (1 - query.recency_weight) +
-                                  recency_factor * query.recency_weight)
-
-                # Apply additional filters (tags, etc.)
-                if query.tags:
-                    memory_tags = row["tags"] or []
-                    if not any(tag in memory_tags for tag in query.tags):
-                        continue  # Skip memories that don't match tag filter
-
-                # Safely convert memory_type string to enum
-                try:
-                    memory_type_enum = MemoryType(row["memory_type"])
-                except ValueError:
-                    logger.warning(f"Invalid memory type '{row['memory_type']}' for memory {memory_id}, defaulting to SEMANTIC")
-                    memory_type_enum = MemoryType.SEMANTIC
-
-                result = MemoryResult(
-                    memory_id=memory_id,
-                    content=row["content"],
-                    memory_type=memory_type_enum,
-                    similarity=final_score,
-                    importance_score=row["importance_score"],
-                    strength_score=row["strength_score"],
-                    last_accessed_at=row["last_accessed_at"],
-                    tags=row["tags"],
-                    metadata=row["metadata"]
-                )
-                results.append(result)
-
-            # Sort by final score
-            results.sort(key=lambda x: x.similarity, reverse=True)
-            results = results[:query.limit]
-
-        # Fallback to PostgreSQL-only search if ChromaDB didn't return enough results
-        if len(results) < query.limit:
-            logger.debug(f"ChromaDB returned insufficient results ({len(results)}), falling back to PostgreSQL")
-
-            # Build SQL query for PostgreSQL fallback
-            sql = """
-                SELECT id, agent_id, memory_type, content, importance_score,
-                       strength_score, last_accessed_at, tags, metadata,
-                       content_embedding <=> $1 as similarity
-                FROM memories
-                WHERE 1=1
-            """
-            params = [query_embedding_list]
-            param_index = 2
-
-            # Apply filters
-            if query.agent_id:
-                sql += f" AND agent_id = ${param_index}"
-                params.append(query.agent_id)
-                param_index += 1
-
-            if query.memory_types:
-                type_values = [mt.value for mt in query.memory_types]
-                sql += f" AND memory_type = ANY(${param_index})"
-                params.append(type_values)
-                param_index += 1
-
-            if query.tags:
-                sql += f" AND tags && ${param_index}"
-                params.append(query.tags)
-                param_index += 1
-
-            # Add similarity threshold
-            sql += f" AND (content_embedding <=> $1) <= (1 - ${param_index})"
-            params.append(query.min_similarity)
-
-            # Order by similarity and importance
-            sql += f" ORDER BY similarity ASC, importance_score DESC LIMIT ${param_index}"
-            params.append(query.limit)
-
-            # Execute query
-            rows = await db.fetch_all(sql, *params)
-
-            # Convert to MemoryResult objects
             for row in rows:
-                memory_id = row["id"]
-                # Skip memories already included from ChromaDB
-                if any(r.memory_id == memory_id for r in results):
-                    continue
-
-                similarity = 1.0 - float(row["similarity"])  # Convert distance to similarity
-
-                # Apply recency weighting
-                final_score = similarity
-                if query.recency_weight > 0 and row["last_accessed_at"]:
-                    hours_ago = (datetime.now() - row["last_accessed_at"]).total_seconds() / 3600
-                    recency_factor = max(0, 1 - (hours_ago / 168))  # Decay over 1 week
-                    final_score = (similarity * (1 - query.recency_weight) +
-                                  recency_factor * query.recency_weight)
-
-                # Safely convert memory_type string to enum
-                try:
-                    memory_type_enum = MemoryType(row["memory_type"])
-                except ValueError:
-                    logger.warning(f"Invalid memory type '{row['memory_type']}' for memory {memory_id}, defaulting to SEMANTIC")
-                    memory_type_enum = MemoryType.SEMANTIC
-
-                result = MemoryResult(
-                    memory_id=memory_id,
-                    content=row["content"],
-                    memory_type=memory_type_enum,
-                    similarity=final_score,
-                    importance_score=row["importance_score"],
-                    strength_score=row["strength_score"],
-                    last_accessed_at=row["last_accessed_at"],
-                    tags=row["tags"],
-                    metadata=row["metadata"]
-                )
-                results.append(result)
-
-            # Sort by final score
-            results.sort(key=lambda x: x.similarity, reverse=True)
-            results = results[:query.limit]
+                found[str(row["id"])] = self._cache_row(row)
+        timings["fetch_details"] = time.perf_counter() - stage
+
+        # 3. One scoring pass over every candidate
+        stage = time.perf_counter()
+        candidate_ids = list(found)
+        candidates = [found[memory_id] for memory_id in candidate_ids]
+        top = rank_candidates(
+            similarities=[similarities[memory_id] for memory_id in candidate_ids],
+            last_accessed=[c.last_accessed_at for c in candidates],
+            importance=[c.importance_score for c in candidates],
+            tags=[c.tags for c in candidates],
+            query=query
+        )
+        # Copies, so cached results keep similarity 1.0
+        results = [replace(candidates[index], similarity=score) for index, score in top]
+        timings["score"] = time.perf_counter() - stage
 
         # Update access times for retrieved memories
         if results:
             await self._update_access_times([r.memory_id for r in results])
-
-        logger.info(f"Found {len(results)} memories for query")
+            accessed_at = datetime.now(timezone.utc)
+            for index, _ in top:
+                candidates[index].last_accessed_at = accessed_at
+        timings["total"] = time.perf_counter() - started
+
+        self._record_search(timings, len(candidates), len(results))
+        logger.info(
+            f"Found {len(results)} memories for query ({len(candidates)} candidates, "
+            f"{timings['total'] * 1000:.1f}ms)"
+        )
         return results
 
+    def _cache_row(self, row: Dict[str, Any]) -> MemoryResult:
+        """Build a MemoryResult from a memories row and cache it."""
+        # Safely convert memory_type string to enum
+        try:
+            memory_type_enum = MemoryType(row["memory_type"])
+        except ValueError:
+            logger.warning(f"Invalid memory type '{row['memory_type']}' for memory {row['id']}, defaulting to SEMANTIC")
+            memory_type_enum = MemoryType.SEMANTIC
+
+        result = MemoryResult(
+            memory_id=row["id"],
+            content=row["content"],
+            memory_type=memory_type_enum,
+            similarity=1.0,
+            importance_score=row["importance_score"],
+            strength_score=row["strength_score"],
+            last_accessed_at=row["last_accessed_at"],
+            tags=row["tags"],
+            metadata=row["metadata"]
+        )
+        expires_at = row.get("expires_at")
+        self.memory_cache.put(
+            str(row["id"]),
+            result,
+            estimate_bytes(result.content, result.tags, result.metadata),
+            expires_at=expires_at.timestamp() if expires_at else None,
+            created_at=row.get("created_at")
+        )
+        return result
+
+    def _record_search(self, timings: Dict[str, float], candidates: int, results: int) -> None:
+        stats = self._search_stats
+        stats["searches"] += 1
+        stats["candidates"] += candidates
+        stats["results"] += results
+        for stage, seconds in timings.items():
+            stats["stage_seconds"][stage] = stats["stage_seconds"].get(stage, 0.0) + seconds
+        stats["last_ms"] = {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+
+    def get_search_stats(self) -> Dict[str, Any]:
+        """Per-stage search timings (average and last) and candidate counts."""
+        stats = self._search_stats
+        searches = stats["searches"]
+        return {
+            "searches": searches,
+            "avg_candidates": round(stats["candidates"] / searches, 1) if searches else 0.0,
+            "avg_results": round(stats["results"] / searches, 1) if searches else 0.0,
+            "avg_ms": {
+                stage: round(seconds * 1000 / searches, 2)
+                for stage, seconds in stats["stage_seconds"].items()
+            },
+            "last_ms": stats["last_ms"],
+        }
+
     async def get_memory_block(
         self,
         agent_id: str,
@@ -855,6 +1224,9 @@ class MemorySystem:
                 results.get("memories_archived", 0)
             )
 
+            # Jobs rewrite scores and delete rows in bulk; drop every cached row
+            self.memory_cache.clear()
+
             logger.info(f"Memory consolidation job {job_id} completed: {results}")
             return {"job_id": job_id, **results}
 
@@ -927,6 +1299,10 @@ class MemorySystem:
             }
             stats["total_memories"] += count
 
+        stats["search"] = self.get_search_stats()
+        stats["cache"] = self.memory_cache.get_stats()
+        stats["consolidation"] = self.consolidation.get_stats()
+        stats["ingest"] = self.get_ingest_stats()
         return stats
 
     async def forget_memory(self, memory_id: str, soft_delete: bool = True) -> bool:
@@ -958,7 +1334,7 @@ class MemorySystem:
                 logger.info(f"Hard-deleted memory {memory_id}")
 
             # Remove from cache
-            self.memory_cache.pop(memory_id, None)
+            self.memory_cache.invalidate(memory_id)
 
             return True
 
@@ -1049,60 +1425,6 @@ class MemorySystem:
             block.version
         )
 
-    async def _store_semantic_memory(self, memory_id: str, content: str) -> None:
-        """Store semantic memory details."""
-        # TODO: Extract subject-predicate-object triples from content
-        # For now, just create a simple record
-        await db.execute(
-            """
-            INSERT INTO semantic_memories (memory_id, subject, predicate, object)
-            VALUES ($1, 'unknown', 'contains', $2)
-            """,
-            memory_id,
-            content[:500]
-        )
-
-    async def _store_episodic_memory(
-        self,
-        memory_id: str,
-        content: str,
-        metadata: Optional[Dict[str, Any]]
-    ) -> None:
-        """Store episodic memory details."""
-        session_id = metadata.get("session_id") if metadata else None
-
-        await db.execute(
-            """
-            INSERT INTO episodic_memories
-            (memory_id, session_id, event_summary, occurred_at)
-            VALUES ($1, $2, $3, NOW())
-            """,
-            memory_id,
-            session_id,
-            content[:1000]
-        )
-
-    async def _store_procedural_memory(
-        self,
-        memory_id: str,
-        content: str,
-        metadata: Optional[Dict[str, Any]]
-    ) -> None:
-        """Store procedural memory details."""
-        skill_name = metadata.get("skill_name", "unknown") if metadata else "unknown"
-        steps = metadata.get("steps", []) if metadata else []
-
-        await db.execute(
-            """
-            INSERT INTO procedural_memories
-            (memory_id, skill_name, steps)
-            VALUES ($1, $2, $3)
-            """,
-            memory_id,
-            skill_name,
-            json.dumps(steps)
-        )
-
     async def _update_access_times(self, memory_ids: List[str]) -> None:
         """Update last_accessed_at for memories."""
         if not memory_ids:
@@ -1151,24 +1473,14 @@ class MemorySystem:
                 await asyncio.sleep(300)  # Wait 5 minutes on error
 
     async def _consolidate_summarize(self, agent_id: Optional[str]) -> Dict[str, Any]:
-        """Summarize similar memories."""
-        # TODO: Implement AI-powered summarization of similar memories
-        return {
-            "memories_processed": 0,
-            "memories_created": 0,
-            "memories_archived": 0,
-            "description": "Summarization not yet implemented"
-        }
+        """Replace clusters of near-duplicate memories with one summary each."""
+        return await self.consolidation.run(self, MemoryConsolidationJobType.SUMMARIZE.value, agent_id)
 
     async def _consolidate_cluster(self, agent_id: Optional[str]) -> Dict[str, Any]:
-        """Cluster related memories."""
-        # TODO: Implement clustering of related memories
-        return {
-            "memories_processed": 0,
-            "memories_created": 0,
-            "memories_archived": 0,
-            "description": "Clustering not yet implemented"
-        }
+        """Record clusters of related memories without archiving them."""
+        return await self.consolidation.run(
+            self, MemoryConsolidationJobType.CLUSTER.value, agent_id, summarize=False
+        )
 
     async def _consolidate_prune(self, agent_id: Optional[str]) -> Dict[str, Any]:
         """Prune low-importance memories."""
@@ -1217,14 +1529,10 @@ class MemorySystem:
         }
 
     async def _consolidate_integrate(self, agent_id: Optional[str]) -> Dict[str, Any]:
-        """Integrate new memories with existing knowledge."""
-        # TODO: Implement knowledge graph integration
-        return {
-            "memories_processed": 0,
-            "memories_created": 0,
-            "memories_archived": 0,
-            "description": "Integration not yet implemented"
-        }
+        """Fold new memories into existing summaries on the same topic."""
+        return await self.consolidation.run(
+            self, MemoryConsolidationJobType.INTEGRATE.value, agent_id, new_clusters=False
+        )
 
 
 # Global memory system instance
@@ -1232,5 +1540,6 @@ memory_system = MemorySystem()
 
 
 async def get_memory_system() -> MemorySystem:
-    """Dependency for FastAPI routes."""
+    """Dependency for FastAPI routes; initializes the global memory system on first use."""
+    await memory_system.initialize()
     return memory_system
\ No newline at end of file
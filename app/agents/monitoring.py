@@ -14,12 +14,18 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 import statistics
+from collections import deque
 from uuid import UUID
 import uuid
 
+import asyncpg
+
+from ..config import settings
 from ..database import db
 from ..agents.base import AgentStatus
 from ..agents.registry import AgentRegistry, registry
+from ..services.usage_rollups import usage_rollups, NIL_AGENT
+from ..services.telemetry_sink import as_decimal
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +33,9 @@ logger = logging.getLogger(__name__)
 # Use existing 'system' agent ID from database
 SYSTEM_AGENT_ID = "50563ee7-5ff8-4dd8-adb7-f544f426f7f9"
 
+# Column order of metric records COPYed into agent_performance_metrics
+METRIC_COLUMNS = ("agent_id", "metric_type", "value", "timestamp", "tags")
+
 
 class MetricType(Enum):
     """Types of performance metrics."""
@@ -88,13 +97,29 @@ class PerformanceMonitor:
     def __init__(self):
         """Initialize the performance monitor."""
         self.registry: Optional[AgentRegistry] = None
-        self.metrics_buffer: List[PerformanceMetric] = []
+        self.metrics_buffer: "deque[PerformanceMetric]" = deque(maxlen=settings.metrics_buffer_max)
         self.alerts: Dict[str, Alert] = {}
-        self._buffer_lock = asyncio.Lock()
         self._metrics_task: Optional[asyncio.Task] = None
         self._alert_check_task: Optional[asyncio.Task] = None
         self._running = False
 
+        # Metrics write path: bounded buffer drained by COPY on a dedicated connection
+        self.flush_interval_seconds = settings.metrics_flush_interval_seconds
+        self.flush_batch_size = settings.metrics_flush_batch_size
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_wake: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_conn: Optional[asyncpg.Connection] = None
+        self._flush_stats = {
+            "flushes": 0,
+            "flush_errors": 0,
+            "rows_written": 0,
+            "rejected": 0,
+            "dropped": 0,
+            "last_flush_ms": 0.0,
+            "last_flush_rows": 0,
+        }
+
     async def initialize(self, agent_registry: AgentRegistry) -> None:
         """
         Initialize the performance monitor.
@@ -114,6 +139,8 @@ class PerformanceMonitor:
         # Start background tasks
         self._metrics_task = asyncio.create_task(self._collect_metrics_loop())
         self._alert_check_task = asyncio.create_task(self._check_alerts_loop())
+        self._flush_wake = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_metrics_loop())
 
         logger.info("Performance monitor initialized")
 
@@ -145,8 +172,19 @@ class PerformanceMonitor:
             except asyncio.CancelledError:
                 pass
 
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
         # Flush remaining metrics
         await self._flush_metrics_buffer()
+        if self._flush_conn and not self._flush_conn.is_closed():
+            await self._flush_conn.close()
+        self._flush_conn = None
 
         logger.info("Performance monitor shut down")
 
@@ -173,6 +211,10 @@ class PerformanceMonitor:
         if original_agent_id != agent_id:
             logger.debug(f"Converted agent_id '{original_agent_id}' to '{agent_id}' for metric recording")
 
+        # Callers may pass the metric type by value (e.g. "latency")
+        if not isinstance(metric_type, MetricType):
+            metric_type = MetricType(metric_type)
+
         metric = PerformanceMetric(
             agent_id=agent_id,
             metric_type=metric_type,
@@ -181,12 +223,17 @@ class PerformanceMonitor:
             tags=tags or {}
         )
 
-        async with self._buffer_lock:
-            self.metrics_buffer.append(metric)
+        if len(self.metrics_buffer) == self.metrics_buffer.maxlen:
+            # Buffer full (database behind or down) - appending sheds the oldest metric
+            self._flush_stats["dropped"] += 1
+        self.metrics_buffer.append(metric)
 
-        # Auto-flush if buffer is large
-        if len(self.metrics_buffer) >= 100:
-            await self._flush_metrics_buffer()
+        if len(self.metrics_buffer) >= self.flush_batch_size:
+            if self._flush_task and not self._flush_task.done():
+                self._flush_wake.set()
+            else:
+                # No background flusher (monitor not initialized) - flush inline
+                await self._flush_metrics_buffer()
 
     async def record_agent_execution(
         self,
@@ -528,7 +575,8 @@ class PerformanceMonitor:
             },
             "cost_summary": cost_summary,
             "recent_alerts": recent_alerts,
-            "active_alerts": len([a for a in self.alerts.values() if not a.resolved])
+            "active_alerts": len([a for a in self.alerts.values() if not a.resolved]),
+            "metrics_writer": self.get_flush_stats()
         }
 
     async def get_agent_errors(
@@ -744,12 +792,9 @@ class PerformanceMonitor:
                 # Wait before next collection
                 await asyncio.sleep(60)  # Collect every minute
 
-                # Collect system metrics
+                # Collect system metrics (written by the flush loop)
                 await self._collect_system_metrics()
 
-                # Flush metrics buffer
-                await self._flush_metrics_buffer()
-
             except Exception as e:
                 logger.error(f"Error in metrics collection: {e}")
                 await asyncio.sleep(10)  # Wait 10 seconds on error
@@ -853,59 +898,101 @@ class PerformanceMonitor:
             logger.debug(f"Converted agent_id '{agent_id}' to UUID '{deterministic_uuid}'")
             return deterministic_uuid
 
-    async def _flush_metrics_buffer(self) -> None:
-        """Flush metrics buffer to database."""
-        if not self.metrics_buffer:
-            return
-
-        async with self._buffer_lock:
-            buffer = self.metrics_buffer.copy()
-            self.metrics_buffer.clear()
+    async def _flush_metrics_loop(self) -> None:
+        """Background task to flush the metrics buffer on a timer or when a batch fills."""
+        while self._running:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_wake.wait(), self.flush_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_wake.clear()
+                await self._flush_metrics_buffer()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in metrics flush loop: {e}")
+                await asyncio.sleep(1)
 
-        if not buffer:
-            return
+    async def _get_flush_connection(self) -> asyncpg.Connection:
+        """Dedicated connection for metric COPYs, so flushes never wait on the request pool."""
+        if self._flush_conn is None or self._flush_conn.is_closed():
+            self._flush_conn = await db.connect_dedicated()
+        return self._flush_conn
 
-        logger.debug(f"Flushing {len(buffer)} metrics to database")
+    async def _flush_metrics_buffer(self) -> None:
+        """Flush metrics buffer to database with COPY."""
+        async with self._flush_lock:
+            if not self.metrics_buffer:
+                return
+            buffer = list(self.metrics_buffer)
+            self.metrics_buffer.clear()
 
-        # Batch insert metrics
-        try:
-            # Prepare values for batch insert
-            values = []
-            for metric in buffer:
-                # Convert tags dict to JSON string for database storage
-                tags_json = json.dumps(metric.tags) if metric.tags else "{}"
-                values.append((
-                    self._ensure_uuid(metric.agent_id),
+            start = time.perf_counter()
+            records = [
+                (
+                    UUID(self._ensure_uuid(metric.agent_id)),
                     metric.metric_type.value,
-                    metric.value,
+                    as_decimal(metric.value),
                     metric.timestamp,
-                    tags_json
-                ))
-
-            # Use executemany for batch insert
-            # Note: asyncpg doesn't have native executemany, so we'll do individual inserts
-            # In production, consider using copy_from or unnest for better performance
-            for agent_id, metric_type, value, timestamp, tags in values:
-                await db.execute(
-                    """
-                    INSERT INTO agent_performance_metrics
-                    (agent_id, metric_type, value, timestamp, tags)
-                    VALUES ($1, $2, $3, $4, $5)
-                    """,
-                    agent_id,
-                    metric_type,
-                    value,
-                    timestamp,
-                    tags
+                    json.dumps(metric.tags or {}),
                 )
+                for metric in buffer
+            ]
 
-            logger.debug(f"Flushed {len(buffer)} metrics")
+            try:
+                conn = await self._get_flush_connection()
+                written = await self._copy_metrics(conn, records)
+            except Exception as e:
+                self._flush_stats["flush_errors"] += 1
+                logger.error(f"Failed to flush metrics: {e}")
+                if self._flush_conn and not self._flush_conn.is_closed():
+                    await self._flush_conn.close()
+                self._flush_conn = None
+                # Put metrics back in front of newer ones for retry, within the buffer bound
+                retained = buffer + list(self.metrics_buffer)
+                overflow = max(0, len(retained) - self.metrics_buffer.maxlen)
+                self._flush_stats["dropped"] += overflow
+                self.metrics_buffer.clear()
+                self.metrics_buffer.extend(retained[overflow:])
+                return
+
+            self._flush_stats["flushes"] += 1
+            self._flush_stats["rows_written"] += written
+            self._flush_stats["rejected"] += len(records) - written
+            self._flush_stats["last_flush_rows"] = written
+            self._flush_stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            logger.debug(f"Flushed {written}/{len(records)} metrics")
+
+    async def _copy_metrics(self, conn: asyncpg.Connection, records: List[tuple]) -> int:
+        """COPY records, bisecting a rejected batch so only the offending rows are lost."""
+        try:
+            await conn.copy_records_to_table(
+                "agent_performance_metrics",
+                records=records,
+                columns=list(METRIC_COLUMNS)
+            )
+            return len(records)
+        except asyncpg.PostgresError as e:
+            if isinstance(e, asyncpg.PostgresConnectionError):
+                raise
+            if len(records) == 1:
+                logger.debug(f"Rejected metric row {records[0][:2]}: {e}")
+                return 0
+            middle = len(records) // 2
+            return (
+                await self._copy_metrics(conn, records[:middle])
+                + await self._copy_metrics(conn, records[middle:])
+            )
 
-        except Exception as e:
-            logger.error(f"Failed to flush metrics: {e}")
-            # Put metrics back in buffer for retry
-            async with self._buffer_lock:
-                self.metrics_buffer.extend(buffer)
+    def get_flush_stats(self) -> Dict[str, Any]:
+        """Metrics buffer depth, throughput and loss counters."""
+        return {
+            **self._flush_stats,
+            "buffered": len(self.metrics_buffer),
+            "max_buffered": self.metrics_buffer.maxlen,
+            "flusher_running": bool(self._flush_task and not self._flush_task.done()),
+        }
 
     async def _check_agent_anomalies(
         self,
@@ -1136,26 +1223,14 @@ class PerformanceMonitor:
         ]
 
     async def _get_cost_summary(self, start_time: datetime) -> Dict[str, Any]:
-        """Get cost summary for time period."""
-        rows = await db.fetch_all(
-            """
-            SELECT SUM(total_cost_usd) as total_cost,
-                   SUM(total_tokens) as total_tokens,
-                   COUNT(DISTINCT agent_id) as agents_with_cost
-            FROM agent_performance
-            WHERE date >= $1
-            """,
-            start_time.date()
-        )
-
-        if not rows or not rows[0]:
-            return {"total_cost_usd": 0, "total_tokens": 0, "agents_with_cost": 0}
+        """Get cost summary for time period (from the usage rollups)."""
+        summary = await usage_rollups.summary(start_time, group_by=("agent_id",))
+        groups = summary["groups"]
 
-        row = rows[0]
         return {
-            "total_cost_usd": float(row["total_cost"] or 0),
-            "total_tokens": row["total_tokens"] or 0,
-            "agents_with_cost": row["agents_with_cost"] or 0
+            "total_cost_usd": float(sum(row["cost_usd"] for row in groups)),
+            "total_tokens": sum(row["input_tokens"] + row["output_tokens"] for row in groups),
+            "agents_with_cost": sum(1 for row in groups if row["agent_id"] != NIL_AGENT and row["cost_usd"] > 0)
         }
 
     async def _get_recent_failure_rate(self, agent_id: str) -> float:
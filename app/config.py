@@ -6,7 +6,7 @@ Load settings from environment using pydantic-settings.
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -38,6 +38,29 @@ class Settings(BaseSettings):
     chromadb_token: str = Field(default="", alias="CHROMA_TOKEN")
     chromadb_collection_prefix: str = Field(default="nexus_", alias="CHROMADB_COLLECTION_PREFIX")
 
+    # Embeddings
+    embedding_max_batch_size: int = Field(default=32, alias="EMBEDDING_MAX_BATCH_SIZE")
+    embedding_max_wait_ms: float = Field(default=5.0, alias="EMBEDDING_MAX_WAIT_MS")
+    embedding_cache_max_entries: int = Field(default=10000, alias="EMBEDDING_CACHE_MAX_ENTRIES")
+
+    # MemorySystem's in-process cache of memory rows
+    memory_cache_max_entries: int = Field(default=5000, alias="MEMORY_CACHE_MAX_ENTRIES")
+    memory_cache_max_bytes: int = Field(default=32 * 1024 * 1024, alias="MEMORY_CACHE_MAX_BYTES")
+
+    # Bulk memory ingestion (MemorySystem.enqueue_memory write-behind queue)
+    memory_ingest_batch_size: int = Field(default=64, alias="MEMORY_INGEST_BATCH_SIZE")
+    memory_ingest_flush_interval_seconds: float = Field(default=1.0, alias="MEMORY_INGEST_FLUSH_INTERVAL_SECONDS")
+    memory_ingest_max_pending: int = Field(default=5000, alias="MEMORY_INGEST_MAX_PENDING")
+
+    # Memory consolidation (cluster near-duplicates, one summary per cluster)
+    memory_consolidation_chunk_size: int = Field(default=500, alias="MEMORY_CONSOLIDATION_CHUNK_SIZE")
+    memory_consolidation_similarity: float = Field(default=0.9, alias="MEMORY_CONSOLIDATION_SIMILARITY")
+    memory_consolidation_min_cluster_size: int = Field(default=3, alias="MEMORY_CONSOLIDATION_MIN_CLUSTER_SIZE")
+    memory_consolidation_max_cluster_size: int = Field(default=20, alias="MEMORY_CONSOLIDATION_MAX_CLUSTER_SIZE")
+    memory_consolidation_max_memories_per_run: int = Field(default=5000, alias="MEMORY_CONSOLIDATION_MAX_MEMORIES_PER_RUN")
+    memory_consolidation_concurrency: int = Field(default=4, alias="MEMORY_CONSOLIDATION_CONCURRENCY")
+    memory_consolidation_lookback_hours: float = Field(default=24.0, alias="MEMORY_CONSOLIDATION_LOOKBACK_HOURS")
+
     # AI Providers
     groq_api_key: str = Field(default="", alias="GROQ_API_KEY")
     deepseek_api_key: str = Field(default="", alias="DEEPSEEK_API_KEY")
@@ -45,6 +68,62 @@ class Settings(BaseSettings):
     anthropic_api_key: str = Field(default="", alias="ANTHROPIC_API_KEY")
     openrouter_api_key: str = Field(default="", alias="OPENROUTER_API_KEY")
 
+    # Provider HTTP clients (shared keep-alive pools)
+    provider_max_connections: int = Field(default=20, alias="PROVIDER_MAX_CONNECTIONS")
+    provider_max_keepalive_connections: int = Field(default=10, alias="PROVIDER_MAX_KEEPALIVE_CONNECTIONS")
+    provider_keepalive_expiry: float = Field(default=60.0, alias="PROVIDER_KEEPALIVE_EXPIRY")
+    provider_connect_timeout: float = Field(default=5.0, alias="PROVIDER_CONNECT_TIMEOUT")
+    provider_timeouts: Dict[str, float] = Field(
+        default={"groq": 30.0, "deepseek": 60.0, "google": 60.0, "openrouter": 30.0},
+        alias="PROVIDER_TIMEOUTS"
+    )
+
+    # Hedged provider requests (fire the fallback when the primary is slow)
+    hedge_enabled: bool = Field(default=True, alias="HEDGE_ENABLED")
+    hedge_quantile: float = Field(default=0.95, alias="HEDGE_QUANTILE")
+    hedge_min_delay_ms: float = Field(default=250.0, alias="HEDGE_MIN_DELAY_MS")
+    hedge_max_delay_ms: float = Field(default=10000.0, alias="HEDGE_MAX_DELAY_MS")
+    hedge_default_delay_ms: float = Field(default=2000.0, alias="HEDGE_DEFAULT_DELAY_MS")
+    hedge_max_ratio: float = Field(default=0.1, alias="HEDGE_MAX_RATIO")
+    hedge_budget_fraction: float = Field(default=0.8, alias="HEDGE_BUDGET_FRACTION")
+
+    # Provider quota ledger ("memory", or "redis" to share counters across workers)
+    quota_ledger_backend: str = Field(default="memory", alias="QUOTA_LEDGER_BACKEND")
+    quota_reconcile_seconds: float = Field(default=30.0, alias="QUOTA_RECONCILE_SECONDS")
+    provider_rate_limits: Dict[str, float] = Field(
+        default={"groq": 30.0, "google": 15.0, "openrouter": 20.0},
+        alias="PROVIDER_RATE_LIMITS"
+    )  # requests per minute
+
+    # Usage/cost rollups
+    usage_rollup_flush_seconds: float = Field(default=5.0, alias="USAGE_ROLLUP_FLUSH_SECONDS")
+
+    # Write-behind telemetry (api_usage rows, provider usage counters)
+    telemetry_batch_size: int = Field(default=500, alias="TELEMETRY_BATCH_SIZE")
+    telemetry_flush_interval_seconds: float = Field(default=1.0, alias="TELEMETRY_FLUSH_INTERVAL_SECONDS")
+    telemetry_max_pending: int = Field(default=20000, alias="TELEMETRY_MAX_PENDING")
+    telemetry_backpressure_timeout_ms: float = Field(default=50.0, alias="TELEMETRY_BACKPRESSURE_TIMEOUT_MS")
+
+    # Agent performance metrics writer (COPY batches on a dedicated connection)
+    metrics_flush_interval_seconds: float = Field(default=2.0, alias="METRICS_FLUSH_INTERVAL_SECONDS")
+    metrics_flush_batch_size: int = Field(default=500, alias="METRICS_FLUSH_BATCH_SIZE")
+    metrics_buffer_max: int = Field(default=20000, alias="METRICS_BUFFER_MAX")
+
+    # In-memory latency sketches (sliding window = slot seconds x slots)
+    latency_sketch_accuracy: float = Field(default=0.01, alias="LATENCY_SKETCH_ACCURACY")
+    latency_window_slot_seconds: float = Field(default=60.0, alias="LATENCY_WINDOW_SLOT_SECONDS")
+    latency_window_slots: int = Field(default=60, alias="LATENCY_WINDOW_SLOTS")
+    latency_sketch_max_keys: int = Field(default=1000, alias="LATENCY_SKETCH_MAX_KEYS")
+
+    # /metrics background sampling
+    metrics_queue_depth_interval_seconds: float = Field(default=15.0, alias="METRICS_QUEUE_DEPTH_INTERVAL_SECONDS")
+
+    # Event-loop monitor (lag heartbeat + blocked-loop stack capture)
+    loop_monitor_interval_seconds: float = Field(default=0.1, alias="LOOP_MONITOR_INTERVAL_SECONDS")
+    loop_monitor_block_threshold_ms: float = Field(default=250.0, alias="LOOP_MONITOR_BLOCK_THRESHOLD_MS")
+    loop_monitor_alert_threshold_ms: float = Field(default=1000.0, alias="LOOP_MONITOR_ALERT_THRESHOLD_MS")
+    loop_monitor_stack_sample_rate: float = Field(default=1.0, alias="LOOP_MONITOR_STACK_SAMPLE_RATE")
+
     # Ollama
     ollama_host: str = Field(default="http://localhost:11434", alias="OLLAMA_HOST")
 
@@ -53,6 +132,19 @@ class Settings(BaseSettings):
     gmail_app_password: str = Field(default="", alias="GMAIL_APP_PASSWORD")
     icloud_email: str = Field(default="", alias="ICLOUD_EMAIL")
     icloud_app_password: str = Field(default="", alias="ICLOUD_APP_PASSWORD")
+    imap_partial_body_bytes: int = Field(default=4096, alias="IMAP_PARTIAL_BODY_BYTES")
+    imap_noop_interval_seconds: float = Field(default=60.0, alias="IMAP_NOOP_INTERVAL_SECONDS")
+
+    # Background email sync ("off", "idle" or "poll")
+    email_sync_mode: str = Field(default="off", alias="EMAIL_SYNC_MODE")
+    email_sync_poll_seconds: float = Field(default=300.0, alias="EMAIL_SYNC_POLL_SECONDS")
+    email_idle_timeout_seconds: float = Field(default=1500.0, alias="EMAIL_IDLE_TIMEOUT_SECONDS")  # RFC 2177: re-issue before 29 min
+    email_sync_max_retries: int = Field(default=3, alias="EMAIL_SYNC_MAX_RETRIES")  # Failed syncs before a message stops holding the checkpoint
+
+    # Email processing pipeline
+    email_classify_batch_size: int = Field(default=25, alias="EMAIL_CLASSIFY_BATCH_SIZE")
+    email_pipeline_concurrency: int = Field(default=8, alias="EMAIL_PIPELINE_CONCURRENCY")
+    email_preferences_ttl_seconds: float = Field(default=300.0, alias="EMAIL_PREFERENCES_TTL_SECONDS")
 
     # Notifications
     ntfy_topic: str = Field(default="", alias="NTFY_TOPIC")
@@ -8,8 +8,10 @@ import json
 from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 import logging
+import time
 
 from .config import settings
+from .metrics import metrics, DB_POOL_ACQUIRE, DB_POOL_CONNECTIONS
 
 logger = logging.getLogger(__name__)
 
@@ -60,14 +62,34 @@ class Database:
             self._pool = None
             logger.info("Database connection pool closed")
 
+    async def connect_dedicated(self) -> asyncpg.Connection:
+        """
+        Open a standalone connection outside the pool for a long-lived writer.
+
+        Uses asyncpg's native codecs (JSONB as text), which COPY requires.
+        The caller owns the connection and must close it.
+        """
+        return await asyncpg.connect(dsn=settings.database_url, command_timeout=60)
+
     @asynccontextmanager
     async def connection(self):
         """Get a connection from the pool."""
         if not self._pool:
             raise RuntimeError("Database not connected. Call connect() first.")
+        started = time.perf_counter()
         async with self._pool.acquire() as conn:
+            DB_POOL_ACQUIRE.observe(time.perf_counter() - started)
             yield conn
 
+    def collect_pool_metrics(self) -> None:
+        """Publish pool occupancy to /metrics."""
+        if self._pool:
+            size = self._pool.get_size()
+            idle = self._pool.get_idle_size()
+            DB_POOL_CONNECTIONS.set(size - idle, state="in_use")
+            DB_POOL_CONNECTIONS.set(idle, state="idle")
+            DB_POOL_CONNECTIONS.set(self._pool.get_max_size(), state="max")
+
     async def fetch_one(self, query: str, *args) -> Optional[Dict[str, Any]]:
         """Execute query and return first row as dict."""
         async with self.connection() as conn:
@@ -85,6 +107,18 @@ class Database:
         async with self.connection() as conn:
             return await conn.execute(query, *args)
 
+    async def execute_many(self, statements: List[tuple]) -> None:
+        """
+        Run (query, rows) pairs with executemany in one transaction.
+
+        Empty row lists are skipped; either every statement commits or none do.
+        """
+        async with self.connection() as conn:
+            async with conn.transaction():
+                for query, rows in statements:
+                    if rows:
+                        await conn.executemany(query, rows)
+
     async def fetch_val(self, query: str, *args) -> Any:
         """Execute query and return single value."""
         async with self.connection() as conn:
@@ -93,6 +127,7 @@ class Database:
 
 # Global database instance
 db = Database()
+metrics.register_collector(db.collect_pool_metrics)
 
 
 async def get_db() -> Database:
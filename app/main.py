@@ -15,7 +15,20 @@ from .routers import health, chat, finance, email, agents, evolution, swarm, man
 from .agents.swarm import initialize_swarm_pubsub, initialize_event_bus, close_swarm_pubsub, close_event_bus
 from .logging_config import setup_logging, get_logger
 from .middleware.error_handler import setup_error_handling
+from .middleware.metrics import setup_request_metrics
+from .metrics import metrics
 from .monitoring_integration import monitoring_integration
+from .services.semantic_cache import initialize_semantic_cache
+from .services.embeddings import embedding_service, embedding_cache
+from .services.http_clients import provider_clients
+from .services.usage_rollups import usage_rollups
+from .services.telemetry_sink import telemetry_sink
+from .services.quota_ledger import quota_ledger
+from .services.loop_monitor import loop_monitor
+from .services.email_client import imap_pool
+from .services.email_sync import email_sync
+from .agents.email_intelligence import scan_emails
+from .agents.memory import memory_system
 
 # Setup centralized logging
 setup_logging()
@@ -30,6 +43,72 @@ async def lifespan(app: FastAPI):
     await db.connect()
     logger.info(f"Database connected: {settings.postgres_host}:{settings.postgres_port}")
 
+    # Open pooled keep-alive clients for the LLM providers
+    try:
+        await provider_clients.start()
+    except Exception as e:
+        logger.error(f"Failed to create provider HTTP clients: {e}")
+        # Continue - clients are created lazily on first request
+
+    # Start the write-behind telemetry flusher
+    try:
+        await telemetry_sink.start()
+    except Exception as e:
+        logger.error(f"Failed to start telemetry sink: {e}")
+        # Continue - the flusher starts on first write
+
+    # Start the periodic usage rollup flush
+    try:
+        await usage_rollups.start()
+    except Exception as e:
+        logger.error(f"Failed to start usage rollups: {e}")
+        # Continue - deltas accumulate in memory until a flush succeeds
+
+    # Sample Celery queue depth for /metrics
+    try:
+        await metrics.start()
+    except Exception as e:
+        logger.error(f"Failed to start metrics sampler: {e}")
+        # Continue - request and provider metrics don't need the sampler
+
+    # Watch event-loop lag and capture stacks of blocking calls
+    try:
+        await loop_monitor.start()
+    except Exception as e:
+        logger.error(f"Failed to start event loop monitor: {e}")
+        # Continue - lag simply isn't measured
+
+    # Load today's provider quotas and start reconciling
+    try:
+        await quota_ledger.start()
+    except Exception as e:
+        logger.error(f"Failed to start quota ledger: {e}")
+        # Continue - counters start from zero and reconcile later
+
+    # Start the embedding worker and load the model off the event loop
+    try:
+        await embedding_cache.initialize()
+        await embedding_service.start()
+        logger.info("Embedding service started")
+    except Exception as e:
+        logger.error(f"Failed to start embedding service: {e}")
+        # Continue - the model is loaded on first use
+
+    # Watch mailboxes for new mail (EMAIL_SYNC_MODE=idle|poll)
+    try:
+        await email_sync.start(lambda accounts: scan_emails(accounts=accounts))
+    except Exception as e:
+        logger.error(f"Failed to start email sync: {e}")
+        # Continue - /email/scan still syncs on demand
+
+    # Load the semantic cache vector index
+    try:
+        await initialize_semantic_cache()
+        logger.info("Semantic cache index loaded")
+    except Exception as e:
+        logger.error(f"Failed to load semantic cache index: {e}")
+        # Continue - the index is rebuilt lazily on first lookup
+
     # Initialize agent framework components
     try:
         await agents.initialize_agent_framework()
@@ -60,6 +139,68 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down NEXUS API...")
+
+    # Stop the embedding worker and flush pending cache writes
+    try:
+        await embedding_service.close()
+        await embedding_cache.close()
+        logger.info("Embedding service stopped")
+    except Exception as e:
+        logger.error(f"Failed to stop embedding service: {e}")
+
+    # Close pooled provider connections
+    try:
+        await provider_clients.close()
+        logger.info("Provider HTTP clients closed")
+    except Exception as e:
+        logger.error(f"Failed to close provider HTTP clients: {e}")
+
+    # Stop mailbox watchers and log out of pooled IMAP sessions
+    try:
+        await email_sync.close()
+        await imap_pool.close()
+    except Exception as e:
+        logger.error(f"Failed to close IMAP connections: {e}")
+
+    # Stop the event loop monitor
+    try:
+        await loop_monitor.close()
+    except Exception as e:
+        logger.error(f"Failed to stop event loop monitor: {e}")
+
+    # Stop the metrics sampler
+    try:
+        await metrics.close()
+    except Exception as e:
+        logger.error(f"Failed to stop metrics sampler: {e}")
+
+    # Stop quota reconciliation
+    try:
+        await quota_ledger.close()
+    except Exception as e:
+        logger.error(f"Failed to close quota ledger: {e}")
+
+    # Drain queued telemetry rows and counters
+    try:
+        await telemetry_sink.close()
+        logger.info(f"Telemetry sink drained: {telemetry_sink.get_stats()}")
+    except Exception as e:
+        logger.error(f"Failed to drain telemetry sink: {e}")
+
+    # Write remaining usage rollup deltas
+    try:
+        await usage_rollups.close()
+        logger.info("Usage rollups flushed")
+    except Exception as e:
+        logger.error(f"Failed to flush usage rollups: {e}")
+
+    # Write memories still queued for bulk ingestion
+    try:
+        await memory_system.ingest.close()
+        logger.info(f"Memory ingest drained: {memory_system.ingest.get_stats()}")
+    except Exception as e:
+        logger.error(f"Failed to drain memory ingest queue: {e}")
+
     await db.disconnect()
     logger.info("Database disconnected")
 
@@ -103,6 +244,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time every request for /metrics (outermost, so it sees the final status)
+setup_request_metrics(app)
+
 # Include routers
 app.include_router(health.router)
 app.include_router(chat.router)
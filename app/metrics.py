@@ -0,0 +1,338 @@
+"""
+NEXUS Metrics
+In-process counters, gauges and histograms with OpenMetrics exposition.
+
+Instruments update plain dicts keyed by label values. Everything runs on
+the event loop, so no locks are needed and an update is a dict lookup and
+an add (histograms add a bisect over a fixed bucket list). `/metrics`
+renders the current values; services that already keep their own
+counters (caches, DB pool) register collectors that are read at scrape
+time, so a scrape never touches Postgres.
+
+A background sampler polls Celery queue depth from the Redis broker and
+caches it for scrapes; event-loop lag is fed by the loop monitor.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import redis.asyncio as redis
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Seconds; covers sub-millisecond handlers up to slow LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Seconds; pool waits and loop lag should sit well under a request's budget
+SHORT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Celery queues declared in celery_app.task_routes
+CELERY_QUEUES = ("default", "agent_tasks", "system_tasks")
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = "unknown"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterable[Sample]:
+        return ()
+
+
+class Counter(_Metric):
+    """Monotonic counter; exposed as `<name>_total`."""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: str) -> None:
+        """Mirror a monotonic total kept elsewhere (for scrape-time collectors)."""
+        self._values[self._key(labels)] = value
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield f"{self.name}_total", self._labels(key), value
+
+
+class Gauge(_Metric):
+    """Point-in-time value."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def get(self, **labels: str) -> Optional[float]:
+        return self._values.get(self._key(labels))
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, self._labels(key), value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram with cumulative `le` buckets, `_count` and `_sum`."""
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self) -> Iterable[Sample]:
+        for key, counts in self._counts.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, self._sums[key]
+
+
+class MetricsRegistry:
+    """Holds instruments and scrape-time collectors and renders OpenMetrics text."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._sampler: Optional[asyncio.Task] = None
+        self._redis: Optional[redis.Redis] = None
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        """Run `collector` before each scrape (to copy counters kept elsewhere into gauges)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Current values in OpenMetrics text format."""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    # ===== Background sampling =====
+
+    async def start(self) -> None:
+        """Start the queue-depth sampler."""
+        if self._sampler is None or self._sampler.done():
+            try:
+                self._redis = redis.from_url(settings.celery_broker_url, decode_responses=False)
+                await self._redis.ping()
+            except Exception as e:
+                logger.warning(f"Metrics sampler can't reach the Celery broker, queue depth disabled: {e}")
+                self._redis = None
+                return
+            self._sampler = asyncio.create_task(self._sample_loop())
+
+    async def close(self) -> None:
+        if self._sampler:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+        if self._redis:
+            await self._redis.close()
+            self._redis = None
+
+    async def _sample_loop(self) -> None:
+        while True:
+            await self._sample_queue_depth()
+            await asyncio.sleep(settings.metrics_queue_depth_interval_seconds)
+
+    async def _sample_queue_depth(self) -> None:
+        try:
+            pipe = self._redis.pipeline()
+            for queue in CELERY_QUEUES:
+                pipe.llen(queue)
+            for queue, depth in zip(CELERY_QUEUES, await pipe.execute()):
+                CELERY_QUEUE_DEPTH.set(depth, queue=queue)
+        except Exception as e:
+            logger.debug(f"Celery queue depth sample failed: {e}")
+
+
+# Global registry
+metrics = MetricsRegistry()
+
+# ===== Shared instruments =====
+
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "nexus_http_request_duration_seconds", "HTTP request duration by route template",
+    ("method", "route", "status")
+)
+PROVIDER_REQUEST_DURATION = metrics.histogram(
+    "nexus_provider_request_duration_seconds", "LLM provider HTTP call duration",
+    ("provider", "outcome")
+)
+PROVIDER_TTFB = metrics.histogram(
+    "nexus_provider_ttfb_seconds", "LLM provider time to response headers", ("provider",)
+)
+PROVIDER_REQUESTS = metrics.counter(
+    "nexus_provider_requests", "Completed LLM calls by outcome", ("provider", "outcome")
+)
+PROVIDER_TOKENS = metrics.counter(
+    "nexus_provider_tokens", "LLM tokens by direction (combined when the provider doesn't split them)",
+    ("provider", "direction")
+)
+PROVIDER_COST = metrics.counter(
+    "nexus_provider_cost_usd", "LLM spend in USD", ("provider",)
+)
+CACHE_LOOKUPS = metrics.counter(
+    "nexus_cache_lookups", "Cache lookups since process start", ("cache",)
+)
+CACHE_HITS = metrics.counter(
+    "nexus_cache_hits", "Cache hits since process start by tier", ("cache", "tier")
+)
+CACHE_HIT_RATIO = metrics.gauge(
+    "nexus_cache_hit_ratio", "Cache hit ratio since process start", ("cache",)
+)
+DB_POOL_ACQUIRE = metrics.histogram(
+    "nexus_db_pool_acquire_seconds", "Time waiting for a pooled Postgres connection",
+    buckets=SHORT_BUCKETS
+)
+DB_POOL_CONNECTIONS = metrics.gauge(
+    "nexus_db_pool_connections", "Postgres pool connections by state", ("state",)
+)
+EVENT_LOOP_LAG = metrics.histogram(
+    "nexus_event_loop_lag_seconds", "Event-loop scheduling delay", buckets=SHORT_BUCKETS
+)
+EVENT_LOOP_LAG_LAST = metrics.gauge(
+    "nexus_event_loop_lag_last_seconds", "Most recent event-loop lag sample"
+)
+CELERY_QUEUE_DEPTH = metrics.gauge(
+    "nexus_celery_queue_depth", "Pending messages per Celery queue", ("queue",)
+)
+
+
+def record_loop_lag(lag_seconds: float) -> None:
+    EVENT_LOOP_LAG.observe(lag_seconds)
+    EVENT_LOOP_LAG_LAST.set(lag_seconds)
+
+
+def record_llm_usage(
+    provider: str,
+    success: bool,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    total_tokens: int = 0,
+    cost_usd: float = 0.0,
+) -> None:
+    """Count one completed LLM call."""
+    PROVIDER_REQUESTS.inc(provider=provider, outcome="success" if success else "error")
+    if input_tokens:
+        PROVIDER_TOKENS.inc(input_tokens, provider=provider, direction="input")
+    if output_tokens:
+        PROVIDER_TOKENS.inc(output_tokens, provider=provider, direction="output")
+    if total_tokens:
+        PROVIDER_TOKENS.inc(total_tokens, provider=provider, direction="combined")
+    if cost_usd:
+        PROVIDER_COST.inc(cost_usd, provider=provider)
+
+
+def record_cache_stats(cache: str, lookups: int, hits_by_tier: Dict[str, int]) -> None:
+    """Copy a cache's own counters into the cache counters and hit-ratio gauge."""
+    CACHE_LOOKUPS.set_total(lookups, cache=cache)
+    for tier, hits in hits_by_tier.items():
+        CACHE_HITS.set_total(hits, cache=cache, tier=tier)
+    CACHE_HIT_RATIO.set(sum(hits_by_tier.values()) / lookups if lookups else 0.0, cache=cache)
@@ -0,0 +1,52 @@
+"""
+NEXUS Request Metrics Middleware
+
+Times every HTTP request into the route latency histogram served at
+/metrics. Written as plain ASGI (no BaseHTTPMiddleware) so it adds one
+timer and one histogram update per request and doesn't buffer streams.
+"""
+
+import time
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..metrics import HTTP_REQUEST_DURATION
+
+
+class RequestMetricsMiddleware:
+    """Record request duration by method, route template and status class."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Route template keeps label cardinality bounded (/agents/{agent_id}, not each id)
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=f"{status // 100}xx",
+            )
+
+
+def setup_request_metrics(app: FastAPI) -> None:
+    """Install the request metrics middleware."""
+    app.add_middleware(RequestMetricsMiddleware)
@@ -4,7 +4,7 @@ Request/response schemas for API validation.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import date, datetime
 from uuid import UUID
 from decimal import Decimal
@@ -26,6 +26,8 @@ class ChatResponse(BaseModel):
     cost_usd: float
     latency_ms: int
     cached: bool = False
+    time_to_first_token_ms: Optional[int] = None
+    metadata: Optional[Dict[str, Any]] = None  # e.g. per-source context timings
 
 
 # ============ Finance Models ============
@@ -14,6 +14,7 @@ import logging
 from .logging_config import get_logger, log_error
 from .agents.monitoring import performance_monitor, AlertSeverity
 from .database import db
+from .services.latency_sketch import new_latency_registry
 
 logger = get_logger(__name__)
 
@@ -32,7 +33,9 @@ class MonitoringIntegration:
 
     def __init__(self):
         """Initialize monitoring integration."""
-        self.request_metrics: Dict[str, List[float]] = {}
+        # Sliding-window latency sketches per "METHOD:endpoint" and per agent
+        self.request_metrics = new_latency_registry()
+        self.agent_metrics = new_latency_registry()
         self.error_counts: Dict[str, int] = {}
         self._cleanup_task: Optional[asyncio.Task] = None
         self._running = False
@@ -91,11 +94,9 @@ class MonitoringIntegration:
         """
         try:
             # Record request metrics
-            key = f"{method}:{endpoint}"
-            if key not in self.request_metrics:
-                self.request_metrics[key] = []
-
-            self.request_metrics[key].append(duration_ms)
+            self.request_metrics.record(f"{method}:{endpoint}", duration_ms)
+            if agent_id:
+                self.agent_metrics.record(str(agent_id), duration_ms)
 
             # Record to performance monitor if agent is involved
             if agent_id:
@@ -204,6 +205,9 @@ class MonitoringIntegration:
         Returns:
             API metrics dictionary
         """
+        # In-process latency percentiles need no database round trip
+        live_latency = self.get_latency_summary(window_minutes=time_range_hours * 60)
+
         try:
             start_time = datetime.now() - timedelta(hours=time_range_hours)
 
@@ -270,6 +274,7 @@ class MonitoringIntegration:
 
             return {
                 "time_range_hours": time_range_hours,
+                "live_latency": live_latency,
                 "request_counts": [
                     {
                         "endpoint": row["endpoint"],
@@ -312,7 +317,24 @@ class MonitoringIntegration:
 
         except Exception as e:
             logger.error(f"Failed to get API metrics: {e}", exc_info=True)
-            return {}
+            return {"time_range_hours": time_range_hours, "live_latency": live_latency}
+
+    def get_latency_summary(self, window_minutes: int = 60) -> Dict[str, Any]:
+        """
+        Get p50/p95/p99 latency per endpoint and agent from the in-memory sketches.
+
+        Args:
+            window_minutes: Sliding window to summarize (capped at the sketch retention)
+
+        Returns:
+            Latency summaries keyed by endpoint and by agent
+        """
+        window_seconds = min(window_minutes * 60, self.request_metrics.slot_seconds * self.request_metrics.slots)
+        return {
+            "window_seconds": window_seconds,
+            "endpoints": self.request_metrics.summaries(window_seconds),
+            "agents": self.agent_metrics.summaries(window_seconds),
+        }
 
     async def get_system_health(self) -> Dict[str, Any]:
         """
@@ -358,14 +380,9 @@ class MonitoringIntegration:
             try:
                 await asyncio.sleep(300)  # Clean up every 5 minutes
 
-                # Clean up request metrics older than 1 hour
-                current_time = time.time()
-                one_hour_ago = current_time - 3600
-
-                # We're storing durations, not timestamps, so we'll just limit list size
-                for key in list(self.request_metrics.keys()):
-                    if len(self.request_metrics[key]) > 1000:  # Keep last 1000 measurements
-                        self.request_metrics[key] = self.request_metrics[key][-1000:]
+                # Sketch windows recycle their own slots; drop keys idle for a whole window
+                self.request_metrics.prune()
+                self.agent_metrics.prune()
 
                 # Clean up error counts
                 self.error_counts.clear()  # Reset error counts periodically
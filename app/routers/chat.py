@@ -4,18 +4,64 @@ Natural language interface to NEXUS.
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Union
 
 from ..models.schemas import ChatRequest, ChatResponse
-from ..services.ai import chat, chat_voice, intelligent_chat, AIResponse
+from ..services.ai import (
+    chat, chat_voice, intelligent_chat, AIResponse, StreamEvent,
+    chat_stream, chat_voice_stream, intelligent_chat_stream
+)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 logger = logging.getLogger(__name__)
 
 
+def _to_chat_response(response: AIResponse) -> ChatResponse:
+    return ChatResponse(
+        response=response.content,
+        model_used=f"{response.provider}/{response.model}",
+        tokens_used=response.input_tokens + response.output_tokens,
+        cost_usd=response.cost_usd,
+        latency_ms=response.latency_ms,
+        cached=response.cached,
+        time_to_first_token_ms=response.time_to_first_token_ms,
+        metadata=response.metadata
+    )
+
+
+def _sse_response(events: AsyncIterator[StreamEvent], label: str) -> StreamingResponse:
+    """
+    Relay stream events as Server-Sent Events.
+
+    Each token is sent as `data: {"token": ...}`; the final ChatResponse is
+    sent as an `event: done` frame, or `event: error` if the stream fails.
+    """
+    async def body() -> AsyncIterator[str]:
+        try:
+            async for event in events:
+                if event.type == "token":
+                    yield f"data: {json.dumps({'token': event.content})}\n\n"
+                else:
+                    yield f"event: done\ndata: {_to_chat_response(event.response).model_dump_json()}\n\n"
+        except Exception as e:
+            logger.error(f"{label} stream failed: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest) -> ChatResponse:
+async def chat_endpoint(
+    request: ChatRequest,
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events")
+) -> Union[ChatResponse, StreamingResponse]:
     """
     Send a message to NEXUS AI.
 
@@ -23,20 +69,16 @@ async def chat_endpoint(request: ChatRequest) -> ChatResponse:
     1. Groq (free tier)
     2. DeepSeek (cheap fallback)
     """
+    if stream:
+        return _sse_response(chat_stream(message=request.message, preferred_model=request.model), "Chat")
+
     try:
         response: AIResponse = await chat(
             message=request.message,
             preferred_model=request.model
         )
 
-        return ChatResponse(
-            response=response.content,
-            model_used=f"{response.provider}/{response.model}",
-            tokens_used=response.input_tokens + response.output_tokens,
-            cost_usd=response.cost_usd,
-            latency_ms=response.latency_ms,
-            cached=response.cached
-        )
+        return _to_chat_response(response)
 
     except Exception as e:
         logger.error(f"Chat failed: {e}")
@@ -46,8 +88,9 @@ async def chat_endpoint(request: ChatRequest) -> ChatResponse:
 @router.post("/voice", response_model=ChatResponse)
 async def voice_endpoint(
     request: ChatRequest,
-    session_id: Optional[str] = Query(None, description="Optional session ID for conversation memory")
-) -> ChatResponse:
+    session_id: Optional[str] = Query(None, description="Optional session ID for conversation memory"),
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events")
+) -> Union[ChatResponse, StreamingResponse]:
     """
     Voice-optimized chat endpoint.
 
@@ -56,20 +99,16 @@ async def voice_endpoint(
 
     Perfect for "Hey NEXUS" demo.
     """
+    if stream:
+        return _sse_response(chat_voice_stream(message=request.message, session_id=session_id), "Voice chat")
+
     try:
         response: AIResponse = await chat_voice(
             message=request.message,
             session_id=session_id
         )
 
-        return ChatResponse(
-            response=response.content,
-            model_used=f"{response.provider}/{response.model}",
-            tokens_used=response.input_tokens + response.output_tokens,
-            cost_usd=response.cost_usd,
-            latency_ms=response.latency_ms,
-            cached=response.cached
-        )
+        return _to_chat_response(response)
 
     except Exception as e:
         logger.error(f"Voice chat failed: {e}")
@@ -80,8 +119,9 @@ async def voice_endpoint(
 async def intelligent_endpoint(
     request: ChatRequest,
     session_id: Optional[str] = Query(None, description="Session ID for conversation memory"),
-    use_context: bool = Query(True, description="Whether to use intelligent context retrieval")
-) -> ChatResponse:
+    use_context: bool = Query(True, description="Whether to use intelligent context retrieval"),
+    stream: bool = Query(False, description="Stream tokens as Server-Sent Events")
+) -> Union[ChatResponse, StreamingResponse]:
     """
     Jarvis-like intelligent chat endpoint.
 
@@ -96,6 +136,12 @@ async def intelligent_endpoint(
     This is the "real Jarvis" endpoint - extremely intelligent,
     learns from every interaction, and provides context-aware responses.
     """
+    if stream:
+        return _sse_response(
+            intelligent_chat_stream(message=request.message, session_id=session_id, use_context=use_context),
+            "Intelligent chat"
+        )
+
     try:
         response: AIResponse = await intelligent_chat(
             message=request.message,
@@ -103,14 +149,7 @@ async def intelligent_endpoint(
             use_context=use_context
         )
 
-        return ChatResponse(
-            response=response.content,
-            model_used=f"{response.provider}/{response.model}",
-            tokens_used=response.input_tokens + response.output_tokens,
-            cost_usd=response.cost_usd,
-            latency_ms=response.latency_ms,
-            cached=response.cached
-        )
+        return _to_chat_response(response)
 
     except Exception as e:
         logger.error(f"Intelligent chat failed: {e}")
@@ -9,10 +9,11 @@ import logging
 
 from ..agents.email_intelligence import scan_emails, get_email_stats
 from ..agents.registry import AgentRegistry
-from ..services.email_client import send_email
+from ..services.email_client import send_email, imap_pool
+from ..services.email_sync import email_sync
 from ..services.email_learner import (
     record_feedback, get_learning_stats,
-    get_vip_senders, get_blocked_senders
+    get_vip_senders, get_blocked_senders, preference_engine
 )
 from ..services.insight_engine import (
     generate_insights, get_recent_insights,
@@ -237,7 +238,8 @@ async def get_stats(email_agent: Optional[Any] = Depends(get_email_agent)) -> Di
         return {
             "email_processing": email_stats,
             "ai_providers": provider_stats,
-            "learning": learning_stats
+            "learning": {**learning_stats, "engine": preference_engine.get_stats()},
+            "sync": {**email_sync.get_stats(), "imap": imap_pool.get_stats()}
         }
     except Exception as e:
         logger.error(f"Failed to get stats: {e}")
@@ -295,6 +297,7 @@ async def update_preference(request: PreferenceUpdate) -> Dict[str, Any]:
             request.sender.lower(),
             preference
         )
+        preference_engine.invalidate()
 
         return {
             "status": "updated",
@@ -6,6 +6,7 @@ and system status monitoring for production deployments.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
 from datetime import datetime, timedelta
 import subprocess
 import psutil
@@ -15,6 +16,8 @@ from typing import Dict, List, Optional, Any
 
 from ..database import db, get_db, Database
 from ..config import settings
+from ..metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from ..services.loop_monitor import loop_monitor
 from ..models.schemas import (
     HealthResponse,
     StatusResponse,
@@ -205,6 +208,27 @@ async def liveness_probe():
         )
 
 
+@router.get("/metrics", include_in_schema=False)
+async def openmetrics():
+    """
+    OpenMetrics exposition for Prometheus scrapes.
+
+    Served from in-process counters only - no database queries.
+    """
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@router.get("/admin/event-loop")
+async def event_loop_health():
+    """
+    Event-loop lag and recently captured stalls.
+
+    Each stall includes the stack of whatever was running on the loop when
+    the watchdog noticed it had stopped yielding.
+    """
+    return loop_monitor.get_stats()
+
+
 @router.get("/metrics/system", response_model=SystemMetricsResponse)
 async def system_metrics():
     """
@@ -213,7 +237,8 @@ async def system_metrics():
     Provides CPU, memory, disk, and network metrics.
     """
     # CPU metrics
-    cpu_percent = psutil.cpu_percent(interval=0.1)
+    # Usage since the previous call; interval=None doesn't block the event loop
+    cpu_percent = psutil.cpu_percent(interval=None)
     cpu_count = psutil.cpu_count()
 
     # Memory metrics
@@ -4,19 +4,25 @@ Route queries to the cheapest capable AI model.
 Includes semantic caching for 60-70% cost reduction.
 """
 
-import httpx
 import time
+import json
 import logging
 import hashlib
 import asyncio
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Any, AsyncIterator, Tuple
 from uuid import UUID
-from dataclasses import dataclass
+from datetime import datetime, timezone
+from dataclasses import dataclass, replace
 from collections import deque
 
 from ..config import settings
-from ..database import db
+from ..metrics import record_llm_usage
 from .semantic_cache import check_cache, store_cache
+from .http_clients import provider_clients
+from .hedging import hedge_policy
+from .single_flight import llm_single_flight, flight_key
+from .usage_rollups import usage_rollups
+from .telemetry_sink import telemetry_sink, as_decimal, as_uuid
 from .intelligent_context import retrieve_intelligent_context, store_conversation
 from ..agents.tools import get_tool_system
 from .conversation_memory import get_conversation_memory_service, ConversationMemoryService
@@ -28,6 +34,9 @@ _conversation_cache: Dict[str, deque] = {}
 _conversation_lock = asyncio.Lock()
 MAX_CONVERSATION_HISTORY = 3  # Keep last 3 exchanges per session
 
+# Intelligent chat: one deadline shared by context retrieval and tools (web search)
+CONTEXT_BUDGET_SECONDS = 1.5
+
 # Model pricing per million tokens (input, output)
 
 
@@ -120,6 +129,31 @@ class AIResponse:
     cost_usd: float
     latency_ms: int
     cached: bool = False
+    time_to_first_token_ms: Optional[int] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class StreamEvent:
+    """Event yielded by the streaming chat functions."""
+    type: str  # "token" for a text delta, "done" once the full response is assembled
+    content: str = ""
+    response: Optional[AIResponse] = None
+
+
+# OpenAI-compatible chat completion endpoints that support SSE streaming
+PROVIDER_CHAT_URLS = {
+    "groq": "https://api.groq.com/openai/v1/chat/completions",
+    "deepseek": "https://api.deepseek.com/chat/completions",
+}
+
+
+# Columns written by log_usage
+API_USAGE_COLUMNS = (
+    "provider", "model", "input_tokens", "output_tokens", "cost_usd",
+    "latency_ms", "success", "error_message", "query_hash", "agent_id", "session_id",
+    "time_to_first_token_ms",
+)
 
 
 def calculate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
@@ -146,21 +180,28 @@ async def log_usage(
     query_hash: Optional[str] = None,
     agent_id: Optional[UUID] = None,
     session_id: Optional[UUID] = None,
+    time_to_first_token_ms: Optional[int] = None,
 ) -> None:
-    """Log API usage to database."""
-    try:
-        await db.execute(
-            """
-            INSERT INTO api_usage
-            (provider, model, input_tokens, output_tokens, cost_usd,
-             latency_ms, success, error_message, query_hash, agent_id, session_id)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-            """,
-            provider, model, input_tokens, output_tokens, cost_usd,
-            latency_ms, success, error_message, query_hash, agent_id, session_id
-        )
-    except Exception as e:
-        logger.error(f"Failed to log API usage: {e}")
+    """Log API usage to database, the usage rollups and /metrics."""
+    record_llm_usage(
+        provider, success, input_tokens=input_tokens, output_tokens=output_tokens, cost_usd=cost_usd
+    )
+    usage_rollups.record(
+        provider=provider,
+        model=model,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost_usd=cost_usd,
+        latency_ms=latency_ms,
+        success=success,
+        agent_id=agent_id,
+    )
+    # Written behind by the telemetry sink, off the request path
+    await telemetry_sink.write_row("api_usage", API_USAGE_COLUMNS, (
+        provider, model, input_tokens, output_tokens, as_decimal(cost_usd),
+        latency_ms, success, error_message, query_hash, as_uuid(agent_id), as_uuid(session_id),
+        time_to_first_token_ms
+    ))
 
 
 async def query_groq(message: str, model: str = "llama-3.3-70b-versatile", max_tokens: int = 1024, agent_id: Optional[UUID] = None, session_id: Optional[UUID] = None) -> AIResponse:
@@ -171,22 +212,22 @@ async def query_groq(message: str, model: str = "llama-3.3-70b-versatile", max_t
     start_time = time.time()
     query_hash = hashlib.sha256(message.encode()).hexdigest()[:16]
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.groq_api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": model,
-                "messages": [{"role": "user", "content": message}],
-                "temperature": 0.7,
-                "max_tokens": max_tokens,
-            },
-        )
-        response.raise_for_status()
-        data = response.json()
+    response = await provider_clients.post(
+        "groq",
+        "https://api.groq.com/openai/v1/chat/completions",
+        headers={
+            "Authorization": f"Bearer {settings.groq_api_key}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "model": model,
+            "messages": [{"role": "user", "content": message}],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+        },
+    )
+    response.raise_for_status()
+    data = response.json()
 
     latency_ms = int((time.time() - start_time) * 1000)
 
@@ -228,22 +269,22 @@ async def query_deepseek(message: str, model: str = "deepseek-chat", max_tokens:
     start_time = time.time()
     query_hash = hashlib.sha256(message.encode()).hexdigest()[:16]
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            "https://api.deepseek.com/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.deepseek_api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": model,
-                "messages": [{"role": "user", "content": message}],
-                "temperature": 0.7,
-                "max_tokens": max_tokens,
-            },
-        )
-        response.raise_for_status()
-        data = response.json()
+    response = await provider_clients.post(
+        "deepseek",
+        "https://api.deepseek.com/chat/completions",
+        headers={
+            "Authorization": f"Bearer {settings.deepseek_api_key}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "model": model,
+            "messages": [{"role": "user", "content": message}],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+        },
+    )
+    response.raise_for_status()
+    data = response.json()
 
     latency_ms = int((time.time() - start_time) * 1000)
 
@@ -287,6 +328,10 @@ async def chat(message: str, preferred_model: Optional[str] = None, max_tokens:
     3. Cache the response for future use
 
     Priority: Cache -> Groq (free) -> DeepSeek (cheap)
+
+    DeepSeek is also fired early if Groq runs past its p95 latency
+    (see hedging.HedgePolicy); the first answer wins. Concurrent identical
+    prompts are coalesced onto one provider call.
     """
     start_time = time.time()
 
@@ -307,32 +352,38 @@ async def chat(message: str, preferred_model: Optional[str] = None, max_tokens:
             cached=True,
         )
 
-    # 2. Cache miss - call AI provider
-    errors = []
-    response: Optional[AIResponse] = None
+    # 2-3. Cache miss - identical in-flight prompts share one upstream call
+    key = flight_key("chat", message, model=_groq_model(preferred_model), max_tokens=max_tokens)
+    response = await llm_single_flight.do(
+        "chat", key,
+        lambda: _query_providers(message, preferred_model, max_tokens, agent_id, session_id)
+    )
+
+    # Callers adjust latency etc. on their copy
+    return replace(response)
 
-    # Try Groq first (free tier)
+
+async def _query_providers(message: str, preferred_model: Optional[str], max_tokens: int, agent_id: Optional[UUID], session_id: Optional[UUID]) -> AIResponse:
+    """Call providers for a cache miss and store the answer in the semantic cache."""
+    # Race providers, hedging with DeepSeek if Groq is slow
+    candidates = []
     if settings.groq_api_key:
-        try:
-            model = preferred_model if preferred_model and "llama" in preferred_model else "llama-3.3-70b-versatile"
-            response = await query_groq(message, model, max_tokens=max_tokens, agent_id=agent_id, session_id=session_id)
-        except Exception as e:
-            logger.warning(f"Groq failed: {e}")
-            errors.append(f"groq: {e}")
+        model = _groq_model(preferred_model)
+        candidates.append(("groq", lambda: query_groq(message, model, max_tokens=max_tokens, agent_id=agent_id, session_id=session_id)))
+    if settings.deepseek_api_key:
+        candidates.append(("deepseek", lambda: query_deepseek(message, max_tokens=max_tokens, agent_id=agent_id, session_id=session_id)))
 
-    # Fall back to DeepSeek
-    if response is None and settings.deepseek_api_key:
-        try:
-            response = await query_deepseek(message, max_tokens=max_tokens, agent_id=agent_id, session_id=session_id)
-        except Exception as e:
-            logger.warning(f"DeepSeek failed: {e}")
-            errors.append(f"deepseek: {e}")
+    # A hedge bills the loser's prompt too; reserve it against the budget guard
+    hedge_cost = calculate_cost("deepseek-chat", len(message) // 4, 0) if len(candidates) > 1 else 0.0
+    response, errors = await hedge_policy.race(candidates, hedge_cost_usd=hedge_cost)
 
     # All providers failed
     if response is None:
         raise RuntimeError(f"All AI providers failed: {errors}")
 
-    # 3. Store in cache for future use
+    hedge_policy.record_spend(response.cost_usd)
+
+    # Store in cache for future use
     await store_cache(
         query=message,
         response=response.content,
@@ -345,6 +396,181 @@ async def chat(message: str, preferred_model: Optional[str] = None, max_tokens:
     return response
 
 
+def _groq_model(preferred_model: Optional[str]) -> str:
+    """Groq model to use for a preferred model hint."""
+    return preferred_model if preferred_model and "llama" in preferred_model else "llama-3.3-70b-versatile"
+
+
+async def stream_provider(
+    provider: str,
+    message: str,
+    model: str,
+    max_tokens: int = 1024,
+    agent_id: Optional[UUID] = None,
+    session_id: Optional[UUID] = None
+) -> AsyncIterator[StreamEvent]:
+    """
+    Stream a completion from an OpenAI-compatible provider (Groq, DeepSeek).
+
+    Yields "token" events as SSE deltas arrive, then one "done" event
+    carrying the assembled AIResponse. Usage is logged before "done".
+    """
+    api_key = getattr(settings, f"{provider}_api_key", "")
+    if not api_key:
+        raise ValueError(f"{provider.upper()}_API_KEY not configured")
+
+    start_time = time.time()
+    query_hash = hashlib.sha256(message.encode()).hexdigest()[:16]
+    first_token_at: Optional[float] = None
+    parts: List[str] = []
+    usage: Dict = {}
+
+    async with provider_clients.stream(
+        provider,
+        "POST",
+        PROVIDER_CHAT_URLS[provider],
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "model": model,
+            "messages": [{"role": "user", "content": message}],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        },
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == "[DONE]":
+                break
+            chunk = json.loads(payload)
+            # Groq reports usage under x_groq on the final chunk
+            usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage") or usage
+            for choice in chunk.get("choices", []):
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    if first_token_at is None:
+                        first_token_at = time.time()
+                    parts.append(delta)
+                    yield StreamEvent(type="token", content=delta)
+
+    latency_ms = int((time.time() - start_time) * 1000)
+    ttft_ms = int((first_token_at - start_time) * 1000) if first_token_at else latency_ms
+    content = "".join(parts)
+    input_tokens = usage.get("prompt_tokens", 0)
+    output_tokens = usage.get("completion_tokens", 0)
+    cost_usd = calculate_cost(model, input_tokens, output_tokens)
+
+    await log_usage(
+        provider=provider,
+        model=model,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost_usd=cost_usd,
+        latency_ms=latency_ms,
+        success=True,
+        query_hash=query_hash,
+        agent_id=agent_id,
+        session_id=session_id,
+        time_to_first_token_ms=ttft_ms,
+    )
+
+    yield StreamEvent(type="done", response=AIResponse(
+        content=content,
+        model=model,
+        provider=provider,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost_usd=cost_usd,
+        latency_ms=latency_ms,
+        time_to_first_token_ms=ttft_ms,
+    ))
+
+
+async def chat_stream(message: str, preferred_model: Optional[str] = None, max_tokens: int = 1024, agent_id: Optional[UUID] = None, session_id: Optional[UUID] = None) -> AsyncIterator[StreamEvent]:
+    """
+    Streaming variant of chat().
+
+    Cache hits are emitted as a single token. Otherwise tokens are relayed
+    from Groq, falling back to DeepSeek if Groq fails before its first
+    token. The assembled response is stored in the semantic cache before
+    the final "done" event.
+    """
+    start_time = time.time()
+
+    # 1. Check semantic cache first
+    cached = await check_cache(message)
+    if cached:
+        latency_ms = int((time.time() - start_time) * 1000)
+        logger.info(f"Cache hit! Saved {cached.tokens_saved} tokens")
+        yield StreamEvent(type="token", content=cached.response_text)
+        yield StreamEvent(type="done", response=AIResponse(
+            content=cached.response_text,
+            model=cached.model_used,
+            provider="cache",
+            input_tokens=0,
+            output_tokens=0,
+            cost_usd=0.0,
+            latency_ms=latency_ms,
+            cached=True,
+            time_to_first_token_ms=latency_ms,
+        ))
+        return
+
+    # 2. Cache miss - stream from providers in priority order
+    candidates: List[Tuple[str, str]] = []
+    if settings.groq_api_key:
+        candidates.append(("groq", _groq_model(preferred_model)))
+    if settings.deepseek_api_key:
+        candidates.append(("deepseek", "deepseek-chat"))
+
+    errors = []
+    response: Optional[AIResponse] = None
+    first_token_at: Optional[float] = None
+    for provider, model in candidates:
+        try:
+            async for event in stream_provider(provider, message, model, max_tokens=max_tokens, agent_id=agent_id, session_id=session_id):
+                if event.type == "token":
+                    if first_token_at is None:
+                        first_token_at = time.time()
+                    yield event
+                else:
+                    response = event.response
+            break
+        except Exception as e:
+            # Tokens already sent can't be retracted, so only fall back before the first one
+            if first_token_at is not None:
+                raise
+            logger.warning(f"{provider} stream failed: {e}")
+            errors.append(f"{provider}: {e}")
+
+    if response is None:
+        raise RuntimeError(f"All AI providers failed: {errors}")
+
+    hedge_policy.record_spend(response.cost_usd)
+
+    # 3. Store the assembled text in cache for future use
+    await store_cache(
+        query=message,
+        response=response.content,
+        model_used=f"{response.provider}/{response.model}",
+        input_tokens=response.input_tokens,
+        output_tokens=response.output_tokens,
+        cost_usd=response.cost_usd,
+    )
+
+    response.latency_ms = int((time.time() - start_time) * 1000)
+    if first_token_at is not None:
+        response.time_to_first_token_ms = int((first_token_at - start_time) * 1000)
+    yield StreamEvent(type="done", response=response)
+
+
 async def chat_voice(message: str, agent_id: Optional[UUID] = None, session_id: Optional[str] = None) -> AIResponse:
     """
     Optimized chat for voice queries.
@@ -376,6 +602,44 @@ async def chat_voice(message: str, agent_id: Optional[UUID] = None, session_id:
     return response
 
 
+async def chat_voice_stream(message: str, agent_id: Optional[UUID] = None, session_id: Optional[str] = None) -> AsyncIterator[StreamEvent]:
+    """
+    Streaming variant of chat_voice().
+
+    Tokens are relayed as they arrive; conversation history is updated
+    with the assembled text before the final "done" event.
+    """
+    start_time = time.time()
+    session_str = str(session_id) if session_id else None
+
+    context = await _get_conversation_context(session_str)
+    full_message = context + message if context else message
+
+    response: Optional[AIResponse] = None
+    first_token_at: Optional[float] = None
+    async for event in chat_stream(
+        message=full_message,
+        preferred_model="llama-3.1-8b-instant",
+        max_tokens=256,
+        agent_id=agent_id,
+        session_id=session_id
+    ):
+        if event.type == "token":
+            if first_token_at is None:
+                first_token_at = time.time()
+            yield event
+        else:
+            response = event.response
+
+    if session_str:
+        await _update_conversation(session_str, message, response.content)
+
+    response.latency_ms = int((time.time() - start_time) * 1000)
+    if first_token_at is not None:
+        response.time_to_first_token_ms = int((first_token_at - start_time) * 1000)
+    yield StreamEvent(type="done", response=response)
+
+
 async def detect_and_execute_tools(message: str, agent_id: Optional[UUID] = None, session_id: Optional[str] = None) -> str:
     """
     Detect tool usage in user message and execute appropriate tools.
@@ -457,52 +721,80 @@ async def detect_and_execute_tools(message: str, agent_id: Optional[UUID] = None
     return ""
 
 
-async def intelligent_chat(
+async def _retrieve_context_text(
     message: str,
-    session_id: Optional[str] = None,
-    agent_id: Optional[UUID] = None,
-    use_context: bool = True
-) -> AIResponse:
-    """
-    Jarvis-like intelligent chat with full NEXUS context.
+    session_id: str,
+    timeout_seconds: float = CONTEXT_BUDGET_SECONDS
+) -> Tuple[str, Dict[str, Dict]]:
+    """Retrieve and format NEXUS context. Returns (context_text, per-source timings)."""
+    try:
+        context = await retrieve_intelligent_context(
+            query=message,
+            session_id=session_id,
+            timeout_seconds=timeout_seconds
+        )
+    except Exception as e:
+        logger.error(f"Context retrieval failed: {e}")
+        return "", {}
 
-    Features:
-    1. Retrieves relevant context from all NEXUS data sources
-    2. Uses context to generate informed responses
-    3. Stores conversations for learning
-    4. Optimized for speed and intelligence
+    context_text = context.format_for_ai()
+    if context_text and context_text != "No relevant data found.":
+        logger.info(f"Retrieved {len(context_text)} chars of context for query")
+        logger.debug(f"Context content:\n{context_text[:500]}...")
+    else:
+        logger.debug("No relevant context found for query")
+        context_text = ""
+    return context_text, context.timings
 
-    This is the "real Jarvis" endpoint for NEXUS.
-    """
-    start_time = time.time()
 
-    # Generate session ID if not provided
-    if not session_id:
-        session_id = hashlib.sha256(f"{message}{time.time()}".encode()).hexdigest()[:16]
+async def _run_tools(
+    message: str,
+    agent_id: Optional[UUID],
+    session_id: str,
+    timeout_seconds: float = CONTEXT_BUDGET_SECONDS
+) -> Tuple[str, Dict[str, Any]]:
+    """Detect and execute tools under a deadline. Returns (tool_results_text, timing)."""
+    start = time.perf_counter()
+    status = "ok"
+    text = ""
+    try:
+        text = await asyncio.wait_for(detect_and_execute_tools(message, agent_id, session_id), timeout_seconds)
+    except asyncio.TimeoutError:
+        status = "timeout"
+        logger.warning(f"Tool execution exceeded {timeout_seconds}s, continuing without tool results")
+    except Exception as e:
+        status = "error"
+        logger.error(f"Tool detection failed: {e}")
+    return text, {"ms": round((time.perf_counter() - start) * 1000, 1), "status": status, "items": 1 if text else 0}
+
 
-    # Step 1: Retrieve intelligent context (if enabled)
-    context_text = ""
+async def _build_intelligent_prompt(
+    message: str,
+    session_id: str,
+    agent_id: Optional[UUID],
+    use_context: bool
+) -> Tuple[str, str, Dict[str, Dict]]:
+    """Gather NEXUS context and tool results and build the Jarvis prompt.
+
+    Context retrieval (domains, memory, usage) and tool detection/execution
+    run concurrently under one CONTEXT_BUDGET_SECONDS deadline; the prompt
+    is built from whatever arrived by then.
+
+    Returns (enhanced_prompt, context_text, per-source timings).
+    """
+    # Step 1: Retrieve intelligent context (if enabled) while tools run
+    start = time.perf_counter()
+    tools = _run_tools(message, agent_id, session_id, CONTEXT_BUDGET_SECONDS)
     if use_context:
-        try:
-            context = await retrieve_intelligent_context(
-                query=message,
-                session_id=session_id,
-                timeout_seconds=1.5  # Fast timeout for responsiveness
-            )
-            context_text = context.format_for_ai()
-
-            if context_text and context_text != "No relevant data found.":
-                logger.info(f"Retrieved {len(context_text)} chars of context for query")
-                logger.debug(f"Context content:\n{context_text[:500]}...")
-            else:
-                logger.debug("No relevant context found for query")
-                context_text = ""
-        except Exception as e:
-            logger.error(f"Context retrieval failed: {e}")
-            context_text = ""
+        (context_text, timings), (tool_results_text, tool_timing) = await asyncio.gather(
+            _retrieve_context_text(message, session_id, CONTEXT_BUDGET_SECONDS), tools
+        )
+    else:
+        context_text, timings = "", {}
+        tool_results_text, tool_timing = await tools
+    timings = {**timings, "tools": tool_timing, "total": {"ms": round((time.perf_counter() - start) * 1000, 1)}}
 
-    # Step 1.5: Detect and execute tools
-    tool_results_text = await detect_and_execute_tools(message, agent_id, session_id)
+    # Step 1.5: Append tool results
     if tool_results_text:
         if context_text:
             context_text = f"{context_text}\n\n{tool_results_text}"
@@ -545,26 +837,17 @@ INSTRUCTIONS:
 
 RESPONSE:"""
 
-    # Step 3: Get AI response (using faster model for speed)
-    try:
-        response = await chat(
-            message=enhanced_prompt,
-            preferred_model="llama-3.3-70b-versatile",  # Use smarter model for intelligence
-            max_tokens=512,  # Longer responses for intelligent answers
-            agent_id=agent_id,
-            session_id=session_id
-        )
-    except Exception as e:
-        logger.error(f"AI call failed in intelligent_chat: {e}")
-        # Fall back to simpler chat
-        response = await chat(
-            message=message,
-            preferred_model="llama-3.1-8b-instant",  # Fallback to faster model
-            max_tokens=256,
-            agent_id=agent_id,
-            session_id=session_id
-        )
+    return enhanced_prompt, context_text, timings
 
+
+async def _store_intelligent_exchange(
+    session_id: str,
+    message: str,
+    response: AIResponse,
+    use_context: bool,
+    context_text: str
+) -> None:
+    """Store an intelligent chat exchange for learning and long-term memory."""
     # Step 4: Store conversation for learning
     try:
         await store_conversation(
@@ -604,31 +887,135 @@ RESPONSE:"""
         logger.error(f"Failed to store intelligent chat as memory: {e}")
         # Continue without memory storage - system still works
 
+
+async def intelligent_chat(
+    message: str,
+    session_id: Optional[str] = None,
+    agent_id: Optional[UUID] = None,
+    use_context: bool = True
+) -> AIResponse:
+    """
+    Jarvis-like intelligent chat with full NEXUS context.
+
+    Features:
+    1. Retrieves relevant context from all NEXUS data sources
+    2. Uses context to generate informed responses
+    3. Stores conversations for learning
+    4. Optimized for speed and intelligence
+
+    This is the "real Jarvis" endpoint for NEXUS.
+    """
+    start_time = time.time()
+
+    # Generate session ID if not provided
+    if not session_id:
+        session_id = hashlib.sha256(f"{message}{time.time()}".encode()).hexdigest()[:16]
+
+    # Steps 1-2: Retrieve context, run tools and build the enhanced prompt
+    enhanced_prompt, context_text, context_timings = await _build_intelligent_prompt(message, session_id, agent_id, use_context)
+
+    # Step 3: Get AI response (using faster model for speed)
+    try:
+        response = await chat(
+            message=enhanced_prompt,
+            preferred_model="llama-3.3-70b-versatile",  # Use smarter model for intelligence
+            max_tokens=512,  # Longer responses for intelligent answers
+            agent_id=agent_id,
+            session_id=session_id
+        )
+    except Exception as e:
+        logger.error(f"AI call failed in intelligent_chat: {e}")
+        # Fall back to simpler chat
+        response = await chat(
+            message=message,
+            preferred_model="llama-3.1-8b-instant",  # Fallback to faster model
+            max_tokens=256,
+            agent_id=agent_id,
+            session_id=session_id
+        )
+
+    # Step 4: Store conversation and episodic memory
+    await _store_intelligent_exchange(session_id, message, response, use_context, context_text)
+
     # Update latency to include context retrieval time
     total_latency = int((time.time() - start_time) * 1000)
     response.latency_ms = total_latency
+    response.metadata = {"context_timings": context_timings}
 
     logger.info(f"Intelligent chat completed in {total_latency}ms for session {session_id[:8]}...")
     return response
 
 
+async def intelligent_chat_stream(
+    message: str,
+    session_id: Optional[str] = None,
+    agent_id: Optional[UUID] = None,
+    use_context: bool = True
+) -> AsyncIterator[StreamEvent]:
+    """
+    Streaming variant of intelligent_chat().
+
+    Context retrieval and tool execution still run up front; the answer
+    is then relayed token by token and stored once complete.
+    """
+    start_time = time.time()
+
+    if not session_id:
+        session_id = hashlib.sha256(f"{message}{time.time()}".encode()).hexdigest()[:16]
+
+    enhanced_prompt, context_text, context_timings = await _build_intelligent_prompt(message, session_id, agent_id, use_context)
+
+    response: Optional[AIResponse] = None
+    first_token_at: Optional[float] = None
+    attempts = [
+        (enhanced_prompt, "llama-3.3-70b-versatile", 512),
+        (message, "llama-3.1-8b-instant", 256),  # Fallback to faster model
+    ]
+    for prompt, model, max_tokens in attempts:
+        try:
+            async for event in chat_stream(
+                message=prompt,
+                preferred_model=model,
+                max_tokens=max_tokens,
+                agent_id=agent_id,
+                session_id=session_id
+            ):
+                if event.type == "token":
+                    if first_token_at is None:
+                        first_token_at = time.time()
+                    yield event
+                else:
+                    response = event.response
+            break
+        except Exception as e:
+            if first_token_at is not None or prompt is message:
+                raise
+            logger.error(f"AI call failed in intelligent_chat_stream: {e}")
+
+    await _store_intelligent_exchange(session_id, message, response, use_context, context_text)
+
+    response.latency_ms = int((time.time() - start_time) * 1000)
+    if first_token_at is not None:
+        response.time_to_first_token_ms = int((first_token_at - start_time) * 1000)
+    response.metadata = {"context_timings": context_timings}
+
+    logger.info(
+        f"Intelligent chat stream completed in {response.latency_ms}ms "
+        f"(first token {response.time_to_first_token_ms}ms) for session {session_id[:8]}..."
+    )
+    yield StreamEvent(type="done", response=response)
+
+
 async def get_usage_stats() -> dict:
     """Get API usage statistics for current month."""
-    result = await db.fetch_one(
-        """
-        SELECT
-            COUNT(*) as total_requests,
-            COALESCE(SUM(cost_usd), 0) as total_cost,
-            COALESCE(SUM(input_tokens), 0) as total_input_tokens,
-            COALESCE(SUM(output_tokens), 0) as total_output_tokens,
-            COALESCE(AVG(latency_ms), 0) as avg_latency_ms
-        FROM api_usage
-        WHERE DATE_TRUNC('month', created_at) = DATE_TRUNC('month', CURRENT_DATE)
-        """
-    )
+    month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    result = await usage_rollups.summary(month_start)
     return {
-        "total_requests": int(result["total_requests"]) if result else 0,
-        "total_cost_usd": float(result["total_cost"]) if result else 0.0,
-        "total_tokens": int(result["total_input_tokens"] or 0) + int(result["total_output_tokens"] or 0) if result else 0,
-        "avg_latency_ms": int(result["avg_latency_ms"]) if result else 0,
+        "total_requests": int(result["request_count"]),
+        "total_cost_usd": float(result["cost_usd"]),
+        "total_tokens": int(result["input_tokens"]) + int(result["output_tokens"]),
+        "avg_latency_ms": int(result["avg_latency_ms"]),
+        "hedging": hedge_policy.get_stats(),
+        "coalesced_requests": llm_single_flight.coalesced,
+        "single_flight": llm_single_flight.get_stats(),
     }
@@ -3,7 +3,6 @@ NEXUS Multi-Provider AI Router
 Routes tasks to optimal free AI provider based on task type and usage limits.
 """
 
-import httpx
 import logging
 from typing import Optional, Dict, Any, List
 from datetime import date
@@ -12,8 +11,12 @@ from enum import Enum
 from uuid import UUID
 
 from ..config import settings
-from ..database import db
+from ..metrics import record_llm_usage
 from ..exceptions.manual_tasks import ConfigurationInterventionRequired
+from .http_clients import provider_clients
+from .quota_ledger import quota_ledger
+from .single_flight import llm_single_flight, flight_key
+from .telemetry_sink import telemetry_sink
 
 logger = logging.getLogger(__name__)
 
@@ -70,29 +73,19 @@ PROVIDERS = {
 
 
 async def get_provider_usage(provider: str) -> int:
-    """Get today's usage count for a provider."""
-    result = await db.fetch_one(
-        """
-        SELECT request_count FROM ai_provider_usage
-        WHERE provider = $1 AND date = CURRENT_DATE
-        """,
-        provider
-    )
-    return result["request_count"] if result else 0
+    """Get today's usage count for a provider (from the in-process quota ledger)."""
+    return quota_ledger.requests_today(provider)
 
 
 async def increment_provider_usage(provider: str, tokens: int = 0, cost: float = 0.0) -> None:
-    """Increment usage for a provider."""
-    await db.execute(
-        """
-        INSERT INTO ai_provider_usage (provider, date, request_count, token_count, cost_usd)
-        VALUES ($1, CURRENT_DATE, 1, $2, $3)
-        ON CONFLICT (provider, date) DO UPDATE SET
-            request_count = ai_provider_usage.request_count + 1,
-            token_count = ai_provider_usage.token_count + $2,
-            cost_usd = ai_provider_usage.cost_usd + $3
-        """,
-        provider, tokens, cost
+    """Increment usage for a provider (written behind in batched UPSERTs)."""
+    quota_ledger.record(provider, tokens, cost)
+    record_llm_usage(provider, True, total_tokens=tokens, cost_usd=cost)
+    telemetry_sink.increment(
+        "ai_provider_usage",
+        ("provider", "date"),
+        (provider, date.today()),
+        {"request_count": 1, "token_count": tokens, "cost_usd": cost}
     )
 
 
@@ -105,7 +98,11 @@ def get_api_key(provider: str) -> Optional[str]:
 
 
 async def select_provider(task_type: str) -> Optional[str]:
-    """Select best available provider for a task type."""
+    """Select best available provider for a task type.
+
+    Reads daily usage from the quota ledger (no database round trips) and
+    skips providers whose per-minute rate limit is exhausted.
+    """
     # Find providers that are good for this task
     suitable = []
     for name, config in PROVIDERS.items():
@@ -122,16 +119,16 @@ async def select_provider(task_type: str) -> Optional[str]:
         if not api_key:
             continue
 
-        usage = await get_provider_usage(name)
-        if usage < config.daily_limit * 0.9:  # 90% threshold
+        usage = quota_ledger.requests_today(name)
+        if usage < config.daily_limit * 0.9 and quota_ledger.try_acquire(name):  # 90% threshold
             return name
 
     # Try any available provider
     for name, config in PROVIDERS.items():
         api_key = get_api_key(name)
         if api_key:
-            usage = await get_provider_usage(name)
-            if usage < config.daily_limit:
+            usage = quota_ledger.requests_today(name)
+            if usage < config.daily_limit and quota_ledger.try_acquire(name):
                 return name
 
     return None
@@ -153,22 +150,22 @@ async def call_groq(prompt: str, system: str = "", agent_id: Optional[UUID] = No
         messages.append({"role": "system", "content": system})
     messages.append({"role": "user", "content": prompt})
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            PROVIDERS["groq"].url,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": PROVIDERS["groq"].model,
-                "messages": messages,
-                "temperature": 0.3,
-                "max_tokens": 1024
-            }
-        )
-        response.raise_for_status()
-        data = response.json()
+    response = await provider_clients.post(
+        "groq",
+        PROVIDERS["groq"].url,
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        },
+        json={
+            "model": PROVIDERS["groq"].model,
+            "messages": messages,
+            "temperature": 0.3,
+            "max_tokens": 1024
+        }
+    )
+    response.raise_for_status()
+    data = response.json()
 
     content = data["choices"][0]["message"]["content"]
     tokens = data.get("usage", {}).get("total_tokens", 0)
@@ -191,20 +188,21 @@ async def call_google(prompt: str, system: str = "", agent_id: Optional[UUID] =
 
     full_prompt = f"{system}\n\n{prompt}" if system else prompt
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            f"{PROVIDERS['google'].url}?key={api_key}",
-            headers={"Content-Type": "application/json"},
-            json={
-                "contents": [{"parts": [{"text": full_prompt}]}],
-                "generationConfig": {
-                    "temperature": 0.3,
-                    "maxOutputTokens": 1024
-                }
+    response = await provider_clients.post(
+        "google",
+        PROVIDERS["google"].url,
+        params={"key": api_key},
+        headers={"Content-Type": "application/json"},
+        json={
+            "contents": [{"parts": [{"text": full_prompt}]}],
+            "generationConfig": {
+                "temperature": 0.3,
+                "maxOutputTokens": 1024
             }
-        )
-        response.raise_for_status()
-        data = response.json()
+        }
+    )
+    response.raise_for_status()
+    data = response.json()
 
     content = data["candidates"][0]["content"]["parts"][0]["text"]
     tokens = data.get("usageMetadata", {}).get("totalTokenCount", 0)
@@ -230,22 +228,22 @@ async def call_openrouter(prompt: str, system: str = "", agent_id: Optional[UUID
         messages.append({"role": "system", "content": system})
     messages.append({"role": "user", "content": prompt})
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            PROVIDERS["openrouter"].url,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": PROVIDERS["openrouter"].model,
-                "messages": messages,
-                "temperature": 0.3,
-                "max_tokens": 512
-            }
-        )
-        response.raise_for_status()
-        data = response.json()
+    response = await provider_clients.post(
+        "openrouter",
+        PROVIDERS["openrouter"].url,
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        },
+        json={
+            "model": PROVIDERS["openrouter"].model,
+            "messages": messages,
+            "temperature": 0.3,
+            "max_tokens": 512
+        }
+    )
+    response.raise_for_status()
+    data = response.json()
 
     content = data["choices"][0]["message"]["content"]
     tokens = data.get("usage", {}).get("total_tokens", 0)
@@ -266,6 +264,8 @@ async def ai_request(
     """
     Make an AI request, automatically selecting the best provider.
 
+    Concurrent identical requests are coalesced onto a single provider call.
+
     Args:
         prompt: The user prompt
         task_type: Type of task (classification, extraction, etc.)
@@ -277,6 +277,24 @@ async def ai_request(
     Returns:
         Dict with content, tokens, and provider used
     """
+    # Identical concurrent requests share one upstream call
+    key = flight_key("ai_request", prompt, task_type=task_type, system=system, provider=preferred_provider)
+    result = await llm_single_flight.do(
+        "ai_request", key,
+        lambda: _route_request(prompt, task_type, system, preferred_provider, agent_id, session_id)
+    )
+    return dict(result)
+
+
+async def _route_request(
+    prompt: str,
+    task_type: str,
+    system: str,
+    preferred_provider: Optional[str],
+    agent_id: Optional[UUID],
+    session_id: Optional[UUID]
+) -> Dict[str, Any]:
+    """Select a provider for the request and call it, with fallbacks."""
     # Select provider
     provider = preferred_provider or await select_provider(task_type)
 
@@ -291,7 +309,7 @@ async def ai_request(
                 context={"available_providers": list(PROVIDERS.keys())}
             )
         else:
-            # All configured providers are at daily limit
+            # All configured providers are at daily limit (or rate limited)
             raise ConfigurationInterventionRequired(
                 title="AI Provider Daily Limits Reached",
                 description="All configured AI providers have reached their daily free tier limits. Add additional API keys or wait until tomorrow.",
@@ -319,6 +337,9 @@ async def ai_request(
         # Try fallback
         for fallback in ["groq", "google", "openrouter"]:
             if fallback != provider and get_api_key(fallback):
+                if not quota_ledger.try_acquire(fallback):
+                    logger.info(f"Skipping fallback {fallback}: rate limited")
+                    continue
                 try:
                     logger.info(f"Falling back to {fallback}")
                     if fallback == "groq":
@@ -335,35 +356,22 @@ async def ai_request(
 
 async def get_provider_stats() -> Dict[str, Any]:
     """Get usage statistics for all providers."""
-    results = await db.fetch_all(
-        """
-        SELECT provider, request_count, token_count, cost_usd
-        FROM ai_provider_usage
-        WHERE date = CURRENT_DATE
-        """
-    )
-
+    http_stats = provider_clients.get_stats()
+    quota_stats = quota_ledger.get_stats()["providers"]
     stats = {}
-    for row in results:
-        provider = row["provider"]
-        config = PROVIDERS.get(provider)
-        stats[provider] = {
-            "requests_today": row["request_count"],
-            "tokens_today": row["token_count"],
-            "cost_today": float(row["cost_usd"]),
+    for name in set(PROVIDERS) | set(quota_stats):
+        config = PROVIDERS.get(name)
+        quota = quota_stats.get(name, {})
+        requests_today = quota.get("requests_today", 0)
+        stats[name] = {
+            "requests_today": requests_today,
+            "tokens_today": quota.get("tokens_today", 0),
+            "cost_today": quota.get("cost_today", 0.0),
             "daily_limit": config.daily_limit if config else 0,
-            "usage_percent": round(row["request_count"] / config.daily_limit * 100, 1) if config else 0
+            "usage_percent": round(requests_today / config.daily_limit * 100, 1) if config else 0,
+            "rate_limit_per_minute": quota.get("rate_limit_per_minute"),
+            "throttled": quota.get("throttled", 0),
+            "http": http_stats.get(name, {})
         }
 
-    # Add providers with no usage today
-    for name, config in PROVIDERS.items():
-        if name not in stats:
-            stats[name] = {
-                "requests_today": 0,
-                "tokens_today": 0,
-                "cost_today": 0.0,
-                "daily_limit": config.daily_limit,
-                "usage_percent": 0.0
-            }
-
     return stats
@@ -10,9 +10,12 @@ import pickle
 from typing import Dict, List, Any, Optional, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta
+import numpy as np
 import redis.asyncio as redis
 from .config import config
 from .database import db_service
+from .embedding_cache import content_hash
+from .embeddings import embedding_cache
 
 class CacheService:
     """Cache service for semantic and embedding caching."""
@@ -168,36 +171,12 @@ class CacheService:
         """
         Get cached embedding for content.
         Returns embedding if found, None otherwise.
+
+        Delegates to the shared read-through embedding cache
+        (in-process LRU -> Redis raw float32 -> embedding_cache table).
         """
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
-        
-        # Try Redis first
-        if self.redis_client:
-            redis_key = f"embedding:{content_hash}"
-            cached = await self.redis_client.get(redis_key)
-            if cached:
-                try:
-                    embedding = pickle.loads(cached)
-                    # Update access count in background
-                    asyncio.create_task(self._update_embedding_cache_access(content_hash))
-                    return embedding
-                except Exception:
-                    await self.redis_client.delete(redis_key)
-        
-        # Fall back to PostgreSQL
-        db_cache = await db_service.get_embedding_cache(content_hash)
-        if db_cache and db_cache.get('embedding'):
-            embedding = db_cache['embedding']
-            
-            # Store in Redis
-            if self.redis_client:
-                redis_key = f"embedding:{content_hash}"
-                # Embeddings don't expire, but we set a long TTL
-                await self.redis_client.setex(redis_key, 86400 * 30, pickle.dumps(embedding))
-            
-            return embedding
-        
-        return None
+        embedding = await embedding_cache.get(content)
+        return embedding.tolist() if embedding is not None else None
     
     async def set_embedding(
         self,
@@ -206,28 +185,17 @@ class CacheService:
         embedding_model: str,
         dimension: int
     ) -> Dict[str, Any]:
-        """Cache embedding in both Redis and PostgreSQL."""
-        # Store in PostgreSQL
-        db_cache = await db_service.create_embedding_cache(
-            content=content,
-            embedding=embedding,
-            embedding_model=embedding_model,
-            dimension=dimension
-        )
-        
-        # Store in Redis
-        if self.redis_client:
-            content_hash = hashlib.sha256(content.encode()).hexdigest()
-            redis_key = f"embedding:{content_hash}"
-            # Embeddings don't expire, but we set a long TTL
-            await self.redis_client.setex(redis_key, 86400 * 30, pickle.dumps(embedding))
-        
-        return db_cache
-    
-    async def _update_embedding_cache_access(self, content_hash: str):
-        """Update access count for embedding cache (background task)."""
-        # This is handled by the ON CONFLICT clause in the database
-        pass
+        """Cache embedding in the shared embedding cache."""
+        if embedding_model != embedding_cache.model_name:
+            raise ValueError(
+                f"Embedding cache holds {embedding_cache.model_name} vectors, got {embedding_model}"
+            )
+        embedding_cache.put(content, np.asarray(embedding, dtype=np.float32))
+        return {
+            "content_hash": content_hash(content),
+            "embedding_model": embedding_model,
+            "dimension": dimension
+        }
     
     # ===== Cache Statistics =====
     
@@ -255,6 +223,7 @@ class CacheService:
         return {
             "database": db_stats,
             "redis": redis_stats,
+            "embedding_cache": embedding_cache.get_stats(),
             "config": {
                 "semantic_cache_enabled": config.cost_optimization.semantic_cache_enabled,
                 "embedding_cache_enabled": config.cost_optimization.embedding_cache_enabled,
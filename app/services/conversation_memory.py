@@ -18,11 +18,10 @@ from dataclasses import dataclass
 
 from ..database import db
 from ..agents.memory import (
-    MemorySystem, MemoryType, MemoryQuery, MemoryResult,
+    MemorySystem, MemoryType, MemoryQuery, MemoryResult, MemoryRecord,
     memory_system as global_memory_system,
     get_memory_system
 )
-from ..services.embeddings import get_embedding
 
 logger = logging.getLogger(__name__)
 
@@ -120,8 +119,8 @@ class ConversationMemoryService:
             if metadata:
                 memory_metadata.update(metadata)
 
-            # Store as episodic memory
-            memory_id = await self._memory_system.store_memory(
+            # Store as episodic memory; the bulk writer flushes it with other turns
+            memory_id = self._memory_system.enqueue_memory(MemoryRecord(
                 agent_id=self._string_to_uuid(self.config.agent_id),
                 content=content,
                 memory_type=self.config.memory_type,
@@ -131,9 +130,12 @@ class ConversationMemoryService:
                 metadata=memory_metadata,
                 source_type="conversation",
                 source_id=self._string_to_uuid(session_id)
-            )
+            ))
+            if memory_id is None:
+                logger.warning(f"Memory ingest queue full; dropped chat exchange for session {session_id[:8]}...")
+                return ""
 
-            logger.debug(f"Stored chat exchange as memory {memory_id[:8]}... for session {session_id[:8]}...")
+            logger.debug(f"Queued chat exchange as memory {memory_id[:8]}... for session {session_id[:8]}...")
             return memory_id
 
         except Exception as e:
@@ -166,12 +168,7 @@ class ConversationMemoryService:
             # Build tags filter
             tags = self.config.default_tags.copy()
 
-            # Build metadata filter for session if provided
-            metadata_filter = None
-            if session_id:
-                metadata_filter = {"session_id": session_id}
-
-            # Create memory query
+            # Create memory query; the session filter runs inside the vector search
             memory_query = MemoryQuery(
                 query_text=query,
                 memory_types=[self.config.memory_type],
@@ -179,26 +176,13 @@ class ConversationMemoryService:
                 limit=limit,
                 min_similarity=self.config.min_similarity,
                 tags=tags,
-                recency_weight=0.5  # Weight recent memories more
+                recency_weight=0.5,  # Weight recent memories more
+                session_id=session_id or None  # Empty string means "any session"
             )
 
             # Search memories
             memories = await self._memory_system.search_memories(memory_query)
 
-            # Apply additional filtering if needed
-            if metadata_filter and memories:
-                filtered_memories = []
-                for memory in memories:
-                    memory_metadata = memory.metadata or {}
-                    matches = True
-                    for key, value in metadata_filter.items():
-                        if memory_metadata.get(key) != value:
-                            matches = False
-                            break
-                    if matches:
-                        filtered_memories.append(memory)
-                memories = filtered_memories
-
             logger.debug(f"Retrieved {len(memories)} relevant memories for query: {query[:100]}...")
             return memories
 
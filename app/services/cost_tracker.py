@@ -8,11 +8,12 @@ import json
 import uuid
 import logging
 from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 from .config import config
 from .database import db_service
 from .cache_service import cache_service
+from .usage_rollups import usage_rollups
 
 logger = logging.getLogger(__name__)
 
@@ -77,8 +78,22 @@ class CostTracker:
         provider_id = None
         model_uuid = None
         
-        # Log to database
-        usage_log = await db_service.log_api_usage(
+        # Update the usage rollups
+        usage_rollups.record(
+            provider=provider_name,
+            model=model_id,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=cost_usd,
+            latency_ms=latency_ms,
+            success=success,
+            cache_hit=cache_hit,
+            cached_tokens=cached_tokens,
+            agent_id=agent_id
+        )
+        
+        # Log to database (write-behind, so there is no row id to return)
+        await db_service.log_api_usage(
             provider_id=provider_id,
             model_id=model_uuid,
             endpoint="chat/completions",  # Default
@@ -102,7 +117,6 @@ class CostTracker:
         
         return {
             "cost_usd": cost_usd,
-            "log_id": usage_log.get("id") if usage_log else None,
             "cache_hit": cache_hit,
             "tokens_saved": cached_tokens
         }
@@ -123,13 +137,15 @@ class CostTracker:
     # ===== Cost Analysis Methods =====
     
     async def get_daily_cost_breakdown(self, days: int = 7) -> Dict[str, Any]:
-        """Get daily cost breakdown for the last N days."""
-        db_costs = await db_service.get_daily_api_costs(days=days)
+        """Get daily cost breakdown for the last N days (from the usage rollups)."""
+        db_costs = await usage_rollups.aggregate(
+            datetime.now(timezone.utc) - timedelta(days=days), group_by=("provider",), granularity="day"
+        )
         
         # Transform data
         daily_data = {}
         for row in db_costs:
-            date_str = row['date'].strftime('%Y-%m-%d')
+            date_str = row['bucket_start'].strftime('%Y-%m-%d')
             if date_str not in daily_data:
                 daily_data[date_str] = {
                     "date": date_str,
@@ -140,11 +156,11 @@ class CostTracker:
                     "cache_hits": 0
                 }
             
-            daily_data[date_str]["total_cost"] += float(row['total_cost'] or 0)
-            daily_data[date_str]["total_tokens"] += (row['total_input_tokens'] or 0) + (row['total_output_tokens'] or 0)
-            daily_data[date_str]["cached_tokens"] += row['total_cached_tokens'] or 0
-            daily_data[date_str]["requests"] += row['request_count'] or 0
-            daily_data[date_str]["cache_hits"] += row['cache_hits'] or 0
+            daily_data[date_str]["total_cost"] += row['cost_usd']
+            daily_data[date_str]["total_tokens"] += row['input_tokens'] + row['output_tokens']
+            daily_data[date_str]["cached_tokens"] += row['cached_tokens']
+            daily_data[date_str]["requests"] += row['request_count']
+            daily_data[date_str]["cache_hits"] += row['cache_hits']
         
         # Convert to list and sort by date
         result = list(daily_data.values())
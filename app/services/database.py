@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 import json
 import hashlib
 from .config import config
+from .telemetry_sink import telemetry_sink, as_decimal, as_uuid
 
 class DatabaseService:
     """Database service for cost optimization operations."""
@@ -220,41 +221,35 @@ class DatabaseService:
         query_hash: Optional[str] = None,
         request_metadata: Optional[Dict] = None
     ) -> Dict[str, Any]:
-        """Log API usage to the database."""
-        query = """
-            INSERT INTO api_usage (
-                provider_id, model_id, endpoint, request_type,
-                input_tokens, output_tokens, cached_tokens, cost_usd,
-                latency_ms, time_to_first_token_ms, success, error_code,
-                error_message, cache_hit, agent_id, session_id, query_hash,
-                request_metadata
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18)
-            RETURNING *
         """
-        
-        result = await self.execute_insert(
-            query,
-            provider_id,
-            model_id,
-            endpoint,
-            request_type,
-            input_tokens,
-            output_tokens,
-            cached_tokens,
-            cost_usd,
-            latency_ms,
-            time_to_first_token_ms,
-            success,
-            error_code,
-            error_message,
-            cache_hit,
-            agent_id,
-            session_id,
-            query_hash,
-            json.dumps(request_metadata) if request_metadata else None
-        )
-        
-        return dict(result) if result else None
+        Log API usage to the database.
+
+        The row is queued on the write-behind telemetry sink and written
+        with the next COPY batch, so no database id is returned. COPY uses
+        asyncpg's native codecs, so request_metadata is passed as JSON text.
+        """
+        record = {
+            "provider_id": provider_id,
+            "model_id": model_id,
+            "endpoint": endpoint,
+            "request_type": request_type,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cached_tokens": cached_tokens,
+            "cost_usd": as_decimal(cost_usd),
+            "latency_ms": latency_ms,
+            "time_to_first_token_ms": time_to_first_token_ms,
+            "success": success,
+            "error_code": error_code,
+            "error_message": error_message,
+            "cache_hit": cache_hit,
+            "agent_id": as_uuid(agent_id),
+            "session_id": as_uuid(session_id),
+            "query_hash": query_hash,
+            "request_metadata": json.dumps(request_metadata or {}),
+        }
+        await telemetry_sink.write_row("api_usage", tuple(record), tuple(record.values()))
+        return record
     
     async def get_daily_api_costs(
         self, 
@@ -1,9 +1,15 @@
 """
 NEXUS Email Client
 Connect to Gmail and iCloud via IMAP.
+
+Each account keeps one persistent IMAP session (see ImapPool) whose
+blocking imaplib calls run on a dedicated worker thread, so scans never
+stall the event loop and accounts are fetched concurrently.
 """
 
+import asyncio
 import imaplib
+import select
 import smtplib
 import ssl
 import email
@@ -15,7 +21,11 @@ import logging
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
 import re
+import time
 
 from ..config import settings
 from ..exceptions.manual_tasks import ConfigurationInterventionRequired
@@ -36,6 +46,9 @@ class EmailMessage:
     body_preview: str
     received_at: datetime
     is_html: bool = False
+    uid: Optional[int] = None
+    folder: str = "INBOX"
+    body_complete: bool = True  # False when only a partial body was fetched
 
 
 # Email account configurations
@@ -183,6 +196,324 @@ def connect_imap(account: str) -> imaplib.IMAP4_SSL:
         )
 
 
+def uid_set(uids: List[int]) -> str:
+    """Compress UIDs into an IMAP sequence set, e.g. [1, 2, 3, 7] -> '1:3,7'."""
+    ranges = []
+    for uid in sorted(set(uids)):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(lo) if lo == hi else f"{lo}:{hi}" for lo, hi in ranges)
+
+
+_FETCH_START = re.compile(rb"^\d+ \(")
+_FETCH_UID = re.compile(rb"\bUID (\d+)")
+_FETCH_SIZE = re.compile(rb"\bRFC822\.SIZE (\d+)")
+_FETCH_SECTION = re.compile(rb"BODY\[([A-Z]*)\](?:<\d+>)? \{\d+\}$")
+
+
+def parse_fetch_response(data: List[Any]) -> Dict[int, Dict[str, Any]]:
+    """
+    Parse an imaplib FETCH response into {uid: {"size", "header", "text", "full"}}.
+
+    imaplib returns each message as (prefix, literal) tuples - one per
+    BODY section - followed by a closing bytes chunk; UID and RFC822.SIZE
+    may appear in any of the prefixes or in the closing chunk.
+    """
+    messages = []
+    current: Optional[Dict[str, Any]] = None
+
+    for item in data:
+        if isinstance(item, tuple):
+            prefix, literal = item
+            if current is None or _FETCH_START.match(prefix):
+                current = {}
+                messages.append(current)
+            chunk = prefix
+            section = _FETCH_SECTION.search(prefix)
+            if section:
+                name = section.group(1).decode().lower() or "full"
+                current[name] = literal
+        elif isinstance(item, bytes) and current is not None:
+            chunk = item
+        else:
+            continue
+
+        uid = _FETCH_UID.search(chunk)
+        if uid:
+            current["uid"] = int(uid.group(1))
+        size = _FETCH_SIZE.search(chunk)
+        if size:
+            current["size"] = int(size.group(1))
+
+    return {message["uid"]: message for message in messages if "uid" in message}
+
+
+class ImapConnection:
+    """
+    Persistent IMAP session for one account.
+
+    imaplib is blocking, so every command runs on this connection's own
+    single worker thread; the event loop only awaits the result. The
+    worker thread also serializes commands, and `session()` holds a lock
+    across multi-command sequences (SELECT, SEARCH, FETCH) so concurrent
+    callers can't interleave folder state.
+    """
+
+    def __init__(self, account: str, noop_interval_seconds: float = 60.0):
+        self.account = account
+        self.noop_interval_seconds = noop_interval_seconds
+        self.lock = asyncio.Lock()
+        self._imap: Optional[imaplib.IMAP4_SSL] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._last_used = 0.0
+
+        # Counters
+        self._connects = 0
+        self._commands = 0
+        self._dropped = 0
+
+    async def _call(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"imap-{self.account}")
+        self._commands += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    async def _ensure_connected(self) -> imaplib.IMAP4_SSL:
+        # Servers silently drop idle sessions; probe with NOOP before reuse
+        if self._imap is not None and time.monotonic() - self._last_used >= self.noop_interval_seconds:
+            try:
+                status, _ = await self._call(self._imap.noop)
+                if status != "OK":
+                    self._drop()
+            except (imaplib.IMAP4.error, OSError):
+                self._drop()
+
+        if self._imap is None:
+            self._imap = await self._call(connect_imap, self.account)
+            self._connects += 1
+
+        self._last_used = time.monotonic()
+        return self._imap
+
+    def _drop(self) -> None:
+        imap, self._imap = self._imap, None
+        if imap is not None:
+            self._dropped += 1
+            try:
+                imap.shutdown()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def session(self):
+        """Hold the connection for a command sequence, reconnecting if needed."""
+        async with self.lock:
+            await self._ensure_connected()
+            try:
+                yield self
+            except (imaplib.IMAP4.abort, OSError):
+                # Broken socket: the next session reconnects
+                self._drop()
+                raise
+            finally:
+                self._last_used = time.monotonic()
+
+    def interrupt(self) -> None:
+        """Close the socket from the loop thread, waking a blocked IDLE."""
+        self._drop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def close(self) -> None:
+        async with self.lock:
+            if self._imap is not None:
+                try:
+                    await self._call(self._imap.logout)
+                except Exception:
+                    pass
+                self._imap = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    # ===== Commands (call inside session()) =====
+
+    async def select(self, folder: str = "INBOX") -> Optional[Dict[str, int]]:
+        """Select a folder; returns its UIDVALIDITY, UIDNEXT and message count."""
+        return await self._call(self._select, folder)
+
+    def _select(self, folder: str) -> Optional[Dict[str, int]]:
+        status, data = self._imap.select(folder)
+        if status != "OK":
+            return None
+        info = {"exists": int(data[0] or 0)}
+        for key in ("UIDVALIDITY", "UIDNEXT"):
+            _, values = self._imap.response(key)
+            if values and values[-1] is not None:
+                info[key.lower()] = int(values[-1])
+        return info
+
+    async def search(self, criteria: str) -> List[int]:
+        """UID SEARCH in the selected folder."""
+        status, data = await self._call(self._imap.uid, "SEARCH", None, criteria)
+        if status != "OK" or not data or not data[0]:
+            return []
+        return [int(uid) for uid in data[0].split()]
+
+    async def fetch(self, uids: List[int], items: str) -> Dict[int, Dict[str, Any]]:
+        """One UID FETCH for the whole set; returns parsed parts keyed by UID."""
+        if not uids:
+            return {}
+        status, data = await self._call(self._imap.uid, "FETCH", uid_set(uids), items)
+        if status != "OK":
+            logger.error(f"UID FETCH failed on {self.account}: {data}")
+            return {}
+        return parse_fetch_response(data)
+
+    async def store(self, uids: List[int], command: str, flags: str) -> bool:
+        status, _ = await self._call(self._imap.uid, "STORE", uid_set(uids), command, flags)
+        return status == "OK"
+
+    async def copy(self, uids: List[int], folder: str) -> bool:
+        status, _ = await self._call(self._imap.uid, "COPY", uid_set(uids), folder)
+        return status == "OK"
+
+    async def expunge(self) -> bool:
+        status, _ = await self._call(self._imap.expunge)
+        return status == "OK"
+
+    def supports_idle(self) -> bool:
+        return self._imap is not None and "IDLE" in self._imap.capabilities
+
+    async def idle(self, timeout: float) -> List[bytes]:
+        """
+        IDLE in the selected folder until the server reports a change or
+        `timeout` elapses. Returns the untagged lines received (empty on
+        timeout). The worker thread blocks, the event loop does not.
+        """
+        return await self._call(self._idle, timeout)
+
+    def _idle(self, timeout: float) -> List[bytes]:
+        # imaplib has no IDLE command; drive it with its own tag/line helpers
+        imap = self._imap
+        tag = imap._new_tag()
+        imap.send(tag + b" IDLE\r\n")
+        line = imap.readline()
+        if not line.startswith(b"+"):
+            raise imaplib.IMAP4.error(f"IDLE rejected: {line!r}")
+
+        events = []
+        ready, _, _ = select.select([imap.sock], [], [], timeout)
+        if ready:
+            line = imap.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("connection closed during IDLE")
+            events.append(line.rstrip())
+
+        imap.send(b"DONE\r\n")
+        while True:
+            line = imap.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("connection closed during IDLE")
+            if line.startswith(tag):
+                break
+            events.append(line.rstrip())
+        return events
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self._imap is not None,
+            "connects": self._connects,
+            "commands": self._commands,
+            "dropped": self._dropped,
+        }
+
+
+class ImapPool:
+    """One persistent ImapConnection per account, created on first use."""
+
+    def __init__(self, noop_interval_seconds: float = 60.0):
+        self.noop_interval_seconds = noop_interval_seconds
+        self._connections: Dict[str, ImapConnection] = {}
+
+    def get(self, account: str) -> ImapConnection:
+        conn = self._connections.get(account)
+        if conn is None:
+            conn = ImapConnection(account, self.noop_interval_seconds)
+            self._connections[account] = conn
+        return conn
+
+    async def close(self) -> None:
+        """Log out of every account."""
+        connections, self._connections = self._connections, {}
+        for conn in connections.values():
+            await conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {account: conn.get_stats() for account, conn in self._connections.items()}
+
+
+# Global IMAP connection pool
+imap_pool = ImapPool(noop_interval_seconds=settings.imap_noop_interval_seconds)
+
+
+def preview_fetch_items() -> str:
+    # Headers plus the first N bytes of the body; PEEK leaves \Seen untouched
+    return f"(UID RFC822.SIZE BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{settings.imap_partial_body_bytes}>)"
+
+
+def build_email_message(account: str, folder: str, uid: int, parts: Dict[str, Any]) -> EmailMessage:
+    """Build an EmailMessage from parsed FETCH parts (preview or full)."""
+    if "full" in parts:
+        raw = parts["full"] or b""
+        complete = True
+    else:
+        header = parts.get("header") or b""
+        text = parts.get("text") or b""
+        raw = header + text
+        complete = "size" in parts and len(raw) >= parts["size"]
+    msg = email.message_from_bytes(raw)
+
+    # Parse headers
+    subject = decode_mime_header(msg.get("Subject", ""))
+    from_header = decode_mime_header(msg.get("From", ""))
+    to_header = decode_mime_header(msg.get("To", ""))
+    message_id = msg.get("Message-ID", "")
+    date_header = msg.get("Date", "")
+
+    sender_name, sender_email = extract_email_address(from_header)
+
+    # Parse date
+    try:
+        received_at = parsedate_to_datetime(date_header)
+    except Exception:
+        received_at = datetime.now()
+
+    # Get body
+    body, is_html = get_email_body(msg)
+    body_preview = body[:500] if body else ""
+
+    return EmailMessage(
+        message_id=message_id,
+        account=account,
+        sender=sender_email,
+        sender_name=sender_name,
+        recipient=to_header,
+        subject=subject,
+        body=body,
+        body_preview=body_preview,
+        received_at=received_at,
+        is_html=is_html,
+        uid=uid,
+        folder=folder,
+        body_complete=complete
+    )
+
+
 async def fetch_emails(
     account: str = "gmail",
     folder: str = "INBOX",
@@ -192,6 +523,9 @@ async def fetch_emails(
     """
     Fetch emails from an account.
 
+    Headers and a partial body for the whole range come back in a single
+    UID FETCH; use load_full_bodies() for messages that need the rest.
+
     Args:
         account: 'gmail' or 'icloud'
         folder: IMAP folder name
@@ -199,106 +533,82 @@ async def fetch_emails(
         limit: Maximum emails to fetch
 
     Returns:
-        List of EmailMessage objects
+        List of EmailMessage objects, newest first
     """
-    imap = connect_imap(account)
-    if not imap:
-        return []
-
-    emails = []
+    conn = imap_pool.get(account)
+    since_date = (datetime.now() - timedelta(days=since_days)).strftime("%d-%b-%Y")
 
-    try:
-        # Select folder
-        status, _ = imap.select(folder)
-        if status != "OK":
+    async with conn.session():
+        if await conn.select(folder) is None:
             logger.error(f"Failed to select folder {folder}")
             return []
 
-        # Search for recent emails
-        since_date = (datetime.now() - timedelta(days=since_days)).strftime("%d-%b-%Y")
-        status, message_ids = imap.search(None, f'(SINCE {since_date})')
-
-        if status != "OK":
-            logger.error("Failed to search emails")
-            return []
-
-        ids = message_ids[0].split()
-        # Get most recent first, limited
-        ids = ids[-limit:][::-1]
-
-        logger.info(f"Found {len(ids)} emails in {account}/{folder}")
+        uids = (await conn.search(f'(SINCE {since_date})'))[-limit:]
+        logger.info(f"Found {len(uids)} emails in {account}/{folder}")
+        fetched = await conn.fetch(uids, preview_fetch_items())
 
-        for msg_id in ids:
-            try:
-                status, msg_data = imap.fetch(msg_id, "(RFC822)")
-                if status != "OK":
-                    continue
-
-                raw_email = msg_data[0][1]
-                msg = email.message_from_bytes(raw_email)
+    emails = []
+    for uid in reversed(uids):
+        parts = fetched.get(uid)
+        if parts is None:
+            continue
+        try:
+            emails.append(build_email_message(account, folder, uid, parts))
+        except Exception as e:
+            logger.error(f"Failed to parse email {uid}: {e}")
+    return emails
 
-                # Parse headers
-                subject = decode_mime_header(msg.get("Subject", ""))
-                from_header = decode_mime_header(msg.get("From", ""))
-                to_header = decode_mime_header(msg.get("To", ""))
-                message_id = msg.get("Message-ID", "")
-                date_header = msg.get("Date", "")
 
-                sender_name, sender_email = extract_email_address(from_header)
+async def load_full_bodies(emails: List[EmailMessage]) -> None:
+    """
+    Replace partial bodies with the full message, in place.
 
-                # Parse date
-                try:
-                    received_at = parsedate_to_datetime(date_header)
-                except Exception:
-                    received_at = datetime.now()
-
-                # Get body
-                body, is_html = get_email_body(msg)
-                body_preview = body[:500] if body else ""
-
-                emails.append(EmailMessage(
-                    message_id=message_id,
-                    account=account,
-                    sender=sender_email,
-                    sender_name=sender_name,
-                    recipient=to_header,
-                    subject=subject,
-                    body=body,
-                    body_preview=body_preview,
-                    received_at=received_at,
-                    is_html=is_html
-                ))
-
-            except Exception as e:
-                logger.error(f"Failed to parse email {msg_id}: {e}")
-                continue
+    Issues one UID FETCH per account/folder for the emails that were
+    truncated at preview time; failures leave the partial body.
+    """
+    groups: Dict[tuple, Dict[int, EmailMessage]] = {}
+    for item in emails:
+        if not item.body_complete and item.uid is not None:
+            groups.setdefault((item.account, item.folder), {})[item.uid] = item
 
-    finally:
+    for (account, folder), by_uid in groups.items():
+        conn = imap_pool.get(account)
         try:
-            imap.logout()
-        except Exception:
-            pass
+            async with conn.session():
+                if await conn.select(folder) is None:
+                    continue
+                fetched = await conn.fetch(list(by_uid), "(UID BODY.PEEK[])")
+        except Exception as e:
+            logger.error(f"Failed to load full bodies from {account}/{folder}: {e}")
+            continue
 
-    return emails
+        for uid, parts in fetched.items():
+            target = by_uid.get(uid)
+            if target is None or parts.get("full") is None:
+                continue
+            body, is_html = get_email_body(email.message_from_bytes(parts["full"]))
+            target.body = body
+            target.is_html = is_html
+            target.body_complete = True
 
 
 async def fetch_all_accounts(
     since_days: int = 1,
     limit_per_account: int = 25
 ) -> List[EmailMessage]:
-    """Fetch emails from all configured accounts."""
-    all_emails = []
+    """Fetch emails from all configured accounts concurrently."""
+    accounts = list(EMAIL_ACCOUNTS.keys())
+    results = await asyncio.gather(
+        *(fetch_emails(account=account, since_days=since_days, limit=limit_per_account) for account in accounts),
+        return_exceptions=True
+    )
 
-    for account in EMAIL_ACCOUNTS.keys():
-        try:
-            emails = await fetch_emails(
-                account=account,
-                since_days=since_days,
-                limit=limit_per_account
-            )
-            all_emails.extend(emails)
-        except Exception as e:
-            logger.error(f"Failed to fetch from {account}: {e}")
+    all_emails = []
+    for account, result in zip(accounts, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Failed to fetch from {account}: {result}")
+            continue
+        all_emails.extend(result)
 
     # Sort by date, newest first
     all_emails.sort(key=lambda x: x.received_at, reverse=True)
@@ -306,32 +616,30 @@ async def fetch_all_accounts(
     return all_emails
 
 
+async def _find_uid(conn: ImapConnection, message_id: str) -> Optional[int]:
+    """Select INBOX and look up a message's UID by Message-ID."""
+    if await conn.select("INBOX") is None:
+        return None
+    uids = await conn.search(f'(HEADER Message-ID "{message_id}")')
+    return uids[0] if uids else None
+
+
 async def archive_email(account: str, message_id: str) -> bool:
     """Archive an email (move to Archive/All Mail)."""
-    imap = connect_imap(account)
-    if not imap:
-        return False
-
     try:
-        imap.select("INBOX")
-
-        # Find the email by Message-ID
-        status, data = imap.search(None, f'(HEADER Message-ID "{message_id}")')
-        if status != "OK" or not data[0]:
-            return False
-
-        msg_num = data[0].split()[0]
-
-        # Gmail uses different archive folder
-        if account == "gmail":
-            # Just remove from INBOX (goes to All Mail)
-            imap.store(msg_num, '+FLAGS', '\\Deleted')
-            imap.expunge()
-        else:
-            # Move to Archive folder
-            imap.copy(msg_num, "Archive")
-            imap.store(msg_num, '+FLAGS', '\\Deleted')
-            imap.expunge()
+        conn = imap_pool.get(account)
+        async with conn.session():
+            uid = await _find_uid(conn, message_id)
+            if uid is None:
+                return False
+
+            # Gmail uses different archive folder
+            if account != "gmail":
+                # Move to Archive folder
+                await conn.copy([uid], "Archive")
+            # On Gmail, removing from INBOX leaves it in All Mail
+            await conn.store([uid], '+FLAGS', '\\Deleted')
+            await conn.expunge()
 
         return True
 
@@ -339,33 +647,21 @@ async def archive_email(account: str, message_id: str) -> bool:
         logger.error(f"Failed to archive email: {e}")
         return False
 
-    finally:
-        try:
-            imap.logout()
-        except Exception:
-            pass
-
 
 async def delete_email(account: str, message_id: str) -> bool:
     """Delete an email (move to Trash)."""
-    imap = connect_imap(account)
-    if not imap:
-        return False
-
     try:
-        imap.select("INBOX")
-
-        status, data = imap.search(None, f'(HEADER Message-ID "{message_id}")')
-        if status != "OK" or not data[0]:
-            return False
-
-        msg_num = data[0].split()[0]
-
-        # Move to Trash
-        trash_folder = "[Gmail]/Trash" if account == "gmail" else "Trash"
-        imap.copy(msg_num, trash_folder)
-        imap.store(msg_num, '+FLAGS', '\\Deleted')
-        imap.expunge()
+        conn = imap_pool.get(account)
+        async with conn.session():
+            uid = await _find_uid(conn, message_id)
+            if uid is None:
+                return False
+
+            # Move to Trash
+            trash_folder = "[Gmail]/Trash" if account == "gmail" else "Trash"
+            await conn.copy([uid], trash_folder)
+            await conn.store([uid], '+FLAGS', '\\Deleted')
+            await conn.expunge()
 
         return True
 
@@ -373,28 +669,16 @@ async def delete_email(account: str, message_id: str) -> bool:
         logger.error(f"Failed to delete email: {e}")
         return False
 
-    finally:
-        try:
-            imap.logout()
-        except Exception:
-            pass
-
 
 async def mark_as_read(account: str, message_id: str) -> bool:
     """Mark an email as read."""
-    imap = connect_imap(account)
-    if not imap:
-        return False
-
     try:
-        imap.select("INBOX")
-
-        status, data = imap.search(None, f'(HEADER Message-ID "{message_id}")')
-        if status != "OK" or not data[0]:
-            return False
-
-        msg_num = data[0].split()[0]
-        imap.store(msg_num, '+FLAGS', '\\Seen')
+        conn = imap_pool.get(account)
+        async with conn.session():
+            uid = await _find_uid(conn, message_id)
+            if uid is None:
+                return False
+            await conn.store([uid], '+FLAGS', '\\Seen')
 
         return True
 
@@ -402,12 +686,6 @@ async def mark_as_read(account: str, message_id: str) -> bool:
         logger.error(f"Failed to mark as read: {e}")
         return False
 
-    finally:
-        try:
-            imap.logout()
-        except Exception:
-            pass
-
 
 async def send_email(
     account: str,
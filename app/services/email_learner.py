@@ -3,10 +3,14 @@ NEXUS Email Learner
 Learn user preferences from feedback to improve email handling.
 """
 
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+import re
+import time
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from datetime import datetime
 
+from ..config import settings
 from ..database import db
 
 logger = logging.getLogger(__name__)
@@ -76,7 +80,6 @@ async def record_feedback(
 
 def extract_keywords(text: str) -> List[str]:
     """Extract meaningful keywords from text."""
-    import re
     # Remove common words and extract keywords
     stop_words = {
         'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
@@ -147,39 +150,12 @@ async def update_preference(
             pattern_type, pattern_value, preference, 0.5 * weight
         )
 
+    preference_engine.invalidate()
+
 
 async def get_sender_preference(sender: str) -> Optional[Dict[str, Any]]:
     """Get learned preference for a sender."""
-    # Check exact sender
-    result = await db.fetch_one(
-        """
-        SELECT preference, confidence
-        FROM email_preferences
-        WHERE pattern_type = $1 AND pattern_value = $2
-        AND confidence >= 0.6
-        """,
-        PATTERN_SENDER, sender.lower()
-    )
-
-    if result:
-        return {"preference": result["preference"], "confidence": float(result["confidence"])}
-
-    # Check domain
-    if "@" in sender:
-        domain = sender.split("@")[1].lower()
-        result = await db.fetch_one(
-            """
-            SELECT preference, confidence
-            FROM email_preferences
-            WHERE pattern_type = $1 AND pattern_value = $2
-            AND confidence >= 0.7
-            """,
-            PATTERN_SENDER_DOMAIN, domain
-        )
-        if result:
-            return {"preference": result["preference"], "confidence": float(result["confidence"])}
-
-    return None
+    return (await preference_engine.get()).sender_preference(sender)
 
 
 async def should_auto_action(
@@ -192,58 +168,182 @@ async def should_auto_action(
 
     Returns: 'archive', 'delete', 'important', or None
     """
-    # Check sender preference (highest priority)
-    sender_pref = await get_sender_preference(sender)
-    if sender_pref and sender_pref["confidence"] >= 0.8:
-        return sender_pref["preference"]
-
-    # Check category preference
-    if classification:
-        cat_result = await db.fetch_one(
-            """
-            SELECT preference, confidence
-            FROM email_preferences
-            WHERE pattern_type = $1 AND pattern_value = $2
-            AND confidence >= 0.75
-            """,
-            PATTERN_CATEGORY, classification
-        )
-        if cat_result:
-            return cat_result["preference"]
-
-    return None
+    return (await preference_engine.get()).auto_action(sender, subject, classification)
 
 
 async def get_vip_senders() -> List[str]:
     """Get list of VIP senders (marked important with high confidence)."""
-    results = await db.fetch_all(
-        """
-        SELECT pattern_value
-        FROM email_preferences
-        WHERE pattern_type = $1
-        AND preference = $2
-        AND confidence >= 0.8
-        ORDER BY confidence DESC
-        """,
-        PATTERN_SENDER, PREF_IMPORTANT
-    )
-    return [r["pattern_value"] for r in results]
+    return list((await preference_engine.get()).vip_senders)
 
 
 async def get_blocked_senders() -> List[str]:
     """Get list of blocked senders (marked delete with high confidence)."""
-    results = await db.fetch_all(
-        """
-        SELECT pattern_value
-        FROM email_preferences
-        WHERE pattern_type = $1
-        AND preference = $2
-        AND confidence >= 0.8
-        ORDER BY confidence DESC
-        """,
-        PATTERN_SENDER, PREF_DELETE
-    )
-    return [r["pattern_value"] for r in results]
+    return list((await preference_engine.get()).blocked_senders)
+
+
+class PreferenceSnapshot:
+    """
+    All learned patterns compiled for lookups without DB I/O.
+
+    Senders, categories and subject keywords are hash maps; domains are a
+    trie over reversed labels, so a `chase.com` pattern also covers
+    `alerts.chase.com` and the most specific domain wins.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()):
+        self.senders: Dict[str, Tuple[str, float]] = {}
+        self.categories: Dict[str, Tuple[str, float]] = {}
+        self.keywords: Dict[str, Tuple[str, float]] = {}
+        self._domains: Dict[str, Any] = {}
+        self.pattern_count = 0
+
+        tables = {
+            PATTERN_SENDER: self.senders,
+            PATTERN_CATEGORY: self.categories,
+            PATTERN_SUBJECT_KEYWORD: self.keywords,
+        }
+        for row in rows:
+            value = (row["preference"], float(row["confidence"]))
+            pattern_value = row["pattern_value"].lower()
+            if row["pattern_type"] == PATTERN_SENDER_DOMAIN:
+                node = self._domains
+                for label in reversed(pattern_value.split(".")):
+                    node = node.setdefault(label, {})
+                node[_MATCH] = value
+            elif row["pattern_type"] in tables:
+                tables[row["pattern_type"]][pattern_value] = value
+            else:
+                continue
+            self.pattern_count += 1
+
+        ranked = sorted(self.senders.items(), key=lambda item: item[1][1], reverse=True)
+        self.vip_senders = tuple(s for s, (pref, conf) in ranked if pref == PREF_IMPORTANT and conf >= 0.8)
+        self.blocked_senders = tuple(s for s, (pref, conf) in ranked if pref == PREF_DELETE and conf >= 0.8)
+        self._vip_set = frozenset(self.vip_senders)
+
+    def domain_preference(self, domain: str, min_confidence: float = 0.0) -> Optional[Tuple[str, float]]:
+        """Most specific domain or parent-domain pattern at `min_confidence` or above."""
+        best = None
+        node = self._domains
+        for label in reversed(domain.lower().split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            match = node.get(_MATCH)
+            if match and match[1] >= min_confidence:
+                best = match
+        return best
+
+    def keyword_preference(self, subject: str, min_confidence: float = 0.8) -> Optional[str]:
+        """Preference the subject's learned keywords agree on, if they agree."""
+        found = {
+            self.keywords[word][0]
+            for word in re.findall(r'\b[a-zA-Z]{3,}\b', subject.lower())
+            if word in self.keywords and self.keywords[word][1] >= min_confidence
+        }
+        return found.pop() if len(found) == 1 else None
+
+    def sender_preference(self, sender: str) -> Optional[Dict[str, Any]]:
+        # Check exact sender
+        sender = sender.lower()
+        match = self.senders.get(sender)
+        if match and match[1] >= 0.6:
+            return {"preference": match[0], "confidence": match[1]}
+
+        # Check domain
+        if "@" in sender:
+            match = self.domain_preference(sender.split("@")[1], min_confidence=0.7)
+            if match:
+                return {"preference": match[0], "confidence": match[1]}
+        return None
+
+    def auto_action(self, sender: str, subject: str = None, classification: str = None) -> Optional[str]:
+        # Check sender preference (highest priority)
+        sender_pref = self.sender_preference(sender)
+        if sender_pref and sender_pref["confidence"] >= 0.8:
+            return sender_pref["preference"]
+
+        # Check category preference
+        if classification:
+            match = self.categories.get(classification)
+            if match and match[1] >= 0.75:
+                return match[0]
+
+        # Subject keywords only decide once they've been confirmed many times
+        if subject:
+            return self.keyword_preference(subject)
+        return None
+
+    def is_vip(self, sender: str) -> bool:
+        return sender.lower() in self._vip_set
+
+
+_MATCH = "$"  # Trie key holding a domain's (preference, confidence); never a DNS label
+
+
+class PreferenceEngine:
+    """
+    Keeps the compiled PreferenceSnapshot for this process.
+
+    Writes through update_preference (and the /email/preferences route)
+    call invalidate(); the snapshot is also reloaded after `ttl_seconds`
+    to pick up writes from other processes.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[PreferenceSnapshot] = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self._loads = 0
+        self._invalidations = 0
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._invalidations += 1
+        self._snapshot = None
+
+    def _fresh(self) -> bool:
+        return self._snapshot is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def get(self) -> PreferenceSnapshot:
+        if self._fresh():
+            return self._snapshot
+        async with self._lock:
+            if self._fresh():
+                return self._snapshot
+            version = self._version
+            rows = await db.fetch_all(
+                """
+                SELECT pattern_type, pattern_value, preference, confidence
+                FROM email_preferences
+                """
+            )
+            snapshot = PreferenceSnapshot(rows)
+            self._loads += 1
+            # An invalidate() during the load means these rows may be stale; serve them once
+            if version == self._version:
+                self._snapshot = snapshot
+                self._loaded_at = time.monotonic()
+            return snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._snapshot is not None,
+            "patterns": self._snapshot.pattern_count if self._snapshot else 0,
+            "loads": self._loads,
+            "invalidations": self._invalidations,
+        }
+
+
+# Global preference engine
+preference_engine = PreferenceEngine(ttl_seconds=settings.email_preferences_ttl_seconds)
+
+
+async def load_preference_snapshot() -> PreferenceSnapshot:
+    """Current compiled preferences, for processing a batch of emails."""
+    return await preference_engine.get()
 
 
 async def get_learning_stats() -> Dict[str, Any]:
@@ -0,0 +1,327 @@
+"""
+NEXUS Email Sync
+Incremental IMAP sync driven by UIDVALIDITY/UID checkpoints.
+
+For each account/folder the highest processed UID is stored in
+`email_sync_state` together with the folder's UIDVALIDITY. A sync then
+SELECTs the folder and compares UIDNEXT with the checkpoint: if nothing
+arrived it stops there, otherwise it searches `UID <last+1>:*` and fetches
+only those messages. Without a checkpoint (first run, or the server reset
+UIDVALIDITY) it falls back to the `SINCE <date>` window.
+
+The checkpoint only advances when the caller commits a batch, so mail
+that failed processing is picked up again on the next sync. A message
+that keeps failing is given up on after `max_retries` commits; otherwise
+it would pin the checkpoint and, once more than `limit` newer messages
+queue behind it, every sync would re-fetch the same window.
+
+A background mode waits for new mail on each account - IMAP IDLE on a
+dedicated connection where the server supports it, polling otherwise -
+and hands changed accounts to a sync callback.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..config import settings
+from ..database import db
+from .email_client import (
+    EMAIL_ACCOUNTS, EmailMessage, ImapConnection,
+    build_email_message, imap_pool, preview_fetch_items
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncBatch:
+    """New messages for one account/folder and the checkpoint they lead to."""
+    account: str
+    folder: str
+    uidvalidity: Optional[int]
+    emails: List[EmailMessage] = field(default_factory=list)
+    last_uid: int = 0  # Highest UID in this batch (or the previous checkpoint)
+
+
+class EmailSync:
+    """Checkpointed fetcher plus optional IDLE/poll watchers."""
+
+    def __init__(
+        self,
+        mode: str = "off",
+        folder: str = "INBOX",
+        poll_seconds: float = 300.0,
+        idle_timeout_seconds: float = 1500.0,
+        max_retries: int = 3,
+    ):
+        self.mode = mode
+        self.folder = folder
+        self.poll_seconds = poll_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_retries = max_retries
+
+        # (account, folder) -> (uidvalidity, last_uid)
+        self._checkpoints: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        # (account, folder, uidvalidity) -> {uid: failed commits} for UIDs above the checkpoint
+        self._failures: Dict[Tuple[str, str, int], Dict[int, int]] = {}
+        self._watchers: Dict[str, asyncio.Task] = {}
+        self._watch_connections: Dict[str, ImapConnection] = {}
+        self._on_new_mail: Optional[Callable[[List[str]], Awaitable[Any]]] = None
+
+        # Counters
+        self._syncs = 0
+        self._unchanged = 0
+        self._fetched = 0
+        self._wakeups = 0
+        self._abandoned = 0
+        self._last_sync: Optional[datetime] = None
+
+    # ===== Checkpoints =====
+
+    async def get_checkpoint(self, account: str, folder: str) -> Optional[Tuple[int, int]]:
+        key = (account, folder)
+        if key not in self._checkpoints:
+            try:
+                row = await db.fetch_one(
+                    "SELECT uidvalidity, last_uid FROM email_sync_state WHERE account = $1 AND folder = $2",
+                    account, folder
+                )
+            except Exception as e:
+                logger.error(f"Failed to load sync checkpoint for {account}/{folder}: {e}")
+                return None
+            if row is None:
+                return None
+            self._checkpoints[key] = (row["uidvalidity"], row["last_uid"])
+        return self._checkpoints[key]
+
+    async def commit(self, batch: SyncBatch, failed_uids: Iterable[int] = ()) -> None:
+        """
+        Advance the checkpoint past a processed batch.
+
+        If some messages failed, the checkpoint stops just below the first
+        failure so it (and anything after it) is fetched again next time.
+        Failures that have hit `max_retries` no longer hold it back.
+        """
+        if batch.uidvalidity is None:
+            return
+        last_uid = batch.last_uid
+        retrying = self._count_failures(batch, failed_uids)
+        if retrying:
+            last_uid = min(last_uid, min(retrying) - 1)
+
+        previous = self._checkpoints.get((batch.account, batch.folder))
+        if previous and previous[0] == batch.uidvalidity and previous[1] >= last_uid:
+            return
+
+        try:
+            await db.execute(
+                """
+                INSERT INTO email_sync_state (account, folder, uidvalidity, last_uid, updated_at)
+                VALUES ($1, $2, $3, $4, NOW())
+                ON CONFLICT (account, folder) DO UPDATE
+                SET uidvalidity = EXCLUDED.uidvalidity, last_uid = EXCLUDED.last_uid, updated_at = NOW()
+                """,
+                batch.account, batch.folder, batch.uidvalidity, last_uid
+            )
+            self._checkpoints[(batch.account, batch.folder)] = (batch.uidvalidity, last_uid)
+        except Exception as e:
+            logger.error(f"Failed to save sync checkpoint for {batch.account}/{batch.folder}: {e}")
+            return
+
+        failures = self._failures.get((batch.account, batch.folder, batch.uidvalidity))
+        if failures:
+            for uid in [uid for uid in failures if uid <= last_uid]:
+                del failures[uid]
+
+    def _count_failures(self, batch: SyncBatch, failed_uids: Iterable[int]) -> List[int]:
+        """Record failed UIDs; returns those still worth retrying."""
+        failed = {uid for uid in failed_uids if uid is not None}
+        if not failed:
+            return []
+        # Counts from an older UIDVALIDITY refer to different messages
+        for key in [key for key in self._failures if key[:2] == (batch.account, batch.folder)
+                    and key[2] != batch.uidvalidity]:
+            del self._failures[key]
+        attempts = self._failures.setdefault((batch.account, batch.folder, batch.uidvalidity), {})
+
+        retrying = []
+        for uid in failed:
+            attempts[uid] = attempts.get(uid, 0) + 1
+            if attempts[uid] < self.max_retries:
+                retrying.append(uid)
+            elif attempts[uid] == self.max_retries:
+                self._abandoned += 1
+                logger.error(
+                    f"Giving up on email {uid} in {batch.account}/{batch.folder} "
+                    f"after {attempts[uid]} failed attempts"
+                )
+        return retrying
+
+    # ===== Sync =====
+
+    async def fetch_new(
+        self,
+        account: str,
+        folder: Optional[str] = None,
+        since_days: int = 1,
+        limit: int = 50
+    ) -> SyncBatch:
+        """
+        Fetch messages that arrived since the last committed checkpoint.
+
+        At most `limit` messages are returned; with a checkpoint these are
+        the oldest new ones, so a backlog drains over successive syncs.
+        """
+        folder = folder or self.folder
+        checkpoint = await self.get_checkpoint(account, folder)
+        conn = imap_pool.get(account)
+        self._syncs += 1
+        self._last_sync = datetime.now()
+
+        async with conn.session():
+            info = await conn.select(folder)
+            if info is None:
+                logger.error(f"Failed to select folder {folder}")
+                return SyncBatch(account, folder, None)
+
+            uidvalidity = info.get("uidvalidity")
+            batch = SyncBatch(account, folder, uidvalidity)
+
+            if checkpoint and uidvalidity is not None and checkpoint[0] == uidvalidity:
+                batch.last_uid = checkpoint[1]
+                if info.get("uidnext") is not None and info["uidnext"] <= checkpoint[1] + 1:
+                    self._unchanged += 1
+                    return batch
+                # `n:*` always matches the newest message, even below n
+                uids = [uid for uid in await conn.search(f"UID {checkpoint[1] + 1}:*") if uid > checkpoint[1]]
+                uids = uids[:limit]
+            else:
+                if checkpoint:
+                    logger.info(f"UIDVALIDITY changed for {account}/{folder}, resyncing window")
+                since_date = (datetime.now() - timedelta(days=since_days)).strftime("%d-%b-%Y")
+                uids = (await conn.search(f'(SINCE {since_date})'))[-limit:]
+
+            if not uids:
+                return batch
+            fetched = await conn.fetch(uids, preview_fetch_items())
+
+        for uid in reversed(uids):
+            parts = fetched.get(uid)
+            if parts is None:
+                continue
+            try:
+                batch.emails.append(build_email_message(account, folder, uid, parts))
+            except Exception as e:
+                logger.error(f"Failed to parse email {uid}: {e}")
+        batch.last_uid = max(batch.last_uid, max(uids))
+        self._fetched += len(batch.emails)
+        logger.info(f"Fetched {len(batch.emails)} new emails from {account}/{folder}")
+        return batch
+
+    async def fetch_all(
+        self,
+        accounts: Optional[List[str]] = None,
+        since_days: int = 1,
+        limit_per_account: int = 25
+    ) -> List[SyncBatch]:
+        """Sync accounts concurrently; failing accounts are logged and skipped."""
+        accounts = accounts or list(EMAIL_ACCOUNTS.keys())
+        results = await asyncio.gather(
+            *(self.fetch_new(account, since_days=since_days, limit=limit_per_account) for account in accounts),
+            return_exceptions=True
+        )
+        batches = []
+        for account, result in zip(accounts, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to sync {account}: {result}")
+                continue
+            batches.append(result)
+        return batches
+
+    # ===== Background mode =====
+
+    async def start(self, on_new_mail: Callable[[List[str]], Awaitable[Any]]) -> None:
+        """Watch every account and call `on_new_mail([account])` when mail may have arrived."""
+        if self.mode not in ("idle", "poll"):
+            return
+        self._on_new_mail = on_new_mail
+        for account in EMAIL_ACCOUNTS:
+            if account not in self._watchers or self._watchers[account].done():
+                self._watchers[account] = asyncio.create_task(self._watch(account))
+        logger.info(f"Email sync watching {list(EMAIL_ACCOUNTS)} ({self.mode})")
+
+    async def close(self) -> None:
+        # A blocked IDLE only returns when its socket closes
+        for conn in self._watch_connections.values():
+            conn.interrupt()
+        self._watch_connections = {}
+        for task in self._watchers.values():
+            task.cancel()
+        for task in self._watchers.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._watchers = {}
+
+    async def _watch(self, account: str) -> None:
+        # IDLE holds its connection, so it gets its own instead of the pooled one
+        conn = ImapConnection(account, settings.imap_noop_interval_seconds)
+        self._watch_connections[account] = conn
+        idle = self.mode == "idle"
+        changed = True  # Catch up on anything that arrived while we weren't watching
+
+        while True:
+            try:
+                if changed:
+                    self._wakeups += 1
+                    await self._on_new_mail([account])
+
+                if idle:
+                    async with conn.session():
+                        if not conn.supports_idle():
+                            logger.info(f"{account} doesn't support IDLE, polling instead")
+                            idle = False
+                            continue
+                        await conn.select(self.folder)
+                        events = await conn.idle(self.idle_timeout_seconds)
+                    changed = any(b"EXISTS" in line for line in events)
+                else:
+                    await asyncio.sleep(self.poll_seconds)
+                    changed = True  # Cheap: an unchanged UIDNEXT ends the sync after SELECT
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email watcher for {account} failed: {e}")
+                changed = True
+                await asyncio.sleep(min(self.poll_seconds, 60))
+
+    # ===== Stats =====
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "watching": [account for account, task in self._watchers.items() if not task.done()],
+            "syncs": self._syncs,
+            "unchanged_syncs": self._unchanged,
+            "emails_fetched": self._fetched,
+            "wakeups": self._wakeups,
+            "abandoned_uids": self._abandoned,
+            "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            "checkpoints": {
+                f"{account}/{folder}": {"uidvalidity": uidvalidity, "last_uid": last_uid}
+                for (account, folder), (uidvalidity, last_uid) in self._checkpoints.items()
+            },
+        }
+
+
+# Global email sync engine
+email_sync = EmailSync(
+    mode=settings.email_sync_mode,
+    poll_seconds=settings.email_sync_poll_seconds,
+    idle_timeout_seconds=settings.email_idle_timeout_seconds,
+    max_retries=settings.email_sync_max_retries,
+)
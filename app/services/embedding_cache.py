@@ -0,0 +1,253 @@
+"""
+NEXUS Embedding Cache
+Content-addressed read-through cache for embeddings.
+
+Keys are (model name, SHA-256 of the text). Lookups go through three tiers:
+1. Bounded in-process LRU
+2. Redis, storing raw float32 bytes (no pickle)
+3. The embedding_cache table (cold storage, BYTEA column)
+
+Writes land in the LRU immediately; Redis and Postgres are written in the
+background so callers never wait on them.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import redis.asyncio as redis
+
+from ..config import settings
+from ..database import db
+
+logger = logging.getLogger(__name__)
+
+# Redis entries are refreshed on every hit; unused ones fall out after this
+REDIS_TTL_SECONDS = 86400 * 30
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of the text."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def to_bytes(vector: np.ndarray) -> bytes:
+    """Serialise a vector as raw little-endian float32."""
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    """Deserialise raw little-endian float32 bytes."""
+    return np.frombuffer(data, dtype="<f4").astype(np.float32)
+
+
+class EmbeddingCache:
+    """Three-tier read-through embedding cache."""
+
+    def __init__(self, model_name: str, max_entries: int = 10000):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.redis_client: Optional[redis.Redis] = None
+        self.use_redis = True
+        self.use_postgres = True
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._background: Set[asyncio.Task] = set()
+        self._stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "postgres_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "write_errors": 0,
+        }
+
+    async def initialize(self) -> None:
+        """Connect to Redis. The Redis tier is skipped if unavailable."""
+        if self.redis_client:
+            return
+        try:
+            self.redis_client = redis.from_url(settings.redis_url, decode_responses=False)
+            await self.redis_client.ping()
+            self.use_redis = True
+            logger.info("Embedding cache Redis tier connected")
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis tier unavailable: {e}")
+            self.redis_client = None
+            self.use_redis = False
+
+    async def close(self) -> None:
+        """Wait for pending background writes and close Redis."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+
+    def _redis_key(self, digest: str) -> str:
+        return f"embedding:{self.model_name}:{digest}"
+
+    # ===== LRU =====
+
+    def _lru_get(self, digest: str) -> Optional[np.ndarray]:
+        vector = self._lru.get(digest)
+        if vector is not None:
+            self._lru.move_to_end(digest)
+        return vector
+
+    def _lru_put(self, digest: str, vector: np.ndarray) -> None:
+        self._lru[digest] = vector
+        self._lru.move_to_end(digest)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    # ===== Reads =====
+
+    async def _redis_get_many(self, digests: List[str]) -> Dict[str, np.ndarray]:
+        if not (self.use_redis and self.redis_client and digests):
+            return {}
+        try:
+            values = await self.redis_client.mget([self._redis_key(d) for d in digests])
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis read failed: {e}")
+            return {}
+        return {d: from_bytes(v) for d, v in zip(digests, values) if v}
+
+    async def _postgres_get_many(self, digests: List[str]) -> Dict[str, np.ndarray]:
+        if not (self.use_postgres and digests):
+            return {}
+        try:
+            rows = await db.fetch_all(
+                """
+                UPDATE embedding_cache
+                SET last_accessed_at = NOW(),
+                    access_count = access_count + 1
+                WHERE embedding_model = $1
+                  AND content_hash = ANY($2)
+                  AND embedding_bytes IS NOT NULL
+                RETURNING content_hash, embedding_bytes
+                """,
+                self.model_name,
+                digests
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache Postgres read failed: {e}")
+            return {}
+        return {row["content_hash"]: from_bytes(row["embedding_bytes"]) for row in rows}
+
+    async def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for text, or None."""
+        return (await self.get_many([text]))[0]
+
+    async def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Return cached embeddings in input order (None for misses)."""
+        digests = [content_hash(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        pending = []
+        for digest in dict.fromkeys(digests):
+            vector = self._lru_get(digest)
+            if vector is not None:
+                found[digest] = vector
+                self._stats["memory_hits"] += 1
+            else:
+                pending.append(digest)
+
+        redis_found = await self._redis_get_many(pending)
+        self._stats["redis_hits"] += len(redis_found)
+        pending = [d for d in pending if d not in redis_found]
+
+        postgres_found = await self._postgres_get_many(pending)
+        self._stats["postgres_hits"] += len(postgres_found)
+        self._stats["misses"] += len(pending) - len(postgres_found)
+
+        for digest, vector in {**redis_found, **postgres_found}.items():
+            self._lru_put(digest, vector)
+            found[digest] = vector
+        if postgres_found:
+            # Promote cold entries to Redis
+            self._spawn(self._redis_put_many(list(postgres_found.items())))
+
+        return [found.get(digest) for digest in digests]
+
+    # ===== Writes =====
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        """Cache one embedding."""
+        self.put_many([text], [vector])
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[np.ndarray]) -> None:
+        """Cache embeddings: LRU now, Redis and Postgres in the background."""
+        entries: Dict[str, Tuple[str, np.ndarray]] = {}
+        for text, vector in zip(texts, vectors):
+            digest = content_hash(text)
+            self._lru_put(digest, vector)
+            entries[digest] = (text, vector)
+        if not entries:
+            return
+        self._stats["writes"] += len(entries)
+        self._spawn(self._redis_put_many([(d, v) for d, (_, v) in entries.items()]))
+        self._spawn(self._postgres_put_many(entries))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _redis_put_many(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        if not (self.use_redis and self.redis_client and items):
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for digest, vector in items:
+                pipe.setex(self._redis_key(digest), REDIS_TTL_SECONDS, to_bytes(vector))
+            await pipe.execute()
+        except Exception as e:
+            self._stats["write_errors"] += 1
+            logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    async def _postgres_put_many(self, entries: Dict[str, Tuple[str, np.ndarray]]) -> None:
+        if not (self.use_postgres and entries):
+            return
+        digests = list(entries)
+        previews = [entries[d][0][:500] for d in digests]
+        blobs = [to_bytes(entries[d][1]) for d in digests]
+        dimension = int(len(entries[digests[0]][1]))
+        try:
+            await db.execute(
+                """
+                INSERT INTO embedding_cache
+                (content_hash, content_preview, embedding_bytes, embedding_model, dimension)
+                SELECT h, p, b, $4, $5
+                FROM unnest($1::varchar[], $2::text[], $3::bytea[]) AS t(h, p, b)
+                ON CONFLICT (embedding_model, content_hash) DO UPDATE SET
+                    embedding_bytes = EXCLUDED.embedding_bytes,
+                    last_accessed_at = NOW()
+                """,
+                digests,
+                previews,
+                blobs,
+                self.model_name,
+                dimension
+            )
+        except Exception as e:
+            self._stats["write_errors"] += 1
+            logger.warning(f"Embedding cache Postgres write failed: {e}")
+
+    # ===== Stats =====
+
+    def get_stats(self) -> Dict[str, float]:
+        """Per-tier hit counts and overall hit rate."""
+        hits = self._stats["memory_hits"] + self._stats["redis_hits"] + self._stats["postgres_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "model": self.model_name,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "redis_enabled": self.use_redis and self.redis_client is not None,
+        }
@@ -2,14 +2,29 @@
 NEXUS Embeddings Service
 Generate embeddings locally using sentence-transformers.
 Free, fast, runs on CPU.
+
+Async callers should use `embed`/`embed_many`, which read through the
+content-addressed embedding cache and, on a miss, run the model on a
+dedicated worker thread, micro-batching concurrent requests into a single
+`encode` call. `get_embedding` is the legacy synchronous path for scripts.
 """
 
+import asyncio
 import logging
-from typing import List
-from functools import lru_cache
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import settings
+from ..metrics import metrics, record_cache_stats
+from .embedding_cache import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
 # Lazy load model to avoid startup delay
 _model = None
 
@@ -20,7 +35,7 @@ def _get_model():
     if _model is None:
         from sentence_transformers import SentenceTransformer
         logger.info("Loading embedding model (first use)...")
-        _model = SentenceTransformer('all-MiniLM-L6-v2')
+        _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
         logger.info("Embedding model loaded")
     return _model
 
@@ -31,17 +46,208 @@ def get_embedding(text: str) -> List[float]:
 
     Returns 384-dimensional vector.
     Runs locally on CPU - FREE.
+
+    Blocks the calling thread; inside the API use `await embed(text)`.
     """
     model = _get_model()
     embedding = model.encode(text, convert_to_numpy=True)
     return embedding.tolist()
 
 
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    """Encode a batch of texts into a (n, dim) float32 matrix."""
+    model = _get_model()
+    vectors = model.encode(texts, convert_to_numpy=True, batch_size=len(texts))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+class EmbeddingService:
+    """
+    Async front-end for the embedding model.
+
+    Requests are queued and a batcher task groups them into one `encode`
+    call of up to `max_batch_size` texts, waiting at most `max_wait_ms`
+    for a batch to fill. Identical texts already in flight share a future.
+    Encoding runs on a single dedicated thread so the event loop never blocks.
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Counters
+        self._requests = 0
+        self._deduplicated = 0
+        self._batches = 0
+        self._encoded = 0
+        self._encode_ms = 0.0
+
+    def _ensure_started(self) -> None:
+        """Start the executor and batcher on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._batcher and not self._batcher.done():
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nexus-embed")
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._inflight = {}
+        self._batcher = loop.create_task(self._run_batcher())
+
+    async def start(self) -> None:
+        """Start the batcher and load the model off the event loop."""
+        self._ensure_started()
+        await self._loop.run_in_executor(self._executor, _get_model)
+
+    async def close(self) -> None:
+        """Stop the batcher and release the worker thread."""
+        if self._batcher:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        for future in self._inflight.values():
+            if not future.done():
+                future.cancel()
+        self._inflight = {}
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one text. Returns a float32 vector."""
+        self._ensure_started()
+        self._requests += 1
+
+        future = self._inflight.get(text)
+        if future is not None:
+            self._deduplicated += 1
+        else:
+            future = self._loop.create_future()
+            self._inflight[text] = future
+            self._queue.put_nowait(text)
+
+        # Shield so one cancelled caller doesn't cancel the shared future
+        return await asyncio.shield(future)
+
+    async def embed_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Embed several texts; they are batched together with other callers."""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def _run_batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self._executor, _encode_batch, batch)
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+                for text in batch:
+                    future = self._inflight.pop(text, None)
+                    if future and not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._batches += 1
+            self._encoded += len(batch)
+            self._encode_ms += (time.perf_counter() - start) * 1000
+
+            for text, vector in zip(batch, vectors):
+                future = self._inflight.pop(text, None)
+                if future and not future.done():
+                    future.set_result(vector)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Batching and deduplication counters."""
+        return {
+            "requests": self._requests,
+            "deduplicated": self._deduplicated,
+            "batches": self._batches,
+            "encoded": self._encoded,
+            "avg_batch_size": round(self._encoded / self._batches, 2) if self._batches else 0.0,
+            "avg_encode_ms": round(self._encode_ms / self._batches, 2) if self._batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "in_flight": len(self._inflight),
+        }
+
+
+# Global embedding service instance
+embedding_service = EmbeddingService(
+    max_batch_size=settings.embedding_max_batch_size,
+    max_wait_ms=settings.embedding_max_wait_ms,
+)
+
+
+# Global read-through cache keyed by (model, content hash)
+embedding_cache = EmbeddingCache(
+    model_name=EMBEDDING_MODEL_NAME,
+    max_entries=settings.embedding_cache_max_entries,
+)
+
+
+def _collect_cache_metrics() -> None:
+    stats = embedding_cache.get_stats()
+    record_cache_stats("embedding", stats["lookups"], {
+        "memory": stats["memory_hits"],
+        "redis": stats["redis_hits"],
+        "postgres": stats["postgres_hits"],
+    })
+
+
+metrics.register_collector(_collect_cache_metrics)
+
+
+async def embed(text: str) -> np.ndarray:
+    """Embed text without blocking the event loop. Returns float32 array."""
+    cached = await embedding_cache.get(text)
+    if cached is not None:
+        return cached
+    vector = await embedding_service.embed(text)
+    embedding_cache.put(text, vector)
+    return vector
+
+
+async def embed_many(texts: Sequence[str]) -> List[np.ndarray]:
+    """Embed several texts in shared batches. Returns float32 arrays."""
+    vectors = await embedding_cache.get_many(texts)
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if missing:
+        encoded = dict(zip(missing, await embedding_service.embed_many(missing)))
+        embedding_cache.put_many(list(encoded), list(encoded.values()))
+        vectors = [v if v is not None else encoded[t] for t, v in zip(texts, vectors)]
+    return vectors
+
+
+def get_embedding_stats() -> Dict[str, Dict]:
+    """Embedding service batching and cache tier counters."""
+    return {
+        "service": embedding_service.get_stats(),
+        "cache": embedding_cache.get_stats(),
+    }
+
+
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """Calculate cosine similarity between two vectors."""
-    import numpy as np
-    a = np.array(vec1)
-    b = np.array(vec2)
+    a = np.asarray(vec1, dtype=np.float32)
+    b = np.asarray(vec2, dtype=np.float32)
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
 
 
@@ -0,0 +1,257 @@
+"""
+NEXUS Provider Hedging
+Latency-aware hedged requests across LLM providers.
+
+Each provider call is timed into an in-process log-bucketed histogram.
+When the primary provider hasn't answered by its p95 (configurable), the
+next provider is fired in parallel; the first success wins and the loser
+is cancelled. A provider that fails outright falls through immediately.
+A cancelled loser is still timed: it ran at least that long, so its
+elapsed time goes into the histogram as a censored lower bound instead of
+leaving only the fast calls to shape the tail.
+
+Hedging is rationed so it can't double spend: every request earns a
+fraction (`hedge_max_ratio`) of a hedge token and a hedge costs one whole
+token, and hedging stops once today's in-process spend reaches
+`hedge_budget_fraction` of the daily budget. Callers only report the
+winner's cost, so each launched hedge reserves the caller's estimate of
+one extra call towards that spend: whichever side is cancelled has still
+been billed for its prompt.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets grow geometrically from 10 ms to ~5 minutes
+BUCKET_BASE_MS = 10.0
+BUCKET_GROWTH = 1.15
+BUCKET_COUNT = 75
+
+# Halve all counts after this many samples so quantiles track recent latency
+DECAY_EVERY = 1000
+
+# Hedge tokens a burst may accumulate
+HEDGE_BURST = 3.0
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with periodic exponential decay."""
+
+    def __init__(self):
+        self.counts = [0.0] * BUCKET_COUNT
+        self.total = 0.0
+        self.samples = 0
+
+    @staticmethod
+    def _bucket(latency_ms: float) -> int:
+        if latency_ms <= BUCKET_BASE_MS:
+            return 0
+        index = int(math.log(latency_ms / BUCKET_BASE_MS, BUCKET_GROWTH)) + 1
+        return min(index, BUCKET_COUNT - 1)
+
+    @staticmethod
+    def _upper_bound(index: int) -> float:
+        return BUCKET_BASE_MS * BUCKET_GROWTH ** index
+
+    def record(self, latency_ms: float) -> None:
+        self.counts[self._bucket(latency_ms)] += 1
+        self.total += 1
+        self.samples += 1
+        if self.samples % DECAY_EVERY == 0:
+            self.counts = [c / 2 for c in self.counts]
+            self.total /= 2
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile, in ms."""
+        if self.total <= 0:
+            return None
+        target = q * self.total
+        cumulative = 0.0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self._upper_bound(index)
+        return self._upper_bound(BUCKET_COUNT - 1)
+
+
+class HedgePolicy:
+    """Per-provider latency tracking and hedged racing of provider calls."""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._hedge_tokens = HEDGE_BURST
+        self._spend_day = date.today()
+        self._spend_today = 0.0
+
+        # Counters
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_denied = 0
+        self.fallbacks = 0
+        self.censored_samples = 0
+        self.hedge_spend_reserved = 0.0
+
+    def record(self, provider: str, latency_ms: float) -> None:
+        """Record a call's latency (or, for a cancelled call, its lower bound)."""
+        self._histograms.setdefault(provider, LatencyHistogram()).record(latency_ms)
+
+    def record_spend(self, cost_usd: float) -> None:
+        """Account spend towards today's hedging budget guard."""
+        today = date.today()
+        if today != self._spend_day:
+            self._spend_day = today
+            self._spend_today = 0.0
+        self._spend_today += cost_usd
+
+    def hedge_delay_ms(self, provider: str) -> float:
+        """How long to wait on `provider` before hedging."""
+        histogram = self._histograms.get(provider)
+        estimate = histogram.quantile(settings.hedge_quantile) if histogram else None
+        if estimate is None:
+            estimate = settings.hedge_default_delay_ms
+        return min(max(estimate, settings.hedge_min_delay_ms), settings.hedge_max_delay_ms)
+
+    def _acquire_hedge(self) -> bool:
+        if self._spend_day == date.today() and \
+                self._spend_today >= settings.daily_budget_usd * settings.hedge_budget_fraction:
+            return False
+        if self._hedge_tokens < 1.0:
+            return False
+        self._hedge_tokens -= 1.0
+        return True
+
+    async def _timed(self, provider: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await call()
+        except asyncio.CancelledError:
+            self.censored_samples += 1
+            raise
+        except Exception:
+            # Failures can return instantly, which says nothing about latency
+            failed = True
+            self._errors[provider] = self._errors.get(provider, 0) + 1
+            raise
+        finally:
+            if not failed:
+                self.record(provider, (time.perf_counter() - start) * 1000)
+
+    async def race(
+        self,
+        candidates: Sequence[Tuple[str, Callable[[], Awaitable[Any]]]],
+        hedge_cost_usd: float = 0.0
+    ) -> Tuple[Optional[Any], List[str]]:
+        """
+        Call providers in priority order, hedging slow ones.
+
+        Args:
+            candidates: (provider, zero-arg coroutine factory) pairs
+            hedge_cost_usd: Estimated cost of the extra call a hedge makes,
+                charged to today's spend when the hedge is launched
+
+        Returns:
+            (first successful result or None, list of provider errors)
+        """
+        self.requests += 1
+        self._hedge_tokens = min(HEDGE_BURST, self._hedge_tokens + settings.hedge_max_ratio)
+
+        queue = list(candidates)
+        pending: Dict[asyncio.Task, str] = {}
+        errors: List[str] = []
+        hedged: set = set()
+        hedging = settings.hedge_enabled
+        last_started = 0.0
+        last_provider = None
+
+        def launch() -> asyncio.Task:
+            nonlocal last_started, last_provider
+            provider, call = queue.pop(0)
+            task = asyncio.ensure_future(self._timed(provider, call))
+            pending[task] = provider
+            last_started = time.perf_counter()
+            last_provider = provider
+            return task
+
+        if queue:
+            launch()
+        try:
+            while pending:
+                timeout = None
+                if hedging and queue:
+                    elapsed_ms = (time.perf_counter() - last_started) * 1000
+                    timeout = max(0.0, self.hedge_delay_ms(last_provider) - elapsed_ms) / 1000
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Deadline passed with the current providers still running
+                    if self._acquire_hedge():
+                        self.hedges += 1
+                        self.hedge_spend_reserved += hedge_cost_usd
+                        self.record_spend(hedge_cost_usd)
+                        logger.info(f"{last_provider} slower than p{int(settings.hedge_quantile * 100)}, hedging with {queue[0][0]}")
+                        hedged.add(launch())
+                    else:
+                        self.hedges_denied += 1
+                        hedging = False
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if task in hedged:
+                            self.hedge_wins += 1
+                        return task.result(), errors
+                    logger.warning(f"{provider} failed: {error}")
+                    errors.append(f"{provider}: {error}")
+
+                if not pending and queue:
+                    self.fallbacks += 1
+                    launch()
+
+            return None, errors
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedging counters and per-provider latency quantiles."""
+        return {
+            "enabled": settings.hedge_enabled,
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "hedges_denied": self.hedges_denied,
+            "fallbacks": self.fallbacks,
+            "censored_samples": self.censored_samples,
+            "spend_today_usd": round(self._spend_today, 6),
+            "hedge_spend_reserved_usd": round(self.hedge_spend_reserved, 6),
+            "providers": {
+                provider: {
+                    "samples": histogram.samples,
+                    "errors": self._errors.get(provider, 0),
+                    "p50_ms": histogram.quantile(0.5),
+                    "p95_ms": histogram.quantile(0.95),
+                    "p99_ms": histogram.quantile(0.99),
+                    "hedge_delay_ms": round(self.hedge_delay_ms(provider), 1),
+                }
+                for provider, histogram in self._histograms.items()
+            },
+        }
+
+
+# Global hedging policy for chat providers
+hedge_policy = HedgePolicy()
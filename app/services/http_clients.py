@@ -0,0 +1,184 @@
+"""
+NEXUS Provider HTTP Clients
+Long-lived, pooled HTTP clients for LLM provider APIs.
+
+One keep-alive `httpx.AsyncClient` per provider base URL, created in the
+FastAPI lifespan and closed on shutdown, so chat turns stop paying TCP+TLS
+setup. HTTP/2 is used when the `h2` package is installed.
+
+Per provider we count requests, how many opened a new connection (the rest
+reused a pooled one) and time-to-first-byte (response headers received).
+"""
+
+import importlib.util
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from ..config import settings
+from ..metrics import PROVIDER_REQUEST_DURATION, PROVIDER_TTFB
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+# Provider name -> base URL
+PROVIDER_BASE_URLS = {
+    "groq": "https://api.groq.com",
+    "deepseek": "https://api.deepseek.com",
+    "google": "https://generativelanguage.googleapis.com",
+    "openrouter": "https://openrouter.ai",
+}
+
+
+@dataclass
+class ProviderHTTPStats:
+    """Connection and latency counters for one provider."""
+    requests: int = 0
+    errors: int = 0
+    new_connections: int = 0
+    total_ttfb_ms: float = 0.0
+    ttfb_samples: int = 0
+    last_ttfb_ms: Optional[float] = None
+    http_versions: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        reused = max(0, self.requests - self.new_connections)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "connection_reuse_rate": round(reused / self.requests, 4) if self.requests else 0.0,
+            "avg_ttfb_ms": round(self.total_ttfb_ms / self.ttfb_samples, 1) if self.ttfb_samples else 0.0,
+            "last_ttfb_ms": round(self.last_ttfb_ms, 1) if self.last_ttfb_ms is not None else None,
+            "http_versions": dict(self.http_versions),
+        }
+
+
+class ProviderClientManager:
+    """Owns one pooled AsyncClient per provider."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, ProviderHTTPStats] = {}
+
+    def _timeout_for(self, provider: str) -> httpx.Timeout:
+        seconds = settings.provider_timeouts.get(provider, 60.0)
+        return httpx.Timeout(seconds, connect=min(seconds, settings.provider_connect_timeout))
+
+    def _create_client(self, provider: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.provider_max_connections,
+            max_keepalive_connections=settings.provider_max_keepalive_connections,
+            keepalive_expiry=settings.provider_keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            base_url=PROVIDER_BASE_URLS.get(provider, ""),
+            http2=HTTP2_AVAILABLE,
+            limits=limits,
+            timeout=self._timeout_for(provider),
+        )
+
+    async def start(self) -> None:
+        """Create clients for every known provider."""
+        for provider in PROVIDER_BASE_URLS:
+            self.get_client(provider)
+        logger.info(
+            f"Provider HTTP clients ready ({len(self._clients)} providers, "
+            f"http2={'on' if HTTP2_AVAILABLE else 'off - install h2'})"
+        )
+
+    async def close(self) -> None:
+        """Close all clients and their pooled connections."""
+        for provider, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP client for {provider}: {e}")
+        self._clients.clear()
+
+    def get_client(self, provider: str) -> httpx.AsyncClient:
+        """Return the shared client for a provider, creating it lazily."""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._create_client(provider)
+            self._clients[provider] = client
+            self._stats.setdefault(provider, ProviderHTTPStats())
+        return client
+
+    def _trace(self, provider: str, started: float):
+        """Build an httpx trace hook that records new connections and TTFB."""
+        stats = self._stats.setdefault(provider, ProviderHTTPStats())
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                stats.new_connections += 1
+            elif event_name.endswith(".receive_response_headers.complete"):
+                ttfb_ms = (time.perf_counter() - started) * 1000
+                stats.total_ttfb_ms += ttfb_ms
+                stats.ttfb_samples += 1
+                stats.last_ttfb_ms = ttfb_ms
+                PROVIDER_TTFB.observe(ttfb_ms / 1000, provider=provider)
+
+        return trace
+
+    def _record_response(self, provider: str, response: httpx.Response) -> None:
+        stats = self._stats[provider]
+        stats.http_versions[response.http_version] = stats.http_versions.get(response.http_version, 0) + 1
+
+    async def request(self, provider: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request on the provider's pooled client."""
+        client = self.get_client(provider)
+        stats = self._stats[provider]
+        stats.requests += 1
+        started = time.perf_counter()
+        extensions = {**kwargs.pop("extensions", {}), "trace": self._trace(provider, started)}
+        try:
+            response = await client.request(method, url, extensions=extensions, **kwargs)
+        except Exception:
+            stats.errors += 1
+            PROVIDER_REQUEST_DURATION.observe(time.perf_counter() - started, provider=provider, outcome="error")
+            raise
+        self._record_response(provider, response)
+        PROVIDER_REQUEST_DURATION.observe(
+            time.perf_counter() - started, provider=provider, outcome=f"{response.status_code // 100}xx"
+        )
+        return response
+
+    async def post(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        """POST on the provider's pooled client."""
+        return await self.request(provider, "POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, provider: str, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Stream a response on the provider's pooled client."""
+        client = self.get_client(provider)
+        stats = self._stats[provider]
+        stats.requests += 1
+        started = time.perf_counter()
+        extensions = {**kwargs.pop("extensions", {}), "trace": self._trace(provider, started)}
+        try:
+            async with client.stream(method, url, extensions=extensions, **kwargs) as response:
+                self._record_response(provider, response)
+                yield response
+        except Exception:
+            stats.errors += 1
+            PROVIDER_REQUEST_DURATION.observe(time.perf_counter() - started, provider=provider, outcome="error")
+            raise
+        PROVIDER_REQUEST_DURATION.observe(
+            time.perf_counter() - started, provider=provider, outcome=f"{response.status_code // 100}xx"
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider connection reuse and TTFB counters."""
+        return {provider: stats.to_dict() for provider, stats in self._stats.items()}
+
+
+# Global client manager
+provider_clients = ProviderClientManager()
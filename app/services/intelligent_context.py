@@ -16,12 +16,12 @@ from typing import Dict, List, Optional, Any, Tuple
 from uuid import UUID
 from dataclasses import dataclass
 import hashlib
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from ..database import db
-from .embeddings import get_embedding, cosine_similarity
 from .semantic_cache import check_cache, store_cache
 from .conversation_memory import get_conversation_memory_service
+from .usage_rollups import usage_rollups
 
 logger = logging.getLogger(__name__)
 
@@ -52,10 +52,13 @@ class RetrievedContext:
     conversation_history: Optional[List[Dict]] = None
     usage_data: Optional[List[Dict]] = None
     errors: List[str] = None  # Any errors during retrieval
+    timings: Dict[str, Dict[str, Any]] = None  # Per-source latency and status
 
     def __post_init__(self):
         if self.errors is None:
             self.errors = []
+        if self.timings is None:
+            self.timings = {}
 
     def format_for_ai(self) -> str:
         """Format retrieved context for AI prompt."""
@@ -381,25 +384,17 @@ async def retrieve_system_data(query: str, intent: QueryIntent) -> List[Dict]:
                 'summary': f"{row['service']} {row.get('error_type', 'error')}: {row['error_message'][:50]}..."
             })
 
-        # Get API usage stats
-        api_usage = await db.fetch_all(
-            """
-            SELECT provider, COUNT(*) as request_count, AVG(latency_ms) as avg_latency
-            FROM api_usage
-            WHERE created_at > NOW() - INTERVAL '24 hours'
-            GROUP BY provider
-            ORDER BY request_count DESC
-            LIMIT 5
-            """
-        )
+        # Get API usage stats (from the usage rollups)
+        summary = await usage_rollups.summary(datetime.now(timezone.utc) - timedelta(hours=24), group_by=("provider",))
+        api_usage = sorted(summary["groups"], key=lambda r: r["request_count"], reverse=True)[:5]
 
         for row in api_usage:
             results.append({
                 'type': 'api_usage',
                 'provider': row['provider'],
                 'requests': row['request_count'],
-                'avg_latency': float(row.get('avg_latency', 0)),
-                'summary': f"{row['provider']}: {row['request_count']} requests, {row.get('avg_latency', 0):.0f}ms avg"
+                'avg_latency': float(row['avg_latency_ms']),
+                'summary': f"{row['provider']}: {row['request_count']} requests, {row['avg_latency_ms']:.0f}ms avg"
             })
 
         return results
@@ -600,10 +595,65 @@ async def retrieve_memory_data(query: str, session_id: Optional[str] = None, lim
         return []
 
 
+async def retrieve_usage_data() -> List[Dict]:
+    """Retrieve AI usage statistics for the last 24 hours (from the usage rollups)."""
+    usage_stats = await usage_rollups.summary(datetime.now(timezone.utc) - timedelta(hours=24))
+
+    total_requests = int(usage_stats['request_count'])
+    total_cost = float(usage_stats['cost_usd'])
+    avg_latency = float(usage_stats['avg_latency_ms'])
+    return [{
+        'type': 'usage_stats',
+        'requests_24h': total_requests,
+        'cost_24h': total_cost,
+        'avg_latency': avg_latency,
+        'summary': f"{total_requests} AI requests in last 24h, ${total_cost:.4f} cost, {avg_latency:.0f}ms avg latency"
+    }]
+
+
 # ============================================================================
 # Main Context Retrieval Function
 # ============================================================================
 
+# Per-source deadlines (seconds); each is also capped by the overall budget
+SOURCE_DEADLINES = {
+    'finance': 1.0,
+    'email': 1.0,
+    'agents': 1.0,
+    'system': 1.0,
+    'database': 1.0,
+    'conversation': 0.5,
+    'memory': 1.2,
+    'usage': 0.5,
+}
+
+
+async def _run_source(name: str, coro, deadline: float, timings: Dict[str, Dict[str, Any]]) -> Any:
+    """Await one retrieval under its deadline, recording latency and outcome."""
+    start = time.perf_counter()
+    status = 'ok'
+    items = 0
+    try:
+        result = await asyncio.wait_for(coro, deadline)
+        items = len(result) if isinstance(result, list) else 0
+        return result
+    except asyncio.TimeoutError:
+        status = 'timeout'
+        raise TimeoutError(f"timed out after {deadline:.1f}s")
+    except asyncio.CancelledError:
+        status = 'cancelled'
+        raise
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        timings[name] = {
+            'ms': round((time.perf_counter() - start) * 1000, 1),
+            'status': status,
+            'items': items,
+        }
+
+
 async def retrieve_intelligent_context(
     query: str,
     session_id: Optional[str] = None,
@@ -614,6 +664,11 @@ async def retrieve_intelligent_context(
 
     This is the core function that makes NEXUS intelligent by providing
     context-aware responses based on all available data.
+
+    Every source (domains, conversation history, memory, usage stats) runs
+    concurrently under its own deadline; whatever has arrived when
+    `timeout_seconds` elapses is used and the rest is dropped. Per-source
+    timings are returned in `RetrievedContext.timings`.
     """
     start_time = time.time()
     errors = []
@@ -653,141 +708,69 @@ async def retrieve_intelligent_context(
         time_frame=None
     )
 
-    # Run data retrievals in parallel with timeout
-    tasks = []
-    finance_data = []
-    email_data = []
-    agent_data = []
-    system_data = []
-    database_data = []
-    conversation_data = []
-    memory_data = []
-
-    try:
-        # Run retrievals concurrently
-        async with asyncio.timeout(timeout_seconds):
-            if 'finance' in domains:
-                tasks.append(retrieve_finance_data(query, intent))
-
-            if 'email' in domains:
-                tasks.append(retrieve_email_data(query, intent))
-
-            if 'agents' in domains:
-                tasks.append(retrieve_agent_data(query, intent))
-
-            if 'system' in domains:
-                tasks.append(retrieve_system_data(query, intent))
-
-            if 'database' in domains:
-                tasks.append(retrieve_database_data(query, intent))
-
-            # Always retrieve conversation history
-            tasks.append(retrieve_conversation_history(session_id))
-            # Always retrieve relevant memories
-            tasks.append(retrieve_memory_data(query, session_id))
-
-            # Wait for all tasks
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Process results
-            result_idx = 0
-            if 'finance' in domains:
-                finance_data = results[result_idx] if not isinstance(results[result_idx], Exception) else []
-                if isinstance(results[result_idx], Exception):
-                    errors.append(f"Finance retrieval: {results[result_idx]}")
-                result_idx += 1
-
-            if 'email' in domains:
-                email_data = results[result_idx] if not isinstance(results[result_idx], Exception) else []
-                if isinstance(results[result_idx], Exception):
-                    errors.append(f"Email retrieval: {results[result_idx]}")
-                result_idx += 1
-
-            if 'agents' in domains:
-                agent_data = results[result_idx] if not isinstance(results[result_idx], Exception) else []
-                if isinstance(results[result_idx], Exception):
-                    errors.append(f"Agent retrieval: {results[result_idx]}")
-                result_idx += 1
-
-            if 'system' in domains:
-                system_data = results[result_idx] if not isinstance(results[result_idx], Exception) else []
-                if isinstance(results[result_idx], Exception):
-                    errors.append(f"System retrieval: {results[result_idx]}")
-                result_idx += 1
-
-            if 'database' in domains:
-                database_data = results[result_idx] if not isinstance(results[result_idx], Exception) else []
-                if isinstance(results[result_idx], Exception):
-                    errors.append(f"Database retrieval: {results[result_idx]}")
-                result_idx += 1
-
-            # Conversation history is second to last, memory data is last
-            # Ensure we have enough results (could be fewer due to timeout)
-            if len(results) >= 2:
-                conversation_data = results[-2] if not isinstance(results[-2], Exception) else []
-                if isinstance(results[-2], Exception):
-                    errors.append(f"Conversation retrieval: {results[-2]}")
-
-                memory_data = results[-1] if not isinstance(results[-1], Exception) else []
-                if isinstance(results[-1], Exception):
-                    errors.append(f"Memory retrieval: {results[-1]}")
-            elif len(results) == 1:
-                # Only conversation history returned (memory retrieval timed out)
-                conversation_data = results[-1] if not isinstance(results[-1], Exception) else []
-                if isinstance(results[-1], Exception):
-                    errors.append(f"Conversation retrieval: {results[-1]}")
-                memory_data = []
-            else:
-                # No results (shouldn't happen)
-                conversation_data = []
-                memory_data = []
-
-    except asyncio.TimeoutError:
-        errors.append(f"Data retrieval timeout after {timeout_seconds} seconds")
-    except Exception as e:
-        errors.append(f"Context retrieval error: {e}")
-
-    # Get usage statistics (quick query)
-    usage_data = []
-    try:
-        usage_stats = await db.fetch_one(
-            """
-            SELECT
-                COUNT(*) as total_requests,
-                COALESCE(SUM(cost_usd), 0) as total_cost,
-                COALESCE(AVG(latency_ms), 0) as avg_latency
-            FROM api_usage
-            WHERE created_at > NOW() - INTERVAL '24 hours'
-            """
+    domain_retrievers = {
+        'finance': retrieve_finance_data,
+        'email': retrieve_email_data,
+        'agents': retrieve_agent_data,
+        'system': retrieve_system_data,
+        'database': retrieve_database_data,
+    }
+    sources = {name: domain_retrievers[name](query, intent) for name in domains}
+    # Always retrieve conversation history, relevant memories and usage stats
+    sources['conversation'] = retrieve_conversation_history(session_id)
+    sources['memory'] = retrieve_memory_data(query, session_id)
+    sources['usage'] = retrieve_usage_data()
+
+    # Run every source concurrently under its own deadline
+    timings: Dict[str, Dict[str, Any]] = {}
+    tasks = {
+        name: asyncio.ensure_future(
+            _run_source(name, coro, min(SOURCE_DEADLINES.get(name, timeout_seconds), timeout_seconds), timings)
         )
+        for name, coro in sources.items()
+    }
 
-        if usage_stats:
-            usage_data.append({
-                'type': 'usage_stats',
-                'requests_24h': usage_stats['total_requests'],
-                'cost_24h': float(usage_stats.get('total_cost', 0)),
-                'avg_latency': float(usage_stats.get('avg_latency', 0)),
-                'summary': f"{usage_stats['total_requests']} AI requests in last 24h, ${usage_stats.get('total_cost', 0):.4f} cost, {usage_stats.get('avg_latency', 0):.0f}ms avg latency"
-            })
-    except Exception as e:
-        logger.debug(f"Usage stats retrieval failed: {e}")
+    results: Dict[str, List[Dict]] = {}
+    try:
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout_seconds)
+    except asyncio.CancelledError:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+    # Global budget exhausted - drop stragglers
+    if pending:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        skipped = [name for name, task in tasks.items() if task in pending]
+        errors.append(f"Data retrieval budget of {timeout_seconds} seconds exhausted; skipped {', '.join(skipped)}")
+
+    for name, task in tasks.items():
+        if task not in done:
+            continue
+        error = task.exception()
+        if error is not None:
+            errors.append(f"{name.capitalize()} retrieval: {error}")
+        else:
+            results[name] = task.result() or []
 
     elapsed = time.time() - start_time
-    logger.info(f"Context retrieval completed in {elapsed:.2f}s. Retrieved: "
-                f"finance({len(finance_data)}), email({len(email_data)}), "
-                f"agents({len(agent_data)}), system({len(system_data)}), "
-                f"database({len(database_data)}), memory({len(memory_data)}), conversation({len(conversation_data)})")
+    logger.info(f"Context retrieval completed in {elapsed:.2f}s. Retrieved: " +
+                ", ".join(f"{name}({len(results.get(name, []))}, {timing['ms']:.0f}ms {timing['status']})"
+                          for name, timing in timings.items()))
 
     return RetrievedContext(
-        finance_data=finance_data,
-        email_data=email_data,
-        agent_data=agent_data,
-        system_data=system_data,
-        database_data=database_data,
-        memory_data=memory_data,
-        conversation_history=conversation_data,
-        usage_data=usage_data,
-        errors=errors
+        finance_data=results.get('finance', []),
+        email_data=results.get('email', []),
+        agent_data=results.get('agents', []),
+        system_data=results.get('system', []),
+        database_data=results.get('database', []),
+        memory_data=results.get('memory', []),
+        conversation_history=results.get('conversation', []),
+        usage_data=results.get('usage', []),
+        errors=errors,
+        timings=timings
     )
 
 
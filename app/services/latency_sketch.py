@@ -0,0 +1,276 @@
+"""
+NEXUS Latency Sketches
+Mergeable, bounded-memory quantile sketches for request and agent latency.
+
+`DDSketch` keeps counts in logarithmic buckets so every quantile estimate
+is within `relative_accuracy` of the true value, whatever the traffic
+volume. Memory is capped at `max_buckets` (the lowest buckets collapse
+first), so reads cost at most one pass over that fixed number of buckets,
+never a sort of raw samples. Sketches with the same accuracy merge exactly
+by adding bucket counts, and serialize to plain dicts so per-worker
+snapshots can be combined.
+
+`WindowedSketch` is a ring of per-slot sketches (one minute each by
+default) covering a sliding window; old slots are recycled in place.
+`LatencyRegistry` holds one windowed sketch per key (endpoint, agent...),
+with a cap on distinct keys.
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from ..config import settings
+
+# Values at or below this are counted as zero (no log bucket)
+MIN_INDEXABLE = 1e-9
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class DDSketch:
+    """Relative-error quantile sketch over positive values."""
+
+    __slots__ = (
+        "relative_accuracy", "gamma", "_log_gamma", "max_buckets",
+        "bins", "zero_count", "count", "sum", "min", "max",
+    )
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Add `count` observations of `value`."""
+        if value <= MIN_INDEXABLE:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + count
+            if len(self.bins) > self.max_buckets:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self) -> None:
+        """Fold the lowest buckets into the first kept one to respect max_buckets."""
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_buckets
+        folded = sum(self.bins.pop(k) for k in keys[:excess])
+        self.bins[keys[excess]] += folded
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add another sketch's observations into this one."""
+        if other.count == 0:
+            return
+        if not math.isclose(other.gamma, self.gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        if len(self.bins) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _value(self, index: int) -> float:
+        # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> List[Optional[float]]:
+        """Estimate several quantiles in one pass over the buckets."""
+        if self.count == 0:
+            return [None] * len(qs)
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        results: List[Optional[float]] = [None] * len(qs)
+        keys = sorted(self.bins)
+        cumulative = self.zero_count
+        position = 0
+        for i in order:
+            rank = qs[i] * (self.count - 1)
+            if rank < self.zero_count:
+                results[i] = 0.0
+                continue
+            while position < len(keys) and cumulative + self.bins[keys[position]] <= rank:
+                cumulative += self.bins[keys[position]]
+                position += 1
+            index = keys[min(position, len(keys) - 1)]
+            results[i] = min(max(self._value(index), self.min), self.max)
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-th quantile (0 <= q <= 1)."""
+        return self.quantiles((q,))[0]
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, extremes and p50/p95/p99."""
+        p50, p95, p99 = self.quantiles(DEFAULT_QUANTILES)
+        return {
+            "count": self.count,
+            "avg": round(self.sum / self.count, 3) if self.count else None,
+            "min": round(self.min, 3) if self.count else None,
+            "max": round(self.max, 3) if self.count else None,
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "p99": round(p99, 3) if p99 is not None else None,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form for shipping between workers."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(k): v for k, v in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_buckets: int = 2048) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"], max_buckets)
+        sketch.bins = {int(k): v for k, v in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+class WindowedSketch:
+    """Ring buffer of per-slot sketches covering a sliding time window."""
+
+    def __init__(self, slot_seconds: float = 60.0, slots: int = 60, relative_accuracy: float = 0.01):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self.relative_accuracy = relative_accuracy
+        self._sketches: List[Optional[DDSketch]] = [None] * slots
+        self._slot_ids: List[int] = [-1] * slots
+        self.last_seen = 0.0
+
+    @property
+    def window_seconds(self) -> float:
+        return self.slot_seconds * self.slots
+
+    def add(self, value: float, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        slot_id = int(now // self.slot_seconds)
+        position = slot_id % self.slots
+        sketch = self._sketches[position]
+        if sketch is None or self._slot_ids[position] != slot_id:
+            sketch = self._sketches[position] = DDSketch(self.relative_accuracy)
+            self._slot_ids[position] = slot_id
+        sketch.add(value)
+        self.last_seen = now
+
+    def merged(self, window_seconds: Optional[float] = None, now: Optional[float] = None) -> DDSketch:
+        """One sketch covering the last `window_seconds` (default: the whole ring)."""
+        now = time.time() if now is None else now
+        current = int(now // self.slot_seconds)
+        span = self.slots if window_seconds is None else max(1, math.ceil(window_seconds / self.slot_seconds))
+        oldest = current - min(span, self.slots) + 1
+        merged = DDSketch(self.relative_accuracy)
+        for sketch, slot_id in zip(self._sketches, self._slot_ids):
+            if sketch is not None and oldest <= slot_id <= current:
+                merged.merge(sketch)
+        return merged
+
+
+class LatencyRegistry:
+    """Windowed latency sketches keyed by endpoint, agent, provider..."""
+
+    def __init__(
+        self,
+        slot_seconds: float = 60.0,
+        slots: int = 60,
+        relative_accuracy: float = 0.01,
+        max_keys: int = 1000,
+    ):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self.relative_accuracy = relative_accuracy
+        self.max_keys = max_keys
+        self._sketches: Dict[str, WindowedSketch] = {}
+        self.dropped_keys = 0
+
+    def record(self, key: str, value: float, now: Optional[float] = None) -> None:
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            if len(self._sketches) >= self.max_keys:
+                self.dropped_keys += 1
+                return
+            sketch = self._sketches[key] = WindowedSketch(self.slot_seconds, self.slots, self.relative_accuracy)
+        sketch.add(value, now)
+
+    def keys(self) -> List[str]:
+        return list(self._sketches)
+
+    def sketch(self, key: str, window_seconds: Optional[float] = None, now: Optional[float] = None) -> DDSketch:
+        windowed = self._sketches.get(key)
+        if windowed is None:
+            return DDSketch(self.relative_accuracy)
+        return windowed.merged(window_seconds, now)
+
+    def summary(self, key: str, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        return self.sketch(key, window_seconds).summary()
+
+    def summaries(self, window_seconds: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Summary per key with traffic in the window."""
+        result = {}
+        for key in list(self._sketches):
+            sketch = self.sketch(key, window_seconds)
+            if sketch.count:
+                result[key] = sketch.summary()
+        return result
+
+    def snapshot(self, window_seconds: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Serialized per-key sketches, for merging with other workers' snapshots."""
+        return {key: self.sketch(key, window_seconds).to_dict() for key in list(self._sketches)}
+
+    @staticmethod
+    def merge_snapshots(snapshots: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, DDSketch]:
+        """Combine snapshots from several workers into one sketch per key."""
+        merged: Dict[str, DDSketch] = {}
+        for snapshot in snapshots:
+            for key, data in snapshot.items():
+                sketch = DDSketch.from_dict(data)
+                if key in merged:
+                    merged[key].merge(sketch)
+                else:
+                    merged[key] = sketch
+        return merged
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop keys with no traffic for a whole window. Returns how many were dropped."""
+        now = time.time() if now is None else now
+        stale = [key for key, sketch in self._sketches.items() if now - sketch.last_seen > sketch.window_seconds]
+        for key in stale:
+            del self._sketches[key]
+        return len(stale)
+
+
+def new_latency_registry() -> LatencyRegistry:
+    """A registry configured from settings."""
+    return LatencyRegistry(
+        slot_seconds=settings.latency_window_slot_seconds,
+        slots=settings.latency_window_slots,
+        relative_accuracy=settings.latency_sketch_accuracy,
+        max_keys=settings.latency_sketch_max_keys,
+    )
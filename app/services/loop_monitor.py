@@ -0,0 +1,273 @@
+"""
+NEXUS Event Loop Monitor
+Continuous scheduling-lag measurement and blocked-loop detection.
+
+A heartbeat task on the loop wakes every `interval_seconds` and records
+how late it woke (lag) into /metrics. A watchdog thread watches that
+heartbeat: when it hasn't advanced for `block_threshold_ms`, something is
+running on the loop without yielding (sync I/O, CPU-heavy encode...), and
+the watchdog captures the loop thread's stack at that moment. Captures
+are sampled (`stack_sample_rate`, at most one per stall and
+`max_captures_per_minute`) into a ring buffer served by
+/admin/event-loop. When the loop resumes, the stall's total duration is
+filled in; long stalls raise a PerformanceMonitor alert (with cooldown)
+and the worst lag per minute is recorded as a system latency metric.
+"""
+
+import asyncio
+import logging
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config import settings
+from ..metrics import record_loop_lag
+
+logger = logging.getLogger(__name__)
+
+# Frames from asyncio itself are plumbing, not the blocking code
+_SKIP_FILES = ("/asyncio/",)
+
+
+class LoopStall:
+    """One period during which the loop didn't run the heartbeat."""
+
+    __slots__ = ("started_at", "detected_after_ms", "duration_ms", "stack", "task")
+
+    def __init__(self, started_at: float, detected_after_ms: float, stack: List[str], task: Optional[str]):
+        self.started_at = started_at
+        self.detected_after_ms = detected_after_ms
+        self.duration_ms: Optional[float] = None
+        self.stack = stack
+        self.task = task
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "detected_after_ms": round(self.detected_after_ms, 1),
+            "duration_ms": round(self.duration_ms, 1) if self.duration_ms is not None else None,
+            "task": self.task,
+            "stack": self.stack,
+        }
+
+
+class LoopMonitor:
+    """Heartbeat-based lag sampler with a stack-capturing watchdog thread."""
+
+    def __init__(
+        self,
+        interval_seconds: float = 0.1,
+        block_threshold_ms: float = 250.0,
+        alert_threshold_ms: float = 1000.0,
+        stack_sample_rate: float = 1.0,
+        max_captures_per_minute: int = 6,
+        max_stalls: int = 50,
+        alert_cooldown_seconds: float = 300.0,
+    ):
+        self.interval_seconds = interval_seconds
+        self.block_threshold_ms = block_threshold_ms
+        self.alert_threshold_ms = alert_threshold_ms
+        self.stack_sample_rate = stack_sample_rate
+        self.max_captures_per_minute = max_captures_per_minute
+        self.alert_cooldown_seconds = alert_cooldown_seconds
+
+        self.stalls: Deque[LoopStall] = deque(maxlen=max_stalls)
+        self._lock = threading.Lock()
+        self._heartbeat = time.monotonic()
+        self._open_stall: Optional[LoopStall] = None
+        self._stall_flagged = False
+        self._capture_times: Deque[float] = deque()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._background: set = set()
+
+        # Counters
+        self._samples = 0
+        self._max_lag_ms = 0.0
+        self._minute_max_lag_ms = 0.0
+        self._minute_started = time.monotonic()
+        self._stall_count = 0
+        self._captures_skipped = 0
+        self._last_alert: Optional[float] = None
+
+    # ===== Lifecycle =====
+
+    async def start(self) -> None:
+        """Start the heartbeat on the running loop and the watchdog thread."""
+        if self._task and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    # ===== Loop side =====
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.beat(max(0.0, time.monotonic() - expected))
+
+    def beat(self, lag_seconds: float) -> None:
+        """Record one heartbeat; closes any stall the watchdog opened."""
+        now = time.monotonic()
+        with self._lock:
+            stall, self._open_stall = self._open_stall, None
+            self._stall_flagged = False
+            self._heartbeat = now
+
+        lag_ms = lag_seconds * 1000
+        self._samples += 1
+        self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+        self._minute_max_lag_ms = max(self._minute_max_lag_ms, lag_ms)
+        record_loop_lag(lag_seconds)
+
+        if stall is not None:
+            stall.duration_ms = max(lag_ms, stall.detected_after_ms)
+            logger.warning(
+                f"Event loop blocked for {stall.duration_ms:.0f}ms"
+                + (f" in {stall.task}" if stall.task else "")
+                + (f" at {stall.stack[-1]}" if stall.stack else "")
+            )
+        if lag_ms >= self.alert_threshold_ms:
+            self._maybe_alert(lag_ms, stall)
+        if now - self._minute_started >= 60:
+            self._spawn(self._record_minute_lag(self._minute_max_lag_ms))
+            self._minute_max_lag_ms = 0.0
+            self._minute_started = now
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _maybe_alert(self, lag_ms: float, stall: Optional[LoopStall]) -> None:
+        now = time.monotonic()
+        if self._last_alert is not None and now - self._last_alert < self.alert_cooldown_seconds:
+            return
+        self._last_alert = now
+        self._spawn(self._alert(lag_ms, stall))
+
+    async def _alert(self, lag_ms: float, stall: Optional[LoopStall]) -> None:
+        from ..agents.monitoring import performance_monitor, AlertSeverity
+        try:
+            await performance_monitor.create_alert(
+                title="Event loop blocked",
+                message=f"The event loop stalled for {lag_ms:.0f}ms; requests were delayed",
+                severity=AlertSeverity.ERROR if lag_ms >= self.alert_threshold_ms * 5 else AlertSeverity.WARNING,
+                source="system",
+                metadata={
+                    "lag_ms": round(lag_ms, 1),
+                    "threshold_ms": self.alert_threshold_ms,
+                    "stall": stall.to_dict() if stall else None,
+                }
+            )
+        except Exception as e:
+            logger.error(f"Failed to raise event loop alert: {e}")
+
+    async def _record_minute_lag(self, max_lag_ms: float) -> None:
+        from ..agents.monitoring import performance_monitor, MetricType, SYSTEM_AGENT_ID
+        try:
+            await performance_monitor.record_metric(
+                SYSTEM_AGENT_ID,
+                MetricType.LATENCY,
+                max_lag_ms,
+                {"metric": "event_loop_lag_max_ms"}
+            )
+        except Exception as e:
+            logger.error(f"Failed to record event loop lag: {e}")
+
+    # ===== Watchdog thread =====
+
+    def _watch(self) -> None:
+        poll = min(self.interval_seconds, self.block_threshold_ms / 1000 / 2)
+        while not self._stop.wait(poll):
+            blocked_ms = (time.monotonic() - self._heartbeat) * 1000
+            if blocked_ms < self.block_threshold_ms + self.interval_seconds * 1000:
+                continue
+            with self._lock:
+                if self._stall_flagged:
+                    continue
+                self._stall_flagged = True
+            self._stall_count += 1
+            stall = self._capture(blocked_ms)
+            if stall is not None:
+                with self._lock:
+                    if self._stall_flagged:
+                        self._open_stall = stall
+                self.stalls.append(stall)
+
+    def _capture(self, blocked_ms: float) -> Optional[LoopStall]:
+        """Snapshot the loop thread's stack, subject to sampling and rate limits."""
+        now = time.monotonic()
+        while self._capture_times and now - self._capture_times[0] > 60:
+            self._capture_times.popleft()
+        if len(self._capture_times) >= self.max_captures_per_minute or random.random() >= self.stack_sample_rate:
+            self._captures_skipped += 1
+            return None
+        self._capture_times.append(now)
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = []
+        if frame is not None:
+            for entry in traceback.extract_stack(frame):
+                if any(skip in entry.filename for skip in _SKIP_FILES):
+                    continue
+                stack.append(f"{entry.filename}:{entry.lineno} in {entry.name}: {entry.line or ''}".strip())
+        task = None
+        try:
+            current = asyncio.current_task(self._loop) if self._loop else None
+            task = current.get_name() if current else None
+        except RuntimeError:
+            pass
+        return LoopStall(time.time() - blocked_ms / 1000, blocked_ms, stack[-25:], task)
+
+    # ===== Stats =====
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lag summary and the most recent captured stalls (newest first)."""
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "interval_ms": self.interval_seconds * 1000,
+            "block_threshold_ms": self.block_threshold_ms,
+            "samples": self._samples,
+            "max_lag_ms": round(self._max_lag_ms, 1),
+            "stalls_detected": self._stall_count,
+            "captures_skipped": self._captures_skipped,
+            "recent_stalls": [stall.to_dict() for stall in reversed(self.stalls)],
+        }
+
+
+# Global loop monitor
+loop_monitor = LoopMonitor(
+    interval_seconds=settings.loop_monitor_interval_seconds,
+    block_threshold_ms=settings.loop_monitor_block_threshold_ms,
+    alert_threshold_ms=settings.loop_monitor_alert_threshold_ms,
+    stack_sample_rate=settings.loop_monitor_stack_sample_rate,
+)
@@ -0,0 +1,169 @@
+"""
+NEXUS Memory Cache
+Bounded in-process cache of memory rows for MemorySystem.
+
+A segmented LRU: new entries go into a probationary segment and move to a
+protected segment on their second hit, so a one-off scan over many
+memories (a big search, a bulk store) can't flush the memories that are
+read repeatedly. The cache is bounded by entry count and by an estimate
+of the bytes it holds; probationary entries are evicted first.
+
+Entries carry the memory's expiry so soft-expired memories are never
+served, and its created_at so metadata predicates can be checked without
+going back to Postgres.
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+# Rough per-entry cost of the cache bookkeeping and the result object itself
+ENTRY_OVERHEAD_BYTES = 512
+
+
+class CacheEntry:
+    __slots__ = ("value", "nbytes", "expires_at", "created_at")
+
+    def __init__(self, value: Any, nbytes: int, expires_at: Optional[float], created_at: Optional[datetime]):
+        self.value = value
+        self.nbytes = nbytes
+        self.expires_at = expires_at
+        self.created_at = created_at
+
+
+def estimate_bytes(*parts: Any) -> int:
+    """Approximate memory held by strings, containers and scalars."""
+    total = ENTRY_OVERHEAD_BYTES
+    stack = list(parts)
+    while stack:
+        part = stack.pop()
+        total += sys.getsizeof(part)
+        if isinstance(part, dict):
+            stack.extend(part.keys())
+            stack.extend(part.values())
+        elif isinstance(part, (list, tuple, set)):
+            stack.extend(part)
+    return total
+
+
+class MemoryCache:
+    """Segmented LRU bounded by entries and bytes."""
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 32 * 1024 * 1024, protected_ratio: float = 0.8):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.protected_ratio = protected_ratio
+        self._probation: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._protected: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._probation) + len(self._protected)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._probation or key in self._protected
+
+    # ===== Reads =====
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        entry = self._protected.get(key)
+        if entry is not None:
+            self._protected.move_to_end(key)
+        else:
+            entry = self._probation.pop(key, None)
+            if entry is not None:
+                # Second hit: promote
+                self._protected[key] = entry
+                self._demote_overflow()
+
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= time.time():
+            self._remove(key)
+            self._stats["expired"] += 1
+            entry = None
+
+        self._stats["hits" if entry is not None else "misses"] += 1
+        return entry
+
+    def get(self, key: str) -> Any:
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    # ===== Writes =====
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        nbytes: int,
+        expires_at: Optional[float] = None,
+        created_at: Optional[datetime] = None
+    ) -> None:
+        """Insert or refresh an entry; an existing entry keeps its segment."""
+        if nbytes > self.max_bytes:
+            return
+        entry = CacheEntry(value, nbytes, expires_at, created_at)
+        old = self._protected.get(key)
+        if old is not None:
+            self._bytes -= old.nbytes
+            self._protected[key] = entry
+            self._protected.move_to_end(key)
+        else:
+            old = self._probation.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._probation[key] = entry
+        self._bytes += nbytes
+        self._evict()
+
+    def invalidate(self, key: str) -> bool:
+        if self._remove(key):
+            self._stats["invalidations"] += 1
+            return True
+        return False
+
+    def invalidate_many(self, keys: Iterable[str]) -> int:
+        return sum(self.invalidate(key) for key in keys)
+
+    def clear(self) -> None:
+        self._stats["invalidations"] += len(self)
+        self._probation.clear()
+        self._protected.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> bool:
+        entry = self._probation.pop(key, None) or self._protected.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry.nbytes
+        return True
+
+    def _demote_overflow(self) -> None:
+        limit = int(self.max_entries * self.protected_ratio)
+        while len(self._protected) > limit:
+            key, entry = self._protected.popitem(last=False)
+            self._probation[key] = entry
+
+    def _evict(self) -> None:
+        while len(self) > self.max_entries or self._bytes > self.max_bytes:
+            segment = self._probation if self._probation else self._protected
+            _, entry = segment.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self._stats["evictions"] += 1
+
+    # ===== Stats =====
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "lookups": lookups,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self),
+            "protected_entries": len(self._protected),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,513 @@
+"""
+NEXUS Memory Consolidation
+Replace clusters of near-duplicate memories with one summarized memory.
+
+Memories are streamed from Postgres in (created_at, id) order, one chunk of
+embeddings at a time, starting after the job's watermark. Each embedding
+joins the cluster with the most similar centroid if it is within
+`similarity_threshold` (centroids live in a VectorIndex per agent), or
+starts a new cluster: a single-pass agglomeration that only ever holds one
+chunk of embeddings plus the centroids.
+
+Clusters of `min_cluster_size` or more are summarized with one LLM call
+each. The summary is stored as a new memory in the same transaction that
+archives the originals (soft-expired and linked through memory_clusters /
+memory_cluster_members), so a failure leaves neither behind, and their
+vectors leave ChromaDB. Earlier summaries seed the clusters, so
+new memories on an already consolidated topic are folded into its summary.
+
+The watermark is saved when a run ends, and never past a cluster that
+failed to summarize, so an interrupted or failed run is simply repeated:
+archived memories and summaries are skipped by the stream. Summarize runs
+first replay the unconsolidated memories created within `lookback_hours`
+before the watermark, so near-duplicates that arrive in different runs
+still reach `min_cluster_size` together.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..database import db
+from ..metrics import metrics
+from .ai_providers import ai_request
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# source_type of the memories this module writes
+CONSOLIDATION_SOURCE = "consolidation"
+
+# Watermark scope used when a job covers every agent
+ALL_AGENTS = "all"
+
+START_POSITION: Tuple[datetime, str] = (
+    datetime(1970, 1, 1, tzinfo=timezone.utc),
+    "00000000-0000-0000-0000-000000000000",
+)
+
+# Characters of each member's content sent to the summarizer
+MEMBER_PROMPT_CHARS = 600
+
+CONSOLIDATE_SYSTEM = """You merge related memories of an AI assistant into one memory.
+Keep every distinct fact, name, date, number and decision; drop repetition.
+Write plain prose in the third person, at most 120 words.
+Respond with the merged memory only."""
+
+MEMORY_CONSOLIDATION = metrics.counter(
+    "nexus_memory_consolidation_memories", "Memories handled by consolidation jobs", ("job", "outcome")
+)
+
+
+@dataclass
+class MemoryCluster:
+    """Near-duplicate memories of one agent, and the summary they extend (if any)."""
+
+    cluster_id: str
+    agent_id: Optional[str]
+    centroid: np.ndarray  # Sum of the members' unit vectors
+    member_ids: List[str] = field(default_factory=list)
+    summary_id: Optional[str] = None
+
+    @property
+    def coherence(self) -> float:
+        """Mean cosine similarity of the members to their centroid."""
+        count = len(self.member_ids) + (1 if self.summary_id else 0)
+        return float(np.linalg.norm(self.centroid)) / count if count else 0.0
+
+
+class Agglomerator:
+    """
+    Single-pass threshold clustering over unit vectors, per agent.
+
+    A cluster stops accepting members (and leaves the centroid index) once
+    it reaches `max_cluster_size`, which also bounds each summary prompt.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.9, max_cluster_size: int = 20):
+        self.similarity_threshold = similarity_threshold
+        self.max_cluster_size = max_cluster_size
+        self.clusters: Dict[str, MemoryCluster] = {}
+        self._indexes: Dict[Optional[str], VectorIndex] = {}
+
+    def _index(self, agent_id: Optional[str], dimension: int) -> VectorIndex:
+        index = self._indexes.get(agent_id)
+        if index is None:
+            index = self._indexes[agent_id] = VectorIndex(dimension)
+        return index
+
+    def seed(self, cluster_id: str, agent_id: Optional[str], summary_id: str, embedding) -> None:
+        """Register an existing summary as an open cluster."""
+        vector = _unit(embedding)
+        self.clusters[cluster_id] = MemoryCluster(cluster_id, agent_id, vector.copy(), summary_id=summary_id)
+        self._index(agent_id, vector.shape[0]).add(cluster_id, vector)
+
+    def add(self, memory_id: str, agent_id: Optional[str], embedding, create: bool = True) -> Optional[MemoryCluster]:
+        """Place a memory in its nearest cluster, or a new one unless `create` is False."""
+        vector = _unit(embedding)
+        index = self._index(agent_id, vector.shape[0])
+        nearest = index.search(vector, k=1)
+        if nearest and nearest[0][1] >= self.similarity_threshold:
+            cluster = self.clusters[nearest[0][0]]
+            cluster.centroid += vector
+        elif not create:
+            return None
+        else:
+            cluster = MemoryCluster(str(uuid.uuid4()), agent_id, vector.copy())
+            self.clusters[cluster.cluster_id] = cluster
+        cluster.member_ids.append(memory_id)
+
+        if len(cluster.member_ids) >= self.max_cluster_size:
+            index.remove(cluster.cluster_id)
+        else:
+            index.add(cluster.cluster_id, cluster.centroid)
+        return cluster
+
+
+def _unit(embedding) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+class ConsolidationEngine:
+    """Runs consolidation passes for MemorySystem and keeps their throughput stats."""
+
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        similarity_threshold: float = 0.9,
+        min_cluster_size: int = 3,
+        max_cluster_size: int = 20,
+        max_memories_per_run: int = 5000,
+        concurrency: int = 4,
+        lookback_hours: float = 24.0
+    ):
+        self.chunk_size = chunk_size
+        self.similarity_threshold = similarity_threshold
+        self.min_cluster_size = min_cluster_size
+        self.max_cluster_size = max_cluster_size
+        self.max_memories_per_run = max_memories_per_run
+        self.concurrency = concurrency
+        self.lookback_hours = lookback_hours
+        self._totals = {
+            "runs": 0, "memories_processed": 0, "memories_created": 0,
+            "memories_archived": 0, "llm_calls": 0, "llm_failures": 0, "seconds": 0.0,
+        }
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    async def run(
+        self,
+        memory_system,
+        job_type: str,
+        agent_id: Optional[str] = None,
+        summarize: bool = True,
+        new_clusters: bool = True
+    ) -> Dict[str, Any]:
+        """
+        One incremental pass over the memories created since the job's watermark.
+
+        Args:
+            memory_system: MemorySystem that stores summaries and owns the caches
+            job_type: Job name; each job type keeps its own watermark
+            agent_id: Specific agent or None for all agents
+            summarize: Summarize and archive clusters; otherwise only record them
+            new_clusters: Form new clusters; otherwise only extend existing summaries
+
+        Returns:
+            Job results in consolidate_memories' format, plus throughput stats
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        scope = agent_id or ALL_AGENTS
+        agglomerator = Agglomerator(self.similarity_threshold, self.max_cluster_size)
+
+        stage = time.perf_counter()
+        if summarize:
+            for row in await self._load_summaries(agent_id):
+                agglomerator.seed(
+                    str(row["source_id"] or uuid.uuid4()),
+                    _agent_key(row["agent_id"]),
+                    str(row["id"]),
+                    row["embedding"]
+                )
+        watermark = await self._load_watermark(job_type, scope)
+        timings["load"] = time.perf_counter() - stage
+
+        # 1. Stream embeddings and cluster them
+        stage = time.perf_counter()
+        replayed = 0
+        if summarize and new_clusters and watermark != START_POSITION:
+            replayed = await self._replay(agglomerator, watermark, agent_id)
+        positions: List[Tuple[datetime, str]] = []
+        position = watermark
+        while len(positions) < self.max_memories_per_run:
+            limit = min(self.chunk_size, self.max_memories_per_run - len(positions))
+            rows = await self._fetch_chunk(position, agent_id, limit)
+            for row in rows:
+                memory_id = str(row["id"])
+                agent_key = _agent_key(row["agent_id"])
+                agglomerator.add(memory_id, agent_key, row["embedding"], create=new_clusters)
+                positions.append((row["created_at"], memory_id))
+            if rows:
+                position = positions[-1]
+            if len(rows) < limit:
+                break
+        timings["cluster"] = time.perf_counter() - stage
+
+        ready = [
+            cluster for cluster in agglomerator.clusters.values()
+            if cluster.member_ids and (
+                cluster.summary_id is not None or len(cluster.member_ids) >= self.min_cluster_size
+            )
+        ]
+
+        # 2. One LLM call per cluster, then archive its members
+        stage = time.perf_counter()
+        results = {"created": 0, "archived": 0, "llm_calls": 0, "failed": []}
+        if summarize:
+            await self._summarize_clusters(memory_system, ready, results)
+        else:
+            for cluster in ready:
+                await self._write_cluster(cluster, summary=None, archive=False)
+        timings["summarize"] = time.perf_counter() - stage
+
+        # 3. Advance the watermark, stopping short of any cluster that failed
+        if positions:
+            failed = {memory_id for cluster in results["failed"] for memory_id in cluster.member_ids}
+            cutoff = next((i for i, (_, memory_id) in enumerate(positions) if memory_id in failed), len(positions))
+            if cutoff:
+                await self._save_watermark(job_type, scope, positions[cutoff - 1], cutoff)
+
+        elapsed = time.perf_counter() - started
+        timings["total"] = elapsed
+        report = {
+            "memories_processed": len(positions),
+            "memories_replayed": replayed,
+            "memories_created": results["created"],
+            "memories_archived": results["archived"],
+            "clusters_found": sum(1 for c in agglomerator.clusters.values() if c.member_ids),
+            "clusters_consolidated": len(ready) - len(results["failed"]),
+            "llm_calls": results["llm_calls"],
+            "llm_failures": len(results["failed"]),
+            "memories_per_second": round(len(positions) / elapsed, 2) if elapsed > 0 else 0.0,
+            "timings_ms": {name: round(seconds * 1000, 2) for name, seconds in timings.items()},
+            "description": (
+                f"Consolidated {results['archived']} memories into {results['created']} summaries"
+                if summarize else f"Recorded {len(ready)} clusters over {len(positions)} memories"
+            ),
+        }
+        self._record(job_type, report, elapsed)
+        return report
+
+    # ===== Summaries =====
+
+    async def _summarize_clusters(self, memory_system, clusters: List[MemoryCluster], results: Dict[str, Any]) -> None:
+        ids = [memory_id for cluster in clusters for memory_id in cluster.member_ids]
+        ids += [cluster.summary_id for cluster in clusters if cluster.summary_id]
+        rows = await db.fetch_all(
+            """
+            SELECT id, memory_type, content, importance_score, strength_score, tags
+            FROM memories
+            WHERE id = ANY($1) AND expires_at IS NULL
+            """,
+            ids
+        ) if ids else []
+        by_id = {str(row["id"]): row for row in rows}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def consolidate(cluster: MemoryCluster) -> None:
+            # Members archived by a concurrent run have dropped out of by_id
+            cluster.member_ids = [m for m in cluster.member_ids if m in by_id]
+            summary_row = by_id.get(cluster.summary_id) if cluster.summary_id else None
+            if cluster.summary_id and summary_row is None:
+                cluster.summary_id = None
+            if not cluster.member_ids or (summary_row is None and len(cluster.member_ids) < self.min_cluster_size):
+                return
+
+            members = [by_id[m] for m in cluster.member_ids]
+            sources = ([summary_row] if summary_row else []) + members
+            async with semaphore:
+                try:
+                    results["llm_calls"] += 1
+                    response = await ai_request(
+                        prompt=_summary_prompt(summary_row, members),
+                        task_type="summarization",
+                        system=CONSOLIDATE_SYSTEM
+                    )
+                    summary = response["content"].strip()
+                    if not summary:
+                        raise ValueError("empty summary")
+                    await self._store_summary(memory_system, cluster, summary, sources)
+                except Exception as e:
+                    logger.warning(f"Consolidation of cluster {cluster.cluster_id} failed: {e}")
+                    results["failed"].append(cluster)
+                    return
+
+            memory_system.memory_cache.invalidate_many(str(row["id"]) for row in sources)
+            await memory_system._delete_memories_from_chromadb(sources)
+            results["created"] += 1
+            results["archived"] += len(sources)
+
+        await asyncio.gather(*(consolidate(cluster) for cluster in clusters))
+
+    async def _store_summary(self, memory_system, cluster: MemoryCluster, summary: str, sources: List[Dict[str, Any]]) -> str:
+        """Store the summary and archive its sources in one transaction."""
+        from ..agents.memory import MemoryRecord, MemoryType
+
+        memory_type = Counter(row["memory_type"] for row in sources).most_common(1)[0][0]
+        tags = sorted({tag for row in sources for tag in (row["tags"] or [])})
+        record = MemoryRecord(
+            agent_id=cluster.agent_id,
+            content=summary,
+            memory_type=MemoryType(memory_type),
+            importance_score=max(float(row["importance_score"]) for row in sources),
+            strength_score=max(float(row["strength_score"]) for row in sources),
+            tags=tags,
+            metadata={"cluster_id": cluster.cluster_id, "consolidated_count": len(sources)},
+            source_type=CONSOLIDATION_SOURCE,
+            source_id=cluster.cluster_id
+        )
+        await memory_system.store_memories_bulk(
+            [record],
+            in_transaction=lambda conn: self._write_cluster_rows(
+                conn, cluster, summary=summary, archive=True, summary_id=record.memory_id
+            )
+        )
+        return record.memory_id
+
+    async def _write_cluster(self, cluster: MemoryCluster, summary: Optional[str], archive: bool) -> None:
+        """Upsert the cluster with its members in one transaction."""
+        async with db.connection() as conn:
+            async with conn.transaction():
+                await self._write_cluster_rows(conn, cluster, summary, archive)
+
+    async def _write_cluster_rows(
+        self,
+        conn,
+        cluster: MemoryCluster,
+        summary: Optional[str],
+        archive: bool,
+        summary_id: Optional[str] = None
+    ) -> None:
+        """Upsert the cluster with its members and, when archiving, expire them."""
+        centroid = _unit(cluster.centroid)
+        archived = cluster.member_ids + ([cluster.summary_id] if cluster.summary_id else [])
+        await conn.execute(
+            """
+            INSERT INTO memory_clusters
+            (id, agent_id, cluster_name, cluster_summary, centroid_embedding,
+             member_count, coherence_score)
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            ON CONFLICT (id) DO UPDATE SET
+                cluster_summary = EXCLUDED.cluster_summary,
+                centroid_embedding = EXCLUDED.centroid_embedding,
+                member_count = memory_clusters.member_count + EXCLUDED.member_count,
+                coherence_score = EXCLUDED.coherence_score,
+                updated_at = NOW()
+            """,
+            cluster.cluster_id,
+            cluster.agent_id,
+            (summary or "")[:80] or f"cluster {cluster.cluster_id[:8]}",
+            summary,
+            centroid.tolist(),
+            len(cluster.member_ids),
+            round(min(cluster.coherence, 0.99), 2)
+        )
+        await conn.executemany(
+            """
+            INSERT INTO memory_cluster_members (cluster_id, memory_id, distance_to_centroid)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (cluster_id, memory_id) DO NOTHING
+            """,
+            [(cluster.cluster_id, memory_id, None) for memory_id in cluster.member_ids]
+        )
+        if archive:
+            await conn.execute(
+                """
+                UPDATE memories
+                SET expires_at = NOW(),
+                    metadata = COALESCE(metadata, '{}'::jsonb)
+                               || jsonb_build_object('consolidated_into', $2::text)
+                WHERE id = ANY($1)
+                """,
+                archived,
+                summary_id
+            )
+
+    # ===== Streaming and watermarks =====
+
+    async def _replay(self, agglomerator: Agglomerator, watermark: Tuple[datetime, str], agent_id: Optional[str]) -> int:
+        """Re-cluster unconsolidated memories from the lookback window behind the watermark."""
+        if self.lookback_hours <= 0:
+            return 0
+        position = (watermark[0] - timedelta(hours=self.lookback_hours), START_POSITION[1])
+        replayed = 0
+        while replayed < self.max_memories_per_run:
+            limit = min(self.chunk_size, self.max_memories_per_run - replayed)
+            rows = await self._fetch_chunk(position, agent_id, limit)
+            for row in rows:
+                position = (row["created_at"], str(row["id"]))
+                if position > watermark:
+                    return replayed
+                agglomerator.add(position[1], _agent_key(row["agent_id"]), row["embedding"])
+                replayed += 1
+            if len(rows) < limit:
+                break
+        return replayed
+
+    async def _fetch_chunk(self, position: Tuple[datetime, str], agent_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        return await db.fetch_all(
+            """
+            SELECT id, agent_id, created_at, content_embedding::real[] AS embedding
+            FROM memories
+            WHERE (created_at, id) > ($1, $2::uuid)
+              AND expires_at IS NULL
+              AND content_embedding IS NOT NULL
+              AND source_type IS DISTINCT FROM $3
+              AND (agent_id = $4 OR $4 IS NULL)
+            ORDER BY created_at, id
+            LIMIT $5
+            """,
+            position[0], position[1], CONSOLIDATION_SOURCE, agent_id, limit
+        )
+
+    async def _load_summaries(self, agent_id: Optional[str]) -> List[Dict[str, Any]]:
+        return await db.fetch_all(
+            """
+            SELECT id, agent_id, source_id, content_embedding::real[] AS embedding
+            FROM memories
+            WHERE source_type = $1
+              AND expires_at IS NULL
+              AND content_embedding IS NOT NULL
+              AND (agent_id = $2 OR $2 IS NULL)
+            """,
+            CONSOLIDATION_SOURCE, agent_id
+        )
+
+    async def _load_watermark(self, job_type: str, scope: str) -> Tuple[datetime, str]:
+        row = await db.fetch_one(
+            """
+            SELECT last_created_at, last_memory_id
+            FROM memory_consolidation_state
+            WHERE job_type = $1 AND scope = $2
+            """,
+            job_type, scope
+        )
+        return (row["last_created_at"], str(row["last_memory_id"])) if row else START_POSITION
+
+    async def _save_watermark(self, job_type: str, scope: str, position: Tuple[datetime, str], seen: int) -> None:
+        await db.execute(
+            """
+            INSERT INTO memory_consolidation_state
+            (job_type, scope, last_created_at, last_memory_id, memories_seen)
+            VALUES ($1, $2, $3, $4, $5)
+            ON CONFLICT (job_type, scope) DO UPDATE SET
+                last_created_at = EXCLUDED.last_created_at,
+                last_memory_id = EXCLUDED.last_memory_id,
+                memories_seen = memory_consolidation_state.memories_seen + EXCLUDED.memories_seen,
+                updated_at = NOW()
+            """,
+            job_type, scope, position[0], position[1], seen
+        )
+
+    # ===== Stats =====
+
+    def _record(self, job_type: str, report: Dict[str, Any], elapsed: float) -> None:
+        self._totals["runs"] += 1
+        self._totals["seconds"] += elapsed
+        for key in ("memories_processed", "memories_created", "memories_archived", "llm_calls", "llm_failures"):
+            self._totals[key] += report[key]
+        MEMORY_CONSOLIDATION.inc(report["memories_processed"], job=job_type, outcome="processed")
+        MEMORY_CONSOLIDATION.inc(report["memories_archived"], job=job_type, outcome="archived")
+        MEMORY_CONSOLIDATION.inc(report["memories_created"], job=job_type, outcome="created")
+        self._last_run = {"job_type": job_type, **report}
+
+    def get_stats(self) -> Dict[str, Any]:
+        seconds = self._totals["seconds"]
+        return {
+            **self._totals,
+            "seconds": round(seconds, 3),
+            "memories_per_second": round(self._totals["memories_processed"] / seconds, 2) if seconds else 0.0,
+            "last_run": self._last_run,
+        }
+
+
+def _agent_key(agent_id) -> Optional[str]:
+    return str(agent_id) if agent_id is not None else None
+
+
+def _summary_prompt(summary_row: Optional[Dict[str, Any]], members: List[Dict[str, Any]]) -> str:
+    parts = []
+    if summary_row:
+        parts.append(f"Existing summary:\n{summary_row['content'][:MEMBER_PROMPT_CHARS * 2]}\n")
+    parts.append("Memories to merge:" if not summary_row else "New memories to fold in:")
+    parts.extend(f"- {row['content'][:MEMBER_PROMPT_CHARS]}" for row in members)
+    return "\n".join(parts)
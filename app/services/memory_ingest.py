@@ -0,0 +1,198 @@
+"""
+NEXUS Memory Ingest Buffer
+Write-behind queue in front of MemorySystem.store_memories_bulk.
+
+Callers enqueue a memory and get its ID back immediately; a background
+flusher hands pending memories to the bulk writer `batch_size` at a time,
+when a batch fills or every `flush_interval_seconds`. Each batch costs one
+embedding call, one ChromaDB add per collection and one Postgres
+transaction instead of that many round trips per memory.
+
+Enqueued memories become searchable once their batch is flushed. A batch
+Postgres rejects is bisected so only the offending memories are lost;
+batches that fail for connection reasons are retried on the next flush up
+to `max_retries` times, then dropped and counted. When `max_pending`
+memories are buffered new ones are dropped rather than growing the queue
+without bound.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+
+def is_rejection(error: Exception) -> bool:
+    """True when the records themselves were refused, not the connection."""
+    if isinstance(error, asyncpg.PostgresConnectionError):
+        return False
+    # Client-side encoding errors (e.g. a non-UUID for a UUID column) are ValueErrors
+    return isinstance(error, (asyncpg.PostgresError, ValueError, TypeError))
+
+
+class MemoryIngestBuffer:
+    """Batches enqueued memories into bulk writes."""
+
+    def __init__(
+        self,
+        write_batch: Callable[[Sequence[Any]], Awaitable[Any]],
+        key: Callable[[Any], Hashable],
+        batch_size: int = 64,
+        flush_interval_seconds: float = 1.0,
+        max_pending: int = 5000,
+        max_retries: int = 3,
+    ):
+        self.write_batch = write_batch
+        self.key = key
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+
+        self._pending: List[Any] = []
+        self._attempts: Dict[Hashable, int] = {}  # record key -> failed connection-level writes
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        # Counters
+        self._enqueued = 0
+        self._written = 0
+        self._batches = 0
+        self._flush_errors = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._last_batch_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _ensure_started(self) -> None:
+        """Start the flusher on the running loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is loop and self._task and not self._task.done():
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    async def start(self) -> None:
+        """Start the background flusher."""
+        self._ensure_started()
+
+    async def close(self, timeout_seconds: float = 10.0) -> None:
+        """Stop the flusher and write everything still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(final=True), timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.error(f"Memory ingest drain timed out; dropping {len(self._pending)} memories")
+            self._dropped += len(self._pending)
+            self._pending = []
+
+    # ===== Write path =====
+
+    def enqueue(self, record: Any) -> bool:
+        """Buffer one memory. Returns False if it was dropped."""
+        self._ensure_started()
+        if len(self._pending) >= self.max_pending:
+            self._dropped += 1
+            return False
+        self._pending.append(record)
+        self._enqueued += 1
+        if len(self._pending) >= self.batch_size and self._wake:
+            self._wake.set()
+        return True
+
+    # ===== Flushing =====
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Memory ingest flush failed: {e}")
+
+    async def flush(self, final: bool = False) -> None:
+        """Write all buffered memories, `batch_size` per bulk call."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            pending, self._pending = self._pending, []
+            retry: List[Any] = []
+            for start in range(0, len(pending), self.batch_size):
+                retry.extend(await self._write(pending[start:start + self.batch_size], final))
+            # Failed batches go ahead of anything enqueued during the flush
+            self._pending = retry + self._pending
+
+    async def _write(self, batch: List[Any], final: bool) -> List[Any]:
+        """Write a batch, bisecting rejected ones. Returns the records to retry."""
+        started = time.perf_counter()
+        try:
+            await self.write_batch(batch)
+        except Exception as e:
+            self._flush_errors += 1
+            if not is_rejection(e):
+                return self._retryable(batch, e, final)
+            if len(batch) == 1:
+                logger.warning(f"Rejected memory {self.key(batch[0])}: {e}")
+                self._rejected += 1
+                self._attempts.pop(self.key(batch[0]), None)
+                return []
+            middle = len(batch) // 2
+            return await self._write(batch[:middle], final) + await self._write(batch[middle:], final)
+
+        self._last_batch_ms = (time.perf_counter() - started) * 1000
+        self._batches += 1
+        self._written += len(batch)
+        for record in batch:
+            self._attempts.pop(self.key(record), None)
+        return []
+
+    def _retryable(self, batch: List[Any], error: Exception, final: bool) -> List[Any]:
+        attempts = max(self._attempts.get(self.key(record), 0) for record in batch) + 1
+        if final or attempts >= self.max_retries:
+            logger.error(f"Dropping {len(batch)} memories after {attempts} failed writes: {error}")
+            self._dropped += len(batch)
+            for record in batch:
+                self._attempts.pop(self.key(record), None)
+            return []
+        logger.warning(f"Memory batch of {len(batch)} failed (attempt {attempts}), retrying: {error}")
+        for record in batch:
+            self._attempts[self.key(record)] = attempts
+        return batch
+
+    # ===== Stats =====
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "enqueued": self._enqueued,
+            "written": self._written,
+            "batches": self._batches,
+            "avg_batch_size": round(self._written / self._batches, 2) if self._batches else 0.0,
+            "flush_errors": self._flush_errors,
+            "dropped": self._dropped,
+            "rejected": self._rejected,
+            "last_batch_ms": round(self._last_batch_ms, 2),
+        }
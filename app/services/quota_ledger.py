@@ -0,0 +1,260 @@
+"""
+NEXUS Provider Quota Ledger
+Today's per-provider request/token/cost counters, held in process.
+
+`select_provider` reads the ledger instead of querying `ai_provider_usage`
+per candidate, so provider selection makes no database round trips.
+Counters are bumped as calls complete and reconciled periodically: from
+the table at startup and every `reconcile_seconds` (covering restarts and
+other writers), or from Redis when several workers share quotas
+(`QUOTA_LEDGER_BACKEND=redis`, atomic HINCRBY per call). Reconciling
+takes the max of local and remote values, since both only grow within a
+day.
+
+Each provider also has an in-process token bucket sized to its
+requests-per-minute limit, so bursts don't trip upstream 429s.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Optional, Set
+
+import redis.asyncio as redis
+
+from ..config import settings
+from ..database import db
+
+logger = logging.getLogger(__name__)
+
+# Redis hash per provider per day
+REDIS_KEY_PREFIX = "quota"
+REDIS_TTL_SECONDS = 2 * 24 * 3600
+
+
+@dataclass
+class ProviderQuota:
+    """Today's usage counters for one provider."""
+    requests: int = 0
+    tokens: int = 0
+    cost_usd: float = 0.0
+
+    def merge_max(self, requests: int, tokens: int, cost_usd: float) -> None:
+        self.requests = max(self.requests, requests)
+        self.tokens = max(self.tokens, tokens)
+        self.cost_usd = max(self.cost_usd, cost_usd)
+
+
+class TokenBucket:
+    """Requests-per-minute limiter with a burst of one minute's allowance."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.throttled = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.throttled += 1
+        return False
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+
+class QuotaLedger:
+    """In-process (optionally Redis-shared) daily quota counters and rate limits."""
+
+    def __init__(self, backend: str = "memory", reconcile_seconds: float = 30.0):
+        self.backend = backend
+        self.reconcile_seconds = reconcile_seconds
+        self._day = date.today()
+        self._quotas: Dict[str, ProviderQuota] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.redis_client: Optional[redis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+        self._background: Set[asyncio.Task] = set()
+
+        # Counters
+        self._reconciles = 0
+        self._reconcile_errors = 0
+        self._last_reconcile: Optional[float] = None
+
+    # ===== Lifecycle =====
+
+    async def start(self) -> None:
+        """Connect Redis if configured, load today's usage and start reconciling."""
+        if self.backend == "redis" and self.redis_client is None:
+            try:
+                self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+                await self.redis_client.ping()
+                logger.info("Quota ledger sharing counters through Redis")
+            except Exception as e:
+                logger.warning(f"Quota ledger Redis unavailable, using in-process counters: {e}")
+                self.redis_client = None
+        await self.reconcile()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop reconciling and wait for pending Redis increments."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.reconcile_seconds)
+            await self.reconcile()
+
+    # ===== Counters =====
+
+    def _roll_day(self) -> None:
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._quotas = {}
+
+    def _quota(self, provider: str) -> ProviderQuota:
+        self._roll_day()
+        quota = self._quotas.get(provider)
+        if quota is None:
+            quota = self._quotas[provider] = ProviderQuota()
+        return quota
+
+    def requests_today(self, provider: str) -> int:
+        """Requests made to `provider` today."""
+        return self._quota(provider).requests
+
+    def record(self, provider: str, tokens: int = 0, cost_usd: float = 0.0) -> None:
+        """Count a completed call."""
+        quota = self._quota(provider)
+        quota.requests += 1
+        quota.tokens += tokens
+        quota.cost_usd += cost_usd
+        if self.redis_client:
+            task = asyncio.ensure_future(self._redis_increment(provider, self._day, tokens, cost_usd))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    def _redis_key(self, provider: str, day: date) -> str:
+        return f"{REDIS_KEY_PREFIX}:{provider}:{day.isoformat()}"
+
+    async def _redis_increment(self, provider: str, day: date, tokens: int, cost_usd: float) -> None:
+        try:
+            key = self._redis_key(provider, day)
+            pipe = self.redis_client.pipeline()
+            pipe.hincrby(key, "requests", 1)
+            pipe.hincrby(key, "tokens", tokens)
+            pipe.hincrbyfloat(key, "cost_usd", cost_usd)
+            pipe.expire(key, REDIS_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Quota ledger Redis increment failed for {provider}: {e}")
+
+    async def reconcile(self) -> None:
+        """Merge today's counters from Redis (if shared) or the database."""
+        self._roll_day()
+        try:
+            if self.redis_client:
+                providers = set(self._quotas) | set(settings.provider_rate_limits)
+                pipe = self.redis_client.pipeline()
+                for provider in providers:
+                    pipe.hgetall(self._redis_key(provider, self._day))
+                for provider, values in zip(providers, await pipe.execute()):
+                    if values:
+                        self._quota(provider).merge_max(
+                            int(values.get("requests", 0)),
+                            int(values.get("tokens", 0)),
+                            float(values.get("cost_usd", 0.0)),
+                        )
+            else:
+                rows = await db.fetch_all(
+                    """
+                    SELECT provider, request_count, token_count, cost_usd
+                    FROM ai_provider_usage
+                    WHERE date = $1
+                    """,
+                    self._day
+                )
+                for row in rows:
+                    self._quota(row["provider"]).merge_max(
+                        int(row["request_count"] or 0),
+                        int(row["token_count"] or 0),
+                        float(row["cost_usd"] or 0.0),
+                    )
+            self._reconciles += 1
+            self._last_reconcile = time.time()
+        except Exception as e:
+            self._reconcile_errors += 1
+            logger.warning(f"Quota ledger reconcile failed: {e}")
+
+    # ===== Rate limiting =====
+
+    def _bucket(self, provider: str) -> Optional[TokenBucket]:
+        per_minute = settings.provider_rate_limits.get(provider)
+        if not per_minute:
+            return None
+        bucket = self._buckets.get(provider)
+        if bucket is None:
+            bucket = self._buckets[provider] = TokenBucket(per_minute)
+        return bucket
+
+    def try_acquire(self, provider: str) -> bool:
+        """Take a rate-limit token for `provider`. Providers without a limit always pass."""
+        bucket = self._bucket(provider)
+        return bucket.try_acquire() if bucket else True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-provider counters, rate-limit headroom and reconcile status."""
+        self._roll_day()
+        providers = set(self._quotas) | set(settings.provider_rate_limits)
+        stats: Dict[str, Any] = {}
+        for provider in sorted(providers):
+            quota = self._quotas.get(provider, ProviderQuota())
+            bucket = self._bucket(provider)
+            stats[provider] = {
+                "requests_today": quota.requests,
+                "tokens_today": quota.tokens,
+                "cost_today": round(quota.cost_usd, 6),
+                "rate_limit_per_minute": settings.provider_rate_limits.get(provider),
+                "rate_tokens_available": round(bucket.available(), 2) if bucket else None,
+                "throttled": bucket.throttled if bucket else 0,
+            }
+        return {
+            "backend": "redis" if self.redis_client else "memory",
+            "day": self._day.isoformat(),
+            "reconciles": self._reconciles,
+            "reconcile_errors": self._reconcile_errors,
+            "last_reconcile": self._last_reconcile,
+            "providers": stats,
+        }
+
+
+# Global quota ledger
+quota_ledger = QuotaLedger(
+    backend=settings.quota_ledger_backend,
+    reconcile_seconds=settings.quota_reconcile_seconds,
+)
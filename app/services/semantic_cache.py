@@ -4,15 +4,22 @@ Cache AI responses based on semantic similarity.
 Reduces API costs by 60-70%.
 """
 
+import asyncio
 import logging
 import hashlib
 import json
-from typing import Optional, Dict, Any, List
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Set, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
+import numpy as np
+
 from ..database import db
-from .embeddings import get_embedding, cosine_similarity
+from ..metrics import metrics, record_cache_stats
+from .embeddings import embed, get_embedding_dimension
+from .vector_index import VectorIndex
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +29,185 @@ SIMILARITY_THRESHOLD = 0.92
 # Cache TTL in hours
 CACHE_TTL_HOURS = 168  # 1 week
 
+# Exact-match LRU size (entries keyed by SHA-256 of the prompt)
+EXACT_LRU_SIZE = 2048
+
+# How long a miss is remembered so repeated prompts skip embedding
+NEGATIVE_CACHE_TTL_SECONDS = 30
+NEGATIVE_CACHE_SIZE = 4096
+
+# In-process ANN index over every non-expired cache entry
+_index = VectorIndex(dimension=get_embedding_dimension())
+_index_ready = False
+_index_lock = asyncio.Lock()
+
+# Index changes made while rebuild_index awaits its rows; replayed after the swap
+_rebuild_log: Optional[List[Callable[[], None]]] = None
+
+# Distribution of best-match similarities, used to tune SIMILARITY_THRESHOLD.
+# Bucket i counts lookups whose best similarity fell in [i/20, (i+1)/20).
+_similarity_histogram = [0] * 21
+
+# Tier 1: prompt hash -> CachedResponse plus its expiry timestamp
+_exact_lru: "OrderedDict[str, tuple]" = OrderedDict()
+
+# Recent misses: prompt hash -> monotonic deadline
+_negative_cache: "OrderedDict[str, float]" = OrderedDict()
+
+# Fire-and-forget writes (hit counts); held here so they aren't garbage-collected mid-flight
+_background: Set[asyncio.Task] = set()
+
+# Per-tier lookup counters
+_lookup_counters = {
+    "lookups": 0,
+    "memory_hits": 0,
+    "hash_hits": 0,
+    "vector_hits": 0,
+    "negative_hits": 0,
+    "misses": 0,
+    "stale": 0,
+}
+
+
+def _decode_embedding(value: Any) -> Optional[np.ndarray]:
+    """Decode a stored embedding (list, pgvector text or JSON) into float32."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    arr = np.asarray(value, dtype=np.float32)
+    return arr if arr.size else None
+
+
+def _expiry_timestamp(expires_at: Optional[datetime]) -> Optional[float]:
+    """Convert an expires_at column value to a unix timestamp."""
+    if expires_at is None:
+        return None
+    if expires_at.tzinfo is None:
+        # Naive values are written as UTC by store_cache
+        return (expires_at - datetime(1970, 1, 1)).total_seconds()
+    return expires_at.timestamp()
+
+
+def _index_op(op: Callable[[], None]) -> None:
+    """Apply an index change now and again after any in-flight rebuild swaps."""
+    op()
+    if _rebuild_log is not None:
+        _rebuild_log.append(op)
+
+
+async def rebuild_index() -> int:
+    """
+    Rebuild the in-process index from every non-expired cache entry.
+
+    Called at startup; safe to call again to resynchronise.
+    Returns number of indexed entries.
+    """
+    global _index_ready, _rebuild_log
+    async with _index_lock:
+        _rebuild_log = []
+        try:
+            rows = await db.fetch_all(
+                """
+                SELECT id, query_embedding, expires_at
+                FROM semantic_cache
+                WHERE query_embedding IS NOT NULL
+                AND (expires_at IS NULL OR expires_at > NOW())
+                """
+            )
+
+            ids, vectors, expiries = [], [], []
+            for row in rows:
+                embedding = _decode_embedding(row["query_embedding"])
+                if embedding is None:
+                    continue
+                ids.append(str(row["id"]))
+                vectors.append(embedding)
+                expiries.append(_expiry_timestamp(row["expires_at"]))
+
+            _index.rebuild(ids, vectors, expiries)
+            # Entries stored or removed while the query ran aren't in its snapshot
+            for op in _rebuild_log:
+                op()
+        finally:
+            _rebuild_log = None
+        _index_ready = True
+        logger.info(f"Semantic cache index rebuilt with {len(_index)} entries")
+        return len(_index)
+
+
+async def initialize_semantic_cache() -> None:
+    """Load the semantic cache index (FastAPI lifespan hook)."""
+    await rebuild_index()
+
+
+def _record_similarity(similarity: float) -> None:
+    bucket = min(20, max(0, int(similarity * 20)))
+    _similarity_histogram[bucket] += 1
+
+
+def _query_hash(query: str) -> str:
+    """SHA-256 of the prompt, matching semantic_cache.query_hash."""
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def _lru_get(query_hash: str) -> Optional["CachedResponse"]:
+    entry = _exact_lru.get(query_hash)
+    if entry is None:
+        return None
+    cached, expires_ts = entry
+    if expires_ts is not None and expires_ts <= time.time():
+        del _exact_lru[query_hash]
+        return None
+    _exact_lru.move_to_end(query_hash)
+    return cached
+
+
+def _lru_put(query_hash: str, cached: "CachedResponse", expires_ts: Optional[float]) -> None:
+    _exact_lru[query_hash] = (cached, expires_ts)
+    _exact_lru.move_to_end(query_hash)
+    while len(_exact_lru) > EXACT_LRU_SIZE:
+        _exact_lru.popitem(last=False)
+
+
+def _negative_hit(query_hash: str) -> bool:
+    deadline = _negative_cache.get(query_hash)
+    if deadline is None:
+        return False
+    if deadline <= time.monotonic():
+        del _negative_cache[query_hash]
+        return False
+    return True
+
+
+def _remember_miss(query_hash: str) -> None:
+    _negative_cache[query_hash] = time.monotonic() + NEGATIVE_CACHE_TTL_SECONDS
+    _negative_cache.move_to_end(query_hash)
+    while len(_negative_cache) > NEGATIVE_CACHE_SIZE:
+        _negative_cache.popitem(last=False)
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def _record_hit(cache_id: str) -> None:
+    """Bump hit_count for an entry served from memory (background task)."""
+    try:
+        await db.execute(
+            """
+            UPDATE semantic_cache
+            SET hit_count = hit_count + 1,
+                last_hit_at = NOW()
+            WHERE id = $1
+            """,
+            cache_id
+        )
+    except Exception as e:
+        logger.debug(f"Failed to record cache hit: {e}")
+
 
 @dataclass
 class CachedResponse:
@@ -33,76 +219,118 @@ class CachedResponse:
     similarity: float
 
 
-async def check_cache(query: str) -> Optional[CachedResponse]:
-    """
-    Check if a similar query exists in cache.
+async def _probe_hash(query_hash: str) -> Optional[CachedResponse]:
+    """Tier 2: exact query_hash lookup in Postgres."""
+    row = await db.fetch_one(
+        """
+        UPDATE semantic_cache
+        SET hit_count = hit_count + 1,
+            last_hit_at = NOW()
+        WHERE query_hash = $1
+        AND (expires_at IS NULL OR expires_at > NOW())
+        RETURNING id, response_text, model_used, tokens_saved, expires_at
+        """,
+        query_hash
+    )
+    if not row:
+        return None
 
-    1. Generate embedding for query
-    2. Search semantic_cache for similar embeddings
-    3. Return cached response if similarity > threshold
-    """
-    try:
-        # Generate embedding for incoming query
-        query_embedding = get_embedding(query)
+    cached = CachedResponse(
+        id=str(row["id"]),
+        response_text=row["response_text"],
+        model_used=row["model_used"] or "cached",
+        tokens_saved=row["tokens_saved"] or 0,
+        similarity=1.0
+    )
+    _lru_put(query_hash, cached, _expiry_timestamp(row["expires_at"]))
+    return cached
 
-        # Get all non-expired cache entries with embeddings
-        rows = await db.fetch_all(
-            """
-            SELECT id, query_text, query_embedding, response_text,
-                   model_used, tokens_saved
-            FROM semantic_cache
-            WHERE query_embedding IS NOT NULL
-            AND (expires_at IS NULL OR expires_at > NOW())
-            ORDER BY created_at DESC
-            LIMIT 100
-            """
-        )
 
-        if not rows:
-            logger.debug("Cache empty, no entries to check")
-            return None
+async def _search_vectors(query: str) -> Optional[CachedResponse]:
+    """Tier 3: embed the prompt and search the ANN index."""
+    if not _index_ready:
+        await rebuild_index()
 
-        # Find most similar entry
-        best_match = None
-        best_similarity = 0.0
+    query_embedding = await embed(query)
 
-        for row in rows:
-            cached_embedding = row["query_embedding"]
-            if not cached_embedding:
-                continue
+    matches = _index.search(query_embedding, k=1)
+    if not matches:
+        logger.debug("Cache empty, no entries to check")
+        return None
 
-            similarity = cosine_similarity(query_embedding, cached_embedding)
+    cache_id, best_similarity = matches[0]
+    _record_similarity(best_similarity)
 
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = row
+    if best_similarity < SIMILARITY_THRESHOLD:
+        logger.debug(f"Cache miss. Best similarity: {best_similarity:.3f}")
+        return None
 
-        # Check if best match exceeds threshold
-        if best_match and best_similarity >= SIMILARITY_THRESHOLD:
-            cache_id = str(best_match["id"])
+    # Update hit count and fetch the response in one round trip
+    row = await db.fetch_one(
+        """
+        UPDATE semantic_cache
+        SET hit_count = hit_count + 1,
+            last_hit_at = NOW()
+        WHERE id = $1
+        AND (expires_at IS NULL OR expires_at > NOW())
+        RETURNING id, response_text, model_used, tokens_saved
+        """,
+        cache_id
+    )
+
+    if not row:
+        # Entry was deleted or expired behind our back
+        _index_op(lambda: _index.remove(cache_id))
+        _lookup_counters["stale"] += 1
+        return None
 
-            # Update hit count
-            await db.execute(
-                """
-                UPDATE semantic_cache
-                SET hit_count = hit_count + 1,
-                    last_hit_at = NOW()
-                WHERE id = $1
-                """,
-                best_match["id"]
-            )
+    logger.info(f"Cache HIT! Similarity: {best_similarity:.3f}")
+    return CachedResponse(
+        id=str(row["id"]),
+        response_text=row["response_text"],
+        model_used=row["model_used"] or "cached",
+        tokens_saved=row["tokens_saved"] or 0,
+        similarity=best_similarity
+    )
 
-            logger.info(f"Cache HIT! Similarity: {best_similarity:.3f}")
 
-            return CachedResponse(
-                id=cache_id,
-                response_text=best_match["response_text"],
-                model_used=best_match["model_used"] or "cached",
-                tokens_saved=best_match["tokens_saved"] or 0,
-                similarity=best_similarity
-            )
+async def check_cache(query: str) -> Optional[CachedResponse]:
+    """
+    Check if a similar query exists in cache.
 
-        logger.debug(f"Cache miss. Best similarity: {best_similarity:.3f}")
+    Tiers, cheapest first:
+    1. In-memory LRU keyed by SHA-256 of the prompt
+    2. Negative cache of recent misses (skips everything below)
+    3. Postgres query_hash probe
+    4. Embedding + ANN index search, accepted if similarity > threshold
+    """
+    _lookup_counters["lookups"] += 1
+    query_hash = _query_hash(query)
+
+    try:
+        cached = _lru_get(query_hash)
+        if cached:
+            _lookup_counters["memory_hits"] += 1
+            _spawn(_record_hit(cached.id))
+            return cached
+
+        if _negative_hit(query_hash):
+            _lookup_counters["negative_hits"] += 1
+            _lookup_counters["misses"] += 1
+            return None
+
+        cached = await _probe_hash(query_hash)
+        if cached:
+            _lookup_counters["hash_hits"] += 1
+            return cached
+
+        cached = await _search_vectors(query)
+        if cached:
+            _lookup_counters["vector_hits"] += 1
+            return cached
+
+        _remember_miss(query_hash)
+        _lookup_counters["misses"] += 1
         return None
 
     except Exception as e:
@@ -125,10 +353,10 @@ async def store_cache(
     """
     try:
         # Generate embedding
-        query_embedding = get_embedding(query)
+        query_embedding = await embed(query)
 
         # Create hash for deduplication
-        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        query_hash = _query_hash(query)
 
         # Calculate tokens saved (for future hits)
         tokens_saved = input_tokens + output_tokens
@@ -146,11 +374,11 @@ async def store_cache(
             ON CONFLICT (query_hash) DO UPDATE SET
                 hit_count = semantic_cache.hit_count,
                 updated_at = NOW()
-            RETURNING id
+            RETURNING id, response_text, model_used, tokens_saved, expires_at
             """,
             query,
             query_hash,
-            query_embedding,
+            query_embedding.tolist(),
             response,
             model_used,
             tokens_saved,
@@ -160,6 +388,17 @@ async def store_cache(
 
         if result:
             cache_id = str(result["id"])
+            # On conflict the existing row (and its expiry) is what gets served
+            expires_ts = _expiry_timestamp(result["expires_at"])
+            _index_op(lambda: _index.add(cache_id, query_embedding, expires_ts))
+            _negative_cache.pop(query_hash, None)
+            _lru_put(query_hash, CachedResponse(
+                id=cache_id,
+                response_text=result["response_text"],
+                model_used=result["model_used"] or "cached",
+                tokens_saved=result["tokens_saved"] or 0,
+                similarity=1.0
+            ), expires_ts)
             logger.info(f"Cached response: {cache_id[:8]}...")
             return cache_id
 
@@ -190,6 +429,7 @@ async def get_cache_stats() -> Dict[str, Any]:
             "total_hits": int(result["total_hits"]) if result else 0,
             "total_tokens_saved": int(result["total_tokens_saved"]) if result else 0,
             "total_cost_saved_usd": float(result["total_cost_saved"]) if result else 0.0,
+            **get_lookup_stats(),
         }
 
     except Exception as e:
@@ -197,6 +437,49 @@ async def get_cache_stats() -> Dict[str, Any]:
         return {}
 
 
+def get_lookup_stats() -> Dict[str, Any]:
+    """In-process index and per-tier lookup counters (no database access)."""
+    counters = _lookup_counters
+    lookups = counters["lookups"]
+
+    def rate(count: int) -> float:
+        return round(count / lookups, 4) if lookups else 0.0
+
+    hits = counters["memory_hits"] + counters["hash_hits"] + counters["vector_hits"]
+    return {
+        "index": {**_index.get_stats(), "ready": _index_ready},
+        "similarity_threshold": SIMILARITY_THRESHOLD,
+        "lookups": lookups,
+        "hits": hits,
+        "misses": counters["misses"],
+        "stale_entries": counters["stale"],
+        "hit_rate": rate(hits),
+        "tiers": {
+            "memory": {"hits": counters["memory_hits"], "hit_rate": rate(counters["memory_hits"]),
+                       "size": len(_exact_lru)},
+            "negative": {"hits": counters["negative_hits"], "hit_rate": rate(counters["negative_hits"]),
+                         "size": len(_negative_cache)},
+            "hash": {"hits": counters["hash_hits"], "hit_rate": rate(counters["hash_hits"])},
+            "vector": {"hits": counters["vector_hits"], "hit_rate": rate(counters["vector_hits"])},
+        },
+        "best_similarity_histogram": {
+            f"{i / 20:.2f}": count for i, count in enumerate(_similarity_histogram) if count
+        },
+    }
+
+
+def _collect_metrics() -> None:
+    counters = _lookup_counters
+    record_cache_stats("semantic", counters["lookups"], {
+        "memory": counters["memory_hits"],
+        "hash": counters["hash_hits"],
+        "vector": counters["vector_hits"],
+    })
+
+
+metrics.register_collector(_collect_metrics)
+
+
 async def cleanup_expired() -> int:
     """Remove expired cache entries. Returns count deleted."""
     try:
@@ -204,10 +487,15 @@ async def cleanup_expired() -> int:
             """
             DELETE FROM semantic_cache
             WHERE expires_at IS NOT NULL AND expires_at <= NOW()
-            RETURNING id
+            RETURNING id, query_hash
             """
         )
         count = len(result)
+        expired_ids = [str(row["id"]) for row in result]
+        _index_op(lambda: _index.remove_many(expired_ids))
+        _index.prune_expired()
+        for row in result:
+            _exact_lru.pop(row["query_hash"], None)
         if count > 0:
             logger.info(f"Cleaned up {count} expired cache entries")
         return count
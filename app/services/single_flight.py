@@ -0,0 +1,87 @@
+"""
+NEXUS Single-Flight
+Coalesce identical concurrent LLM requests into one upstream call.
+
+Requests are keyed on (scope, model/provider, normalized prompt, params).
+The first caller starts the upstream call as its own task; identical
+requests arriving before it finishes await the same task instead of
+paying for another provider call. Nothing is cached after completion -
+that is the semantic cache's job.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so trivially different prompts share a key."""
+    return " ".join(prompt.split())
+
+
+def flight_key(scope: str, prompt: str, **params: Any) -> str:
+    """Stable key for a request: scope, normalized prompt and parameters."""
+    payload = json.dumps(
+        {"scope": scope, "prompt": normalize_prompt(prompt), "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Shares one in-flight call among concurrent identical requests."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # Counters per scope
+        self._calls: Dict[str, int] = {}
+        self._coalesced: Dict[str, int] = {}
+
+    async def do(self, scope: str, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `call` once per key among concurrent callers.
+
+        Every caller gets the same result object (or exception); callers
+        that mutate it should copy first.
+        """
+        self._calls[scope] = self._calls.get(scope, 0) + 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._coalesced[scope] = self._coalesced.get(scope, 0) + 1
+            logger.debug(f"Coalesced {scope} request onto in-flight call {key[:8]}")
+        else:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._inflight.pop(k, None) if self._inflight.get(k) is t else None)
+
+        # Shield so one cancelled caller doesn't cancel the shared call
+        return await asyncio.shield(task)
+
+    @property
+    def coalesced(self) -> int:
+        return sum(self._coalesced.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Calls and coalesced requests per scope."""
+        return {
+            "coalesced_requests": self.coalesced,
+            "in_flight": len(self._inflight),
+            "scopes": {
+                scope: {
+                    "requests": calls,
+                    "coalesced": self._coalesced.get(scope, 0),
+                }
+                for scope, calls in self._calls.items()
+            },
+        }
+
+
+# Global single-flight group for LLM provider calls
+llm_single_flight = SingleFlight()
@@ -0,0 +1,367 @@
+"""
+NEXUS Telemetry Sink
+Write-behind queue for usage logging.
+
+Request handlers enqueue a compact record and return immediately; a
+background flusher writes batches when `batch_size` records are pending
+or every `flush_interval_seconds`:
+
+- Row streams (e.g. `api_usage`) go out with `copy_records_to_table`,
+  one COPY per (table, columns), on a dedicated connection with asyncpg's
+  native codecs: the pool's JSON codecs have no binary encoder, so jsonb
+  values must be enqueued as JSON text.
+- Counter streams (e.g. `ai_provider_usage`) are summed per key in memory
+  and written with a single multi-row additive UPSERT.
+
+When Postgres falls behind and `max_pending` rows are buffered, writers
+wait up to `backpressure_timeout_ms` for the flusher to make room, then
+the record is dropped and counted. Batches that fail for connection
+reasons are retried up to `max_retries` flushes; batches Postgres rejects
+are retried row by row so one bad record doesn't lose the rest.
+"""
+
+import asyncio
+import logging
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import asyncpg
+
+from ..config import settings
+from ..database import db
+
+logger = logging.getLogger(__name__)
+
+# Postgres bind parameter limit per statement
+MAX_QUERY_PARAMS = 32767
+
+RowKey = Tuple[str, Tuple[str, ...]]
+CounterKey = Tuple[str, Tuple[str, ...], Tuple[str, ...], Tuple[Any, ...]]
+
+
+def as_uuid(value: Any) -> Optional[UUID]:
+    """Coerce a value to UUID for a UUID column, or None if it isn't one."""
+    if value is None or isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+def as_decimal(value: Any) -> Optional[Decimal]:
+    """Coerce a float to Decimal for a NUMERIC column."""
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+class TelemetrySink:
+    """Buffered, batched writer for telemetry rows and counters."""
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 1.0,
+        max_pending: int = 20000,
+        backpressure_timeout_ms: float = 50.0,
+        max_retries: int = 3,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.backpressure_timeout_ms = backpressure_timeout_ms
+        self.max_retries = max_retries
+
+        self._rows: Dict[RowKey, List[tuple]] = {}
+        self._row_count = 0
+        self._counters: Dict[CounterKey, List[Any]] = {}
+        self._attempts: Dict[Any, int] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._copy_conn: Optional[asyncpg.Connection] = None
+
+        # Counters
+        self._enqueued = 0
+        self._written = 0
+        self._counter_rows_written = 0
+        self._flushes = 0
+        self._flush_errors = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._backpressure_waits = 0
+        self._last_flush_ms = 0.0
+
+    def _ensure_started(self) -> None:
+        """Start the flusher on the running loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is loop and self._task and not self._task.done():
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    async def start(self) -> None:
+        """Start the background flusher."""
+        self._ensure_started()
+
+    async def close(self, timeout_seconds: float = 10.0) -> None:
+        """Stop the flusher and drain everything still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(final=True), timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.error(f"Telemetry drain timed out; dropping {self._row_count} rows")
+            self._dropped += self._row_count
+        await self._close_copy_connection()
+
+    # ===== Write path =====
+
+    def enqueue_row(self, table: str, columns: Sequence[str], record: tuple) -> bool:
+        """Buffer one row for COPY. Returns False if it was dropped."""
+        self._ensure_started()
+        if self._row_count >= self.max_pending:
+            self._dropped += 1
+            return False
+        self._rows.setdefault((table, tuple(columns)), []).append(record)
+        self._row_count += 1
+        self._enqueued += 1
+        if self._row_count >= self.max_pending and self._space:
+            self._space.clear()
+        if self._row_count >= self.batch_size and self._wake:
+            self._wake.set()
+        return True
+
+    async def write_row(self, table: str, columns: Sequence[str], record: tuple) -> bool:
+        """Buffer one row, briefly waiting for room if the buffer is full."""
+        self._ensure_started()
+        if self._row_count >= self.max_pending and self._space and self.backpressure_timeout_ms > 0:
+            self._backpressure_waits += 1
+            self._wake.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), self.backpressure_timeout_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+        return self.enqueue_row(table, columns, record)
+
+    def increment(
+        self,
+        table: str,
+        key_columns: Sequence[str],
+        key: Sequence[Any],
+        deltas: Dict[str, Any],
+    ) -> None:
+        """Add to counter columns of the row identified by `key`."""
+        self._ensure_started()
+        if self._add_counter((table, tuple(key_columns), tuple(deltas), tuple(key)), list(deltas.values())):
+            self._enqueued += 1
+
+    def _add_counter(self, counter_key: CounterKey, values: List[Any]) -> bool:
+        existing = self._counters.get(counter_key)
+        if existing is None:
+            if len(self._counters) >= self.max_pending:
+                self._dropped += 1
+                return False
+            self._counters[counter_key] = values
+        else:
+            for i, value in enumerate(values):
+                existing[i] += value
+        return True
+
+    # ===== Flushing =====
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Telemetry flush failed: {e}")
+
+    async def flush(self, final: bool = False) -> None:
+        """Write all buffered rows and counters."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            if not self._rows and not self._counters:
+                return
+            start = time.perf_counter()
+            rows, self._rows = self._rows, {}
+            self._row_count = 0
+            counters, self._counters = self._counters, {}
+            if self._space:
+                self._space.set()
+
+            for (table, columns), records in rows.items():
+                await self._write_rows(table, columns, records, final)
+
+            grouped: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...]], List[Tuple[tuple, List[Any]]]] = {}
+            for (table, key_columns, delta_columns, key), values in counters.items():
+                grouped.setdefault((table, key_columns, delta_columns), []).append((key, values))
+            for (table, key_columns, delta_columns), entries in grouped.items():
+                await self._write_counters(table, key_columns, delta_columns, entries, final)
+
+            self._flushes += 1
+            self._last_flush_ms = (time.perf_counter() - start) * 1000
+
+    def _should_retry(self, attempt_key: Any, final: bool) -> bool:
+        attempts = self._attempts.get(attempt_key, 0) + 1
+        if final or attempts >= self.max_retries:
+            self._attempts.pop(attempt_key, None)
+            return False
+        self._attempts[attempt_key] = attempts
+        return True
+
+    async def _get_copy_connection(self) -> asyncpg.Connection:
+        """Dedicated connection for row COPYs, kept open between flushes."""
+        if self._copy_conn is None or self._copy_conn.is_closed():
+            self._copy_conn = await db.connect_dedicated()
+        return self._copy_conn
+
+    async def _close_copy_connection(self) -> None:
+        conn, self._copy_conn = self._copy_conn, None
+        if conn is not None and not conn.is_closed():
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.debug(f"Closing telemetry COPY connection failed: {e}")
+
+    async def _write_rows(self, table: str, columns: Tuple[str, ...], records: List[tuple], final: bool) -> None:
+        try:
+            conn = await self._get_copy_connection()
+            await conn.copy_records_to_table(table, records=records, columns=list(columns))
+        except asyncpg.PostgresError as e:
+            if isinstance(e, asyncpg.PostgresConnectionError):
+                await self._close_copy_connection()
+                self._requeue_rows(table, columns, records, final, e)
+                return
+            # Postgres rejected the batch - isolate the bad rows
+            logger.warning(f"COPY into {table} rejected ({e}); retrying {len(records)} rows individually")
+            await self._write_rows_individually(table, columns, records)
+            return
+        except Exception as e:
+            await self._close_copy_connection()
+            self._requeue_rows(table, columns, records, final, e)
+            return
+        self._attempts.pop((table, columns), None)
+        self._written += len(records)
+
+    async def _write_rows_individually(self, table: str, columns: Tuple[str, ...], records: List[tuple]) -> None:
+        try:
+            conn = await self._get_copy_connection()
+            for record in records:
+                try:
+                    await conn.copy_records_to_table(table, records=[record], columns=list(columns))
+                    self._written += 1
+                except asyncpg.PostgresConnectionError:
+                    raise
+                except asyncpg.PostgresError as e:
+                    self._rejected += 1
+                    logger.debug(f"Rejected {table} row: {e}")
+        except Exception as e:
+            self._flush_errors += 1
+            await self._close_copy_connection()
+            logger.error(f"Row-by-row write to {table} failed: {e}")
+
+    def _requeue_rows(self, table: str, columns: Tuple[str, ...], records: List[tuple], final: bool, error: Exception) -> None:
+        self._flush_errors += 1
+        if not self._should_retry((table, columns), final):
+            self._dropped += len(records)
+            logger.error(f"Dropping {len(records)} {table} rows after repeated failures: {error}")
+            return
+        logger.warning(f"Write of {len(records)} {table} rows failed, will retry: {error}")
+        room = max(0, self.max_pending - self._row_count)
+        keep = records[:room]
+        self._dropped += len(records) - len(keep)
+        self._rows.setdefault((table, columns), [])[:0] = keep
+        self._row_count += len(keep)
+
+    async def _write_counters(
+        self,
+        table: str,
+        key_columns: Tuple[str, ...],
+        delta_columns: Tuple[str, ...],
+        entries: List[Tuple[tuple, List[Any]]],
+        final: bool,
+    ) -> None:
+        columns = key_columns + delta_columns
+        per_statement = max(1, MAX_QUERY_PARAMS // len(columns))
+        updates = ", ".join(f"{c} = {table}.{c} + EXCLUDED.{c}" for c in delta_columns)
+
+        for offset in range(0, len(entries), per_statement):
+            chunk = entries[offset:offset + per_statement]
+            params: List[Any] = []
+            values = []
+            for key, deltas in chunk:
+                row = [*key, *(as_decimal(v) if isinstance(v, float) else v for v in deltas)]
+                placeholders = ", ".join(f"${len(params) + i + 1}" for i in range(len(row)))
+                params.extend(row)
+                values.append(f"({placeholders})")
+            try:
+                await db.execute(
+                    f"""
+                    INSERT INTO {table} ({', '.join(columns)})
+                    VALUES {', '.join(values)}
+                    ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}
+                    """,
+                    *params
+                )
+            except Exception as e:
+                self._flush_errors += 1
+                if not self._should_retry((table, key_columns, delta_columns), final):
+                    self._dropped += len(chunk)
+                    logger.error(f"Dropping {len(chunk)} {table} counter updates: {e}")
+                    continue
+                logger.warning(f"Counter UPSERT into {table} failed, will retry: {e}")
+                for key, deltas in chunk:
+                    self._add_counter((table, key_columns, delta_columns, key), list(deltas))
+                continue
+            self._attempts.pop((table, key_columns, delta_columns), None)
+            self._counter_rows_written += len(chunk)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and loss counters."""
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "pending_rows": self._row_count,
+            "pending_counters": len(self._counters),
+            "enqueued": self._enqueued,
+            "rows_written": self._written,
+            "counter_rows_written": self._counter_rows_written,
+            "flushes": self._flushes,
+            "flush_errors": self._flush_errors,
+            "dropped": self._dropped,
+            "rejected": self._rejected,
+            "backpressure_waits": self._backpressure_waits,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+        }
+
+
+# Global telemetry sink
+telemetry_sink = TelemetrySink(
+    batch_size=settings.telemetry_batch_size,
+    flush_interval_seconds=settings.telemetry_flush_interval_seconds,
+    max_pending=settings.telemetry_max_pending,
+    backpressure_timeout_ms=settings.telemetry_backpressure_timeout_ms,
+)
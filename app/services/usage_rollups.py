@@ -0,0 +1,380 @@
+"""
+NEXUS Usage Rollups
+Incrementally maintained usage and cost aggregates.
+
+Every logged API call is added to in-process per-minute, per-hour and
+per-day deltas keyed by (provider, model, agent). A background task
+flushes the deltas into `usage_rollups` with one additive multi-row UPSERT,
+so readers sum a handful of buckets instead of scanning `api_usage`.
+
+Arbitrary windows are answered by combining buckets: whole days, then
+whole hours, then minutes for the ragged edge. Deltas not yet flushed are
+merged into every read, so results are current to the last call.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from ..config import settings
+from ..database import db
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("minute", "hour", "day")
+
+# Unattributed usage is keyed under the nil UUID (part of the primary key)
+NIL_AGENT = UUID(int=0)
+
+# Dimensions readers may group by
+DIMENSIONS = ("provider", "model", "agent_id")
+
+# Cap on unflushed keys if the database is unavailable for a long time
+MAX_PENDING_KEYS = 50000
+
+# Retention for fine-grained buckets
+RETENTION = {
+    "minute": timedelta(days=2),
+    "hour": timedelta(days=90),
+}
+
+
+@dataclass
+class UsageDelta:
+    """Additive counters for one rollup bucket."""
+    request_count: int = 0
+    success_count: int = 0
+    cache_hits: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+    latency_ms_sum: int = 0
+    latency_samples: int = 0
+
+    def add(self, other: "UsageDelta") -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+COUNTERS = tuple(f.name for f in fields(UsageDelta))
+
+# (granularity, bucket_start, provider, model, agent_id)
+RollupKey = Tuple[str, datetime, str, str, UUID]
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    """Floor a UTC timestamp to the start of its bucket."""
+    ts = ts.astimezone(timezone.utc).replace(second=0, microsecond=0)
+    if granularity in ("hour", "day"):
+        ts = ts.replace(minute=0)
+    if granularity == "day":
+        ts = ts.replace(hour=0)
+    return ts
+
+
+def _ceil(ts: datetime, granularity: str) -> datetime:
+    floor = bucket_start(ts, granularity)
+    if floor == ts:
+        return floor
+    step = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}[granularity]
+    return floor + step
+
+
+def window_ranges(since: datetime) -> Dict[str, Tuple[datetime, Optional[datetime]]]:
+    """
+    Decompose [since, now) into [start, end) bucket ranges per granularity.
+
+    Days cover everything from the first whole day, hours fill in up to
+    it and minutes cover the leading partial hour.
+    """
+    since = since.astimezone(timezone.utc)
+    day_from = _ceil(since, "day")
+    hour_from = min(_ceil(since, "hour"), day_from)
+    minute_from = bucket_start(since, "minute")
+    return {
+        "day": (day_from, None),
+        "hour": (hour_from, day_from),
+        "minute": (minute_from, hour_from),
+    }
+
+
+def _normalize_agent(agent_id: Any) -> UUID:
+    if agent_id is None:
+        return NIL_AGENT
+    if isinstance(agent_id, UUID):
+        return agent_id
+    try:
+        return UUID(str(agent_id))
+    except ValueError:
+        return NIL_AGENT
+
+
+class UsageRollups:
+    """In-process delta accumulator and reader for `usage_rollups`."""
+
+    def __init__(self, flush_interval_seconds: float = 5.0):
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending: Dict[RollupKey, UsageDelta] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune: Optional[datetime] = None
+
+        # Counters
+        self._recorded = 0
+        self._flushes = 0
+        self._rows_flushed = 0
+        self._flush_errors = 0
+        self._dropped = 0
+
+    # ===== Write path =====
+
+    def record(
+        self,
+        provider: Optional[str],
+        model: Optional[str],
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cost_usd: float = 0.0,
+        latency_ms: Optional[int] = None,
+        success: bool = True,
+        cache_hit: bool = False,
+        cached_tokens: int = 0,
+        agent_id: Any = None,
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        """Add one API call to the minute, hour and day buckets."""
+        ts = timestamp or datetime.now(timezone.utc)
+        delta = UsageDelta(
+            request_count=1,
+            success_count=1 if success else 0,
+            cache_hits=1 if cache_hit else 0,
+            input_tokens=input_tokens or 0,
+            output_tokens=output_tokens or 0,
+            cached_tokens=cached_tokens or 0,
+            cost_usd=float(cost_usd or 0.0),
+            latency_ms_sum=int(latency_ms or 0),
+            latency_samples=1 if latency_ms is not None else 0,
+        )
+        agent = _normalize_agent(agent_id)
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(ts, granularity), provider or "", model or "", agent)
+            existing = self._pending.get(key)
+            if existing is None:
+                if len(self._pending) >= MAX_PENDING_KEYS:
+                    self._dropped += 1
+                    continue
+                self._pending[key] = UsageDelta()
+                existing = self._pending[key]
+            existing.add(delta)
+        self._recorded += 1
+
+    async def flush(self) -> int:
+        """Write pending deltas with one additive UPSERT. Returns rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+
+            columns: Dict[str, List[Any]] = {name: [] for name in ("granularity", "bucket_start", "provider", "model", "agent_id", *COUNTERS)}
+            for (granularity, start, provider, model, agent), delta in batch.items():
+                columns["granularity"].append(granularity)
+                columns["bucket_start"].append(start)
+                columns["provider"].append(provider)
+                columns["model"].append(model)
+                columns["agent_id"].append(agent)
+                for name in COUNTERS:
+                    columns[name].append(getattr(delta, name))
+
+            try:
+                await db.execute(
+                    """
+                    INSERT INTO usage_rollups (
+                        granularity, bucket_start, provider, model, agent_id,
+                        request_count, success_count, cache_hits, input_tokens, output_tokens,
+                        cached_tokens, cost_usd, latency_ms_sum, latency_samples, updated_at
+                    )
+                    SELECT g, b, p, m, a, rc, sc, ch, it, ot, ct, cu, ls, ln, NOW()
+                    FROM unnest(
+                        $1::text[], $2::timestamptz[], $3::text[], $4::text[], $5::uuid[],
+                        $6::bigint[], $7::bigint[], $8::bigint[], $9::bigint[], $10::bigint[],
+                        $11::bigint[], $12::numeric[], $13::bigint[], $14::bigint[]
+                    ) AS t(g, b, p, m, a, rc, sc, ch, it, ot, ct, cu, ls, ln)
+                    ON CONFLICT (granularity, bucket_start, provider, model, agent_id) DO UPDATE SET
+                        request_count = usage_rollups.request_count + EXCLUDED.request_count,
+                        success_count = usage_rollups.success_count + EXCLUDED.success_count,
+                        cache_hits = usage_rollups.cache_hits + EXCLUDED.cache_hits,
+                        input_tokens = usage_rollups.input_tokens + EXCLUDED.input_tokens,
+                        output_tokens = usage_rollups.output_tokens + EXCLUDED.output_tokens,
+                        cached_tokens = usage_rollups.cached_tokens + EXCLUDED.cached_tokens,
+                        cost_usd = usage_rollups.cost_usd + EXCLUDED.cost_usd,
+                        latency_ms_sum = usage_rollups.latency_ms_sum + EXCLUDED.latency_ms_sum,
+                        latency_samples = usage_rollups.latency_samples + EXCLUDED.latency_samples,
+                        updated_at = NOW()
+                    """,
+                    *columns.values()
+                )
+            except Exception as e:
+                self._flush_errors += 1
+                logger.error(f"Usage rollup flush of {len(batch)} buckets failed: {e}")
+                # Put the deltas back so the next flush retries them
+                for key, delta in batch.items():
+                    if key in self._pending:
+                        self._pending[key].add(delta)
+                    elif len(self._pending) < MAX_PENDING_KEYS:
+                        self._pending[key] = delta
+                    else:
+                        self._dropped += 1
+                return 0
+
+            self._flushes += 1
+            self._rows_flushed += len(batch)
+            return len(batch)
+
+    async def prune(self) -> None:
+        """Drop minute and hour buckets past their retention."""
+        now = datetime.now(timezone.utc)
+        for granularity, keep in RETENTION.items():
+            try:
+                await db.execute(
+                    "DELETE FROM usage_rollups WHERE granularity = $1 AND bucket_start < $2",
+                    granularity, now - keep
+                )
+            except Exception as e:
+                logger.error(f"Usage rollup prune ({granularity}) failed: {e}")
+        self._last_prune = now
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+                if self._last_prune is None or datetime.now(timezone.utc) - self._last_prune > timedelta(hours=1):
+                    await self.prune()
+            except Exception as e:
+                logger.error(f"Usage rollup job failed: {e}")
+
+    async def start(self) -> None:
+        """Start the periodic flush job."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flush job and write any remaining deltas."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    # ===== Read path =====
+
+    async def aggregate(
+        self,
+        since: datetime,
+        group_by: Sequence[str] = (),
+        granularity: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Sum usage from `since` until now.
+
+        Args:
+            since: Start of the window
+            group_by: Any of "provider", "model", "agent_id"
+            granularity: If set, return one row per bucket of this
+                granularity (with a "bucket_start" key) instead of totals
+
+        Returns:
+            Rows of dimension values plus summed counters and avg_latency_ms
+        """
+        dims = [d for d in group_by if d in DIMENSIONS]
+        if granularity:
+            ranges = {granularity: (bucket_start(since, granularity), None)}
+            dims = ["bucket_start", *dims]
+        else:
+            ranges = window_ranges(since)
+
+        conditions = []
+        params: List[Any] = []
+        for gran, (start, end) in ranges.items():
+            if end is not None and end <= start:
+                continue
+            params.extend([gran, start])
+            clause = f"(granularity = ${len(params) - 1} AND bucket_start >= ${len(params)}"
+            if end is not None:
+                params.append(end)
+                clause += f" AND bucket_start < ${len(params)}"
+            conditions.append(clause + ")")
+
+        totals: Dict[Tuple, UsageDelta] = {}
+        if conditions:
+            select_dims = "".join(f"{d}, " for d in dims)
+            group_clause = f"GROUP BY {', '.join(dims)}" if dims else ""
+            rows = await db.fetch_all(
+                f"""
+                SELECT {select_dims}
+                    {', '.join(f'COALESCE(SUM({c}), 0) AS {c}' for c in COUNTERS)}
+                FROM usage_rollups
+                WHERE {' OR '.join(conditions)}
+                {group_clause}
+                """,
+                *params
+            )
+            for row in rows:
+                key = tuple(row[d] for d in dims)
+                totals.setdefault(key, UsageDelta()).add(UsageDelta(**{
+                    c: float(row[c]) if c == "cost_usd" else int(row[c]) for c in COUNTERS
+                }))
+
+        # Merge deltas that haven't been flushed yet
+        for (gran, start, provider, model, agent), delta in list(self._pending.items()):
+            if gran not in ranges:
+                continue
+            range_start, range_end = ranges[gran]
+            if start < range_start or (range_end is not None and start >= range_end):
+                continue
+            values = {"bucket_start": start, "provider": provider, "model": model, "agent_id": agent}
+            key = tuple(values[d] for d in dims)
+            totals.setdefault(key, UsageDelta()).add(delta)
+
+        result = []
+        for key, delta in totals.items():
+            row: Dict[str, Any] = dict(zip(dims, key))
+            row.update({c: getattr(delta, c) for c in COUNTERS})
+            row["avg_latency_ms"] = delta.latency_ms_sum / delta.latency_samples if delta.latency_samples else 0.0
+            result.append(row)
+        if granularity:
+            result.sort(key=lambda r: r["bucket_start"], reverse=True)
+        return result
+
+    async def summary(self, since: datetime, group_by: Sequence[str] = ()) -> Dict[str, Any]:
+        """Totals from `since` until now (all zeros if there is no usage)."""
+        rows = await self.aggregate(since, group_by=group_by)
+        if group_by:
+            return {"groups": rows}
+        if rows:
+            return rows[0]
+        empty = {c: getattr(UsageDelta(), c) for c in COUNTERS}
+        empty["avg_latency_ms"] = 0.0
+        return empty
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Write-path counters."""
+        return {
+            "recorded": self._recorded,
+            "pending_buckets": len(self._pending),
+            "flushes": self._flushes,
+            "rows_flushed": self._rows_flushed,
+            "flush_errors": self._flush_errors,
+            "dropped": self._dropped,
+        }
+
+
+# Global usage rollups instance
+usage_rollups = UsageRollups(flush_interval_seconds=settings.usage_rollup_flush_seconds)
@@ -0,0 +1,289 @@
+"""
+NEXUS Vector Index
+In-process approximate nearest neighbour index over a contiguous float32 matrix.
+
+Small indexes are searched exactly (one matrix-vector product). Once the index
+grows past `ivf_min_size` rows it trains an IVF coarse quantizer (k-means) and
+only scores the rows in the `nprobe` closest lists. A small sample of IVF
+searches is re-run exactly to estimate recall.
+"""
+
+import logging
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Expiry value used for entries that never expire
+NO_EXPIRY = float("inf")
+
+
+def _normalize(vector) -> np.ndarray:
+    """Return a unit-length float32 copy of a vector."""
+    arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(arr))
+    if norm > 0:
+        arr = arr / norm
+    return arr
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index with exact search for small sizes and IVF above that.
+
+    Vectors are stored L2-normalised in a single float32 matrix so scoring is a
+    dot product. Rows are removed by swapping the last row into the hole, which
+    keeps the matrix contiguous.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        ivf_min_size: int = 2048,
+        nprobe: int = 8,
+        recall_sample_rate: float = 0.05,
+        initial_capacity: int = 256,
+    ):
+        self.dimension = dimension
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self.recall_sample_rate = recall_sample_rate
+
+        self._matrix = np.zeros((initial_capacity, dimension), dtype=np.float32)
+        self._expires = np.full(initial_capacity, NO_EXPIRY, dtype=np.float64)
+        self._ids: List[str] = []
+        self._id_to_row: Dict[str, int] = {}
+
+        # IVF state
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(initial_capacity, dtype=np.int32)
+        self._trained_size = 0
+
+        # Counters
+        self._searches = 0
+        self._recall_samples = 0
+        self._recall_hits = 0
+        self._total_search_ms = 0.0
+        self._recent_search_ms: deque = deque(maxlen=1000)
+        self._rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._id_to_row
+
+    # ===== Mutation =====
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        matrix = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+        expires = np.full(new_capacity, NO_EXPIRY, dtype=np.float64)
+        expires[:len(self._ids)] = self._expires[:len(self._ids)]
+        assignments = np.zeros(new_capacity, dtype=np.int32)
+        assignments[:len(self._ids)] = self._assignments[:len(self._ids)]
+        self._matrix, self._expires, self._assignments = matrix, expires, assignments
+
+    def add(self, item_id: str, vector, expires_at: Optional[float] = None) -> None:
+        """Insert or replace a vector. `expires_at` is a unix timestamp."""
+        vec = _normalize(vector)
+        if vec.shape[0] != self.dimension:
+            raise ValueError(f"Expected dimension {self.dimension}, got {vec.shape[0]}")
+
+        row = self._id_to_row.get(item_id)
+        if row is None:
+            row = len(self._ids)
+            self._ensure_capacity(row + 1)
+            self._ids.append(item_id)
+            self._id_to_row[item_id] = row
+
+        self._matrix[row] = vec
+        self._expires[row] = expires_at if expires_at is not None else NO_EXPIRY
+        if self._centroids is not None:
+            self._assignments[row] = int(np.argmax(self._centroids @ vec))
+
+        self._maybe_train()
+
+    def remove(self, item_id: str) -> bool:
+        """Remove a vector. Returns True if it was present."""
+        row = self._id_to_row.pop(item_id, None)
+        if row is None:
+            return False
+
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._expires[row] = self._expires[last]
+            self._assignments[row] = self._assignments[last]
+            self._ids[row] = moved_id
+            self._id_to_row[moved_id] = row
+        self._ids.pop()
+        return True
+
+    def remove_many(self, item_ids: Sequence[str]) -> int:
+        """Remove several vectors. Returns the number removed."""
+        return sum(1 for item_id in item_ids if self.remove(item_id))
+
+    def prune_expired(self, now: Optional[float] = None) -> List[str]:
+        """Drop expired vectors and return their ids."""
+        now = time.time() if now is None else now
+        size = len(self._ids)
+        expired_rows = np.nonzero(self._expires[:size] <= now)[0]
+        expired_ids = [self._ids[row] for row in expired_rows]
+        self.remove_many(expired_ids)
+        return expired_ids
+
+    def rebuild(
+        self,
+        item_ids: Sequence[str],
+        vectors: Sequence,
+        expires_at: Optional[Sequence[Optional[float]]] = None,
+    ) -> None:
+        """Replace the whole index contents in one pass."""
+        count = len(item_ids)
+        self._ids = []
+        self._id_to_row = {}
+        self._centroids = None
+        self._trained_size = 0
+        self._matrix = np.zeros((max(count, 1), self.dimension), dtype=np.float32)
+        self._expires = np.full(max(count, 1), NO_EXPIRY, dtype=np.float64)
+        self._assignments = np.zeros(max(count, 1), dtype=np.int32)
+
+        for i, (item_id, vector) in enumerate(zip(item_ids, vectors)):
+            vec = _normalize(vector)
+            if vec.shape[0] != self.dimension:
+                logger.warning(f"Skipping vector {item_id}: dimension {vec.shape[0]} != {self.dimension}")
+                continue
+            row = len(self._ids)
+            self._matrix[row] = vec
+            expiry = expires_at[i] if expires_at is not None else None
+            self._expires[row] = expiry if expiry is not None else NO_EXPIRY
+            self._ids.append(item_id)
+            self._id_to_row[item_id] = row
+
+        self._rebuilds += 1
+        self._maybe_train()
+
+    # ===== IVF =====
+
+    def _maybe_train(self) -> None:
+        size = len(self._ids)
+        if size < self.ivf_min_size:
+            self._centroids = None
+            return
+        # Retrain when the index has doubled since the last training run
+        if self._centroids is None or size >= 2 * self._trained_size:
+            self._train(size)
+
+    def _train(self, size: int, iterations: int = 10) -> None:
+        start = time.perf_counter()
+        nlist = max(1, int(np.sqrt(size)))
+        data = self._matrix[:size]
+
+        sample_size = min(size, nlist * 64)
+        sample_rows = np.random.default_rng(0).choice(size, sample_size, replace=False)
+        sample = data[sample_rows]
+        centroids = sample[:nlist].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = _normalize(members.mean(axis=0))
+
+        self._centroids = centroids
+        self._assignments[:size] = np.argmax(data @ centroids.T, axis=1)
+        self._trained_size = size
+        logger.info(
+            f"Trained IVF index: {nlist} lists over {size} vectors "
+            f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+
+    # ===== Search =====
+
+    def _exact_scores(self, query: np.ndarray) -> np.ndarray:
+        return self._matrix[:len(self._ids)] @ query
+
+    def search(self, vector, k: int = 1, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Return up to k (id, cosine similarity) pairs, best first, skipping expired rows."""
+        start = time.perf_counter()
+        size = len(self._ids)
+        if size == 0:
+            return []
+
+        query = _normalize(vector)
+        now = time.time() if now is None else now
+        live = self._expires[:size] > now
+
+        if self._centroids is not None:
+            nprobe = min(self.nprobe, self._centroids.shape[0])
+            probes = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.nonzero(np.isin(self._assignments[:size], probes) & live)[0]
+            scores = self._matrix[candidates] @ query
+        else:
+            candidates = np.nonzero(live)[0]
+            scores = self._exact_scores(query)[candidates]
+
+        results: List[Tuple[str, float]] = []
+        if len(candidates):
+            top = min(k, len(candidates))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            results = [(self._ids[candidates[i]], float(scores[i])) for i in best]
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._searches += 1
+        self._total_search_ms += elapsed_ms
+        self._recent_search_ms.append(elapsed_ms)
+
+        if self._centroids is not None and random.random() < self.recall_sample_rate:
+            self._sample_recall(query, live, results)
+
+        return results
+
+    def _sample_recall(self, query: np.ndarray, live: np.ndarray, results: List[Tuple[str, float]]) -> None:
+        """Compare the approximate top-1 against an exact scan."""
+        scores = np.where(live, self._exact_scores(query), -np.inf)
+        exact_best = int(np.argmax(scores))
+        if not np.isfinite(scores[exact_best]):
+            return
+        self._recall_samples += 1
+        if results and results[0][0] == self._ids[exact_best]:
+            self._recall_hits += 1
+
+    # ===== Stats =====
+
+    def get_stats(self) -> Dict:
+        """Index size, search latency and sampled recall."""
+        recent = sorted(self._recent_search_ms)
+
+        def pct(p: float) -> float:
+            if not recent:
+                return 0.0
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))], 3)
+
+        return {
+            "size": len(self._ids),
+            "mode": "ivf" if self._centroids is not None else "exact",
+            "lists": int(self._centroids.shape[0]) if self._centroids is not None else 0,
+            "nprobe": self.nprobe,
+            "searches": self._searches,
+            "rebuilds": self._rebuilds,
+            "avg_search_ms": round(self._total_search_ms / self._searches, 3) if self._searches else 0.0,
+            "p50_search_ms": pct(0.50),
+            "p95_search_ms": pct(0.95),
+            "recall_samples": self._recall_samples,
+            "estimated_recall": (
+                round(self._recall_hits / self._recall_samples, 4) if self._recall_samples else None
+            ),
+        }
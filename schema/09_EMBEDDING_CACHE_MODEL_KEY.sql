@@ -0,0 +1,10 @@
+-- Embedding cache keyed by (embedding_model, content_hash)
+-- Embeddings are stored as raw little-endian float32 bytes so any model dimension fits
+-- and reads need no vector decoding. Used by app/services/embedding_cache.py.
+
+ALTER TABLE embedding_cache ADD COLUMN IF NOT EXISTS embedding_bytes BYTEA;
+
+-- The same text embedded by two models must be two rows
+ALTER TABLE embedding_cache DROP CONSTRAINT IF EXISTS embedding_cache_content_hash_key;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_cache_model_hash
+    ON embedding_cache(embedding_model, content_hash);
@@ -0,0 +1,66 @@
+-- Materialized usage and cost rollups
+-- Per-minute/hour/day aggregates of api_usage by provider, model and agent.
+-- Maintained incrementally by app/services/usage_rollups.py (additive UPSERTs
+-- of in-process deltas), so readers sum O(buckets) rows instead of scanning api_usage.
+
+CREATE TABLE IF NOT EXISTS usage_rollups (
+    granularity VARCHAR(6) NOT NULL CHECK (granularity IN ('minute', 'hour', 'day')),
+    bucket_start TIMESTAMPTZ NOT NULL,
+    provider VARCHAR(50) NOT NULL DEFAULT '',
+    model VARCHAR(100) NOT NULL DEFAULT '',
+    -- Unattributed usage is recorded under the nil UUID so it can be part of the key
+    agent_id UUID NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+    request_count BIGINT NOT NULL DEFAULT 0,
+    success_count BIGINT NOT NULL DEFAULT 0,
+    cache_hits BIGINT NOT NULL DEFAULT 0,
+    input_tokens BIGINT NOT NULL DEFAULT 0,
+    output_tokens BIGINT NOT NULL DEFAULT 0,
+    cached_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(14,6) NOT NULL DEFAULT 0,
+    latency_ms_sum BIGINT NOT NULL DEFAULT 0,
+    latency_samples BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (granularity, bucket_start, provider, model, agent_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_usage_rollups_bucket
+    ON usage_rollups(granularity, bucket_start DESC);
+
+COMMENT ON TABLE usage_rollups IS 'Incrementally maintained api_usage aggregates (minute/hour/day)';
+
+-- Backfill from existing api_usage so month-to-date and 7-day reads are
+-- complete right after deploy. Buckets are UTC, as in usage_rollups.py, and
+-- minute/hour history is limited to its retention. Idempotent: buckets that
+-- already exist (backfilled or written by the app) are left alone.
+INSERT INTO usage_rollups (
+    granularity, bucket_start, provider, model, agent_id,
+    request_count, success_count, cache_hits, input_tokens, output_tokens,
+    cached_tokens, cost_usd, latency_ms_sum, latency_samples
+)
+SELECT
+    g.granularity,
+    date_trunc(g.granularity, u.timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+    COALESCE(p.name, ''),
+    COALESCE(m.model_id, ''),
+    COALESCE(u.agent_id, '00000000-0000-0000-0000-000000000000'),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE u.success),
+    COUNT(*) FILTER (WHERE u.cache_hit),
+    COALESCE(SUM(u.input_tokens), 0),
+    COALESCE(SUM(u.output_tokens), 0),
+    COALESCE(SUM(u.cached_tokens), 0),
+    COALESCE(SUM(u.cost_usd), 0),
+    COALESCE(SUM(u.latency_ms), 0),
+    COUNT(u.latency_ms)
+FROM api_usage u
+CROSS JOIN (VALUES
+    ('minute', INTERVAL '2 days'),
+    ('hour', INTERVAL '90 days'),
+    ('day', NULL::INTERVAL)
+) AS g(granularity, retention)
+LEFT JOIN ai_providers p ON p.id = u.provider_id
+LEFT JOIN ai_models m ON m.id = u.model_id
+WHERE u.timestamp IS NOT NULL
+  AND (g.retention IS NULL OR u.timestamp >= date_trunc('hour', NOW()) - g.retention)
+GROUP BY 1, 2, 3, 4, 5
+ON CONFLICT (granularity, bucket_start, provider, model, agent_id) DO NOTHING;
@@ -0,0 +1,16 @@
+-- Incremental email sync checkpoints
+-- One row per account/folder: the folder's UIDVALIDITY and the highest UID
+-- whose message has been processed. Maintained by app/services/email_sync.py;
+-- a scan fetches only UIDs above last_uid, and resyncs its date window when
+-- the server reports a different UIDVALIDITY.
+
+CREATE TABLE IF NOT EXISTS email_sync_state (
+    account VARCHAR(50) NOT NULL,
+    folder VARCHAR(255) NOT NULL,
+    uidvalidity BIGINT NOT NULL,
+    last_uid BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (account, folder)
+);
+
+COMMENT ON TABLE email_sync_state IS 'Per account/folder IMAP checkpoints (UIDVALIDITY + last processed UID)';
@@ -0,0 +1,14 @@
+-- Metadata predicates for memory search
+-- MemoryQuery.session_id/source/created_after/created_before are applied inside the
+-- pgvector query (app/agents/memory.py). These indexes let Postgres start from the
+-- session's rows and rank only those by distance, so filtered top-k is exact and
+-- its cost follows the session size rather than the whole table.
+
+CREATE INDEX IF NOT EXISTS idx_memories_session
+    ON memories (agent_id, (metadata->>'session_id'), created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_memories_source
+    ON memories (agent_id, (metadata->>'source'), created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_memories_created_at
+    ON memories (agent_id, created_at DESC);
@@ -0,0 +1,22 @@
+-- Memory consolidation watermarks
+-- One row per consolidation job type and scope (an agent id, or 'all'): the
+-- (created_at, id) of the last memory the job has streamed. Maintained by
+-- app/services/memory_consolidation.py; each run reads only memories after it,
+-- and never advances past a cluster whose summary failed.
+
+CREATE TABLE IF NOT EXISTS memory_consolidation_state (
+    job_type VARCHAR(50) NOT NULL,
+    scope VARCHAR(64) NOT NULL,
+    last_created_at TIMESTAMPTZ NOT NULL,
+    last_memory_id UUID NOT NULL,
+    memories_seen BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (job_type, scope)
+);
+
+-- Keyset pagination for the consolidation stream
+CREATE INDEX IF NOT EXISTS idx_memories_created_id
+    ON memories (created_at, id)
+    WHERE expires_at IS NULL;
+
+COMMENT ON TABLE memory_consolidation_state IS 'Per job/scope consolidation watermark (last streamed created_at, id)';
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark agent_performance_metrics flush throughput.
+
+Compares the old per-row INSERT loop with PerformanceMonitor's COPY flush.
+Rows are tagged with a run id and deleted afterwards.
+
+Usage: python scripts/benchmark_metrics_flush.py [rows]
+"""
+
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, '.')
+
+from app.database import db
+from app.agents.monitoring import (
+    PerformanceMonitor, PerformanceMetric, MetricType, SYSTEM_AGENT_ID
+)
+
+
+def make_metrics(count: int, run_id: str, offset: int) -> list:
+    # Distinct timestamps keep rows clear of the (agent_id, metric_type, timestamp) unique key
+    base = datetime.now()
+    return [
+        PerformanceMetric(
+            agent_id=SYSTEM_AGENT_ID,
+            metric_type=MetricType.LATENCY,
+            value=float(i % 1000),
+            timestamp=base + timedelta(microseconds=offset + i),
+            tags={"benchmark": run_id}
+        )
+        for i in range(count)
+    ]
+
+
+async def per_row_insert(metrics: list) -> None:
+    """The previous flush: one db.execute per metric."""
+    for metric in metrics:
+        await db.execute(
+            """
+            INSERT INTO agent_performance_metrics
+            (agent_id, metric_type, value, timestamp, tags)
+            VALUES ($1, $2, $3, $4, $5)
+            """,
+            metric.agent_id,
+            metric.metric_type.value,
+            metric.value,
+            metric.timestamp,
+            metric.tags
+        )
+
+
+async def copy_flush(metrics: list) -> PerformanceMonitor:
+    monitor = PerformanceMonitor()
+    monitor.max_buffered_metrics = len(metrics)
+    monitor.metrics_buffer = metrics
+    await monitor._flush_metrics_buffer()
+    return monitor
+
+
+async def main(rows: int) -> None:
+    await db.connect()
+    run_id = uuid.uuid4().hex
+
+    try:
+        metrics = make_metrics(rows, run_id, 0)
+        start = time.perf_counter()
+        await per_row_insert(metrics)
+        per_row_seconds = time.perf_counter() - start
+
+        metrics = make_metrics(rows, run_id, rows)
+        start = time.perf_counter()
+        monitor = await copy_flush(metrics)
+        copy_seconds = time.perf_counter() - start
+        stats = monitor.get_flush_stats()
+        if monitor._flush_conn:
+            await monitor._flush_conn.close()
+
+        print(f"Rows per run: {rows:,}")
+        print(f"  per-row INSERT: {per_row_seconds:8.3f}s  {rows / per_row_seconds:12,.0f} rows/s")
+        print(f"  COPY flush:     {copy_seconds:8.3f}s  {rows / copy_seconds:12,.0f} rows/s")
+        print(f"  speedup:        {per_row_seconds / copy_seconds:8.1f}x")
+        print(f"  flush stats:    {json.dumps(stats)}")
+    finally:
+        await db.execute(
+            "DELETE FROM agent_performance_metrics WHERE tags->>'benchmark' = $1",
+            run_id
+        )
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -295,3 +295,118 @@ class TestEmailIntelligenceAgent:
             mock_save_state.assert_called_once()
             assert email_agent.status == AgentStatus.STOPPED
 
+
+
+class TestEmailPipeline:
+    """Test suite for the batched process_emails pipeline."""
+
+    @pytest.fixture
+    def emails(self):
+        from datetime import datetime
+        from app.services.email_client import EmailMessage
+        return [
+            EmailMessage(f"<m{i}>", "gmail", f"user{i}@example.com", f"User {i}", "me",
+                         f"Subject {i}", "body", "body", datetime(2026, 10, 1), uid=i)
+            for i in (1, 2, 3)
+        ]
+
+    @pytest.fixture
+    def pipeline(self):
+        from app.agents import email_intelligence
+        from app.services.email_learner import PreferenceSnapshot
+
+        db = Mock()
+        db.execute_many = AsyncMock()
+        with patch.object(email_intelligence, "db", db), \
+             patch.object(email_intelligence, "load_preference_snapshot",
+                          AsyncMock(return_value=PreferenceSnapshot())) as load_prefs, \
+             patch.object(email_intelligence, "load_full_bodies", AsyncMock()), \
+             patch.object(email_intelligence, "archive_email", AsyncMock(return_value=True)), \
+             patch.object(email_intelligence, "store_email_insights_in_memory", AsyncMock()):
+            yield email_intelligence, db, load_prefs
+
+    @pytest.mark.asyncio
+    async def test_batch_classification_falls_back_per_email(self, pipeline, emails):
+        """One prompt classifies the batch; unlabeled emails are classified alone."""
+        email_intelligence, db, load_prefs = pipeline
+        replies = {
+            email_intelligence.CLASSIFY_BATCH_SYSTEM: '{"1": "promo", "2": "Social", "3": "nonsense"}',
+            email_intelligence.CLASSIFY_SYSTEM: "promo",
+        }
+        ai_request = AsyncMock(side_effect=lambda prompt, task_type, system: {
+            "content": replies[system], "provider": "groq"
+        })
+
+        with patch.object(email_intelligence, "ai_request", ai_request):
+            results = await email_intelligence.process_emails(emails)
+
+        systems = [c.kwargs["system"] for c in ai_request.call_args_list]
+        assert systems == [email_intelligence.CLASSIFY_BATCH_SYSTEM, email_intelligence.CLASSIFY_SYSTEM]
+        assert [r["classification"] for r in results] == ["promo", "social", "promo"]
+        assert [r["action_taken"] for r in results] == ["archived", None, "archived"]
+        load_prefs.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_results_written_in_one_transaction(self, pipeline, emails):
+        """Processed rows and extracted entities go out in a single execute_many."""
+        email_intelligence, db, _ = pipeline
+        replies = {
+            email_intelligence.CLASSIFY_BATCH_SYSTEM: '{"1": "financial", "2": "work", "3": "promo"}',
+            email_intelligence.EXTRACT_SYSTEM: '{"people": [{"name": "Ann", "email": "ann@example.com"}]}',
+            email_intelligence.SUMMARIZE_SYSTEM: "A summary.",
+        }
+        ai_request = AsyncMock(side_effect=lambda prompt, task_type, system: {
+            "content": replies[system], "provider": "groq"
+        })
+
+        with patch.object(email_intelligence, "ai_request", ai_request):
+            results = await email_intelligence.process_emails(emails)
+
+        assert results[0]["summary"] == "A summary."
+        db.execute_many.assert_awaited_once()
+        (processed_sql, processed_rows), (entity_sql, entity_rows) = db.execute_many.call_args.args[0]
+        assert "processed_emails" in processed_sql
+        assert [row[0] for row in processed_rows] == ["<m1>", "<m2>", "<m3>"]
+        assert [row[:2] for row in entity_rows] == [("<m1>", "person"), ("<m2>", "person")]
+
+    @pytest.mark.asyncio
+    async def test_failing_email_does_not_stop_batch(self, pipeline, emails):
+        """An email whose action raises gets an error result; the rest are stored."""
+        email_intelligence, db, _ = pipeline
+        ai_request = AsyncMock(return_value={"content": '{"1": "promo", "2": "spam", "3": "promo"}', "provider": "groq"})
+
+        with patch.object(email_intelligence, "ai_request", ai_request), \
+             patch.object(email_intelligence, "delete_email", AsyncMock(side_effect=RuntimeError("imap down"))):
+            results = await email_intelligence.process_emails(emails)
+
+        assert results[1] == {"error": "imap down", "message_id": "<m2>"}
+        processed_rows = db.execute_many.call_args.args[0][0][1]
+        assert [row[0] for row in processed_rows] == ["<m1>", "<m3>"]
+
+    @pytest.mark.asyncio
+    async def test_malformed_extraction_does_not_fail_batch(self, pipeline, emails):
+        """A malformed extraction loses only its bad entries; every email is still stored."""
+        email_intelligence, db, _ = pipeline
+
+        def reply(prompt, task_type, system):
+            if system == email_intelligence.CLASSIFY_BATCH_SYSTEM:
+                content = '{"1": "financial", "2": "work", "3": "promo"}'
+            elif system == email_intelligence.EXTRACT_SYSTEM and "Subject 1" in prompt:
+                content = '{"dates": ["2024-01-02"], "transaction": {"amount": 12.5, "merchant": "Shop"}}'
+            elif system == email_intelligence.EXTRACT_SYSTEM:
+                content = '{"people": [{"name": "Ann", "email": "ann@example.com"}]}'
+            else:
+                content = "A summary."
+            return {"content": content, "provider": "groq"}
+
+        with patch.object(email_intelligence, "ai_request", AsyncMock(side_effect=reply)):
+            results = await email_intelligence.process_emails(emails)
+
+        assert not any("error" in result for result in results)
+        assert results[0]["extracted_data"] == {"dates": [], "transaction": {"amount": "12.5", "merchant": "Shop"}}
+        (_, processed_rows), (_, entity_rows) = db.execute_many.call_args.args[0]
+        assert [row[0] for row in processed_rows] == ["<m1>", "<m2>", "<m3>"]
+        assert entity_rows == [
+            ("<m1>", "transaction", "12.5", "Shop - "),
+            ("<m2>", "person", "Ann", "ann@example.com"),
+        ]
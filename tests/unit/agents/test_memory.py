@@ -7,6 +7,7 @@ Tests memory storage, retrieval, and the specific fixes made in Phase 1:
 - Memory consolidation and pruning
 """
 
+import numpy as np
 import pytest
 import uuid
 from unittest.mock import AsyncMock, Mock, patch, MagicMock
@@ -185,7 +186,7 @@ class TestMemorySystem:
             mock_db.execute = AsyncMock()
 
             # Mock embedding generation
-            with patch('app.agents.memory.get_embedding', AsyncMock(return_value=[0.1] * 384)):
+            with patch('app.agents.memory.embed', AsyncMock(return_value=np.full(384, 0.1, dtype=np.float32))):
                 # Execute
                 memory_id = await memory_system.store_memory(
                     agent_id=agent_id,
@@ -210,13 +211,15 @@ class TestMemorySystem:
         agent_id = str(uuid.uuid4())
         content = "Test content for embedding"
         memory_type = MemoryType.SEMANTIC
-        expected_embedding = [0.1] * 384
+        expected_embedding = np.full(384, 0.1, dtype=np.float32)
 
-        # Mock embedding generation
-        with patch('app.agents.memory.get_embedding', AsyncMock(return_value=expected_embedding)):
+        # Mock embedding generation (store_memory is a bulk write of one)
+        with patch('app.agents.memory.embed_many', AsyncMock(return_value=[expected_embedding])):
             # Mock database insert
             with patch('app.agents.memory.db') as mock_db:
-                mock_db.execute = AsyncMock()
+                conn = MagicMock()
+                conn.execute = AsyncMock()
+                mock_db.connection.return_value.__aenter__.return_value = conn
 
                 # Execute
                 await memory_system.store_memory(
@@ -226,8 +229,9 @@ class TestMemorySystem:
                 )
 
                 # Verify embedding was generated
-                from app.agents.memory import get_embedding
-                get_embedding.assert_called_once_with(content)
+                from app.agents.memory import embed_many
+                embed_many.assert_called_once_with([content])
+                assert conn.execute.await_count == 2  # memories + semantic_memories
 
     @pytest.mark.asyncio
     async def test_query_memories_semantic(self, memory_system):
@@ -244,7 +248,7 @@ class TestMemorySystem:
         )
 
         # Mock embedding and similarity calculation
-        with patch('app.agents.memory.get_embedding', AsyncMock(return_value=[0.1] * 384)):
+        with patch('app.agents.memory.embed', AsyncMock(return_value=np.full(384, 0.1, dtype=np.float32))):
             with patch('app.agents.memory.cosine_similarity', Mock(return_value=0.8)):
                 # Mock database query for memories
                 with patch.object(memory_system, 'get_memories', AsyncMock(return_value=[])):
@@ -0,0 +1,152 @@
+"""
+Unit tests for MemorySystem bulk ingestion.
+
+Tests multi-row INSERT expansion, store_memories_bulk's single embedding
+batch, one ChromaDB add per collection and one Postgres transaction shared
+with caller writes, and enqueue_memory's write-behind path.
+"""
+
+import numpy as np
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.agents import memory as memory_module
+from app.agents.memory import (
+    INSERT_SEMANTIC, MemoryRecord, MemorySystem, MemoryType, multi_row_inserts
+)
+
+
+def fake_db():
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+
+    @asynccontextmanager
+    async def transaction():
+        conn.transactions += 1
+        yield
+
+    @asynccontextmanager
+    async def connection():
+        yield conn
+
+    conn.transactions = 0
+    conn.transaction = transaction
+    db = MagicMock()
+    db.connection = connection
+    return db, conn
+
+
+class TestMultiRowInserts:
+    """Test suite for multi_row_inserts."""
+
+    def test_numbers_parameters_per_row(self):
+        (sql, params), = multi_row_inserts(INSERT_SEMANTIC, [("m1", "a"), ("m2", "b")])
+
+        assert "($1, 'unknown', 'contains', $2),\n($3, 'unknown', 'contains', $4)" in sql
+        assert params == ["m1", "a", "m2", "b"]
+
+    def test_splits_at_parameter_limit(self):
+        with patch.object(memory_module, "MAX_QUERY_PARAMS", 5):
+            statements = multi_row_inserts(INSERT_SEMANTIC, [(f"m{i}", "x") for i in range(5)])
+
+        assert [len(params) for _, params in statements] == [4, 4, 2]
+        assert multi_row_inserts(INSERT_SEMANTIC, []) == []
+
+
+class TestStoreMemoriesBulk:
+    """Test suite for MemorySystem.store_memories_bulk."""
+
+    @pytest.mark.asyncio
+    async def test_one_write_per_backend(self):
+        """One embedding batch, one add per collection, one transaction."""
+        system = MemorySystem()
+        system.chroma_client = object()
+        collections = {t.value: MagicMock() for t in (MemoryType.SEMANTIC, MemoryType.EPISODIC)}
+        system.chroma_collections = collections
+        records = [
+            MemoryRecord("agent", "fact one"),
+            MemoryRecord("agent", "chat turn", MemoryType.EPISODIC, metadata={"session_id": "s1"}),
+            MemoryRecord("agent", "fact two", strength_score=0.2),
+        ]
+        embed_many = AsyncMock(return_value=[np.ones(4, dtype=np.float32)] * 3)
+        db, conn = fake_db()
+
+        with patch.object(memory_module, "db", db), patch.object(memory_module, "embed_many", embed_many):
+            ids = await system.store_memories_bulk(records)
+
+        assert ids == [r.memory_id for r in records]
+        embed_many.assert_awaited_once_with(["fact one", "chat turn", "fact two"])
+        semantic_add = collections["semantic"].add.call_args.kwargs
+        assert semantic_add["ids"] == [records[0].memory_id, records[2].memory_id]
+        assert collections["episodic"].add.call_args.kwargs["metadatas"][0]["session_id"] == "s1"
+
+        assert conn.transactions == 1
+        statements = [call.args[0] for call in conn.execute.await_args_list]
+        assert len(statements) == 3
+        assert "INSERT INTO memories" in statements[0] and "$23" in statements[0]
+        assert "semantic_memories" in statements[1] and "episodic_memories" in statements[2]
+
+        assert system.memory_cache.get_entry(records[2].memory_id).expires_at is not None
+        stats = system.get_ingest_stats()
+        assert stats["batches"] == 1 and stats["memories"] == 3
+
+    @pytest.mark.asyncio
+    async def test_in_transaction_shares_the_insert_transaction(self):
+        """Extra writes run on the INSERT connection; a failure there rolls back the batch."""
+        system = MemorySystem()
+        system.chroma_client = object()
+        collection = MagicMock()
+        system.chroma_collections = {"semantic": collection}
+        db, conn = fake_db()
+        extra = AsyncMock(side_effect=RuntimeError("archive failed"))
+
+        with patch.object(memory_module, "db", db), \
+                patch.object(memory_module, "embed_many", AsyncMock(return_value=[np.ones(4, dtype=np.float32)])):
+            with pytest.raises(RuntimeError):
+                await system.store_memories_bulk([MemoryRecord("agent", "summary")], in_transaction=extra)
+
+        extra.assert_awaited_once_with(conn)
+        assert conn.transactions == 1
+        collection.add.assert_not_called()
+        assert len(system.memory_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_transaction_writes_no_vectors(self):
+        """ChromaDB is only written after the Postgres commit."""
+        system = MemorySystem()
+        system.chroma_client = object()
+        collection = MagicMock()
+        system.chroma_collections = {"semantic": collection}
+        db, conn = fake_db()
+        conn.execute = AsyncMock(side_effect=ValueError("invalid input for query argument $2"))
+
+        with patch.object(memory_module, "db", db), \
+                patch.object(memory_module, "embed_many", AsyncMock(return_value=[np.ones(4, dtype=np.float32)])):
+            with pytest.raises(ValueError):
+                await system.store_memories_bulk([MemoryRecord("not-a-uuid", "fact")])
+
+        collection.add.assert_not_called()
+        assert len(system.memory_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_store_memory_uses_bulk_path(self):
+        system = MemorySystem()
+        with patch.object(system, "store_memories_bulk", AsyncMock(return_value=["m1"])) as bulk:
+            memory_id = await system.store_memory("agent", "content", tags=["x"])
+
+        assert memory_id == "m1"
+        (record,), = bulk.await_args.args
+        assert (record.agent_id, record.content, record.tags) == ("agent", "content", ["x"])
+
+    @pytest.mark.asyncio
+    async def test_enqueue_returns_id_and_flushes_in_bulk(self):
+        system = MemorySystem()
+        records = [MemoryRecord("agent", f"turn {i}") for i in range(3)]
+
+        with patch.object(system.ingest, "write_batch", AsyncMock()) as write:
+            ids = [system.enqueue_memory(record) for record in records]
+            await system.ingest.close()
+
+        assert ids == [r.memory_id for r in records]
+        write.assert_awaited_once_with(records)
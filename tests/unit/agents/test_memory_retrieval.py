@@ -0,0 +1,206 @@
+"""
+Unit tests for MemorySystem.search_memories retrieval.
+
+Tests the vectorized candidate scoring (recency, importance, tag and
+similarity filters), the merge of concurrent ChromaDB and pgvector
+candidates with a single detail fetch, and metadata predicates pushed
+into both backends.
+"""
+
+import numpy as np
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from app.agents import memory as memory_module
+from app.agents.memory import MemoryQuery, MemorySystem, chromadb_where, rank_candidates
+
+
+def memory_row(memory_id, similarity=None, tags=None, importance=0.5, accessed=None):
+    row = {
+        "id": memory_id,
+        "agent_id": "agent",
+        "memory_type": "episodic",
+        "content": f"memory {memory_id}",
+        "importance_score": importance,
+        "strength_score": 1.0,
+        "last_accessed_at": accessed,
+        "tags": tags or ["chat"],
+        "metadata": {},
+    }
+    if similarity is not None:
+        row["similarity"] = similarity
+    return row
+
+
+class TestRankCandidates:
+    """Test suite for rank_candidates."""
+
+    def test_recency_blends_into_score(self):
+        """A just-accessed memory outranks a slightly more similar stale one."""
+        now = datetime.now(timezone.utc)
+        query = MemoryQuery(query_text="q", limit=2, min_similarity=0.5, recency_weight=0.5)
+
+        top = rank_candidates(
+            similarities=[0.9, 0.8, 0.85],
+            last_accessed=[now - timedelta(days=30), now, None],
+            importance=[0.5, 0.5, 0.5],
+            tags=[None, None, None],
+            query=query
+        )
+
+        assert [i for i, _ in top] == [1, 2]
+        assert top[0][1] == pytest.approx(0.9, abs=1e-3)
+        assert top[1][1] == pytest.approx(0.85)
+
+    def test_filters_and_importance_tiebreak(self):
+        """Low similarity and non-matching tags drop out; ties prefer importance."""
+        query = MemoryQuery(query_text="q", limit=5, min_similarity=0.7, tags=["chat"], recency_weight=0)
+
+        top = rank_candidates(
+            similarities=[0.8, 0.8, 0.6, 0.95],
+            last_accessed=[None] * 4,
+            importance=[0.2, 0.9, 0.9, 0.9],
+            tags=[["chat"], ["chat", "x"], ["chat"], ["other"]],
+            query=query
+        )
+
+        assert [i for i, _ in top] == [1, 0]
+
+
+class TestSearchMemories:
+    """Test suite for the merged search path."""
+
+    @pytest.mark.asyncio
+    async def test_merges_backends_with_one_detail_fetch(self):
+        """pgvector rows are reused; only ChromaDB-only hits are fetched."""
+        system = MemorySystem()
+        system.chroma_client = object()
+        shared, chroma_only, pg_only = (str(uuid.uuid4()) for _ in range(3))
+
+        db = AsyncMock()
+        db.fetch_all = AsyncMock(side_effect=[
+            [memory_row(shared, similarity=0.75), memory_row(pg_only, similarity=0.8)],
+            [memory_row(chroma_only)],
+        ])
+
+        with patch.object(memory_module, "db", db), \
+                patch.object(memory_module, "embed", AsyncMock(return_value=np.ones(4, dtype=np.float32))), \
+                patch.object(system, "_search_memories_in_chromadb",
+                             AsyncMock(return_value=[(shared, 0.9), (chroma_only, 0.85)])):
+            results = await system.search_memories(
+                MemoryQuery(query_text="q", limit=3, min_similarity=0.7, recency_weight=0)
+            )
+
+        assert [r.memory_id for r in results] == [shared, chroma_only, pg_only]
+        assert results[0].similarity == pytest.approx(0.9)
+        assert db.fetch_all.await_args_list[1].args[1] == [chroma_only]
+        stats = system.get_search_stats()
+        assert stats["searches"] == 1
+        assert set(stats["last_ms"]) == {"embed", "vector_search", "fetch_details", "score", "total"}
+
+
+class TestMetadataFilters:
+    """Test suite for metadata predicates pushed into the vector queries."""
+
+    def test_chromadb_where(self):
+        """Agent, session and date predicates become one `$and` clause."""
+        after = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        query = MemoryQuery(query_text="q", agent_id="a", session_id="s1", created_after=after)
+
+        assert chromadb_where(query) == {"$and": [
+            {"agent_id": "a"},
+            {"session_id": "s1"},
+            {"created_ts": {"$gte": after.timestamp()}},
+        ]}
+        assert chromadb_where(MemoryQuery(query_text="q", agent_id="a")) == {"agent_id": "a"}
+        assert chromadb_where(MemoryQuery(query_text="q")) is None
+
+    @pytest.mark.asyncio
+    async def test_session_filter_reaches_both_backends(self):
+        """The session predicate is in the ChromaDB where and every SQL query."""
+        system = MemorySystem()
+        system.chroma_client = object()
+        chroma_only = str(uuid.uuid4())
+
+        db = AsyncMock()
+        db.fetch_all = AsyncMock(side_effect=[[], [memory_row(chroma_only)]])
+        chroma = AsyncMock(return_value=[(chroma_only, 0.9)])
+
+        with patch.object(memory_module, "db", db), \
+                patch.object(memory_module, "embed", AsyncMock(return_value=np.ones(4, dtype=np.float32))), \
+                patch.object(system, "_search_memories_in_chromadb", chroma):
+            results = await system.search_memories(
+                MemoryQuery(query_text="q", agent_id="a", session_id="s1", source="chat_exchange")
+            )
+
+        assert [r.memory_id for r in results] == [chroma_only]
+        assert chroma.call_args.kwargs["where"]["$and"][1] == {"session_id": "s1"}
+        for call in db.fetch_all.await_args_list:
+            sql, *params = call.args
+            assert "metadata->>'session_id' = $" in sql
+            assert "metadata->>'source' = $" in sql
+            assert "s1" in params and "chat_exchange" in params
+
+
+class TestSearchCache:
+    """Test suite for serving detail rows from the memory cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_search_skips_detail_fetch(self):
+        """A ChromaDB-only hit fetched once is served from the cache next time."""
+        system = MemorySystem()
+        system.chroma_client = object()
+        chroma_only = str(uuid.uuid4())
+
+        db = AsyncMock()
+        db.fetch_all = AsyncMock(side_effect=[[], [memory_row(chroma_only)], []])
+        query = MemoryQuery(query_text="q", limit=3, min_similarity=0.7, recency_weight=0)
+
+        with patch.object(memory_module, "db", db), \
+                patch.object(memory_module, "embed", AsyncMock(return_value=np.ones(4, dtype=np.float32))), \
+                patch.object(system, "_search_memories_in_chromadb",
+                             AsyncMock(return_value=[(chroma_only, 0.9)])):
+            first = await system.search_memories(query)
+            second = await system.search_memories(query)
+
+        assert [r.memory_id for r in second] == [r.memory_id for r in first] == [chroma_only]
+        assert second[0].similarity == pytest.approx(0.9)
+        assert db.fetch_all.await_count == 3  # pgvector twice, details once
+        assert system.memory_cache.get(chroma_only).similarity == 1.0
+        assert system.get_search_stats()["searches"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_rows_respect_metadata_filters(self):
+        """A cached memory from another session is not returned."""
+        system = MemorySystem()
+        system.chroma_client = object()
+        memory_id = str(uuid.uuid4())
+        row = memory_row(memory_id)
+        row["metadata"] = {"session_id": "s2"}
+        system._cache_row(row)
+
+        db = AsyncMock()
+        db.fetch_all = AsyncMock(return_value=[])
+
+        with patch.object(memory_module, "db", db), \
+                patch.object(memory_module, "embed", AsyncMock(return_value=np.ones(4, dtype=np.float32))), \
+                patch.object(system, "_search_memories_in_chromadb",
+                             AsyncMock(return_value=[(memory_id, 0.9)])):
+            results = await system.search_memories(MemoryQuery(query_text="q", session_id="s1"))
+
+        assert results == []
+        assert db.fetch_all.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_forget_invalidates(self):
+        """Forgetting a memory drops it from the cache."""
+        system = MemorySystem()
+        memory_id = str(uuid.uuid4())
+        system._cache_row(memory_row(memory_id))
+
+        with patch.object(memory_module, "db", AsyncMock()):
+            assert await system.forget_memory(memory_id)
+
+        assert memory_id not in system.memory_cache
@@ -5,15 +5,19 @@ Tests performance monitoring, metrics collection, and the specific fixes made in
 - UUID conversion for 'system' agent_id
 - Performance metric aggregation
 - Alert generation and management
+- Batched COPY flush of the metrics buffer
 """
 
+import asyncpg
 import pytest
 import uuid
+from collections import deque
 from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from app.agents.monitoring import PerformanceMonitor, AlertSeverity, Alert
+from app.agents import monitoring
+from app.agents.monitoring import PerformanceMonitor, AlertSeverity, Alert, MetricType
 from app.agents.base import AgentStatus
 
 
@@ -416,4 +420,63 @@ class TestPerformanceMonitor:
         agent_metrics = export_data["agent_metrics"]
         assert agent_id in agent_metrics
         assert "latency_ms" in agent_metrics[agent_id]
-        assert "success_rate" in agent_metrics[agent_id]
\ No newline at end of file
+        assert "success_rate" in agent_metrics[agent_id]
+
+    @pytest.mark.asyncio
+    async def test_flush_copies_buffer_in_one_batch(self, performance_monitor):
+        """Buffered metrics are written with a single COPY on the dedicated connection."""
+        conn = Mock()
+        conn.is_closed = Mock(return_value=False)
+        conn.copy_records_to_table = AsyncMock()
+        for i in range(3):
+            await performance_monitor.record_metric("system", MetricType.LATENCY, float(i))
+
+        with patch.object(monitoring, "db") as mock_db:
+            mock_db.connect_dedicated = AsyncMock(return_value=conn)
+            await performance_monitor._flush_metrics_buffer()
+
+        conn.copy_records_to_table.assert_awaited_once()
+        args, kwargs = conn.copy_records_to_table.call_args
+        assert args[0] == "agent_performance_metrics"
+        assert len(kwargs["records"]) == 3
+        assert kwargs["records"][0][0] == uuid.UUID(monitoring.SYSTEM_AGENT_ID)
+        assert len(performance_monitor.metrics_buffer) == 0
+        assert performance_monitor.get_flush_stats()["rows_written"] == 3
+
+    @pytest.mark.asyncio
+    async def test_flush_isolates_rejected_rows(self, performance_monitor):
+        """A row Postgres rejects is dropped without losing the rest of the batch."""
+
+        def copy(table, records, columns):
+            if any(record[2] == Decimal("2.0") for record in records):
+                raise asyncpg.UniqueViolationError("duplicate key")
+
+        conn = Mock()
+        conn.is_closed = Mock(return_value=False)
+        conn.copy_records_to_table = AsyncMock(side_effect=copy)
+        for value in (1.0, 2.0, 3.0, 4.0):
+            await performance_monitor.record_metric("system", MetricType.LATENCY, value)
+
+        with patch.object(monitoring, "db") as mock_db:
+            mock_db.connect_dedicated = AsyncMock(return_value=conn)
+            await performance_monitor._flush_metrics_buffer()
+
+        stats = performance_monitor.get_flush_stats()
+        assert stats["rows_written"] == 3
+        assert stats["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_within_bound(self, performance_monitor):
+        """Metrics survive a connection failure, and overflow sheds the oldest."""
+        performance_monitor.metrics_buffer = deque(maxlen=3)
+        for value in (1.0, 2.0, 3.0, 4.0):
+            await performance_monitor.record_metric("system", MetricType.LATENCY, value)
+
+        with patch.object(monitoring, "db") as mock_db:
+            mock_db.connect_dedicated = AsyncMock(side_effect=OSError("connection refused"))
+            await performance_monitor._flush_metrics_buffer()
+
+        stats = performance_monitor.get_flush_stats()
+        assert [m.value for m in performance_monitor.metrics_buffer] == [2.0, 3.0, 4.0]
+        assert stats["dropped"] == 1
+        assert stats["flush_errors"] == 1
@@ -0,0 +1,185 @@
+"""
+Unit tests for the AI chat service.
+
+Tests token streaming from OpenAI-compatible providers, cache hits on the
+streaming path, provider fallback before the first token and coalescing of
+identical concurrent chat requests and concurrent context assembly for
+intelligent chat under one budget.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import ai
+
+
+def _sse_lines(tokens, usage=None):
+    lines = ["data: " + json.dumps({"choices": [{"delta": {"content": t}}]}) for t in tokens]
+    if usage:
+        lines.append("data: " + json.dumps({"choices": [], "usage": usage}))
+    lines.append("data: [DONE]")
+    return lines
+
+
+def _fake_stream(lines_by_provider):
+    """Stand-in for provider_clients.stream replaying canned SSE lines."""
+    @asynccontextmanager
+    async def stream(provider, method, url, **kwargs):
+        lines = lines_by_provider[provider]
+        if isinstance(lines, Exception):
+            raise lines
+
+        async def aiter_lines():
+            for line in lines:
+                yield line
+
+        response = MagicMock()
+        response.aiter_lines = aiter_lines
+        yield response
+
+    return stream
+
+
+async def _collect(events):
+    tokens, done = [], None
+    async for event in events:
+        if event.type == "token":
+            tokens.append(event.content)
+        else:
+            done = event.response
+    return tokens, done
+
+
+class TestChatStream:
+    """Test suite for streaming chat."""
+
+    @pytest.fixture
+    def providers(self):
+        with patch.object(ai.settings, "groq_api_key", "groq-key"), \
+             patch.object(ai.settings, "deepseek_api_key", "deepseek-key"), \
+             patch.object(ai, "check_cache", AsyncMock(return_value=None)), \
+             patch.object(ai, "store_cache", AsyncMock()) as store_cache, \
+             patch.object(ai, "log_usage", AsyncMock()) as log_usage:
+            yield store_cache, log_usage
+
+    @pytest.mark.asyncio
+    async def test_stream_relays_tokens_and_usage(self, providers):
+        """Deltas are yielded in order and usage is logged with TTFT."""
+        store_cache, log_usage = providers
+        lines = {"groq": _sse_lines(["Hel", "lo"], {"prompt_tokens": 3, "completion_tokens": 2})}
+
+        with patch.object(ai.provider_clients, "stream", _fake_stream(lines)):
+            tokens, response = await _collect(ai.chat_stream("hi"))
+
+        assert tokens == ["Hel", "lo"]
+        assert response.content == "Hello"
+        assert response.provider == "groq"
+        assert response.output_tokens == 2
+        assert response.time_to_first_token_ms is not None
+        assert log_usage.call_args.kwargs["time_to_first_token_ms"] is not None
+        assert store_cache.call_args.kwargs["response"] == "Hello"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_before_first_token(self, providers):
+        """A provider failing before any token falls back to the next one."""
+        lines = {"groq": RuntimeError("503"), "deepseek": _sse_lines(["ok"])}
+
+        with patch.object(ai.provider_clients, "stream", _fake_stream(lines)):
+            tokens, response = await _collect(ai.chat_stream("hi"))
+
+        assert tokens == ["ok"]
+        assert response.provider == "deepseek"
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_streams_single_token(self):
+        """Cached answers are emitted whole without calling a provider."""
+        cached = MagicMock(response_text="cached answer", model_used="groq/llama", tokens_saved=10)
+
+        with patch.object(ai, "check_cache", AsyncMock(return_value=cached)):
+            tokens, response = await _collect(ai.chat_stream("hi"))
+
+        assert tokens == ["cached answer"]
+        assert response.cached is True
+        assert response.provider == "cache"
+
+
+class TestChat:
+    """Test suite for blocking chat."""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_chats_share_one_call(self):
+        """Concurrent identical prompts make a single provider call."""
+        calls = []
+
+        async def fake_groq(message, model, **kwargs):
+            calls.append(message)
+            await asyncio.sleep(0.01)
+            return ai.AIResponse(content="hi", model=model, provider="groq",
+                                 input_tokens=1, output_tokens=1, cost_usd=0.0, latency_ms=10)
+
+        with patch.object(ai.settings, "groq_api_key", "groq-key"), \
+             patch.object(ai.settings, "deepseek_api_key", ""), \
+             patch.object(ai, "check_cache", AsyncMock(return_value=None)), \
+             patch.object(ai, "store_cache", AsyncMock()) as store_cache, \
+             patch.object(ai, "query_groq", fake_groq):
+            before = ai.llm_single_flight.coalesced
+            responses = await asyncio.gather(ai.chat("hello"), ai.chat("hello "), ai.chat("hello"))
+
+        assert len(calls) == 1
+        assert store_cache.await_count == 1
+        assert [r.content for r in responses] == ["hi"] * 3
+        # Each caller gets its own copy
+        assert len({id(r) for r in responses}) == 3
+        assert ai.llm_single_flight.coalesced - before == 2
+
+
+class TestIntelligentChat:
+    """Test suite for intelligent chat context assembly."""
+
+    @pytest.mark.asyncio
+    async def test_context_and_tools_run_concurrently(self):
+        """Context retrieval and tool execution overlap and report timings."""
+        async def fake_context(message, session_id, timeout_seconds):
+            await asyncio.sleep(0.1)
+            return "FINANCE DATA:", {"finance": {"ms": 100.0, "status": "ok", "items": 1}}
+
+        async def fake_tools(message, agent_id, session_id):
+            await asyncio.sleep(0.1)
+            return "WEB SEARCH RESULTS:"
+
+        with patch.object(ai, "_retrieve_context_text", fake_context), \
+             patch.object(ai, "detect_and_execute_tools", fake_tools):
+            start = asyncio.get_running_loop().time()
+            prompt, context_text, timings = await ai._build_intelligent_prompt("hi", "session", None, True)
+            elapsed = asyncio.get_running_loop().time() - start
+
+        assert elapsed < 0.18
+        assert "FINANCE DATA:" in prompt and "WEB SEARCH RESULTS:" in prompt
+        assert timings["finance"]["status"] == "ok"
+        assert timings["tools"]["status"] == "ok"
+        assert "total" in timings
+
+    @pytest.mark.asyncio
+    async def test_slow_tool_does_not_delay_prompt_past_budget(self):
+        """Tools share the context budget; a slow tool is dropped, not waited for."""
+        async def fake_context(message, session_id, timeout_seconds):
+            return "FINANCE DATA:", {}
+
+        async def slow_tools(message, agent_id, session_id):
+            await asyncio.sleep(10)
+            return "WEB SEARCH RESULTS:"
+
+        with patch.object(ai, "CONTEXT_BUDGET_SECONDS", 0.1), \
+             patch.object(ai, "_retrieve_context_text", fake_context), \
+             patch.object(ai, "detect_and_execute_tools", slow_tools):
+            start = asyncio.get_running_loop().time()
+            prompt, _, timings = await ai._build_intelligent_prompt("hi", "session", None, True)
+            elapsed = asyncio.get_running_loop().time() - start
+
+        assert elapsed < 0.3
+        assert "FINANCE DATA:" in prompt and "WEB SEARCH RESULTS:" not in prompt
+        assert timings["tools"]["status"] == "timeout"
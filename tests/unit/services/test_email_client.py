@@ -0,0 +1,143 @@
+"""
+Unit tests for the async IMAP layer in email_client.
+
+Tests UID set compression, FETCH response parsing, preview fetches in a
+single round trip, on-demand full bodies and concurrent account scans.
+"""
+
+import asyncio
+import imaplib
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services import email_client
+from app.services.email_client import ImapPool, parse_fetch_response, uid_set
+
+HEADER = (
+    b"From: \"Alice\" <alice@example.com>\r\n"
+    b"To: me@example.com\r\n"
+    b"Subject: Invoice\r\n"
+    b"Message-ID: <m1@example.com>\r\n"
+    b"Date: Mon, 12 Oct 2026 09:00:00 +0000\r\n"
+    b"\r\n"
+)
+BODY = b"Total due: 42.00 USD\r\n" * 20
+
+
+def fetch_response(uid: int, text: bytes, size: int) -> list:
+    """Shape of imaplib output for UID FETCH with header and partial text."""
+    return [
+        (f"{uid} (UID {uid} RFC822.SIZE {size} BODY[HEADER] {{{len(HEADER)}}}".encode(), HEADER),
+        (f" BODY[TEXT]<0> {{{len(text)}}}".encode(), text),
+        b")",
+    ]
+
+
+class TestEmailClient:
+    """Test suite for the IMAP connection pool and fetch helpers."""
+
+    @pytest.fixture
+    def imap(self):
+        imap = MagicMock()
+        imap.capabilities = ("IMAP4REV1", "IDLE")
+        imap.noop.return_value = ("OK", [b""])
+        imap.select.return_value = ("OK", [b"2"])
+        imap.response.side_effect = lambda key: (key, [b"7" if key == "UIDVALIDITY" else b"12"])
+        return imap
+
+    @pytest.fixture
+    async def pool(self, imap):
+        pool = ImapPool()
+        with patch.object(email_client, "imap_pool", pool), \
+                patch.object(email_client, "connect_imap", return_value=imap) as connect:
+            pool.connect = connect
+            yield pool
+            await pool.close()
+
+    def test_uid_set_compresses_ranges(self):
+        """Consecutive UIDs collapse into ranges."""
+        assert uid_set([7, 1, 2, 3, 9, 10]) == "1:3,7,9:10"
+
+    def test_parse_fetch_response(self):
+        """UID, size and each BODY section are collected per message."""
+        data = fetch_response(5, b"hello", 999) + [
+            (b"6 (RFC822.SIZE 10 BODY[] {3}", b"abc"),
+            b" UID 6)",
+        ]
+
+        parsed = parse_fetch_response(data)
+
+        assert parsed[5]["size"] == 999
+        assert parsed[5]["header"] == HEADER
+        assert parsed[5]["text"] == b"hello"
+        assert parsed[6]["full"] == b"abc"
+
+    @pytest.mark.asyncio
+    async def test_fetch_emails_uses_one_uid_fetch(self, pool, imap):
+        """The range is fetched in one command with headers and a partial body."""
+        def uid(command, *args):
+            if command == "SEARCH":
+                return "OK", [b"11 12"]
+            return "OK", fetch_response(11, BODY[:64], len(HEADER) + len(BODY)) \
+                + fetch_response(12, BODY, len(HEADER) + len(BODY))
+        imap.uid.side_effect = uid
+
+        emails = await email_client.fetch_emails("gmail", since_days=1, limit=10)
+        await email_client.fetch_emails("gmail", since_days=1, limit=10)
+
+        fetches = [c for c in imap.uid.call_args_list if c.args[0] == "FETCH"]
+        assert fetches[0].args[1] == "11:12"
+        assert "BODY.PEEK[HEADER]" in fetches[0].args[2]
+        assert pool.connect.call_count == 1
+        assert [e.uid for e in emails] == [12, 11]
+        assert emails[0].body_complete is True
+        assert emails[1].body_complete is False
+        assert emails[1].sender == "alice@example.com"
+
+    @pytest.mark.asyncio
+    async def test_load_full_bodies_only_for_partial(self, pool, imap):
+        """Only truncated emails are refetched, and their body is replaced."""
+        partial = email_client.build_email_message(
+            "gmail", "INBOX", 11, parse_fetch_response(fetch_response(11, BODY[:64], 10_000))[11]
+        )
+        imap.uid.return_value = ("OK", [(b"1 (UID 11 BODY[] {%d}" % len(HEADER + BODY), HEADER + BODY), b")"])
+
+        await email_client.load_full_bodies([partial])
+
+        assert partial.body_complete is True
+        assert partial.body.count("Total due") == 20
+        assert imap.uid.call_args.args[1:] == ("11", "(UID BODY.PEEK[])")
+
+    @pytest.mark.asyncio
+    async def test_broken_connection_reconnects(self, pool, imap):
+        """An aborted session is dropped and the next call logs in again."""
+        imap.uid.side_effect = imaplib.IMAP4.abort("socket error")
+        with pytest.raises(imaplib.IMAP4.abort):
+            await email_client.fetch_emails("gmail")
+
+        imap.uid.side_effect = None
+        imap.uid.return_value = ("OK", [b""])
+        assert await email_client.fetch_emails("gmail") == []
+        assert pool.connect.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_accounts_fetched_concurrently(self):
+        """fetch_all_accounts overlaps accounts and skips failing ones."""
+        active = 0
+        peak = 0
+
+        async def fake_fetch(account, since_days, limit):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if account == "icloud":
+                raise RuntimeError("not configured")
+            return []
+
+        with patch.object(email_client, "fetch_emails", side_effect=fake_fetch):
+            assert await email_client.fetch_all_accounts() == []
+
+        assert peak == 2
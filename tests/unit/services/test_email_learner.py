@@ -0,0 +1,86 @@
+"""
+Unit tests for the compiled email preference engine.
+
+Tests sender/domain/category/keyword decisions against a PreferenceSnapshot,
+subdomain matching through the domain trie, and PreferenceEngine caching
+and invalidation.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services import email_learner
+from app.services.email_learner import PreferenceEngine, PreferenceSnapshot
+
+
+def pattern(pattern_type, value, preference, confidence):
+    return {"pattern_type": pattern_type, "pattern_value": value,
+            "preference": preference, "confidence": confidence}
+
+
+ROWS = [
+    pattern("sender", "boss@work.com", "important", 0.9),
+    pattern("sender", "maybe@shop.com", "archive", 0.65),
+    pattern("sender", "spammer@bad.com", "delete", 0.95),
+    pattern("sender_domain", "chase.com", "important", 0.85),
+    pattern("sender_domain", "promo.chase.com", "archive", 0.9),
+    pattern("sender_domain", "shop.com", "delete", 0.95),
+    pattern("category", "social", "archive", 0.8),
+    pattern("subject_keyword", "webinar", "delete", 0.85),
+    pattern("subject_keyword", "invoice", "important", 0.9),
+]
+
+
+class TestPreferenceSnapshot:
+    """Test suite for PreferenceSnapshot class."""
+
+    @pytest.fixture
+    def snapshot(self):
+        return PreferenceSnapshot(ROWS)
+
+    def test_sender_lists(self, snapshot):
+        """VIP and blocked lists come from high-confidence sender patterns."""
+        assert snapshot.vip_senders == ("boss@work.com",)
+        assert snapshot.blocked_senders == ("spammer@bad.com",)
+        assert snapshot.is_vip("Boss@Work.com")
+
+    def test_most_specific_domain_wins(self, snapshot):
+        """Subdomains inherit a parent pattern unless they have their own."""
+        assert snapshot.auto_action("alerts@secure.chase.com") == "important"
+        assert snapshot.auto_action("deals@promo.chase.com") == "archive"
+        assert snapshot.auto_action("someone@notchase.com") is None
+
+    def test_sender_match_shadows_domain(self, snapshot):
+        """A weak exact-sender pattern stops the domain lookup, as before."""
+        assert snapshot.sender_preference("maybe@shop.com") == {"preference": "archive", "confidence": 0.65}
+        assert snapshot.auto_action("maybe@shop.com") is None
+        assert snapshot.auto_action("other@shop.com") == "delete"
+
+    def test_category_and_keywords(self, snapshot):
+        """Category, then agreeing subject keywords, decide when senders don't."""
+        assert snapshot.auto_action("x@y.com", classification="social") == "archive"
+        assert snapshot.auto_action("x@y.com", subject="Join our webinar") == "delete"
+        assert snapshot.auto_action("x@y.com", subject="Webinar invoice") is None
+
+
+class TestPreferenceEngine:
+    """Test suite for PreferenceEngine class."""
+
+    @pytest.mark.asyncio
+    async def test_cached_until_invalidated(self):
+        """Lookups reuse one load; update_preference forces a reload."""
+        engine = PreferenceEngine(ttl_seconds=300)
+        with patch.object(email_learner, "db") as db, \
+                patch.object(email_learner, "preference_engine", engine):
+            db.fetch_all = AsyncMock(return_value=ROWS)
+            db.fetch_one = AsyncMock(return_value=None)
+            db.execute = AsyncMock()
+
+            assert await email_learner.get_vip_senders() == ["boss@work.com"]
+            assert await email_learner.should_auto_action("spammer@bad.com") == "delete"
+            assert db.fetch_all.await_count == 1
+
+            await email_learner.update_preference("sender", "new@vip.com", "important")
+            await email_learner.get_blocked_senders()
+            assert db.fetch_all.await_count == 2
+            assert engine.get_stats()["invalidations"] == 1
@@ -0,0 +1,164 @@
+"""
+Unit tests for EmailSync.
+
+Tests checkpointed fetches (unchanged folders, new UIDs only,
+UIDVALIDITY resets), checkpoint commits around failures, giving up on a
+message that keeps failing and the batched processed-email check in
+scan_emails.
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.agents import email_intelligence
+from app.services import email_client, email_sync as email_sync_module
+from app.services.email_client import EmailMessage, ImapPool
+from app.services.email_sync import EmailSync, SyncBatch
+
+HEADER = (
+    b"From: bob@example.com\r\n"
+    b"Subject: Hello\r\n"
+    b"Message-ID: <m%d@example.com>\r\n"
+    b"Date: Mon, 12 Oct 2026 09:00:00 +0000\r\n"
+    b"\r\n"
+)
+
+
+def fetch_response(uids) -> list:
+    data = []
+    for uid in uids:
+        header = HEADER % uid
+        data.append((b"%d (UID %d RFC822.SIZE %d BODY[HEADER] {%d}" % (uid, uid, len(header), len(header)), header))
+        data.append(b")")
+    return data
+
+
+class TestEmailSync:
+    """Test suite for EmailSync class."""
+
+    @pytest.fixture
+    def imap(self):
+        imap = MagicMock()
+        imap.select.return_value = ("OK", [b"3"])
+        imap.folder_state = {"UIDVALIDITY": b"7", "UIDNEXT": b"13"}
+        imap.response.side_effect = lambda key: (key, [imap.folder_state[key]])
+        imap.searches = []
+
+        def uid(command, *args):
+            if command == "SEARCH":
+                imap.searches.append(args[-1])
+                return "OK", [b"10 11 12"]
+            return "OK", fetch_response([11, 12])
+        imap.uid.side_effect = uid
+        return imap
+
+    @pytest.fixture
+    async def sync(self, imap):
+        pool = ImapPool()
+        with patch.object(email_sync_module, "imap_pool", pool), \
+                patch.object(email_client, "connect_imap", return_value=imap), \
+                patch.object(email_sync_module, "db") as db:
+            db.fetch_one = AsyncMock(return_value=None)
+            db.execute = AsyncMock()
+            sync = EmailSync()
+            sync.db = db
+            yield sync
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_unchanged_folder_skips_search(self, sync, imap):
+        """UIDNEXT at the checkpoint means nothing new: no SEARCH, no FETCH."""
+        sync._checkpoints[("gmail", "INBOX")] = (7, 12)
+
+        batch = await sync.fetch_new("gmail")
+
+        assert batch.emails == []
+        assert batch.last_uid == 12
+        imap.uid.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fetches_only_uids_past_checkpoint(self, sync, imap):
+        """A checkpoint turns the window search into `UID n:*` over new mail."""
+        sync._checkpoints[("gmail", "INBOX")] = (7, 10)
+
+        batch = await sync.fetch_new("gmail")
+
+        assert imap.searches == ["UID 11:*"]
+        assert [e.uid for e in batch.emails] == [12, 11]
+        assert batch.last_uid == 12
+
+    @pytest.mark.asyncio
+    async def test_uidvalidity_change_resyncs_window(self, sync, imap):
+        """A new UIDVALIDITY invalidates the checkpoint and falls back to SINCE."""
+        sync._checkpoints[("gmail", "INBOX")] = (6, 12)
+
+        batch = await sync.fetch_new("gmail", limit=2)
+
+        assert imap.searches[0].startswith("(SINCE ")
+        assert batch.uidvalidity == 7
+        assert batch.last_uid == 12
+
+    @pytest.mark.asyncio
+    async def test_commit_stops_below_first_failure(self, sync):
+        """Failed UIDs stay above the checkpoint so they're fetched again."""
+        batch = SyncBatch("gmail", "INBOX", 7, last_uid=20)
+
+        await sync.commit(batch, failed_uids=[15, 18])
+
+        assert sync.db.execute.call_args.args[1:] == ("gmail", "INBOX", 7, 14)
+        assert (await sync.get_checkpoint("gmail", "INBOX")) == (7, 14)
+
+    @pytest.mark.asyncio
+    async def test_failing_email_stops_pinning_checkpoint(self, sync, imap):
+        """More than `limit` new UIDs behind a bad one still drain once it is given up on."""
+        server_uids = list(range(11, 18))
+
+        def uid(command, *args):
+            if command == "SEARCH":
+                imap.searches.append(args[-1])
+                start = int(args[-1].split()[1].split(":")[0])
+                return "OK", [" ".join(str(u) for u in server_uids if u >= start).encode()]
+            return "OK", fetch_response(server_uids)
+        imap.uid.side_effect = uid
+        imap.folder_state["UIDNEXT"] = b"18"
+        sync._checkpoints[("gmail", "INBOX")] = (7, 10)
+
+        windows = []
+        for _ in range(5):
+            batch = await sync.fetch_new("gmail", limit=3)
+            windows.append(sorted(e.uid for e in batch.emails))
+            await sync.commit(batch, failed_uids=[11] if 11 in windows[-1] else [])
+
+        # Retried max_retries (3) times, then the sync moves on past UID 11
+        assert windows == [[11, 12, 13]] * 3 + [[14, 15, 16], [17]]
+        assert (await sync.get_checkpoint("gmail", "INBOX")) == (7, 17)
+        assert sync.get_stats()["abandoned_uids"] == 1
+        assert sync._failures[("gmail", "INBOX", 7)] == {}
+
+    @pytest.mark.asyncio
+    async def test_scan_checks_processed_in_one_query(self):
+        """scan_emails filters the batch with one ANY($1) lookup and commits it."""
+        emails = [
+            EmailMessage(f"<m{uid}>", "gmail", "a@x.com", "A", "me", "s", "b", "b",
+                         datetime(2026, 10, uid), uid=uid)
+            for uid in (1, 2, 3)
+        ]
+        batch = SyncBatch("gmail", "INBOX", 7, emails=emails, last_uid=3)
+        sync = MagicMock()
+        sync.fetch_all = AsyncMock(return_value=[batch])
+        sync.commit = AsyncMock()
+        db = MagicMock()
+        db.fetch_all = AsyncMock(return_value=[{"message_id": "<m2>"}])
+        process = AsyncMock(return_value=[{"classification": "work"}, {"error": "boom"}])
+
+        with patch.object(email_intelligence, "email_sync", sync), \
+                patch.object(email_intelligence, "db", db), \
+                patch.object(email_intelligence, "process_emails", process):
+            results = await email_intelligence.scan_emails()
+
+        assert "ANY($1)" in db.fetch_all.call_args.args[0]
+        assert [e.uid for e in process.call_args.args[0]] == [3, 1]
+        assert results["skipped"] == 1
+        assert results["errors"] == 1
+        sync.commit.assert_awaited_once_with(batch, [1])
@@ -0,0 +1,108 @@
+"""
+Unit tests for EmbeddingCache.
+
+Tests the LRU, Redis and Postgres tiers, raw float32 serialisation and the
+bulk get_many API with Redis and the database mocked out.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import embedding_cache as embedding_cache_module
+from app.services.embedding_cache import EmbeddingCache, content_hash, from_bytes, to_bytes
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache class."""
+
+    @pytest.fixture
+    def cache(self):
+        """Create a cache with Redis disabled and a tiny LRU."""
+        cache = EmbeddingCache(model_name="test-model", max_entries=2)
+        cache.use_redis = False
+        return cache
+
+    def test_bytes_round_trip(self):
+        """Vectors survive raw float32 serialisation."""
+        vector = np.array([0.25, -1.5, 3.0], dtype=np.float32)
+        data = to_bytes(vector)
+
+        assert len(data) == 12
+        assert np.array_equal(from_bytes(data), vector)
+
+    @pytest.mark.asyncio
+    async def test_put_then_get_hits_memory(self, cache):
+        """A put is immediately served from the in-process LRU."""
+        vector = np.ones(3, dtype=np.float32)
+        with patch.object(embedding_cache_module, "db") as mock_db:
+            mock_db.execute = AsyncMock()
+            cache.put("hello", vector)
+            result = await cache.get("hello")
+            await asyncio.gather(*cache._background)
+
+        assert np.array_equal(result, vector)
+        assert cache.get_stats()["memory_hits"] == 1
+        mock_db.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_lru_is_bounded(self, cache):
+        """The LRU evicts the least recently used entry."""
+        with patch.object(embedding_cache_module, "db") as mock_db:
+            mock_db.execute = AsyncMock()
+            for text in ("a", "b", "c"):
+                cache.put(text, np.zeros(3, dtype=np.float32))
+            await asyncio.gather(*cache._background)
+
+        assert len(cache._lru) == 2
+        assert content_hash("a") not in cache._lru
+
+    @pytest.mark.asyncio
+    async def test_get_many_falls_through_tiers(self, cache):
+        """Misses go to Redis, then Postgres; results keep input order."""
+        redis_vector = np.full(3, 2.0, dtype=np.float32)
+        pg_vector = np.full(3, 3.0, dtype=np.float32)
+
+        cache.use_redis = True
+        cache.redis_client = MagicMock()
+        cache.redis_client.mget = AsyncMock(
+            side_effect=lambda keys: [to_bytes(redis_vector) if key.endswith(content_hash("r")) else None
+                                      for key in keys]
+        )
+        pipeline = MagicMock()
+        pipeline.execute = AsyncMock()
+        cache.redis_client.pipeline = MagicMock(return_value=pipeline)
+
+        with patch.object(embedding_cache_module, "db") as mock_db:
+            mock_db.fetch_all = AsyncMock(return_value=[
+                {"content_hash": content_hash("p"), "embedding_bytes": to_bytes(pg_vector)}
+            ])
+            results = await cache.get_many(["missing", "r", "p"])
+            await asyncio.gather(*cache._background)
+
+        assert results[0] is None
+        assert np.array_equal(results[1], redis_vector)
+        assert np.array_equal(results[2], pg_vector)
+
+        # Postgres was only asked about what Redis didn't have
+        pg_args = mock_db.fetch_all.call_args[0]
+        assert pg_args[1] == "test-model"
+        assert set(pg_args[2]) == {content_hash("missing"), content_hash("p")}
+
+        stats = cache.get_stats()
+        assert stats["redis_hits"] == 1
+        assert stats["postgres_hits"] == 1
+        assert stats["misses"] == 1
+        # Cold hit was promoted to Redis
+        pipeline.setex.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_postgres_failure_is_a_miss(self, cache):
+        """Database errors degrade to cache misses."""
+        with patch.object(embedding_cache_module, "db") as mock_db:
+            mock_db.fetch_all = AsyncMock(side_effect=RuntimeError("down"))
+            assert await cache.get("anything") is None
+
+        assert cache.get_stats()["misses"] == 1
@@ -0,0 +1,72 @@
+"""
+Unit tests for EmbeddingService.
+
+Tests micro-batching, in-flight deduplication and error propagation with the
+sentence-transformer model mocked out.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from app.services import embeddings
+from app.services.embeddings import EmbeddingService
+
+
+def fake_encode(texts):
+    """Deterministic stand-in for the model: one row per text."""
+    return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingService:
+    """Test suite for EmbeddingService class."""
+
+    @pytest.fixture
+    async def service(self):
+        """Create a service with a generous batching window."""
+        service = EmbeddingService(max_batch_size=8, max_wait_ms=20)
+        yield service
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_batch(self, service):
+        """Concurrent embeds are encoded in a single model call."""
+        with patch.object(embeddings, "_encode_batch", side_effect=fake_encode) as mock_encode:
+            results = await asyncio.gather(*(service.embed(t) for t in ["a", "bb", "ccc"]))
+
+        mock_encode.assert_called_once()
+        assert mock_encode.call_args[0][0] == ["a", "bb", "ccc"]
+        assert all(r.dtype == np.float32 for r in results)
+        assert [float(r[0]) for r in results] == [1.0, 2.0, 3.0]
+
+    @pytest.mark.asyncio
+    async def test_identical_texts_are_deduplicated(self, service):
+        """The same text in flight twice is encoded once."""
+        with patch.object(embeddings, "_encode_batch", side_effect=fake_encode) as mock_encode:
+            first, second = await asyncio.gather(service.embed("same"), service.embed("same"))
+
+        assert mock_encode.call_args[0][0] == ["same"]
+        assert np.array_equal(first, second)
+        stats = service.get_stats()
+        assert stats["requests"] == 2
+        assert stats["deduplicated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batches_respect_max_size(self, service):
+        """More requests than max_batch_size are split across calls."""
+        texts = [f"text-{i}" for i in range(20)]
+        with patch.object(embeddings, "_encode_batch", side_effect=fake_encode) as mock_encode:
+            results = await service.embed_many(texts)
+
+        assert len(results) == 20
+        assert all(len(call[0][0]) <= 8 for call in mock_encode.call_args_list)
+        assert service.get_stats()["encoded"] == 20
+
+    @pytest.mark.asyncio
+    async def test_encode_failure_propagates(self, service):
+        """A failing batch raises in every waiting caller."""
+        with patch.object(embeddings, "_encode_batch", side_effect=RuntimeError("model down")):
+            with pytest.raises(RuntimeError):
+                await service.embed("boom")
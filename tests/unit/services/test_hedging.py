@@ -0,0 +1,154 @@
+"""
+Unit tests for HedgePolicy.
+
+Tests latency quantiles, hedging a slow primary, timing of cancelled
+losers, plain fallback on failure, the hedge budget guards and the spend
+reserved for hedges whose loser is cancelled.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from app.services import hedging
+from app.services.hedging import HedgePolicy, LatencyHistogram
+
+
+def _provider(result, delay=0.0, error=None, calls=None):
+    async def call():
+        if calls is not None:
+            calls.append(result)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+    return call
+
+
+class TestHedgePolicy:
+    """Test suite for HedgePolicy class."""
+
+    @pytest.fixture
+    def policy(self):
+        """Policy with tight hedge deadlines."""
+        with patch.object(hedging.settings, "hedge_enabled", True), \
+             patch.object(hedging.settings, "hedge_default_delay_ms", 20.0), \
+             patch.object(hedging.settings, "hedge_min_delay_ms", 10.0):
+            yield HedgePolicy()
+
+    def test_histogram_quantiles(self):
+        """Quantiles land within one bucket of the true value."""
+        histogram = LatencyHistogram()
+        for latency in range(1, 101):
+            histogram.record(latency * 10.0)
+
+        p95 = histogram.quantile(0.95)
+        assert 950 <= p95 <= 950 * hedging.BUCKET_GROWTH
+        assert histogram.quantile(0.5) < p95
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged(self, policy):
+        """The secondary fires after the deadline and the faster one wins."""
+        result, errors = await policy.race([
+            ("groq", _provider("slow", delay=1.0)),
+            ("deepseek", _provider("fast", delay=0.0)),
+        ])
+
+        assert result == "fast"
+        assert errors == []
+        assert policy.hedges == 1
+        assert policy.hedge_wins == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_loser_is_recorded_as_lower_bound(self, policy):
+        """The slow primary's elapsed time still reaches its histogram when it loses."""
+        await policy.race([
+            ("groq", _provider("slow", delay=1.0)),
+            ("deepseek", _provider("fast", delay=0.0)),
+        ])
+        await asyncio.sleep(0)  # Let the cancelled loser unwind
+
+        groq = policy.get_stats()["providers"]["groq"]
+        assert groq["samples"] == 1
+        assert groq["p50_ms"] >= 20.0  # At least the hedge delay it was cancelled after
+        assert policy.censored_samples == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self, policy):
+        """A primary answering within its deadline never fires the secondary."""
+        calls = []
+        result, _ = await policy.race([
+            ("groq", _provider("groq", calls=calls)),
+            ("deepseek", _provider("deepseek", calls=calls)),
+        ])
+
+        assert result == "groq"
+        assert calls == ["groq"]
+        assert policy.get_stats()["providers"]["groq"]["samples"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_falls_back(self, policy):
+        """A failing primary falls through to the next provider."""
+        result, errors = await policy.race([
+            ("groq", _provider(None, error=RuntimeError("503"))),
+            ("deepseek", _provider("ok")),
+        ])
+
+        assert result == "ok"
+        assert errors == ["groq: 503"]
+        assert policy.fallbacks == 1
+        assert policy.hedges == 0
+
+    @pytest.mark.asyncio
+    async def test_budget_guard_blocks_hedging(self, policy):
+        """No hedges once today's spend nears the daily budget."""
+        policy.record_spend(hedging.settings.daily_budget_usd)
+        calls = []
+        result, _ = await policy.race([
+            ("groq", _provider("slow", delay=0.05, calls=calls)),
+            ("deepseek", _provider("fast", calls=calls)),
+        ])
+
+        assert result == "slow"
+        assert calls == ["slow"]
+        assert policy.hedges_denied == 1
+
+    @pytest.mark.asyncio
+    async def test_hedge_ratio_is_rationed(self, policy):
+        """Hedges are capped by the token budget, not one per slow request."""
+        with patch.object(hedging.settings, "hedge_max_delay_ms", 10.0):
+            for _ in range(6):
+                await policy.race([
+                    ("groq", _provider("slow", delay=0.03)),
+                    ("deepseek", _provider("fast", delay=0.03)),
+                ])
+
+        assert policy.hedges == int(hedging.HEDGE_BURST)
+        assert policy.hedges_denied == 6 - int(hedging.HEDGE_BURST)
+
+    @pytest.mark.asyncio
+    async def test_hedge_reserves_spend_for_cancelled_loser(self, policy):
+        """Each launched hedge counts its estimated cost towards the budget guard."""
+        daily_limit = hedging.settings.daily_budget_usd * hedging.settings.hedge_budget_fraction
+        policy.record_spend(daily_limit - 0.5)
+
+        first, _ = await policy.race([
+            ("groq", _provider("fast", delay=0.05)),
+            ("deepseek", _provider("slow", delay=1.0)),
+        ], hedge_cost_usd=0.5)
+        await asyncio.sleep(0)  # Let the cancelled hedge unwind
+
+        assert first == "fast"
+        assert policy.hedges == 1
+        assert policy.get_stats()["hedge_spend_reserved_usd"] == 0.5
+
+        calls = []
+        second, _ = await policy.race([
+            ("groq", _provider("slow", delay=0.2, calls=calls)),
+            ("deepseek", _provider("fast", calls=calls)),
+        ], hedge_cost_usd=0.5)
+
+        assert second == "slow"
+        assert calls == ["slow"]
+        assert policy.hedges_denied == 1
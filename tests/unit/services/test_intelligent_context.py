@@ -0,0 +1,89 @@
+"""
+Unit tests for intelligent context retrieval.
+
+Tests that sources run concurrently under per-source deadlines, that slow
+sources are dropped at the overall budget and that timings are reported.
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.services import intelligent_context
+
+
+def _source(items, delay=0.0, error=None):
+    async def retrieve(*args, **kwargs):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return items
+    return retrieve
+
+
+class TestRetrieveIntelligentContext:
+    """Test suite for retrieve_intelligent_context."""
+
+    @pytest.fixture
+    def sources(self):
+        """Patch every source with fast canned results."""
+        with patch.multiple(
+            intelligent_context,
+            retrieve_finance_data=_source([{"summary": "spent $10"}], delay=0.05),
+            retrieve_system_data=_source([{"summary": "healthy"}], delay=0.05),
+            retrieve_agent_data=_source([], delay=0.05),
+            retrieve_conversation_history=_source([], delay=0.05),
+            retrieve_memory_data=_source([{"role": "user", "content": "hi"}], delay=0.05),
+            retrieve_usage_data=_source([{"summary": "3 AI requests"}], delay=0.05),
+        ):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_sources_run_concurrently(self, sources):
+        """Six 50 ms sources finish in roughly one source's time."""
+        start = time.perf_counter()
+        context = await intelligent_context.retrieve_intelligent_context("how is my budget", timeout_seconds=1.0)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.2
+        assert context.finance_data == [{"summary": "spent $10"}]
+        assert context.usage_data == [{"summary": "3 AI requests"}]
+        assert context.errors == []
+        assert set(context.timings) == {"finance", "conversation", "memory", "usage"}
+        assert context.timings["finance"]["status"] == "ok"
+        assert context.timings["finance"]["items"] == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_source_hits_its_deadline(self, sources):
+        """A source past its own deadline is dropped; the rest still arrive."""
+        with patch.object(intelligent_context, "retrieve_memory_data", _source([{}], delay=5.0)), \
+             patch.dict(intelligent_context.SOURCE_DEADLINES, {"memory": 0.1}):
+            context = await intelligent_context.retrieve_intelligent_context("budget", timeout_seconds=1.0)
+
+        assert context.memory_data == []
+        assert context.finance_data
+        assert context.timings["memory"]["status"] == "timeout"
+        assert any(error.startswith("Memory retrieval") for error in context.errors)
+
+    @pytest.mark.asyncio
+    async def test_global_budget_bounds_retrieval(self, sources):
+        """Nothing waits past the overall budget."""
+        with patch.object(intelligent_context, "retrieve_usage_data", _source([{}], delay=5.0)):
+            start = time.perf_counter()
+            context = await intelligent_context.retrieve_intelligent_context("budget", timeout_seconds=0.2)
+
+        assert time.perf_counter() - start < 0.5
+        assert context.usage_data == []
+        assert context.finance_data
+
+    @pytest.mark.asyncio
+    async def test_failing_source_is_reported(self, sources):
+        """Errors are collected rather than raised."""
+        with patch.object(intelligent_context, "retrieve_finance_data", _source(None, error=RuntimeError("db down"))):
+            context = await intelligent_context.retrieve_intelligent_context("budget", timeout_seconds=1.0)
+
+        assert context.finance_data == []
+        assert "Finance retrieval: db down" in context.errors
+        assert context.timings["finance"]["status"] == "error"
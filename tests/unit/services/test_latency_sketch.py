@@ -0,0 +1,86 @@
+"""
+Unit tests for the latency sketches.
+
+Tests DDSketch relative accuracy, exact merging, the bucket cap,
+sliding-window expiry and merging per-worker registry snapshots.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.latency_sketch import DDSketch, LatencyRegistry, WindowedSketch
+
+
+class TestLatencySketch:
+    """Test suite for DDSketch, WindowedSketch and LatencyRegistry."""
+
+    @pytest.fixture
+    def samples(self):
+        return np.random.default_rng(7).lognormal(mean=4.0, sigma=1.0, size=20000)
+
+    def test_quantiles_within_relative_accuracy(self, samples):
+        """Estimates stay within the configured relative error."""
+        sketch = DDSketch(relative_accuracy=0.01)
+        for value in samples:
+            sketch.add(float(value))
+
+        for q in (0.5, 0.95, 0.99):
+            expected = float(np.quantile(samples, q, method="lower"))
+            assert sketch.quantile(q) == pytest.approx(expected, rel=0.011)
+        assert sketch.count == len(samples)
+        assert sketch.summary()["max"] == pytest.approx(samples.max(), rel=1e-6)
+
+    def test_merge_matches_single_sketch(self, samples):
+        """Merging two halves gives the same sketch as adding everything to one."""
+        whole, left, right = DDSketch(), DDSketch(), DDSketch()
+        for i, value in enumerate(samples):
+            whole.add(float(value))
+            (left if i % 2 else right).add(float(value))
+
+        left.merge(right)
+        assert left.bins == whole.bins
+        assert left.quantiles() == whole.quantiles()
+
+    def test_bucket_cap_bounds_memory(self):
+        """Past max_buckets the lowest buckets collapse; high quantiles are kept."""
+        sketch = DDSketch(relative_accuracy=0.01, max_buckets=50)
+        for exponent in range(-3, 6):
+            for step in range(1, 10):
+                sketch.add(step * 10.0 ** exponent)
+
+        assert len(sketch.bins) == 50
+        assert sketch.quantile(0.99) == pytest.approx(8e5, rel=0.02)
+
+    def test_window_expires_old_slots(self):
+        """Slots outside the window stop counting and are recycled."""
+        window = WindowedSketch(slot_seconds=60, slots=5)
+        window.add(100.0, now=0)
+        window.add(200.0, now=120)
+
+        assert window.merged(now=150).count == 2
+        assert window.merged(window_seconds=60, now=150).count == 1
+        # 10 minutes later the ring has wrapped past both
+        window.add(300.0, now=600)
+        assert window.merged(now=600).count == 1
+
+    def test_snapshots_merge_across_workers(self):
+        """Serialized per-worker snapshots combine into one sketch per key."""
+        worker_a, worker_b = LatencyRegistry(max_keys=10), LatencyRegistry(max_keys=10)
+        for value in range(1, 101):
+            (worker_a if value <= 50 else worker_b).record("GET:/chat", float(value))
+        worker_b.record("GET:/health", 1.0)
+
+        merged = LatencyRegistry.merge_snapshots([worker_a.snapshot(), worker_b.snapshot()])
+
+        assert merged["GET:/chat"].count == 100
+        assert merged["GET:/chat"].quantile(0.5) == pytest.approx(50, rel=0.02)
+        assert merged["GET:/health"].count == 1
+
+    def test_registry_caps_keys(self):
+        """New keys past max_keys are counted and ignored."""
+        registry = LatencyRegistry(max_keys=1)
+        registry.record("a", 1.0)
+        registry.record("b", 1.0)
+
+        assert registry.keys() == ["a"]
+        assert registry.dropped_keys == 1
@@ -0,0 +1,82 @@
+"""
+Unit tests for LoopMonitor.
+
+Tests lag sampling, stack capture of a blocking call, capture rate
+limiting and the alert raised for long stalls.
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.agents import monitoring
+from app.services.loop_monitor import LoopMonitor
+
+
+def blocking_call(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+class TestLoopMonitor:
+    """Test suite for LoopMonitor class."""
+
+    @pytest.fixture
+    async def monitor(self):
+        monitor = LoopMonitor(
+            interval_seconds=0.01,
+            block_threshold_ms=50,
+            alert_threshold_ms=10000,
+            max_captures_per_minute=2,
+        )
+        await monitor.start()
+        yield monitor
+        await monitor.close()
+
+    @pytest.mark.asyncio
+    async def test_lag_is_sampled(self, monitor):
+        """The heartbeat records samples while the loop is idle."""
+        await asyncio.sleep(0.1)
+
+        stats = monitor.get_stats()
+        assert stats["running"] is True
+        assert stats["samples"] > 0
+        assert stats["stalls_detected"] == 0
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_stack_is_captured(self, monitor):
+        """A sync call that holds the loop is caught with its stack and duration."""
+        await asyncio.sleep(0.03)
+        blocking_call(0.3)
+        await asyncio.sleep(0.05)
+
+        stalls = monitor.get_stats()["recent_stalls"]
+        assert len(stalls) == 1
+        assert any("blocking_call" in frame for frame in stalls[0]["stack"])
+        assert stalls[0]["duration_ms"] >= 250
+
+    @pytest.mark.asyncio
+    async def test_captures_are_rate_limited(self, monitor):
+        """Past the per-minute cap, stalls are counted but not captured."""
+        for _ in range(3):
+            await asyncio.sleep(0.03)
+            blocking_call(0.15)
+        await asyncio.sleep(0.05)
+
+        stats = monitor.get_stats()
+        assert stats["stalls_detected"] == 3
+        assert len(stats["recent_stalls"]) == 2
+        assert stats["captures_skipped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_long_stall_raises_alert(self, monitor):
+        """Lag over the alert threshold becomes a PerformanceMonitor alert."""
+        monitor.alert_threshold_ms = 100
+        with patch.object(monitoring.performance_monitor, "create_alert", new=AsyncMock()) as create_alert:
+            await asyncio.sleep(0.03)
+            blocking_call(0.2)
+            await asyncio.sleep(0.05)
+
+        create_alert.assert_awaited_once()
+        assert create_alert.call_args.kwargs["title"] == "Event loop blocked"
@@ -0,0 +1,83 @@
+"""
+Unit tests for MemoryCache.
+
+Tests the segmented LRU (probation and protected segments), the entry and
+byte bounds, expiry and invalidation.
+"""
+
+import time
+
+from app.services.memory_cache import MemoryCache, estimate_bytes
+
+
+class TestMemoryCache:
+    """Test suite for MemoryCache class."""
+
+    def test_second_hit_protects_entry_from_scan(self):
+        """An entry read twice survives a scan of one-off entries."""
+        cache = MemoryCache(max_entries=4)
+        cache.put("hot", "value", 10)
+        assert cache.get("hot") == "value"
+
+        for i in range(10):
+            cache.put(f"scan-{i}", i, 10)
+
+        assert "hot" in cache
+        assert len(cache) == 4
+        assert cache.get_stats()["evictions"] == 7
+
+    def test_byte_bound(self):
+        """The oldest probationary entries go once the byte budget is exceeded."""
+        cache = MemoryCache(max_entries=100, max_bytes=100)
+        cache.put("a", 1, 40)
+        cache.put("b", 2, 40)
+        cache.put("c", 3, 40)
+
+        assert "a" not in cache
+        assert cache.get_stats()["bytes"] == 80
+
+        cache.put("huge", 4, 1000)
+        assert "huge" not in cache
+
+    def test_refresh_replaces_bytes(self):
+        """Re-putting a key swaps its size instead of adding to it."""
+        cache = MemoryCache()
+        cache.put("a", 1, 40)
+        cache.get("a")
+        cache.put("a", 2, 60)
+
+        assert cache.get("a") == 2
+        stats = cache.get_stats()
+        assert stats["bytes"] == 60
+        assert stats["protected_entries"] == 1
+
+    def test_expired_entries_are_not_served(self):
+        """An entry past its expiry counts as a miss and is removed."""
+        cache = MemoryCache()
+        cache.put("old", 1, 10, expires_at=time.time() - 1)
+        cache.put("new", 2, 10, expires_at=time.time() + 60)
+
+        assert cache.get("old") is None
+        assert cache.get("new") == 2
+        stats = cache.get_stats()
+        assert stats["expired"] == 1
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_invalidate_and_clear(self):
+        cache = MemoryCache()
+        cache.put("a", 1, 10)
+        cache.put("b", 2, 10)
+        cache.put("c", 3, 10)
+
+        assert cache.invalidate("a")
+        assert not cache.invalidate("a")
+        assert cache.invalidate_many(["b", "missing"]) == 1
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.get_stats()["bytes"] == 0
+        assert cache.get_stats()["invalidations"] == 3
+
+    def test_estimate_bytes_walks_containers(self):
+        assert estimate_bytes("x" * 1000, ["tag"], {"k": "v"}) > estimate_bytes("x", [], {})
@@ -0,0 +1,235 @@
+"""
+Unit tests for memory consolidation.
+
+Tests threshold agglomeration of embeddings, and ConsolidationEngine runs:
+one summary per cluster, stored in the transaction that archives the
+originals, seeding from earlier summaries, replay of the lookback window
+and the watermark on success and failure.
+"""
+
+import numpy as np
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import memory_consolidation
+from app.services.memory_cache import MemoryCache
+from app.services.memory_consolidation import Agglomerator, ConsolidationEngine
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def vector(*components):
+    """A 4-d embedding near one of the axes."""
+    return list(components) + [0.0] * (4 - len(components))
+
+
+def stream_row(memory_id, embedding, minutes, agent_id="a"):
+    return {"id": memory_id, "agent_id": agent_id, "created_at": T0 + timedelta(minutes=minutes),
+            "embedding": embedding}
+
+
+def detail_row(memory_id, memory_type="episodic", importance=0.5, tags=None):
+    return {"id": memory_id, "memory_type": memory_type, "content": f"content {memory_id}",
+            "importance_score": importance, "strength_score": 1.0, "tags": tags or []}
+
+
+class TestAgglomerator:
+    """Test suite for Agglomerator class."""
+
+    def test_groups_near_duplicates_per_agent(self):
+        """Close vectors share a cluster; other agents never join it."""
+        agg = Agglomerator(similarity_threshold=0.9)
+        first = agg.add("m1", "a", vector(1.0))
+        assert agg.add("m2", "a", vector(1.0, 0.1)) is first
+        assert agg.add("m3", "a", vector(0.0, 1.0)) is not first
+        assert agg.add("m4", "b", vector(1.0)) is not first
+
+        assert first.member_ids == ["m1", "m2"]
+        assert first.coherence == pytest.approx(0.998, abs=1e-3)
+
+    def test_full_clusters_close(self):
+        """A cluster at max size stops taking members."""
+        agg = Agglomerator(similarity_threshold=0.9, max_cluster_size=2)
+        first = agg.add("m1", "a", vector(1.0))
+        agg.add("m2", "a", vector(1.0))
+        third = agg.add("m3", "a", vector(1.0))
+
+        assert third is not first
+        assert len(first.member_ids) == 2
+
+    def test_extend_only(self):
+        """With create=False memories only join seeded summaries."""
+        agg = Agglomerator(similarity_threshold=0.9)
+        agg.seed("c1", "a", "s1", vector(1.0))
+
+        assert agg.add("m1", "a", vector(0.0, 1.0), create=False) is None
+        assert agg.add("m2", "a", vector(1.0), create=False).cluster_id == "c1"
+
+
+class TestConsolidationEngine:
+    """Test suite for ConsolidationEngine class."""
+
+    @pytest.fixture
+    def memory_system(self):
+        system = MagicMock()
+        system.memory_cache = MemoryCache()
+        system.conn = MagicMock()
+
+        async def store_memories_bulk(records, in_transaction=None):
+            # Stands in for the INSERT transaction the archive runs inside
+            if in_transaction:
+                await in_transaction(system.conn)
+            return [record.memory_id for record in records]
+
+        system.store_memories_bulk = AsyncMock(side_effect=store_memories_bulk)
+        system._delete_memories_from_chromadb = AsyncMock()
+        return system
+
+    @pytest.mark.asyncio
+    async def test_summarizes_each_cluster_once(self, memory_system):
+        """Three near-duplicates become one summary; the singleton is left alone."""
+        engine = ConsolidationEngine(chunk_size=10, min_cluster_size=3)
+        stream = [
+            stream_row("m1", vector(1.0), 1),
+            stream_row("m2", vector(0.0, 1.0), 2),
+            stream_row("m3", vector(1.0, 0.05), 3),
+            stream_row("m4", vector(1.0, -0.05), 4),
+        ]
+        db = AsyncMock()
+        db.fetch_one = AsyncMock(return_value=None)
+        db.fetch_all = AsyncMock(side_effect=[
+            [],  # earlier summaries
+            stream,
+            [detail_row("m1", tags=["x"]), detail_row("m3", importance=0.9), detail_row("m4", "semantic")],
+        ])
+        ai = AsyncMock(return_value={"content": " merged ", "provider": "groq"})
+        memory_system.memory_cache.put("m1", "cached", 10)
+
+        with patch.object(memory_consolidation, "db", db), \
+                patch.object(memory_consolidation, "ai_request", ai), \
+                patch.object(engine, "_write_cluster_rows", AsyncMock()) as write:
+            report = await engine.run(memory_system, "summarize")
+
+        assert ai.await_count == 1
+        assert "content m1" in ai.call_args.kwargs["prompt"]
+        (stored,) = memory_system.store_memories_bulk.call_args.args[0]
+        assert stored.content == "merged"
+        assert stored.importance_score == 0.9
+        assert stored.tags == ["x"]
+        assert stored.source_type == "consolidation"
+        conn, cluster = write.call_args.args
+        assert conn is memory_system.conn
+        assert cluster.member_ids == ["m1", "m3", "m4"]
+        assert write.call_args.kwargs["archive"] is True
+        assert write.call_args.kwargs["summary_id"] == stored.memory_id
+        assert "m1" not in memory_system.memory_cache
+
+        assert report["memories_processed"] == 4
+        assert report["memories_created"] == 1
+        assert report["memories_archived"] == 3
+        assert report["clusters_found"] == 2
+        # Watermark moves to the last streamed memory
+        assert db.execute.await_args.args[3:] == (T0 + timedelta(minutes=4), "m4", 4)
+        assert engine.get_stats()["runs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_cluster_holds_watermark(self, memory_system):
+        """The watermark stops just before the first member of a failed cluster."""
+        engine = ConsolidationEngine(chunk_size=10, min_cluster_size=2)
+        stream = [
+            stream_row("m1", vector(0.0, 1.0), 1),
+            stream_row("m2", vector(1.0), 2),
+            stream_row("m3", vector(1.0), 3),
+        ]
+        db = AsyncMock()
+        db.fetch_one = AsyncMock(return_value=None)
+        db.fetch_all = AsyncMock(side_effect=[[], stream, [detail_row("m2"), detail_row("m3")]])
+
+        with patch.object(memory_consolidation, "db", db), \
+                patch.object(memory_consolidation, "ai_request", AsyncMock(side_effect=RuntimeError("down"))), \
+                patch.object(engine, "_write_cluster_rows", AsyncMock()) as write:
+            report = await engine.run(memory_system, "summarize")
+
+        assert report["llm_failures"] == 1
+        assert report["memories_archived"] == 0
+        write.assert_not_awaited()
+        assert db.execute.await_args.args[3:] == (T0 + timedelta(minutes=1), "m1", 1)
+
+    @pytest.mark.asyncio
+    async def test_failed_archive_rolls_back_summary(self, memory_system):
+        """If archiving fails the summary INSERT fails with it, leaving nothing to duplicate."""
+        engine = ConsolidationEngine(chunk_size=10, min_cluster_size=2)
+        db = AsyncMock()
+        db.fetch_one = AsyncMock(return_value=None)
+        db.fetch_all = AsyncMock(side_effect=[
+            [], [stream_row("m1", vector(1.0), 1), stream_row("m2", vector(1.0), 2)],
+            [detail_row("m1"), detail_row("m2")],
+        ])
+        memory_system.memory_cache.put("m1", "cached", 10)
+
+        with patch.object(memory_consolidation, "db", db), \
+                patch.object(memory_consolidation, "ai_request", AsyncMock(return_value={"content": "merged"})), \
+                patch.object(engine, "_write_cluster_rows", AsyncMock(side_effect=RuntimeError("deadlock"))):
+            report = await engine.run(memory_system, "summarize")
+
+        # One store call, which raised: the summary shares the archive's transaction
+        memory_system.store_memories_bulk.assert_awaited_once()
+        assert report["memories_created"] == 0 and report["llm_failures"] == 1
+        assert "m1" in memory_system.memory_cache
+        memory_system._delete_memories_from_chromadb.assert_not_awaited()
+        db.execute.assert_not_awaited()  # Watermark held before m1
+
+    @pytest.mark.asyncio
+    async def test_new_memories_extend_existing_summary(self, memory_system):
+        """A memory close to an earlier summary is merged with it, archiving both."""
+        engine = ConsolidationEngine(chunk_size=10, min_cluster_size=3)
+        watermark = {"last_created_at": T0, "last_memory_id": "m0"}
+        db = AsyncMock()
+        db.fetch_one = AsyncMock(return_value=watermark)
+        db.fetch_all = AsyncMock(side_effect=[
+            [{"id": "s1", "agent_id": "a", "source_id": "cluster-1", "embedding": vector(1.0)}],
+            [stream_row("m5", vector(1.0, 0.1), 5)],
+            [detail_row("s1"), detail_row("m5")],
+        ])
+        ai = AsyncMock(return_value={"content": "updated", "provider": "groq"})
+
+        with patch.object(memory_consolidation, "db", db), \
+                patch.object(memory_consolidation, "ai_request", ai), \
+                patch.object(engine, "_write_cluster_rows", AsyncMock()) as write:
+            report = await engine.run(memory_system, "integrate", new_clusters=False)
+
+        assert db.fetch_all.await_args_list[1].args[1:3] == (T0, "m0")
+        assert ai.call_args.kwargs["prompt"].startswith("Existing summary:\ncontent s1")
+        cluster = write.call_args.args[1]
+        assert (cluster.cluster_id, cluster.summary_id, cluster.member_ids) == ("cluster-1", "s1", ["m5"])
+        assert report["memories_archived"] == 2
+
+    @pytest.mark.asyncio
+    async def test_lookback_replay_completes_undersized_clusters(self, memory_system):
+        """A near-duplicate left below min_cluster_size last run joins this run's matches."""
+        engine = ConsolidationEngine(chunk_size=10, min_cluster_size=3, lookback_hours=1)
+        watermark = {"last_created_at": T0 + timedelta(minutes=10), "last_memory_id": "m2"}
+        db = AsyncMock()
+        db.fetch_one = AsyncMock(return_value=watermark)
+        db.fetch_all = AsyncMock(side_effect=[
+            [],  # earlier summaries
+            # Replay stops at the first memory past the watermark
+            [stream_row("m1", vector(1.0), 5), stream_row("m2", vector(0.0, 1.0), 10),
+             stream_row("m4", vector(1.0), 12)],
+            [stream_row("m4", vector(1.0), 12), stream_row("m5", vector(1.0, 0.05), 13)],
+            [detail_row("m1"), detail_row("m4"), detail_row("m5")],
+        ])
+        ai = AsyncMock(return_value={"content": "merged", "provider": "groq"})
+
+        with patch.object(memory_consolidation, "db", db), \
+                patch.object(memory_consolidation, "ai_request", ai), \
+                patch.object(engine, "_write_cluster_rows", AsyncMock()) as write:
+            report = await engine.run(memory_system, "summarize")
+
+        assert db.fetch_all.await_args_list[1].args[1] == T0 + timedelta(minutes=10) - timedelta(hours=1)
+        assert db.fetch_all.await_args_list[2].args[1:3] == (T0 + timedelta(minutes=10), "m2")
+        assert write.call_args.args[1].member_ids == ["m1", "m4", "m5"]
+        assert report["memories_replayed"] == 2
+        assert report["memories_processed"] == 2
+        assert db.execute.await_args.args[3:] == (T0 + timedelta(minutes=13), "m5", 2)
@@ -0,0 +1,102 @@
+"""
+Unit tests for MemoryIngestBuffer.
+
+Tests batching of enqueued memories, the pending bound, bisection of
+rejected batches, retries of failed batches and draining on close.
+"""
+
+import asyncio
+
+import asyncpg
+import pytest
+from unittest.mock import AsyncMock
+
+from app.services.memory_ingest import MemoryIngestBuffer
+
+
+class TestMemoryIngestBuffer:
+    """Test suite for MemoryIngestBuffer class."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_in_batches(self):
+        """Pending memories are written batch_size at a time."""
+        write = AsyncMock()
+        buffer = MemoryIngestBuffer(write, key=str, batch_size=2, flush_interval_seconds=60)
+
+        for i in range(5):
+            assert buffer.enqueue(i)
+        await buffer.flush()
+
+        assert [call.args[0] for call in write.await_args_list] == [[0, 1], [2, 3], [4]]
+        stats = buffer.get_stats()
+        assert stats["written"] == 5 and stats["batches"] == 3 and stats["pending"] == 0
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_full_batch_wakes_flusher(self):
+        """Reaching batch_size flushes without waiting for the interval."""
+        write = AsyncMock()
+        buffer = MemoryIngestBuffer(write, key=str, batch_size=2, flush_interval_seconds=60)
+
+        buffer.enqueue("a")
+        buffer.enqueue("b")
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        write.assert_awaited_once_with(["a", "b"])
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_bounded_pending(self):
+        buffer = MemoryIngestBuffer(AsyncMock(), key=str, batch_size=10, max_pending=2, flush_interval_seconds=60)
+
+        assert buffer.enqueue(1) and buffer.enqueue(2)
+        assert not buffer.enqueue(3)
+        assert buffer.get_stats()["dropped"] == 1
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_then_dropped(self):
+        """A failing batch stays queued until max_retries, then is dropped."""
+        write = AsyncMock(side_effect=asyncpg.ConnectionDoesNotExistError("db down"))
+        buffer = MemoryIngestBuffer(write, key=str, batch_size=10, max_retries=2, flush_interval_seconds=60)
+        buffer.enqueue("a")
+
+        await buffer.flush()
+        assert len(buffer) == 1
+        await buffer.flush()
+        assert len(buffer) == 0
+
+        stats = buffer.get_stats()
+        assert stats["flush_errors"] == 2 and stats["dropped"] == 1
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_is_bisected(self):
+        """Only the record Postgres refuses is lost; the rest of its batch is written."""
+        written = []
+
+        async def write(batch):
+            if "bad" in batch:
+                raise ValueError("invalid input for query argument $2")
+            written.extend(batch)
+
+        buffer = MemoryIngestBuffer(write, key=str, batch_size=8, flush_interval_seconds=60)
+        for record in ["a", "b", "bad", "c", "d"]:
+            buffer.enqueue(record)
+        await buffer.flush()
+
+        assert sorted(written) == ["a", "b", "c", "d"]
+        stats = buffer.get_stats()
+        assert stats["rejected"] == 1 and stats["dropped"] == 0 and stats["pending"] == 0
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_drains(self):
+        write = AsyncMock()
+        buffer = MemoryIngestBuffer(write, key=str, batch_size=10, flush_interval_seconds=60)
+        buffer.enqueue("a")
+
+        await buffer.close()
+
+        write.assert_awaited_once_with(["a"])
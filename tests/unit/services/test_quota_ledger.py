@@ -0,0 +1,79 @@
+"""
+Unit tests for QuotaLedger.
+
+Tests in-process counting, reconciliation against the usage table,
+day rollover, token-bucket rate limiting and DB-free provider selection.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services import ai_providers
+from app.services import quota_ledger as ledger_module
+from app.services.quota_ledger import QuotaLedger, TokenBucket
+
+
+class TestQuotaLedger:
+    """Test suite for QuotaLedger class."""
+
+    @pytest.fixture
+    def ledger(self):
+        return QuotaLedger()
+
+    def test_record_counts_locally(self, ledger):
+        """Recorded calls are visible immediately without any I/O."""
+        ledger.record("groq", tokens=100, cost_usd=0.01)
+        ledger.record("groq", tokens=50)
+
+        assert ledger.requests_today("groq") == 2
+        stats = ledger.get_stats()["providers"]["groq"]
+        assert stats["tokens_today"] == 150
+        assert stats["cost_today"] == pytest.approx(0.01)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_takes_max_of_local_and_table(self, ledger):
+        """Reconciling never loses local increments not yet written."""
+        ledger.record("groq", tokens=10)
+        rows = [
+            {"provider": "groq", "request_count": 0, "token_count": 0, "cost_usd": 0},
+            {"provider": "google", "request_count": 40, "token_count": 900, "cost_usd": 0.2},
+        ]
+        with patch.object(ledger_module, "db") as mock_db:
+            mock_db.fetch_all = AsyncMock(return_value=rows)
+            await ledger.reconcile()
+
+        assert ledger.requests_today("groq") == 1
+        assert ledger.requests_today("google") == 40
+        assert ledger.get_stats()["reconciles"] == 1
+
+    def test_day_rollover_resets_counters(self, ledger):
+        """Yesterday's usage doesn't count against today's quota."""
+        ledger.record("groq")
+        ledger._day = date.today() - timedelta(days=1)
+
+        assert ledger.requests_today("groq") == 0
+
+    def test_token_bucket_limits_bursts(self):
+        """A bucket admits one minute's allowance, then throttles."""
+        bucket = TokenBucket(per_minute=3)
+
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+        assert bucket.throttled == 1
+
+    @pytest.mark.asyncio
+    async def test_select_provider_skips_exhausted_and_limited(self, ledger):
+        """Selection uses ledger counts and rate limits, never the database."""
+        ledger._quotas["groq"] = ledger_module.ProviderQuota(requests=ai_providers.PROVIDERS["groq"].daily_limit)
+        ledger._buckets["google"] = TokenBucket(per_minute=1)
+        ledger._buckets["google"].try_acquire()
+
+        with patch.object(ai_providers, "quota_ledger", ledger), \
+                patch.object(ai_providers, "get_api_key", return_value="key"), \
+                patch.object(ledger_module, "db") as mock_db:
+            provider = await ai_providers.select_provider("classification")
+
+        assert provider == "openrouter"
+        mock_db.fetch_one.assert_not_called()
+        mock_db.fetch_all.assert_not_called()
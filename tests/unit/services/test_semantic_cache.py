@@ -0,0 +1,161 @@
+"""
+Unit tests for the semantic cache lookup tiers.
+
+Tests the exact-hash LRU, the negative cache, the Postgres hash probe,
+store/cleanup upkeep of the tiers and stores racing an index rebuild, with
+the database and embedding model mocked out.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from app.services import semantic_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_cache_state():
+    """Clear module-level tiers and counters between tests."""
+    semantic_cache._exact_lru.clear()
+    semantic_cache._negative_cache.clear()
+    for key in semantic_cache._lookup_counters:
+        semantic_cache._lookup_counters[key] = 0
+    semantic_cache._index.rebuild([], [])
+    yield
+    semantic_cache._exact_lru.clear()
+    semantic_cache._negative_cache.clear()
+
+
+class TestSemanticCacheTiers:
+    """Test suite for tiered semantic cache lookups."""
+
+    @pytest.mark.asyncio
+    async def test_hash_probe_hit_populates_lru(self):
+        """A query_hash hit is served without embedding and then from memory."""
+        row = {"id": "abc", "response_text": "cached answer", "model_used": "groq/llama",
+               "tokens_saved": 10, "expires_at": None}
+
+        with patch.object(semantic_cache, "db") as mock_db, \
+                patch.object(semantic_cache, "embed", AsyncMock()) as mock_embed:
+            mock_db.fetch_one = AsyncMock(return_value=row)
+            mock_db.execute = AsyncMock()
+
+            first = await semantic_cache.check_cache("hello")
+            second = await semantic_cache.check_cache("hello")
+
+        assert first.response_text == "cached answer"
+        assert second.id == "abc"
+        mock_embed.assert_not_called()
+        mock_db.fetch_one.assert_called_once()
+
+        stats = semantic_cache.get_lookup_stats()
+        assert stats["tiers"]["hash"]["hits"] == 1
+        assert stats["tiers"]["memory"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_miss_is_negatively_cached(self):
+        """A repeated miss skips the hash probe and the embedding model."""
+        semantic_cache._index_ready = True
+
+        with patch.object(semantic_cache, "db") as mock_db, \
+                patch.object(semantic_cache, "embed", AsyncMock(return_value=np.full(384, 0.1, dtype=np.float32))) as mock_embed:
+            mock_db.fetch_one = AsyncMock(return_value=None)
+
+            assert await semantic_cache.check_cache("unknown") is None
+            assert await semantic_cache.check_cache("unknown") is None
+
+        assert mock_embed.call_count == 1
+        assert mock_db.fetch_one.call_count == 1
+
+        stats = semantic_cache.get_lookup_stats()
+        assert stats["lookups"] == 2
+        assert stats["misses"] == 2
+        assert stats["tiers"]["negative"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_store_clears_negative_entry(self):
+        """Storing a response makes the next identical lookup a memory hit."""
+        semantic_cache._remember_miss(semantic_cache._query_hash("question"))
+        row = {"id": "new-id", "response_text": "answer", "model_used": "groq/llama", "tokens_saved": 5,
+               "expires_at": None}
+
+        with patch.object(semantic_cache, "db") as mock_db, \
+                patch.object(semantic_cache, "embed", AsyncMock(return_value=np.full(384, 0.2, dtype=np.float32))):
+            mock_db.fetch_one = AsyncMock(return_value=row)
+            mock_db.execute = AsyncMock()
+
+            assert await semantic_cache.store_cache("question", "answer", "groq/llama") == "new-id"
+            cached = await semantic_cache.check_cache("question")
+
+        assert cached.response_text == "answer"
+        assert semantic_cache.get_lookup_stats()["tiers"]["memory"]["hits"] == 1
+        assert "new-id" in semantic_cache._index
+
+    @pytest.mark.asyncio
+    async def test_store_conflict_keeps_row_expiry(self):
+        """A duplicate store caches the existing row under that row's own expiry."""
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        row = {"id": "old-id", "response_text": "first answer", "model_used": "groq/llama",
+               "tokens_saved": 5, "expires_at": expires_at}
+
+        with patch.object(semantic_cache, "db") as mock_db, \
+                patch.object(semantic_cache, "embed", AsyncMock(return_value=np.full(384, 0.2, dtype=np.float32))):
+            mock_db.fetch_one = AsyncMock(return_value=row)
+            assert await semantic_cache.store_cache("question", "second answer", "groq/llama") == "old-id"
+
+        cached, expires_ts = semantic_cache._exact_lru[semantic_cache._query_hash("question")]
+        assert cached.response_text == "first answer"
+        assert expires_ts == pytest.approx(semantic_cache._expiry_timestamp(expires_at))
+
+    @pytest.mark.asyncio
+    async def test_cleanup_evicts_exact_lru(self):
+        """Deleted rows leave the hash tier as well as the vector index."""
+        semantic_cache._lru_put("h1", semantic_cache.CachedResponse("id-1", "a", "m", 0, 1.0), None)
+        semantic_cache._lru_put("h2", semantic_cache.CachedResponse("id-2", "b", "m", 0, 1.0), None)
+
+        with patch.object(semantic_cache, "db") as mock_db:
+            mock_db.fetch_all = AsyncMock(return_value=[{"id": "id-1", "query_hash": "h1"}])
+            assert await semantic_cache.cleanup_expired() == 1
+
+        assert list(semantic_cache._exact_lru) == ["h2"]
+
+    @pytest.mark.asyncio
+    async def test_memory_hit_keeps_hit_count_task(self):
+        """The background hit-count update is referenced until it finishes."""
+        semantic_cache._lru_put(semantic_cache._query_hash("q"),
+                                semantic_cache.CachedResponse("id-1", "a", "m", 0, 1.0), None)
+
+        with patch.object(semantic_cache, "db") as mock_db:
+            mock_db.execute = AsyncMock()
+            assert (await semantic_cache.check_cache("q")).id == "id-1"
+            assert len(semantic_cache._background) == 1
+            await asyncio.gather(*semantic_cache._background)
+
+        mock_db.execute.assert_awaited_once()
+        assert not semantic_cache._background
+
+    @pytest.mark.asyncio
+    async def test_store_during_rebuild_survives_swap(self):
+        """An entry stored while rebuild_index loads rows is kept after the swap."""
+        row = {"id": "new-id", "response_text": "answer", "model_used": "groq/llama", "tokens_saved": 5,
+               "expires_at": None}
+        old = {"id": "old-id", "query_embedding": [0.3] * 384, "expires_at": None}
+
+        with patch.object(semantic_cache, "db") as mock_db, \
+                patch.object(semantic_cache, "embed", AsyncMock(return_value=np.full(384, 0.2, dtype=np.float32))):
+            mock_db.fetch_one = AsyncMock(return_value=row)
+
+            async def fetch_all(query):
+                # The snapshot was taken before the concurrent store committed
+                await semantic_cache.store_cache("question", "answer", "groq/llama")
+                return [old]
+
+            mock_db.fetch_all = fetch_all
+            assert await semantic_cache.rebuild_index() == 2
+
+        assert "new-id" in semantic_cache._index
+        assert "old-id" in semantic_cache._index
+        assert semantic_cache._rebuild_log is None
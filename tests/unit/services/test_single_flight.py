@@ -0,0 +1,84 @@
+"""
+Unit tests for SingleFlight.
+
+Tests request keys, coalescing of concurrent identical calls, error
+sharing and isolation of cancelled callers.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight, flight_key
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight class."""
+
+    @pytest.fixture
+    def flight(self):
+        return SingleFlight()
+
+    def test_key_normalizes_whitespace(self):
+        """Whitespace differences share a key; params do not."""
+        assert flight_key("chat", "hello   world\n", model="m") == flight_key("chat", " hello world", model="m")
+        assert flight_key("chat", "hello", model="a") != flight_key("chat", "hello", model="b")
+        assert flight_key("chat", "hello") != flight_key("ai_request", "hello")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_coalesced(self, flight):
+        """Identical in-flight requests await a single upstream call."""
+        calls = []
+
+        async def upstream():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"content": "answer"}
+
+        results = await asyncio.gather(*(flight.do("chat", "k", upstream) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert all(r == {"content": "answer"} for r in results)
+        stats = flight.get_stats()
+        assert stats["coalesced_requests"] == 4
+        assert stats["scopes"]["chat"] == {"requests": 5, "coalesced": 4}
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_cached(self, flight):
+        """Once a call finishes the next identical request goes upstream."""
+        calls = []
+
+        async def upstream():
+            calls.append(1)
+            return len(calls)
+
+        assert await flight.do("chat", "k", upstream) == 1
+        assert await flight.do("chat", "k", upstream) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared(self, flight):
+        """Every waiter sees the upstream failure."""
+        async def upstream():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(
+            *(flight.do("chat", "k", upstream) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self, flight):
+        """Cancelling the first caller leaves the shared call running."""
+        async def upstream():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        first = asyncio.ensure_future(flight.do("chat", "k", upstream))
+        second = asyncio.ensure_future(flight.do("chat", "k", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "ok"
@@ -0,0 +1,182 @@
+"""
+Unit tests for TelemetrySink.
+
+Tests COPY batching on the dedicated connection, jsonb encoding of usage
+rows, counter aggregation into one UPSERT, the drop policy when the buffer
+is full, retries after connection failures and isolation of rows Postgres
+rejects.
+"""
+
+import json
+from decimal import Decimal
+
+import asyncpg
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import database as database_module
+from app.services import telemetry_sink as sink_module
+from app.services.database import DatabaseService
+from app.services.telemetry_sink import TelemetrySink, as_decimal, as_uuid
+
+COLUMNS = ("provider", "input_tokens")
+
+
+def _mock_db(copy_side_effect=None):
+    """A db stand-in whose connect_dedicated() returns a conn with copy_records_to_table."""
+    conn = MagicMock()
+    conn.copy_records_to_table = AsyncMock(side_effect=copy_side_effect)
+    conn.is_closed = MagicMock(return_value=False)
+    conn.close = AsyncMock()
+    mock_db = MagicMock()
+    mock_db.connect_dedicated = AsyncMock(return_value=conn)
+    mock_db.execute = AsyncMock()
+    return mock_db, conn
+
+
+class TestTelemetrySink:
+    """Test suite for TelemetrySink class."""
+
+    @pytest.fixture
+    async def sink(self):
+        sink = TelemetrySink(batch_size=1000, flush_interval_seconds=60, max_pending=3, backpressure_timeout_ms=10)
+        yield sink
+        if sink._task:
+            sink._task.cancel()
+
+    def test_coercions(self):
+        """Column helpers tolerate non-UUID ids and floats."""
+        assert as_uuid("not-a-uuid") is None
+        assert as_uuid("00000000-0000-0000-0000-000000000001").int == 1
+        assert as_decimal(0.1) == Decimal("0.1")
+
+    @pytest.mark.asyncio
+    async def test_rows_are_copied_in_one_batch(self, sink):
+        """Buffered rows go out in a single COPY per table."""
+        mock_db, conn = _mock_db()
+        sink.enqueue_row("api_usage", COLUMNS, ("groq", 1))
+        sink.enqueue_row("api_usage", COLUMNS, ("deepseek", 2))
+
+        with patch.object(sink_module, "db", mock_db):
+            await sink.flush()
+
+        conn.copy_records_to_table.assert_awaited_once()
+        args, kwargs = conn.copy_records_to_table.call_args
+        assert args[0] == "api_usage"
+        assert kwargs["records"] == [("groq", 1), ("deepseek", 2)]
+        assert kwargs["columns"] == list(COLUMNS)
+        assert sink.get_stats()["rows_written"] == 2
+        mock_db.connection.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_copy_connection_is_reused(self, sink):
+        """Flushes share one dedicated connection, which close() releases."""
+        mock_db, conn = _mock_db()
+
+        with patch.object(sink_module, "db", mock_db):
+            for i in range(2):
+                sink.enqueue_row("api_usage", COLUMNS, ("groq", i))
+                await sink.flush()
+            await sink.close()
+
+        mock_db.connect_dedicated.assert_awaited_once()
+        conn.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_usage_row_encodes_jsonb_as_text(self, sink):
+        """request_metadata reaches COPY as JSON text, which the native jsonb codec accepts."""
+        mock_db, conn = _mock_db()
+
+        with patch.object(database_module, "telemetry_sink", sink), \
+                patch.object(sink_module, "db", mock_db):
+            await DatabaseService().log_api_usage(
+                input_tokens=10, cost_usd=0.5, request_metadata={"route": "chat", "n": 1}
+            )
+            await sink.flush()
+
+        kwargs = conn.copy_records_to_table.call_args.kwargs
+        row = dict(zip(kwargs["columns"], kwargs["records"][0]))
+        assert isinstance(row["request_metadata"], str)
+        assert json.loads(row["request_metadata"]) == {"route": "chat", "n": 1}
+        assert row["cost_usd"] == Decimal("0.5")
+
+    @pytest.mark.asyncio
+    async def test_counters_are_summed_into_one_upsert(self, sink):
+        """Increments to the same key are merged before the UPSERT."""
+        mock_db, _ = _mock_db()
+        for tokens in (10, 20):
+            sink.increment("ai_provider_usage", ("provider", "date"), ("groq", "d"), {"request_count": 1, "token_count": tokens})
+        sink.increment("ai_provider_usage", ("provider", "date"), ("google", "d"), {"request_count": 1, "token_count": 5})
+
+        with patch.object(sink_module, "db", mock_db):
+            await sink.flush()
+
+        mock_db.execute.assert_awaited_once()
+        query, *params = mock_db.execute.call_args[0]
+        assert "ON CONFLICT (provider, date)" in query
+        assert "request_count = ai_provider_usage.request_count + EXCLUDED.request_count" in query
+        assert params == ["groq", "d", 2, 30, "google", "d", 1, 5]
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_drops_after_backpressure(self, sink):
+        """Writers wait briefly for room, then the record is dropped."""
+        for i in range(3):
+            assert sink.enqueue_row("api_usage", COLUMNS, ("groq", i))
+
+        # Postgres is down, so the flusher woken by the writer requeues everything
+        mock_db, _ = _mock_db()
+        mock_db.connect_dedicated = AsyncMock(side_effect=OSError("connection refused"))
+        with patch.object(sink_module, "db", mock_db):
+            assert await sink.write_row("api_usage", COLUMNS, ("groq", 99)) is False
+        stats = sink.get_stats()
+        assert stats["dropped"] == 1
+        assert stats["backpressure_waits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_connection_failure_requeues(self, sink):
+        """Rows survive a failed flush and are written by the next one."""
+        mock_db, conn = _mock_db(copy_side_effect=[OSError("connection refused"), None])
+        sink.enqueue_row("api_usage", COLUMNS, ("groq", 1))
+
+        with patch.object(sink_module, "db", mock_db):
+            await sink.flush()
+            assert sink.get_stats()["pending_rows"] == 1
+            await sink.flush()
+
+        stats = sink.get_stats()
+        assert stats["rows_written"] == 1
+        assert stats["flush_errors"] == 1
+        assert stats["pending_rows"] == 0
+        # The failed connection is replaced rather than reused
+        assert mock_db.connect_dedicated.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_row_is_isolated(self, sink):
+        """A row Postgres rejects doesn't take the rest of the batch with it."""
+        def copy(table, records, columns):
+            if len(records) > 1 or records[0][1] == "bad":
+                raise asyncpg.DataError("invalid input")
+
+        mock_db, _ = _mock_db(copy_side_effect=copy)
+        for value in (1, "bad", 3):
+            sink.enqueue_row("api_usage", COLUMNS, ("groq", value))
+
+        with patch.object(sink_module, "db", mock_db):
+            await sink.flush()
+
+        stats = sink.get_stats()
+        assert stats["rows_written"] == 2
+        assert stats["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_close_drains(self, sink):
+        """Shutdown writes whatever is still buffered."""
+        mock_db, conn = _mock_db()
+        await sink.start()
+        sink.enqueue_row("api_usage", COLUMNS, ("groq", 1))
+
+        with patch.object(sink_module, "db", mock_db):
+            await sink.close()
+
+        conn.copy_records_to_table.assert_awaited_once()
+        assert sink.get_stats()["running"] is False
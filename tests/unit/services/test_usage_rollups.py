@@ -0,0 +1,110 @@
+"""
+Unit tests for UsageRollups.
+
+Tests bucket flooring and window decomposition, in-memory delta merging
+on reads, the additive flush and retry after a failed flush.
+"""
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services import usage_rollups as rollups_module
+from app.services.usage_rollups import NIL_AGENT, UsageRollups, bucket_start, window_ranges
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestUsageRollups:
+    """Test suite for UsageRollups class."""
+
+    @pytest.fixture
+    def rollups(self):
+        return UsageRollups()
+
+    def test_bucket_start(self):
+        """Timestamps floor to their minute, hour and day."""
+        ts = _ts(2026, 3, 14, 15, 9, 26, 500)
+        assert bucket_start(ts, "minute") == _ts(2026, 3, 14, 15, 9)
+        assert bucket_start(ts, "hour") == _ts(2026, 3, 14, 15)
+        assert bucket_start(ts, "day") == _ts(2026, 3, 14)
+
+    def test_window_ranges(self):
+        """A window splits into leading minutes, then hours, then days."""
+        ranges = window_ranges(_ts(2026, 3, 14, 15, 9, 26))
+
+        assert ranges["minute"] == (_ts(2026, 3, 14, 15, 9), _ts(2026, 3, 14, 16))
+        assert ranges["hour"] == (_ts(2026, 3, 14, 16), _ts(2026, 3, 15))
+        assert ranges["day"] == (_ts(2026, 3, 15), None)
+
+    @pytest.mark.asyncio
+    async def test_unflushed_deltas_are_read(self, rollups):
+        """Reads include calls recorded since the last flush."""
+        agent = uuid4()
+        rollups.record("groq", "llama", input_tokens=10, output_tokens=5, cost_usd=0.01, latency_ms=100, agent_id=agent)
+        rollups.record("groq", "llama", input_tokens=20, output_tokens=5, cost_usd=0.02, latency_ms=300, success=False)
+
+        with patch.object(rollups_module, "db") as mock_db:
+            mock_db.fetch_all = AsyncMock(return_value=[])
+            summary = await rollups.summary(datetime.now(timezone.utc) - timedelta(hours=24))
+            by_agent = await rollups.summary(datetime.now(timezone.utc) - timedelta(hours=24), group_by=("agent_id",))
+
+        assert summary["request_count"] == 2
+        assert summary["success_count"] == 1
+        assert summary["input_tokens"] == 30
+        assert summary["cost_usd"] == pytest.approx(0.03)
+        assert summary["avg_latency_ms"] == 200
+        assert {row["agent_id"] for row in by_agent["groups"]} == {agent, NIL_AGENT}
+
+    @pytest.mark.asyncio
+    async def test_reads_combine_stored_buckets(self, rollups):
+        """Stored rows and pending deltas are summed together."""
+        stored = {
+            "request_count": 3, "success_count": 3, "cache_hits": 0, "input_tokens": 30,
+            "output_tokens": 30, "cached_tokens": 0, "cost_usd": 0.5, "latency_ms_sum": 300,
+            "latency_samples": 3,
+        }
+        rollups.record("groq", "llama", input_tokens=10, latency_ms=100)
+
+        with patch.object(rollups_module, "db") as mock_db:
+            mock_db.fetch_all = AsyncMock(return_value=[stored])
+            summary = await rollups.summary(datetime.now(timezone.utc) - timedelta(days=30))
+
+        assert summary["request_count"] == 4
+        assert summary["input_tokens"] == 40
+        # Only the rollup table is read
+        assert "FROM usage_rollups" in mock_db.fetch_all.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_each_granularity_once(self, rollups):
+        """One call yields minute, hour and day rows in a single UPSERT."""
+        rollups.record("groq", "llama", input_tokens=1)
+        rollups.record("groq", "llama", input_tokens=2)
+
+        with patch.object(rollups_module, "db") as mock_db:
+            mock_db.execute = AsyncMock()
+            written = await rollups.flush()
+
+        assert written == 3
+        mock_db.execute.assert_awaited_once()
+        args = mock_db.execute.call_args[0]
+        assert "ON CONFLICT" in args[0]
+        assert sorted(args[1]) == ["day", "hour", "minute"]
+        assert rollups.get_stats()["pending_buckets"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self, rollups):
+        """Deltas from a failed flush are kept for the next one."""
+        rollups.record("groq", "llama", input_tokens=1)
+
+        with patch.object(rollups_module, "db") as mock_db:
+            mock_db.execute = AsyncMock(side_effect=RuntimeError("db down"))
+            assert await rollups.flush() == 0
+
+        stats = rollups.get_stats()
+        assert stats["flush_errors"] == 1
+        assert stats["pending_buckets"] == 3
@@ -0,0 +1,90 @@
+"""
+Unit tests for VectorIndex.
+
+Tests exact and IVF search, swap-removal, expiry handling and recall stats.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import VectorIndex
+
+
+class TestVectorIndex:
+    """Test suite for VectorIndex class."""
+
+    @pytest.fixture
+    def index(self):
+        """Create a small exact-mode index."""
+        return VectorIndex(dimension=4)
+
+    def test_empty_search(self, index):
+        """Searching an empty index returns nothing."""
+        assert index.search([1, 0, 0, 0]) == []
+
+    def test_exact_search_returns_best_match(self, index):
+        """Nearest vector by cosine similarity comes first."""
+        index.add("a", [1, 0, 0, 0])
+        index.add("b", [0, 1, 0, 0])
+        index.add("c", [0.9, 0.1, 0, 0])
+
+        results = index.search([1, 0, 0, 0], k=2)
+
+        assert [item_id for item_id, _ in results] == ["a", "c"]
+        assert results[0][1] == pytest.approx(1.0)
+
+    def test_add_replaces_existing_id(self, index):
+        """Re-adding an id overwrites its vector instead of duplicating it."""
+        index.add("a", [1, 0, 0, 0])
+        index.add("a", [0, 1, 0, 0])
+
+        assert len(index) == 1
+        assert index.search([0, 1, 0, 0])[0][1] == pytest.approx(1.0)
+
+    def test_remove_swaps_last_row(self, index):
+        """Removing a middle row keeps the remaining ids searchable."""
+        index.add("a", [1, 0, 0, 0])
+        index.add("b", [0, 1, 0, 0])
+        index.add("c", [0, 0, 1, 0])
+
+        assert index.remove("a") is True
+        assert index.remove("a") is False
+        assert len(index) == 2
+        assert index.search([0, 0, 1, 0])[0][0] == "c"
+        assert "a" not in index
+
+    def test_expired_entries_are_skipped(self, index):
+        """Expired vectors are never returned and can be pruned."""
+        now = time.time()
+        index.add("old", [1, 0, 0, 0], expires_at=now - 1)
+        index.add("new", [0.8, 0.2, 0, 0], expires_at=now + 3600)
+
+        assert index.search([1, 0, 0, 0])[0][0] == "new"
+        assert index.prune_expired(now) == ["old"]
+        assert len(index) == 1
+
+    def test_dimension_mismatch_raises(self, index):
+        """Vectors with the wrong dimension are rejected."""
+        with pytest.raises(ValueError):
+            index.add("bad", [1, 0, 0])
+
+    def test_ivf_mode_finds_exact_duplicates(self):
+        """Above ivf_min_size the index trains IVF and still finds stored vectors."""
+        rng = np.random.default_rng(42)
+        vectors = rng.normal(size=(600, 16)).astype(np.float32)
+        index = VectorIndex(dimension=16, ivf_min_size=500, nprobe=4, recall_sample_rate=1.0)
+        index.rebuild([str(i) for i in range(600)], vectors)
+
+        stats = index.get_stats()
+        assert stats["mode"] == "ivf"
+        assert stats["lists"] > 1
+
+        for i in (0, 123, 599):
+            assert index.search(vectors[i])[0][0] == str(i)
+
+        stats = index.get_stats()
+        assert stats["searches"] == 3
+        assert stats["recall_samples"] == 3
+        assert stats["estimated_recall"] == 1.0
@@ -0,0 +1,93 @@
+"""
+Unit tests for the in-process metrics registry.
+
+Tests OpenMetrics rendering of counters, gauges and histograms,
+scrape-time collectors and the request metrics middleware.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics import MetricsRegistry
+from app.middleware import metrics as middleware_module
+from app.middleware.metrics import RequestMetricsMiddleware
+
+
+class TestMetricsRegistry:
+    """Test suite for MetricsRegistry and its instruments."""
+
+    @pytest.fixture
+    def registry(self):
+        return MetricsRegistry()
+
+    def test_counter_and_gauge_render(self, registry):
+        """Counters get a _total sample and the output ends with # EOF."""
+        requests = registry.counter("nexus_test_requests", "Requests", ("provider",))
+        depth = registry.gauge("nexus_test_depth", "Depth")
+        requests.inc(provider="groq")
+        requests.inc(2, provider="groq")
+        depth.set(7)
+
+        text = registry.render()
+
+        assert "# TYPE nexus_test_requests counter" in text
+        assert 'nexus_test_requests_total{provider="groq"} 3' in text
+        assert "nexus_test_depth 7" in text
+        assert text.endswith("# EOF\n")
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """Bucket counts accumulate up to +Inf, with _count and _sum."""
+        latency = registry.histogram("nexus_test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+
+        text = registry.render()
+
+        assert 'nexus_test_latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'nexus_test_latency_seconds_bucket{le="1"} 3' in text
+        assert 'nexus_test_latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "nexus_test_latency_seconds_count 4" in text
+        assert "nexus_test_latency_seconds_sum 3.65" in text
+
+    def test_collectors_run_on_scrape(self, registry):
+        """Collectors refresh gauges; a failing collector doesn't break the scrape."""
+        size = registry.gauge("nexus_test_size", "Size")
+        registry.register_collector(lambda: size.set(42))
+        registry.register_collector(lambda: 1 / 0)
+
+        assert "nexus_test_size 42" in registry.render()
+
+    def test_collected_totals_render_as_counters(self, registry):
+        """Totals mirrored from a cache's own counters are typed as counters."""
+        lookups = registry.counter("nexus_test_cache_lookups", "Lookups", ("cache",))
+        registry.register_collector(lambda: lookups.set_total(12, cache="semantic"))
+
+        text = registry.render()
+        assert "# TYPE nexus_test_cache_lookups counter" in text
+        assert 'nexus_test_cache_lookups_total{cache="semantic"} 12' in text
+
+    def test_label_values_are_escaped(self, registry):
+        """Quotes and newlines in label values can't break the exposition."""
+        registry.counter("nexus_test_errors", "Errors", ("message",)).inc(message='bad "x"\n')
+
+        assert 'message="bad \\"x\\"\\n"' in registry.render()
+
+    def test_middleware_labels_by_route_template(self, registry, monkeypatch):
+        """Requests are labelled with the route template, not the concrete path."""
+        histogram = registry.histogram("nexus_test_http_seconds", "HTTP", ("method", "route", "status"))
+        monkeypatch.setattr(middleware_module, "HTTP_REQUEST_DURATION", histogram)
+        app = FastAPI()
+        app.add_middleware(RequestMetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            return {"id": item_id}
+
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+
+        assert histogram.count(method="GET", route="/items/{item_id}", status="2xx") == 2
+        assert histogram.count(method="GET", route="unmatched", status="4xx") == 1